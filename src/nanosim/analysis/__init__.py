@@ -0,0 +1,50 @@
+"""Trajectory analysis tools.
+
+Vectorized, streaming analyses of MD trajectories used by the scale bridges
+and workflows (hydrogen bonds, frame clustering, pocket detection,
+coarse-grained mapping).
+"""
+
+from .clustering import LeaderClustering, cluster_frames, superposed_rmsd, superposition
+from .coarse_grain import MARTINI_MAPPING, CGMapping, backmap_structure, map_structure
+from .hbonds import HBondCriteria, HBondResult, HydrogenBondAnalyzer
+from .pockets import (
+    PocketDetectionParams,
+    detect_pockets,
+    detect_pockets_batch,
+    track_pockets,
+)
+from .trajectory import (
+    Topology,
+    TrajectoryChunk,
+    iter_frames,
+    read_frames,
+    read_topology,
+    write_gro,
+    write_pdb,
+)
+
+__all__ = [
+    "LeaderClustering",
+    "cluster_frames",
+    "superposed_rmsd",
+    "superposition",
+    "MARTINI_MAPPING",
+    "CGMapping",
+    "backmap_structure",
+    "map_structure",
+    "HBondCriteria",
+    "HBondResult",
+    "HydrogenBondAnalyzer",
+    "PocketDetectionParams",
+    "detect_pockets",
+    "detect_pockets_batch",
+    "track_pockets",
+    "Topology",
+    "TrajectoryChunk",
+    "iter_frames",
+    "read_frames",
+    "read_topology",
+    "write_gro",
+    "write_pdb",
+]
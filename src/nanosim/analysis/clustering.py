@@ -0,0 +1,190 @@
+"""Streaming conformational clustering of trajectory frames.
+
+Leader clustering assigns each frame to the nearest cluster leader within an
+RMSD cutoff (after optimal superposition) and otherwise opens a new
+cluster with the frame as leader. Only leader coordinates of the selected
+atoms are kept, so memory is independent of trajectory length and the
+trajectory is read exactly once.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from .trajectory import TrajectoryChunk
+
+
+def superposed_rmsd(references: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """RMSD between every frame and every reference after optimal superposition.
+
+    Uses the singular values of the covariance matrix (Kabsch), batched over
+    all frame/reference combinations.
+
+    Args:
+        references: Centered coordinates of shape (n_refs, n_atoms, 3)
+        frames: Centered coordinates of shape (n_frames, n_atoms, 3)
+
+    Returns:
+        Array of shape (n_frames, n_refs) with RMSD values
+    """
+    n_atoms = frames.shape[1]
+    covariance = np.einsum("fai,raj->frij", frames, references)
+    singular = np.linalg.svd(covariance, compute_uv=False)
+
+    # Correct for improper rotations (reflections)
+    sign = np.sign(np.linalg.det(covariance))
+    singular[..., -1] *= np.where(sign == 0, 1.0, sign)
+
+    frame_norm = (frames**2).sum(axis=(1, 2))[:, None]
+    ref_norm = (references**2).sum(axis=(1, 2))[None, :]
+    msd = (frame_norm + ref_norm - 2.0 * singular.sum(axis=-1)) / n_atoms
+
+    return np.sqrt(np.clip(msd, 0.0, None))
+
+
+def superposition(mobile: np.ndarray, reference: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rigid transform optimally superposing coordinates onto a reference (Kabsch).
+
+    Args:
+        mobile: Coordinates of shape (n_atoms, 3)
+        reference: Coordinates of the same atoms, shape (n_atoms, 3)
+
+    Returns:
+        Tuple (rotation of shape (3, 3), translation of shape (3,)) such that
+        ``mobile @ rotation + translation`` best fits the reference
+    """
+    mobile_centre = mobile.mean(axis=0)
+    reference_centre = reference.mean(axis=0)
+    covariance = (mobile - mobile_centre).T @ (reference - reference_centre)
+    u, _, vt = np.linalg.svd(covariance)
+
+    # Correct for improper rotations (reflections)
+    if np.linalg.det(u @ vt) < 0:
+        u[:, -1] *= -1.0
+    rotation = u @ vt
+    return rotation, reference_centre - mobile_centre @ rotation
+
+
+class LeaderClustering:
+    """Single-pass leader clustering of frames on an RMSD cutoff.
+
+    Example:
+        >>> clustering = LeaderClustering(rmsd_cutoff=2.0)
+        >>> for chunk in iter_frames(traj_file, atom_indices=site_atoms):
+        ...     clustering.partial_fit(chunk)
+        >>> clustering.representatives(max_count=20)
+    """
+
+    def __init__(self, rmsd_cutoff: float = 2.0):
+        """Initialize clustering.
+
+        Args:
+            rmsd_cutoff: Maximum RMSD (Å) between a frame and its cluster leader
+
+        Raises:
+            ValueError: If rmsd_cutoff is not positive
+        """
+        if rmsd_cutoff <= 0:
+            raise ValueError("rmsd_cutoff must be positive")
+
+        self.rmsd_cutoff = rmsd_cutoff
+        self.leaders: np.ndarray | None = None
+        self.leader_frames: list[int] = []
+        self.leader_times: list[float] = []
+        self.sizes: list[int] = []
+        self.n_frames = 0
+
+    def partial_fit(self, chunk: TrajectoryChunk) -> np.ndarray:
+        """Assign the frames of a chunk to clusters, opening clusters as needed.
+
+        Args:
+            chunk: Trajectory chunk restricted to the clustering atoms
+
+        Returns:
+            Cluster label of each frame in the chunk
+        """
+        frames = chunk.coordinates - chunk.coordinates.mean(axis=1, keepdims=True)
+        labels = np.full(len(frames), -1, dtype=np.int64)
+
+        if self.leaders is not None:
+            rmsd = superposed_rmsd(self.leaders, frames)
+            nearest = rmsd.argmin(axis=1)
+            close = rmsd[np.arange(len(frames)), nearest] <= self.rmsd_cutoff
+            labels[close] = nearest[close]
+
+        # Frames far from all leaders open new clusters, in trajectory order
+        pending = np.nonzero(labels < 0)[0]
+        while len(pending):
+            leader = pending[0]
+            label = self._add_leader(
+                frames[leader], int(chunk.start + leader), float(chunk.times[leader])
+            )
+            rmsd = superposed_rmsd(frames[leader][None], frames[pending])[:, 0]
+            members = rmsd <= self.rmsd_cutoff
+            members[0] = True
+            labels[pending[members]] = label
+            pending = pending[~members]
+
+        counts = np.bincount(labels, minlength=len(self.sizes))
+        self.sizes = [size + int(n) for size, n in zip(self.sizes, counts, strict=True)]
+        self.n_frames += len(frames)
+
+        return labels
+
+    def _add_leader(self, coordinates: np.ndarray, frame: int, time: float) -> int:
+        """Register a new cluster leader and return its label."""
+        if self.leaders is None:
+            self.leaders = coordinates[None].copy()
+        else:
+            self.leaders = np.concatenate([self.leaders, coordinates[None]])
+        self.leader_frames.append(frame)
+        self.leader_times.append(time)
+        self.sizes.append(0)
+        return len(self.sizes) - 1
+
+    def representatives(self, max_count: int | None = None) -> list[dict[str, Any]]:
+        """Cluster leaders ordered by cluster population.
+
+        Args:
+            max_count: Maximum number of representatives to return
+
+        Returns:
+            List of dictionaries with frame index, time, cluster id,
+            cluster size and population fraction
+        """
+        order = sorted(range(len(self.sizes)), key=lambda i: (-self.sizes[i], i))
+        if max_count is not None:
+            order = order[:max_count]
+
+        return [
+            {
+                "index": self.leader_frames[i],
+                "time": self.leader_times[i],
+                "cluster": i,
+                "cluster_size": self.sizes[i],
+                "population": self.sizes[i] / max(self.n_frames, 1),
+            }
+            for i in order
+        ]
+
+
+def cluster_frames(
+    chunks: Iterable[TrajectoryChunk],
+    rmsd_cutoff: float = 2.0,
+    max_representatives: int | None = None,
+) -> list[dict[str, Any]]:
+    """Cluster a stream of frames and return representative frames.
+
+    Args:
+        chunks: Trajectory chunks restricted to the clustering atoms
+        rmsd_cutoff: Cluster RMSD cutoff (Å)
+        max_representatives: Maximum number of representatives
+
+    Returns:
+        Representative frames, most populated cluster first
+    """
+    clustering = LeaderClustering(rmsd_cutoff)
+    for chunk in chunks:
+        clustering.partial_fit(chunk)
+    return clustering.representatives(max_representatives)
@@ -0,0 +1,347 @@
+"""Coarse-grained (Martini-style) mapping and backmapping of MD structures.
+
+Atoms are grouped into beads per residue following a mapping scheme; bead
+positions are mass-weighted centres of the bead's atoms, taken over the
+periodic images nearest the bead's first atom when a box is given (so
+molecules wrapped atom-wise into the box map correctly). The atom-to-bead
+assignment is computed once from the topology as index arrays, so mapping
+a trajectory is a single gather and segmented sum (``np.add.reduceat``)
+over all frames, with no per-residue Python loop.
+
+Backmapping places every atom at its bead's coarse-grained position plus
+the atom's offset from the bead centre in an atomistic reference
+structure. The result keeps the reference's local geometry and needs an
+energy minimisation before atomistic MD.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .trajectory import NM_TO_ANGSTROM, Topology, read_frames, read_topology, write_gro
+
+# Bead definitions per residue: (bead name, heavy atoms). Hydrogens and
+# atoms not listed join the bead of the closest preceding listed atom.
+MARTINI_MAPPING: dict[str, tuple[tuple[str, tuple[str, ...]], ...]] = {
+    "GLY": (("BB", ("N", "CA", "C", "O")),),
+    "ALA": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB",))),
+    "CYS": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "SG"))),
+    "SER": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "OG"))),
+    "THR": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "OG1", "CG2"))),
+    "VAL": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG1", "CG2"))),
+    "LEU": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "CD1", "CD2"))),
+    "ILE": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG1", "CG2", "CD", "CD1"))),
+    "MET": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "SD", "CE"))),
+    "PRO": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "CD"))),
+    "ASN": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "OD1", "ND2"))),
+    "ASP": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "OD1", "OD2"))),
+    "GLN": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "CD", "OE1", "NE2"))),
+    "GLU": (("BB", ("N", "CA", "C", "O")), ("SC1", ("CB", "CG", "CD", "OE1", "OE2"))),
+    "LYS": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG", "CD")),
+        ("SC2", ("CE", "NZ")),
+    ),
+    "ARG": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG", "CD")),
+        ("SC2", ("NE", "CZ", "NH1", "NH2")),
+    ),
+    "HIS": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG")),
+        ("SC2", ("ND1", "CE1")),
+        ("SC3", ("NE2", "CD2")),
+    ),
+    "PHE": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG")),
+        ("SC2", ("CD1", "CE1")),
+        ("SC3", ("CD2", "CE2")),
+        ("SC4", ("CZ",)),
+    ),
+    "TYR": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG")),
+        ("SC2", ("CD1", "CE1")),
+        ("SC3", ("CD2", "CE2")),
+        ("SC4", ("CZ", "OH")),
+    ),
+    "TRP": (
+        ("BB", ("N", "CA", "C", "O")),
+        ("SC1", ("CB", "CG")),
+        ("SC2", ("CD1", "NE1")),
+        ("SC3", ("CD2", "CE2")),
+        ("SC4", ("CE3", "CZ3")),
+        ("SC5", ("CZ2", "CH2")),
+    ),
+    # CHARMM36 atom names; tail A is the sn-2 oleoyl, tail B the sn-1 palmitoyl
+    "POPC": (
+        ("NC3", ("N", "C11", "C12", "C13", "C14", "C15")),
+        ("PO4", ("P", "O11", "O12", "O13", "O14")),
+        ("GL1", ("C1", "C2", "O21", "C21", "O22")),
+        ("GL2", ("C3", "O31", "C31", "O32")),
+        ("C1A", ("C22", "C23", "C24", "C25")),
+        ("D2A", ("C26", "C27", "C28", "C29", "C210")),
+        ("C3A", ("C211", "C212", "C213", "C214")),
+        ("C4A", ("C215", "C216", "C217", "C218")),
+        ("C1B", ("C32", "C33", "C34", "C35")),
+        ("C2B", ("C36", "C37", "C38", "C39")),
+        ("C3B", ("C310", "C311", "C312")),
+        ("C4B", ("C313", "C314", "C315", "C316")),
+    ),
+    "SOL": (("W", ("OW",)),),
+}  # fmt: skip
+
+# Protonation-state and force-field residue names mapped like their parent
+RESIDUE_ALIASES = {
+    "HID": "HIS", "HIE": "HIS", "HIP": "HIS", "HSD": "HIS", "HSE": "HIS", "HSP": "HIS",
+    "CYX": "CYS", "ASH": "ASP", "GLH": "GLU", "LYN": "LYS",
+}  # fmt: skip
+MARTINI_MAPPING.update(
+    {alias: MARTINI_MAPPING[parent] for alias, parent in RESIDUE_ALIASES.items()}
+)
+
+# Atomic masses (u); unknown elements are weighted as carbon
+ATOMIC_MASSES = {"H": 1.008, "C": 12.011, "N": 14.007, "O": 15.999, "P": 30.974, "S": 32.06}
+
+
+@dataclass
+class CGMapping:
+    """Atom-to-bead assignment of an atomistic system.
+
+    Residues missing from the scheme (ions, ligands) become a single bead
+    named after the residue.
+
+    Attributes:
+        bead_index: Bead of every atom, shape (n_atoms,)
+        weights: Mass of every atom, shape (n_atoms,)
+        topology: Bead topology (bead names, residue names and numbers)
+
+    Example:
+        >>> mapping = CGMapping.from_topology(read_topology("membrane.gro"))
+        >>> for chunk in iter_frames("membrane.xtc", "membrane.gro"):
+        ...     beads = mapping.map_coordinates(chunk.coordinates)
+    """
+
+    bead_index: np.ndarray
+    weights: np.ndarray
+    topology: Topology
+
+    def __post_init__(self):
+        """Precompute the bead-sorted atom order used by map_coordinates."""
+        self._order = np.argsort(self.bead_index, kind="stable")
+        self._starts = np.searchsorted(self.bead_index[self._order], np.arange(self.n_beads))
+        self._sorted_weights = self.weights[self._order][:, None]
+        self._bead_mass = np.bincount(self.bead_index, self.weights, minlength=self.n_beads)
+        self._first_atoms = self._order[self._starts]
+
+    @property
+    def n_beads(self) -> int:
+        """Number of coarse-grained beads."""
+        return self.topology.n_atoms
+
+    @classmethod
+    def from_topology(
+        cls,
+        topology: Topology,
+        scheme: dict[str, tuple[tuple[str, tuple[str, ...]], ...]] | None = None,
+    ) -> "CGMapping":
+        """Assign the atoms of a topology to beads.
+
+        Args:
+            topology: Atomistic topology
+            scheme: Bead definitions per residue name (default: MARTINI_MAPPING)
+
+        Returns:
+            CGMapping of the topology
+        """
+        scheme = MARTINI_MAPPING if scheme is None else scheme
+        n_atoms = topology.n_atoms
+
+        # Residue index: a new residue starts where resid or resname changes
+        changed = np.ones(n_atoms, dtype=bool)
+        changed[1:] = (topology.resids[1:] != topology.resids[:-1]) | (
+            topology.resnames[1:] != topology.resnames[:-1]
+        )
+        residue = np.cumsum(changed) - 1
+        first_atoms = np.nonzero(changed)[0]
+        residue_names = topology.resnames[first_atoms]
+
+        # Local bead of each atom from the unique (resname, name) pairs only
+        pairs, inverse = np.unique(
+            np.char.add(
+                np.char.add(topology.resnames.astype(str), ":"), topology.names.astype(str)
+            ),
+            return_inverse=True,
+        )
+        bead_of_pair = {
+            f"{resname}:{name}": local
+            for resname, beads in scheme.items()
+            for local, (_, names) in enumerate(beads)
+            for name in names
+        }
+        lookup = np.array([bead_of_pair.get(pair, -1) for pair in pairs.tolist()], dtype=np.int64)
+        local = lookup[inverse.ravel()] if n_atoms else np.zeros(0, dtype=np.int64)
+        local[~np.isin(topology.resnames, list(scheme))] = 0
+
+        # Unlisted atoms follow the closest preceding listed atom of the residue
+        listed = np.where(local >= 0, np.arange(n_atoms), -1)
+        previous = np.maximum.accumulate(listed) if n_atoms else listed
+        follows = (previous >= 0) & (residue[np.maximum(previous, 0)] == residue)
+        local = np.where(local >= 0, local, np.where(follows, local[np.maximum(previous, 0)], 0))
+
+        # Global bead index, renumbered to drop beads without atoms
+        n_residue_beads = np.array([len(scheme.get(r, ((r, ()),))) for r in residue_names.tolist()])
+        offsets = np.concatenate([[0], np.cumsum(n_residue_beads)[:-1]]).astype(np.int64)
+        beads, first_of_bead, bead_index = np.unique(
+            offsets[residue] + local, return_index=True, return_inverse=True
+        )
+
+        resnames = topology.resnames[first_of_bead]
+        bead_local = local[first_of_bead]
+        names = [
+            scheme[r][i][0] if r in scheme else r[:5]
+            for r, i in zip(resnames.tolist(), bead_local.tolist(), strict=True)
+        ]
+        masses = np.array([ATOMIC_MASSES.get(e, ATOMIC_MASSES["C"]) for e in topology.elements])
+        return cls(
+            bead_index=bead_index.ravel(),
+            weights=masses,
+            topology=Topology(
+                names=np.array(names),
+                resnames=resnames,
+                resids=topology.resids[first_of_bead],
+                elements=np.full(len(beads), ""),
+            ),
+        )
+
+    def map_coordinates(self, coordinates: np.ndarray, box: np.ndarray | None = None) -> np.ndarray:
+        """Bead positions (mass-weighted centres) of atomistic coordinates.
+
+        Args:
+            coordinates: Atom coordinates of shape (..., n_atoms, 3), e.g. a
+                single structure or the frames of a trajectory chunk
+            box: Rectangular box lengths of shape (3,) or (..., 3); if given,
+                each atom is taken at its periodic image nearest the first
+                atom of its bead. Without a box, molecules must be whole
+                (e.g. a trajectory written with ``gmx trjconv -pbc mol``)
+
+        Returns:
+            Bead coordinates of shape (..., n_beads, 3)
+        """
+        if box is not None:
+            coordinates = self._unwrap(coordinates, box)
+        weighted = np.take(coordinates, self._order, axis=-2) * self._sorted_weights
+        return np.add.reduceat(weighted, self._starts, axis=-2) / self._bead_mass[:, None]
+
+    def backmap(
+        self, cg_coordinates: np.ndarray, reference: np.ndarray, box: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Atom coordinates from bead positions and an atomistic reference.
+
+        Args:
+            cg_coordinates: Bead coordinates of shape (..., n_beads, 3)
+            reference: Atomistic reference coordinates of shape (n_atoms, 3)
+            box: Rectangular box lengths of the reference (see map_coordinates)
+
+        Returns:
+            Atom coordinates of shape (..., n_atoms, 3)
+        """
+        if box is not None:
+            reference = self._unwrap(reference, box)
+        offsets = reference - self.map_coordinates(reference)[self.bead_index]
+        return np.take(cg_coordinates, self.bead_index, axis=-2) + offsets
+
+    def _unwrap(self, coordinates: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """Atoms moved to the periodic image nearest the first atom of their bead."""
+        anchors = np.take(coordinates, self._first_atoms[self.bead_index], axis=-2)
+        box = np.asarray(box, dtype=float)[..., None, :]
+        delta = coordinates - anchors
+        return anchors + delta - box * np.round(delta / box)
+
+
+def map_structure(
+    structure_file: Path, output_file: Path, mapping: CGMapping | None = None
+) -> Path:
+    """Write the coarse-grained counterpart of an atomistic structure.
+
+    Molecules wrapped atom-wise into the box of a .gro file are unwrapped
+    (see CGMapping.map_coordinates).
+
+    Args:
+        structure_file: Atomistic .gro or .pdb file
+        output_file: Output .gro file with one entry per bead
+        mapping: Mapping of the structure (built from its topology if None)
+
+    Returns:
+        Path to the written file
+    """
+    topology = read_topology(structure_file)
+    mapping = CGMapping.from_topology(topology) if mapping is None else mapping
+    coordinates = read_frames(structure_file, [0])[0]
+    box = _structure_box(structure_file, coordinates)
+    return write_gro(
+        output_file,
+        mapping.topology,
+        mapping.map_coordinates(coordinates, _periodic_box(structure_file, box)),
+        box,
+        title=f"Coarse-grained from {Path(structure_file).name}",
+    )
+
+
+def backmap_structure(cg_file: Path, reference_file: Path, output_file: Path) -> Path:
+    """Write an atomistic structure rebuilt from a coarse-grained one.
+
+    Args:
+        cg_file: Coarse-grained .gro or .pdb file (e.g. the last CG frame)
+        reference_file: Atomistic structure the CG system was mapped from
+        output_file: Output .gro file
+
+    Returns:
+        Path to the written file
+
+    Raises:
+        ValueError: If the CG structure does not match the reference's beads
+    """
+    topology = read_topology(reference_file)
+    mapping = CGMapping.from_topology(topology)
+    cg_coordinates = read_frames(cg_file, [0])[0]
+    if len(cg_coordinates) != mapping.n_beads:
+        raise ValueError(
+            f"{cg_file} has {len(cg_coordinates)} beads, "
+            f"the mapping of {reference_file} has {mapping.n_beads}"
+        )
+
+    reference = read_frames(reference_file, [0])[0]
+    coordinates = mapping.backmap(
+        cg_coordinates,
+        reference,
+        _periodic_box(reference_file, _structure_box(reference_file, reference)),
+    )
+    return write_gro(
+        output_file,
+        topology,
+        coordinates,
+        _structure_box(cg_file, cg_coordinates),
+        title=f"Backmapped from {Path(cg_file).name}",
+    )
+
+
+def _structure_box(structure_file: Path, coordinates: np.ndarray) -> np.ndarray:
+    """Box (Å) of a .gro file, or the coordinates' bounding box for other formats."""
+    if Path(structure_file).suffix.lower() == ".gro":
+        with open(structure_file) as handle:
+            last = handle.read().rstrip().splitlines()[-1]
+        return np.array(last.split()[:3], dtype=float) * NM_TO_ANGSTROM
+    if not len(coordinates):
+        return np.zeros(3)
+    return coordinates.max(axis=0) - coordinates.min(axis=0)
+
+
+def _periodic_box(structure_file: Path, box: np.ndarray) -> np.ndarray | None:
+    """The periodic box of a .gro file; other formats are taken as unwrapped."""
+    if Path(structure_file).suffix.lower() != ".gro" or not np.all(box > 0):
+        return None
+    return box
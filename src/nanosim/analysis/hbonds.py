@@ -0,0 +1,338 @@
+"""Vectorized hydrogen-bond occupancy analysis for ligand-receptor complexes.
+
+Hydrogen bonds are detected with geometric criteria:
+- Donor-acceptor distance below ``distance_cutoff`` (default 3.5 Å)
+- Donor-hydrogen-acceptor angle above ``angle_cutoff`` (default 150°)
+
+Only the ligand-receptor interface is evaluated. Each trajectory chunk is
+split into blocks whose polar atoms drift by at most ``max_drift``; for each
+block, polar atoms near the ligand are selected on its first frame (with the
+cutoff widened by the drift so contacts forming later in the block are kept),
+candidate donor/acceptor pairs are found with a cell list, and the geometric
+criteria are then applied to all frames of the block at once.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ..utils.spatial import CellList, neighbor_pairs
+from .trajectory import TrajectoryChunk
+
+HBOND_DONOR_ELEMENTS = ("N", "O")
+HBOND_ACCEPTOR_ELEMENTS = ("N", "O")
+COVALENT_H_CUTOFF = 1.25  # Å, maximum heavy atom-hydrogen bond length
+
+
+@dataclass
+class HBondCriteria:
+    """Geometric hydrogen-bond criteria.
+
+    Attributes:
+        distance_cutoff: Maximum donor-acceptor distance (Å)
+        angle_cutoff: Minimum donor-hydrogen-acceptor angle (degrees)
+        interface_cutoff: Distance from the ligand within which receptor atoms
+            are considered at the start of each block (Å)
+        max_drift: Largest atomic drift tolerated within one chunk before it
+            is split (Å); bounds the widened candidate search radius
+    """
+
+    distance_cutoff: float = 3.5
+    angle_cutoff: float = 150.0
+    interface_cutoff: float = 10.0
+    max_drift: float = 2.0
+
+
+@dataclass
+class HBondResult:
+    """Hydrogen-bond statistics over a trajectory.
+
+    Attributes:
+        per_frame_counts: Number of ligand-receptor H-bonds in each frame
+        pair_occupancy: Fraction of frames in which each (donor, hydrogen,
+            acceptor) triplet is hydrogen bonded
+    """
+
+    per_frame_counts: np.ndarray
+    pair_occupancy: dict[tuple[int, int, int], float] = field(default_factory=dict)
+
+    @property
+    def n_frames(self) -> int:
+        """Number of analysed frames."""
+        return len(self.per_frame_counts)
+
+    @property
+    def occupancy(self) -> float:
+        """Fraction of frames with at least one ligand-receptor H-bond."""
+        if self.n_frames == 0:
+            return 0.0
+        return float(np.count_nonzero(self.per_frame_counts) / self.n_frames)
+
+
+def find_donors(
+    coordinates: np.ndarray, elements: np.ndarray, atom_indices: np.ndarray
+) -> np.ndarray:
+    """Identify donor heavy atom-hydrogen pairs from covalent geometry.
+
+    Args:
+        coordinates: Coordinates of all atoms, shape (n_atoms, 3) in Å
+        elements: Element symbols of all atoms
+        atom_indices: Atoms to consider (e.g. the ligand)
+
+    Returns:
+        Array of shape (n_donors, 2) with (heavy atom, hydrogen) indices
+    """
+    atom_indices = np.asarray(atom_indices)
+    heavy = atom_indices[np.isin(elements[atom_indices], HBOND_DONOR_ELEMENTS)]
+    hydrogens = atom_indices[elements[atom_indices] == "H"]
+
+    if len(heavy) == 0 or len(hydrogens) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    heavy_idx, h_idx, _ = neighbor_pairs(
+        coordinates[heavy], coordinates[hydrogens], COVALENT_H_CUTOFF
+    )
+    return np.column_stack([heavy[heavy_idx], hydrogens[h_idx]]).astype(np.int64)
+
+
+def find_acceptors(elements: np.ndarray, atom_indices: np.ndarray) -> np.ndarray:
+    """Identify acceptor atoms by element.
+
+    Args:
+        elements: Element symbols of all atoms
+        atom_indices: Atoms to consider
+
+    Returns:
+        Array of acceptor atom indices
+    """
+    atom_indices = np.asarray(atom_indices)
+    return atom_indices[np.isin(elements[atom_indices], HBOND_ACCEPTOR_ELEMENTS)]
+
+
+class HydrogenBondAnalyzer:
+    """Compute ligand-receptor hydrogen-bond occupancy over a trajectory.
+
+    Only the ligand atoms and the polar atoms and hydrogens of the receptor
+    are read (``atom_indices``); passing them to ``iter_frames`` keeps
+    solvent and apolar atoms out of memory.
+
+    Example:
+        >>> analyzer = HydrogenBondAnalyzer(topology.elements, ligand_idx, receptor_idx)
+        >>> chunks = iter_frames(traj_file, chunk_size=200, atom_indices=analyzer.atom_indices)
+        >>> result = analyzer.run(chunks)
+        >>> result.occupancy
+    """
+
+    def __init__(
+        self,
+        elements: np.ndarray,
+        ligand_indices: np.ndarray,
+        receptor_indices: np.ndarray,
+        criteria: HBondCriteria | None = None,
+        donors: np.ndarray | None = None,
+        acceptors: np.ndarray | None = None,
+    ):
+        """Initialize analyzer.
+
+        Args:
+            elements: Element symbols of all atoms
+            ligand_indices: Atom indices of the ligand
+            receptor_indices: Atom indices of the receptor
+            criteria: Geometric criteria (defaults to HBondCriteria())
+            donors: Optional (heavy atom, hydrogen) pairs; detected from the
+                first frame when omitted
+            acceptors: Optional acceptor indices; detected by element when omitted
+        """
+        elements = np.asarray(elements)
+        ligand_indices = np.asarray(ligand_indices, dtype=np.int64)
+        receptor_indices = np.asarray(receptor_indices, dtype=np.int64)
+        polar_elements = HBOND_DONOR_ELEMENTS + HBOND_ACCEPTOR_ELEMENTS + ("H",)
+        receptor_polar = receptor_indices[np.isin(elements[receptor_indices], polar_elements)]
+        if donors is not None:
+            receptor_polar = np.concatenate([receptor_polar, np.ravel(donors)])
+        if acceptors is not None:
+            receptor_polar = np.concatenate([receptor_polar, acceptors])
+        self.n_atoms = len(elements)
+        self.atom_indices = np.union1d(ligand_indices, receptor_polar).astype(np.int64)
+
+        # Analysis runs on the atom_indices subset; results map back to input indices
+        local = lambda indices: np.searchsorted(self.atom_indices, indices)  # noqa: E731
+        self.elements = elements[self.atom_indices]
+        self.ligand_indices = local(ligand_indices)
+        self.receptor_indices = local(np.intersect1d(receptor_indices, self.atom_indices))
+        self.criteria = criteria or HBondCriteria()
+        self._donors = local(np.asarray(donors, dtype=np.int64)) if donors is not None else None
+        self._acceptors = (
+            local(np.asarray(acceptors, dtype=np.int64))
+            if acceptors is not None
+            else np.concatenate(
+                [
+                    find_acceptors(self.elements, self.ligand_indices),
+                    find_acceptors(self.elements, self.receptor_indices),
+                ]
+            )
+        )
+        self._cos_cutoff = float(np.cos(np.deg2rad(self.criteria.angle_cutoff)))
+        self._ligand_mask = np.zeros(len(self.atom_indices), dtype=bool)
+        self._ligand_mask[self.ligand_indices] = True
+
+    def run(self, chunks: Iterable[TrajectoryChunk]) -> HBondResult:
+        """Analyse a stream of trajectory chunks.
+
+        Args:
+            chunks: Trajectory chunks (e.g. from ``iter_frames``) holding
+                either all atoms or only ``atom_indices``
+
+        Returns:
+            HBondResult with per-frame counts and per-triplet occupancy
+
+        Raises:
+            ValueError: If a chunk holds neither all atoms nor atom_indices
+        """
+        counts: list[np.ndarray] = []
+        pair_frames: dict[tuple[int, int, int], int] = {}
+
+        for chunk in chunks:
+            coordinates = self._subset(chunk.coordinates)
+            if self._donors is None:
+                self._donors = np.concatenate(
+                    [
+                        find_donors(coordinates[0], self.elements, self.ligand_indices),
+                        find_donors(coordinates[0], self.elements, self.receptor_indices),
+                    ]
+                )
+            polar = np.union1d(self._donors[:, 0], self._acceptors)
+
+            for block, drift in self._split_by_drift(coordinates, polar):
+                # Interface atoms are chosen per block, with a margin covering
+                # the drift of any atom within it
+                radius = self.criteria.distance_cutoff + 2.0 * drift
+                donors, acceptors = self._interface(
+                    block[0], max(self.criteria.interface_cutoff, radius)
+                )
+                candidates = self._candidate_triplets(block[0], donors, acceptors, radius)
+                block_counts, triplets, frames_bonded = self._analyze_block(block, candidates)
+                counts.append(block_counts)
+                triplets = self.atom_indices[triplets]
+                for triplet, n in zip(
+                    map(tuple, triplets.tolist()), frames_bonded.tolist(), strict=True
+                ):
+                    pair_frames[triplet] = pair_frames.get(triplet, 0) + n
+
+        per_frame = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+        n_frames = max(len(per_frame), 1)
+        occupancy = {k: v / n_frames for k, v in pair_frames.items()}
+
+        return HBondResult(per_frame_counts=per_frame, pair_occupancy=occupancy)
+
+    def _subset(self, coordinates: np.ndarray) -> np.ndarray:
+        """Restrict chunk coordinates to atom_indices."""
+        if coordinates.shape[1] == len(self.atom_indices):
+            return coordinates
+        if coordinates.shape[1] == self.n_atoms:
+            return coordinates[:, self.atom_indices]
+        raise ValueError(
+            f"Chunk has {coordinates.shape[1]} atoms; expected {self.n_atoms} "
+            f"or the {len(self.atom_indices)} atoms of atom_indices"
+        )
+
+    def _interface(self, reference: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray]:
+        """Donors and acceptors within a cutoff of the ligand.
+
+        Args:
+            reference: Coordinates of one frame, shape (n_atoms, 3)
+            cutoff: Distance from any ligand atom (Å)
+
+        Returns:
+            Tuple (donor pairs, acceptor indices) restricted to the interface
+        """
+        ligand_grid = CellList(reference[self.ligand_indices], cutoff)
+        donors = self._donors
+        acceptors = self._acceptors
+
+        near_donors = self._ligand_mask[donors[:, 0]] | ligand_grid.query_any(
+            reference[donors[:, 0]], cutoff
+        )
+        near_acceptors = self._ligand_mask[acceptors] | ligand_grid.query_any(
+            reference[acceptors], cutoff
+        )
+        return donors[near_donors], acceptors[near_acceptors]
+
+    def _split_by_drift(
+        self, coordinates: np.ndarray, polar: np.ndarray
+    ) -> list[tuple[np.ndarray, float]]:
+        """Split a chunk so interface atom drift within each block stays bounded.
+
+        Returns:
+            List of (block coordinates, max drift within block)
+        """
+        drift = self._max_drift(coordinates, polar)
+        if len(coordinates) <= 1 or drift <= self.criteria.max_drift:
+            return [(coordinates, drift)]
+        half = len(coordinates) // 2
+        return self._split_by_drift(coordinates[:half], polar) + self._split_by_drift(
+            coordinates[half:], polar
+        )
+
+    @staticmethod
+    def _max_drift(coordinates: np.ndarray, polar: np.ndarray) -> float:
+        """Largest displacement of the given atoms relative to the first frame."""
+        if len(polar) == 0:
+            return 0.0
+        displacement = coordinates[:, polar] - coordinates[0, polar]
+        return float(np.sqrt((displacement**2).sum(axis=-1)).max())
+
+    def _candidate_triplets(
+        self, reference: np.ndarray, donors: np.ndarray, acceptors: np.ndarray, radius: float
+    ) -> np.ndarray:
+        """Donor/hydrogen/acceptor triplets that may H-bond within a block."""
+        ligand = self._ligand_mask
+        triplets = []
+
+        # Ligand donors -> receptor acceptors, receptor donors -> ligand acceptors
+        for donor_side in (True, False):
+            side_donors = donors[ligand[donors[:, 0]] == donor_side]
+            side_acceptors = acceptors[ligand[acceptors] != donor_side]
+            if len(side_donors) == 0 or len(side_acceptors) == 0:
+                continue
+
+            grid = CellList(reference[side_acceptors], radius)
+            d_idx, a_idx, _ = grid.query_pairs(reference[side_donors[:, 0]], radius)
+            triplets.append(
+                np.column_stack([side_donors[d_idx], side_acceptors[a_idx]]).astype(np.int64)
+            )
+
+        if not triplets:
+            return np.empty((0, 3), dtype=np.int64)
+        return np.concatenate(triplets)
+
+    def _analyze_block(
+        self, coordinates: np.ndarray, triplets: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply H-bond criteria to every frame of a block at once.
+
+        Returns:
+            Tuple (per-frame counts, bonded triplets, frames bonded per triplet)
+        """
+        n_frames = len(coordinates)
+        if len(triplets) == 0:
+            return np.zeros(n_frames, dtype=np.int64), triplets, np.empty(0, dtype=np.int64)
+
+        donor = coordinates[:, triplets[:, 0]]
+        hydrogen = coordinates[:, triplets[:, 1]]
+        acceptor = coordinates[:, triplets[:, 2]]
+
+        distance = np.linalg.norm(acceptor - donor, axis=-1)
+        h_to_d = donor - hydrogen
+        h_to_a = acceptor - hydrogen
+        cos_angle = (h_to_d * h_to_a).sum(axis=-1) / (
+            np.linalg.norm(h_to_d, axis=-1) * np.linalg.norm(h_to_a, axis=-1) + 1e-12
+        )
+
+        # Angle >= cutoff is equivalent to cos(angle) <= cos(cutoff)
+        bonded = (distance <= self.criteria.distance_cutoff) & (cos_angle <= self._cos_cutoff)
+        frames_bonded = bonded.sum(axis=0)
+        present = frames_bonded > 0
+
+        return bonded.sum(axis=1), triplets[present], frames_bonded[present]
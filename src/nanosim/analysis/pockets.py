@@ -0,0 +1,398 @@
+"""Grid-based binding pocket detection.
+
+Pockets are found on a 3D occupancy grid around the receptor:
+1. Grid points inside atomic spheres are marked occupied
+2. Empty points within ``pocket_cutoff`` of the protein are candidates
+3. Buriedness: rays are cast along 14 directions from every candidate and
+   the number of directions that hit protein within ``ray_length`` is counted
+4. Sufficiently buried points are grouped by connected-component labelling
+5. Components smaller than ``min_pocket_volume`` are discarded
+
+All steps are vectorized over the grid with NumPy, so detection needs no
+external tools or file round-trips and frames can be processed concurrently.
+"""
+
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Any
+
+import numpy as np
+
+from ..utils.spatial import CellList
+
+# 6 face and 8 corner directions of a cube
+RAY_DIRECTIONS = np.array(
+    [d for d in product((-1, 0, 1), repeat=3) if sum(map(abs, d)) in (1, 3)], dtype=np.int64
+)
+
+
+@dataclass
+class PocketDetectionParams:
+    """Parameters of the grid pocket detector.
+
+    Attributes:
+        grid_spacing: Grid spacing (Å)
+        atom_radius: Radius around atom centres treated as occupied (Å)
+        pocket_cutoff: Maximum distance of pocket points from the protein (Å)
+        min_pocket_volume: Minimum pocket volume (Å³)
+        ray_length: Maximum ray length for buriedness (Å)
+        min_buriedness: Minimum number of the 14 rays that must hit protein
+    """
+
+    grid_spacing: float = 1.0
+    atom_radius: float = 3.0
+    pocket_cutoff: float = 5.0
+    min_pocket_volume: float = 100.0
+    ray_length: float = 10.0
+    min_buriedness: int = 10
+
+
+def _sphere_stencil(radius: float, spacing: float) -> np.ndarray:
+    """Integer grid offsets lying within a sphere."""
+    n = int(np.ceil(radius / spacing))
+    axis = np.arange(-n, n + 1)
+    offsets = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1).reshape(-1, 3)
+    return offsets[(offsets**2).sum(axis=1) * spacing**2 <= radius**2]
+
+
+def _splat(shape: tuple[int, ...], centers: np.ndarray, stencil: np.ndarray) -> np.ndarray:
+    """Mark all grid points within a stencil around integer grid centres.
+
+    Loops over the stencil offsets and marks the shifted (unique) centres,
+    so temporaries scale with the number of atoms, not atoms x stencil.
+    """
+    grid = np.zeros(shape, dtype=bool)
+    centers = np.unique(centers, axis=0)
+    upper = np.asarray(shape)
+    for offset in stencil:
+        points = centers + offset
+        inside = np.all((points >= 0) & (points < upper), axis=1)
+        points = points[inside]
+        grid[points[:, 0], points[:, 1], points[:, 2]] = True
+    return grid
+
+
+def _shifted(grid: np.ndarray, offset: np.ndarray) -> np.ndarray:
+    """Return ``out`` with ``out[i] = grid[i + offset]`` (False outside the grid)."""
+    out = np.zeros_like(grid)
+    src = []
+    dst = []
+    for size, o in zip(grid.shape, offset, strict=True):
+        if abs(o) >= size:
+            return out
+        src.append(slice(max(o, 0), size + min(o, 0)))
+        dst.append(slice(max(-o, 0), size + min(-o, 0)))
+    out[tuple(dst)] = grid[tuple(src)]
+    return out
+
+
+def buriedness(occupied: np.ndarray, max_steps: int) -> np.ndarray:
+    """Count ray directions that hit an occupied point within max_steps.
+
+    Args:
+        occupied: Boolean occupancy grid
+        max_steps: Number of grid steps along each ray
+
+    Returns:
+        Integer grid with the number of blocked directions (0-14)
+    """
+    count = np.zeros(occupied.shape, dtype=np.int8)
+    for direction in RAY_DIRECTIONS:
+        # Doubling: ``hit`` covers steps 1..covered, so OR-ing a copy shifted
+        # by ``add`` steps extends coverage to 1..covered+add
+        hit = _shifted(occupied, direction)
+        covered = 1
+        while covered < max_steps:
+            add = min(covered, max_steps - covered)
+            hit |= _shifted(hit, direction * add)
+            covered += add
+        count += hit
+    return count
+
+
+def label_components(mask: np.ndarray) -> tuple[np.ndarray, int]:
+    """Label 6-connected components of a boolean grid.
+
+    Uses vectorized label propagation with pointer jumping over the
+    adjacency pairs of the selected points.
+
+    Args:
+        mask: Boolean grid
+
+    Returns:
+        Tuple (labels, n_components); labels is -1 outside the mask and
+        0..n_components-1 inside
+    """
+    flat = np.flatnonzero(mask)
+    labels = np.full(mask.shape, -1, dtype=np.int64)
+    if len(flat) == 0:
+        return labels, 0
+
+    position = np.full(mask.size, -1, dtype=np.int64)
+    position[flat] = np.arange(len(flat))
+    coords = np.stack(np.unravel_index(flat, mask.shape), axis=1)
+    strides = np.array(mask.strides) // mask.itemsize
+
+    first_parts = []
+    second_parts = []
+    for axis in range(3):
+        valid = coords[:, axis] + 1 < mask.shape[axis]
+        neighbour = position[flat[valid] + strides[axis]]
+        linked = neighbour >= 0
+        first_parts.append(np.nonzero(valid)[0][linked])
+        second_parts.append(neighbour[linked])
+    first = np.concatenate(first_parts)
+    second = np.concatenate(second_parts)
+
+    component = np.arange(len(flat))
+    while True:
+        updated = component.copy()
+        np.minimum.at(updated, first, component[second])
+        np.minimum.at(updated, second, component[first])
+        updated = updated[updated]
+        if np.array_equal(updated, component):
+            break
+        component = updated
+
+    _, dense = np.unique(component, return_inverse=True)
+    labels.ravel()[flat] = dense
+    return labels, int(dense.max()) + 1
+
+
+def detect_pockets(
+    coordinates: np.ndarray,
+    resids: np.ndarray | None = None,
+    params: PocketDetectionParams | None = None,
+) -> list[dict[str, Any]]:
+    """Detect buried pockets in a single receptor structure.
+
+    Args:
+        coordinates: Receptor atom coordinates of shape (n_atoms, 3) in Å
+        resids: Residue number of each atom (for lining residues)
+        params: Detection parameters
+
+    Returns:
+        List of pocket dictionaries, largest first, containing:
+            - center: Pocket centroid (x, y, z)
+            - volume: Pocket volume (Å³)
+            - n_points: Number of grid points
+            - min_corner / max_corner: Bounding box of the pocket points
+            - buriedness: Mean number of blocked ray directions
+            - residues: Residue numbers lining the pocket
+    """
+    params = params or PocketDetectionParams()
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    spacing = params.grid_spacing
+
+    origin = coordinates.min(axis=0) - params.pocket_cutoff - spacing
+    extent = coordinates.max(axis=0) + params.pocket_cutoff + spacing - origin
+    shape = tuple(int(n) for n in np.ceil(extent / spacing).astype(np.int64) + 1)
+    centers = np.rint((coordinates - origin) / spacing).astype(np.int64)
+
+    occupied = _splat(shape, centers, _sphere_stencil(params.atom_radius, spacing))
+    near = _splat(shape, centers, _sphere_stencil(params.pocket_cutoff, spacing))
+
+    max_steps = int(np.ceil(params.ray_length / spacing))
+    buried = buriedness(occupied, max_steps)
+    candidate = near & ~occupied & (buried >= params.min_buriedness)
+
+    labels, n_components = label_components(candidate)
+    if n_components == 0:
+        return []
+
+    flat = np.flatnonzero(candidate)
+    component = labels.ravel()[flat]
+    points = np.stack(np.unravel_index(flat, shape), axis=1) * spacing + origin
+
+    sizes = np.bincount(component, minlength=n_components)
+    keep = np.nonzero(sizes * spacing**3 >= params.min_pocket_volume)[0]
+    if len(keep) == 0:
+        return []
+
+    centroids = (
+        np.stack(
+            [
+                np.bincount(component, weights=points[:, i], minlength=n_components)
+                for i in range(3)
+            ],
+            axis=1,
+        )
+        / np.maximum(sizes, 1)[:, None]
+    )
+    mean_buriedness = np.bincount(
+        component, weights=buried.ravel()[flat], minlength=n_components
+    ) / np.maximum(sizes, 1)
+    lo = np.full((n_components, 3), np.inf)
+    hi = np.full((n_components, 3), -np.inf)
+    np.minimum.at(lo, component, points)
+    np.maximum.at(hi, component, points)
+
+    lining = _lining_residues(coordinates, resids, points, component, params.pocket_cutoff)
+
+    pockets = [
+        {
+            "center": tuple(float(x) for x in centroids[c]),
+            "volume": float(sizes[c] * spacing**3),
+            "n_points": int(sizes[c]),
+            "min_corner": tuple(float(x) for x in lo[c]),
+            "max_corner": tuple(float(x) for x in hi[c]),
+            "buriedness": float(mean_buriedness[c]),
+            "residues": lining.get(int(c), []),
+        }
+        for c in keep
+    ]
+    pockets.sort(key=lambda p: -p["volume"])
+    return pockets
+
+
+def _lining_residues(
+    coordinates: np.ndarray,
+    resids: np.ndarray | None,
+    points: np.ndarray,
+    component: np.ndarray,
+    cutoff: float,
+) -> dict[int, list[int]]:
+    """Residue numbers with an atom within cutoff of each pocket's points."""
+    if resids is None:
+        return {}
+
+    grid = CellList(coordinates, cutoff)
+    point_idx, atom_idx, _ = grid.query_pairs(points, cutoff)
+    pairs = np.unique(np.column_stack([component[point_idx], resids[atom_idx]]), axis=0)
+
+    lining: dict[int, list[int]] = {}
+    for c, resid in pairs.tolist():
+        lining.setdefault(c, []).append(resid)
+    return lining
+
+
+def detect_pockets_batch(
+    frames: Sequence[np.ndarray],
+    resids: np.ndarray | None = None,
+    params: PocketDetectionParams | None = None,
+    max_workers: int | None = None,
+) -> list[list[dict[str, Any]]]:
+    """Detect pockets in several receptor conformations concurrently.
+
+    Args:
+        frames: Receptor coordinates for each frame
+        resids: Residue number of each atom (shared topology)
+        params: Detection parameters
+        max_workers: Number of worker threads (None = executor default)
+
+    Returns:
+        Pocket lists, one per frame, in input order
+    """
+    if len(frames) <= 1:
+        return [detect_pockets(frame, resids, params) for frame in frames]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda frame: detect_pockets(frame, resids, params), frames))
+
+
+def _residue_overlap(first: set[int], second: set[int]) -> float:
+    """Jaccard overlap of two residue sets (1.0 when both are empty)."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def track_pockets(
+    frame_pockets: Sequence[Sequence[dict[str, Any]]],
+    centroid_cutoff: float = 4.0,
+    min_residue_overlap: float = 0.5,
+    frame_weights: Sequence[float] | None = None,
+) -> list[dict[str, Any]]:
+    """Merge pockets recurring across frames into persistent sites.
+
+    Pockets are matched frame by frame to existing sites whose mean centroid
+    lies within ``centroid_cutoff`` and whose lining residues overlap by at
+    least ``min_residue_overlap`` (Jaccard). Each site takes at most one
+    pocket per frame; unmatched pockets open new sites.
+
+    Args:
+        frame_pockets: Pocket lists, one per frame (as from detect_pockets)
+        centroid_cutoff: Maximum centroid distance for a match (Å)
+        min_residue_overlap: Minimum Jaccard overlap of lining residues
+        frame_weights: Optional weight of each frame (e.g. the population of
+            the cluster a representative frame stands for); uniform if omitted
+
+    Returns:
+        Persistent sites sorted by occupancy, containing:
+            - site_id: Site index
+            - center: Mean centroid over member pockets
+            - residues: Residues lining the site in at least half of its frames
+            - occupancy: (Weighted) fraction of frames in which the site is present
+            - frames: Positions (in frame_pockets) of frames containing the site
+            - volume: Mean pocket volume
+            - min_corner / max_corner: Bounding box covering all member pockets
+            - representative: Position of the frame with the largest pocket
+            - members: Member pockets in frame order
+    """
+    centroid_sums: list[np.ndarray] = []
+    members: list[list[tuple[int, dict[str, Any]]]] = []
+
+    for position, pockets in enumerate(frame_pockets):
+        if not pockets:
+            continue
+
+        centers = np.array([p["center"] for p in pockets], dtype=np.float64)
+        if centroid_sums:
+            site_centers = np.array(centroid_sums) / np.array([len(m) for m in members])[:, None]
+            distances = np.linalg.norm(centers[:, None] - site_centers[None], axis=-1)
+        else:
+            distances = np.empty((len(pockets), 0))
+
+        taken: set[int] = set()
+        # Larger pockets claim their site first
+        for i in sorted(range(len(pockets)), key=lambda k: -pockets[k]["volume"]):
+            residues = set(pockets[i]["residues"])
+            best = None
+            best_score = (-1.0, 0.0)
+            for site in np.nonzero(distances[i] <= centroid_cutoff)[0].tolist():
+                if site in taken:
+                    continue
+                overlap = _residue_overlap(residues, set(members[site][-1][1]["residues"]))
+                score = (overlap, -float(distances[i, site]))
+                if overlap >= min_residue_overlap and score > best_score:
+                    best, best_score = site, score
+
+            if best is None:
+                centroid_sums.append(centers[i].copy())
+                members.append([(position, pockets[i])])
+                taken.add(len(members) - 1)
+            else:
+                centroid_sums[best] += centers[i]
+                members[best].append((position, pockets[i]))
+                taken.add(best)
+
+    weights = np.ones(len(frame_pockets)) if frame_weights is None else np.asarray(frame_weights)
+    total_weight = float(weights.sum()) or 1.0
+    sites = []
+    for site_id, site_members in enumerate(members):
+        pockets = [pocket for _, pocket in site_members]
+        residue_counts: dict[int, int] = {}
+        for pocket in pockets:
+            for resid in pocket["residues"]:
+                residue_counts[resid] = residue_counts.get(resid, 0) + 1
+        largest = max(range(len(pockets)), key=lambda k: pockets[k]["volume"])
+
+        sites.append(
+            {
+                "site_id": site_id,
+                "center": tuple(float(x) for x in centroid_sums[site_id] / len(pockets)),
+                "residues": sorted(r for r, n in residue_counts.items() if 2 * n >= len(pockets)),
+                "occupancy": float(weights[[p for p, _ in site_members]].sum()) / total_weight,
+                "frames": [position for position, _ in site_members],
+                "volume": float(np.mean([p["volume"] for p in pockets])),
+                "min_corner": tuple(np.min([p["min_corner"] for p in pockets], axis=0).tolist()),
+                "max_corner": tuple(np.max([p["max_corner"] for p in pockets], axis=0).tolist()),
+                "representative": site_members[largest][0],
+                "members": pockets,
+            }
+        )
+
+    sites.sort(key=lambda site: (-site["occupancy"], site["site_id"]))
+    return sites
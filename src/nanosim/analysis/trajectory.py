@@ -0,0 +1,442 @@
+"""Streaming access to MD structures and trajectories.
+
+Frames are read in fixed-size chunks so analyses never hold a full trajectory
+in memory. Coordinates are always returned in Ångström, regardless of the
+units of the underlying file (GROMACS .gro files store nm).
+
+Text formats (.gro, multi-model .pdb) are read natively; binary trajectory
+formats (.xtc, .trr, .dcd) require MDAnalysis.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+import numpy as np
+
+NM_TO_ANGSTROM = 10.0
+
+PROTEIN_RESIDUES = frozenset(
+    {
+        "ALA", "ARG", "ASN", "ASP", "CYS", "GLN", "GLU", "GLY", "HIS", "ILE",
+        "LEU", "LYS", "MET", "PHE", "PRO", "SER", "THR", "TRP", "TYR", "VAL",
+        "HID", "HIE", "HIP", "HSD", "HSE", "HSP", "CYX", "ASH", "GLH", "LYN",
+    }
+)  # fmt: skip
+
+# Residue names whose atom names are two-letter elements (ions)
+_ION_ELEMENTS = {"NA": "NA", "CL": "CL", "K": "K", "MG": "MG", "CA": "CA", "ZN": "ZN"}
+
+
+@dataclass
+class Topology:
+    """Per-atom identity arrays for a molecular system.
+
+    Attributes:
+        names: Atom names
+        resnames: Residue names
+        resids: Residue numbers
+        elements: Element symbols (upper case)
+    """
+
+    names: np.ndarray
+    resnames: np.ndarray
+    resids: np.ndarray
+    elements: np.ndarray
+
+    @property
+    def n_atoms(self) -> int:
+        """Number of atoms in the system."""
+        return len(self.names)
+
+    def subset(self, atom_indices: np.ndarray) -> "Topology":
+        """Topology of a subset of atoms."""
+        return Topology(
+            names=self.names[atom_indices],
+            resnames=self.resnames[atom_indices],
+            resids=self.resids[atom_indices],
+            elements=self.elements[atom_indices],
+        )
+
+    def select(self, selection: str) -> np.ndarray:
+        """Select atom indices with a minimal selection language.
+
+        Supported forms: ``all``, ``protein``, ``backbone``, ``resname X [Y ...]``,
+        ``name X [Y ...]``, ``element X [Y ...]``, each optionally prefixed
+        with ``not``.
+
+        Args:
+            selection: Selection string
+
+        Returns:
+            Sorted array of selected atom indices
+
+        Raises:
+            ValueError: If the selection keyword is not supported
+        """
+        tokens = selection.split()
+        negate = bool(tokens) and tokens[0] == "not"
+        if negate:
+            tokens = tokens[1:]
+        if not tokens:
+            raise ValueError(f"Empty atom selection: '{selection}'")
+
+        keyword, values = tokens[0], tokens[1:]
+        if keyword == "all":
+            mask = np.ones(self.n_atoms, dtype=bool)
+        elif keyword == "protein":
+            mask = np.isin(self.resnames, list(PROTEIN_RESIDUES))
+        elif keyword == "backbone":
+            mask = np.isin(self.resnames, list(PROTEIN_RESIDUES)) & np.isin(
+                self.names, ["N", "CA", "C", "O"]
+            )
+        elif keyword == "resname":
+            mask = np.isin(self.resnames, values)
+        elif keyword == "name":
+            mask = np.isin(self.names, values)
+        elif keyword == "element":
+            mask = np.isin(self.elements, [v.upper() for v in values])
+        else:
+            raise ValueError(f"Unsupported atom selection: '{selection}'")
+
+        return np.nonzero(~mask if negate else mask)[0]
+
+
+@dataclass
+class TrajectoryChunk:
+    """A contiguous block of trajectory frames.
+
+    Attributes:
+        start: Index of the first frame in the chunk
+        coordinates: Array of shape (n_frames, n_atoms, 3) in Å
+        times: Frame times in ps
+    """
+
+    start: int
+    coordinates: np.ndarray
+    times: np.ndarray
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        """Global indices of the frames in this chunk."""
+        return np.arange(self.start, self.start + len(self.coordinates))
+
+
+def guess_element(atom_name: str, resname: str = "") -> str:
+    """Guess an element symbol from an atom name.
+
+    Args:
+        atom_name: Atom name (e.g. 'CA', 'HG21', 'OW')
+        resname: Residue name, used to recognise monatomic ions
+
+    Returns:
+        Upper-case element symbol
+    """
+    name = atom_name.strip().upper()
+    if resname.strip().upper() == name and name in _ION_ELEMENTS:
+        return _ION_ELEMENTS[name]
+    letters = name.lstrip("0123456789")
+    return letters[:1] if letters else ""
+
+
+def read_topology(structure_file: Path) -> Topology:
+    """Read atom identities from a .gro or .pdb structure.
+
+    Args:
+        structure_file: Path to the structure file
+
+    Returns:
+        Topology of the first frame
+
+    Raises:
+        ValueError: If the file format is not supported
+    """
+    structure_file = Path(structure_file)
+    suffix = structure_file.suffix.lower()
+
+    with open(structure_file) as handle:
+        if suffix == ".gro":
+            handle.readline()
+            n_atoms = int(handle.readline())
+            lines = [handle.readline() for _ in range(n_atoms)]
+            resids = [int(line[0:5]) for line in lines]
+            resnames = [line[5:10].strip() for line in lines]
+            names = [line[10:15].strip() for line in lines]
+            elements = [guess_element(n, r) for n, r in zip(names, resnames, strict=True)]
+        elif suffix == ".pdb":
+            records = _read_pdb_atoms(handle)
+            resids = [r["resid"] for r in records]
+            resnames = [r["resname"] for r in records]
+            names = [r["name"] for r in records]
+            elements = [r["element"] for r in records]
+        else:
+            raise ValueError(f"Unsupported topology format: {suffix}")
+
+    return Topology(
+        names=np.array(names),
+        resnames=np.array(resnames),
+        resids=np.array(resids, dtype=np.int64),
+        elements=np.array(elements),
+    )
+
+
+def iter_frames(
+    traj_file: Path,
+    topo_file: Path | None = None,
+    chunk_size: int = 100,
+    atom_indices: np.ndarray | None = None,
+) -> Iterator[TrajectoryChunk]:
+    """Stream trajectory frames in chunks.
+
+    Args:
+        traj_file: Trajectory file (.gro, .pdb, or an MDAnalysis-readable format)
+        topo_file: Topology file (required for binary formats)
+        chunk_size: Number of frames per chunk
+        atom_indices: Optional subset of atoms to keep
+
+    Yields:
+        TrajectoryChunk objects with coordinates in Å
+
+    Raises:
+        ValueError: If chunk_size is not positive
+        ImportError: If a binary format is requested without MDAnalysis
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    traj_file = Path(traj_file)
+    suffix = traj_file.suffix.lower()
+
+    if suffix == ".gro":
+        frames: Iterator[tuple[float, np.ndarray]] = _iter_gro_frames(traj_file)
+    elif suffix == ".pdb":
+        frames = _iter_pdb_frames(traj_file)
+    else:
+        frames = _iter_mdanalysis_frames(traj_file, topo_file)
+
+    start = 0
+    buffer_coords: list[np.ndarray] = []
+    buffer_times: list[float] = []
+
+    for time, coords in frames:
+        buffer_coords.append(coords if atom_indices is None else coords[atom_indices])
+        buffer_times.append(time)
+        if len(buffer_coords) == chunk_size:
+            yield TrajectoryChunk(start, np.stack(buffer_coords), np.array(buffer_times))
+            start += len(buffer_coords)
+            buffer_coords, buffer_times = [], []
+
+    if buffer_coords:
+        yield TrajectoryChunk(start, np.stack(buffer_coords), np.array(buffer_times))
+
+
+def read_frames(
+    traj_file: Path,
+    frame_indices: list[int],
+    topo_file: Path | None = None,
+    chunk_size: int = 100,
+) -> dict[int, np.ndarray]:
+    """Fetch full coordinates of specific frames in a single streaming pass.
+
+    Args:
+        traj_file: Trajectory file
+        frame_indices: Frames to fetch
+        topo_file: Topology file (required for binary formats)
+        chunk_size: Frames read per chunk
+
+    Returns:
+        Mapping of frame index to coordinates of shape (n_atoms, 3) in Å
+    """
+    wanted = set(frame_indices)
+    found: dict[int, np.ndarray] = {}
+    last = max(wanted) if wanted else -1
+
+    for chunk in iter_frames(traj_file, topo_file, chunk_size):
+        for offset, index in enumerate(chunk.frame_indices):
+            if index in wanted:
+                found[int(index)] = chunk.coordinates[offset].copy()
+        if chunk.start + len(chunk.coordinates) > last:
+            break
+
+    return found
+
+
+def write_pdb(
+    pdb_file: Path,
+    topology: Topology,
+    coordinates: np.ndarray,
+    atom_indices: np.ndarray | None = None,
+) -> Path:
+    """Write a single-model PDB file.
+
+    Args:
+        pdb_file: Output path
+        topology: System topology
+        coordinates: Coordinates of all atoms in Å, shape (n_atoms, 3)
+        atom_indices: Optional subset of atoms to write
+
+    Returns:
+        Path to the written file
+    """
+    pdb_file = Path(pdb_file)
+    indices = np.arange(topology.n_atoms) if atom_indices is None else np.asarray(atom_indices)
+
+    lines = []
+    for serial, i in enumerate(indices, start=1):
+        name = topology.names[i]
+        # 4-character names start in column 13, shorter ones in column 14
+        padded = f"{name:<4s}" if len(name) == 4 else f" {name:<3s}"
+        record = "ATOM  " if topology.resnames[i] in PROTEIN_RESIDUES else "HETATM"
+        x, y, z = coordinates[i]
+        lines.append(
+            f"{record}{serial % 100000:5d} {padded} {topology.resnames[i]:>3s} A"
+            f"{topology.resids[i] % 10000:4d}    {x:8.3f}{y:8.3f}{z:8.3f}"
+            f"  1.00  0.00          {topology.elements[i]:>2s}"
+        )
+    lines.append("END")
+
+    pdb_file.write_text("\n".join(lines) + "\n")
+    return pdb_file
+
+
+def write_gro(
+    gro_file: Path,
+    topology: Topology,
+    coordinates: np.ndarray,
+    box: np.ndarray,
+    title: str = "Generated by NanoSim",
+    velocities: np.ndarray | None = None,
+    *,
+    unit: str = "angstrom",
+) -> Path:
+    """Write a single-frame .gro file.
+
+    Args:
+        gro_file: Output path
+        topology: System topology
+        coordinates: Coordinates of all atoms in ``unit``, shape (n_atoms, 3)
+        box: Rectangular box edge lengths in ``unit``
+        title: Title line
+        velocities: Optional velocities in nm/ps, shape (n_atoms, 3)
+        unit: Length unit of coordinates and box, 'angstrom' or 'nm'
+
+    Returns:
+        Path to the written file
+
+    Raises:
+        ValueError: If the unit is not supported
+    """
+    if unit not in ("angstrom", "nm"):
+        raise ValueError(f"Unknown length unit: {unit}. Must be 'angstrom' or 'nm'")
+    scale = NM_TO_ANGSTROM if unit == "angstrom" else 1.0
+    gro_file = Path(gro_file)
+    nm = np.asarray(coordinates, dtype=np.float64) / scale
+    record = "%5d%-5s%5s%5d%8.3f%8.3f%8.3f"
+    lines = [
+        record % (resid % 100000, resname[:5], name[:5], serial % 100000, x, y, z)
+        for serial, (resid, resname, name, (x, y, z)) in enumerate(
+            zip(topology.resids, topology.resnames, topology.names, nm.tolist(), strict=True),
+            start=1,
+        )
+    ]
+    if velocities is not None:
+        lines = [
+            f"{line}{vx:8.4f}{vy:8.4f}{vz:8.4f}"
+            for line, (vx, vy, vz) in zip(lines, np.asarray(velocities).tolist(), strict=True)
+        ]
+    bx, by, bz = np.asarray(box, dtype=np.float64) / scale
+    gro_file.write_text(
+        f"{title}\n{len(lines):5d}\n"
+        + "".join(f"{line}\n" for line in lines)
+        + f"{bx:10.5f}{by:10.5f}{bz:10.5f}\n"
+    )
+    return gro_file
+
+
+def _iter_gro_frames(gro_file: Path) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (time, coordinates) from a (multi-frame) .gro file."""
+    with open(gro_file) as handle:
+        frame = 0
+        while True:
+            title = handle.readline()
+            if not title:
+                return
+            n_atoms = int(handle.readline())
+            lines = [handle.readline() for _ in range(n_atoms)]
+            handle.readline()  # box vectors
+
+            coords = np.array(
+                [(line[20:28], line[28:36], line[36:44]) for line in lines], dtype=np.float64
+            )
+            yield _parse_gro_time(title, frame), coords * NM_TO_ANGSTROM
+            frame += 1
+
+
+def _parse_gro_time(title: str, frame: int) -> float:
+    """Extract the 't=' time stamp from a .gro title line."""
+    if "t=" in title:
+        try:
+            return float(title.split("t=")[1].split()[0])
+        except (IndexError, ValueError):
+            pass
+    return float(frame)
+
+
+def _iter_pdb_frames(pdb_file: Path) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (time, coordinates) for each MODEL of a .pdb file."""
+    with open(pdb_file) as handle:
+        frame = 0
+        coords: list[tuple[str, str, str]] = []
+        for line in handle:
+            record = line[:6]
+            if record in ("ATOM  ", "HETATM"):
+                coords.append((line[30:38], line[38:46], line[46:54]))
+            elif record == "ENDMDL" and coords:
+                yield float(frame), np.array(coords, dtype=np.float64)
+                frame += 1
+                coords = []
+        if coords:
+            yield float(frame), np.array(coords, dtype=np.float64)
+
+
+def _read_pdb_atoms(handle: TextIO) -> list[dict[str, Any]]:
+    """Read atom records of the first model of a PDB file."""
+    records = []
+    for line in handle:
+        record = line[:6]
+        if record in ("ATOM  ", "HETATM"):
+            name = line[12:16].strip()
+            resname = line[17:21].strip()
+            element = line[76:78].strip().upper() if len(line) >= 78 else ""
+            records.append(
+                {
+                    "name": name,
+                    "resname": resname,
+                    "resid": int(line[22:26]),
+                    "element": element or guess_element(name, resname),
+                }
+            )
+        elif record == "ENDMDL":
+            break
+    return records
+
+
+def _iter_mdanalysis_frames(
+    traj_file: Path, topo_file: Path | None
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (time, coordinates) using MDAnalysis for binary formats."""
+    try:
+        import MDAnalysis as mda  # noqa: N813
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {traj_file.suffix} trajectories requires MDAnalysis "
+            "(pip install MDAnalysis)"
+        ) from e
+
+    if topo_file is None:
+        raise ValueError(f"A topology file is required to read {traj_file}")
+
+    universe = mda.Universe(str(topo_file), str(traj_file))
+    for ts in universe.trajectory:
+        yield float(ts.time), universe.atoms.positions.astype(np.float64)
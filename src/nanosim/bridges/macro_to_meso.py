@@ -4,10 +4,19 @@ This module handles the conversion from CFD/continuum results (macro scale)
 to molecular dynamics inputs (meso scale).
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from ..analysis.trajectory import Topology, write_gro
 from ..core.bridge import MacroToMesoBridge
+from ..engines.foam_fields import FoamCase, open_case
+from ..utils.transforms import CoordinateTransform
+
+# Per-cell arrays of the field data handed between the conversion steps
+_CELL_ARRAYS = ("cell_indices", "cell_centres", "cell_volumes", "concentration")
 
 
 class OpenFoamToGromacsConverter(MacroToMesoBridge):
@@ -32,29 +41,48 @@ class OpenFoamToGromacsConverter(MacroToMesoBridge):
                 - particle_density: Target particle count per volume
                 - velocity_scaling: How to map CFD velocities to MD
                 - boundary_conditions: How to handle domain boundaries
+                - concentration_name: Concentration field name (default: 'C')
+                - velocity_name: Velocity field name (default: 'U')
+                - decomposed: Read processor* directories instead of the
+                  reconstructed case (default: when the time is not reconstructed)
+                - max_workers: Threads reading processor directories
+                - region: Default region of interest (see _select_region)
+                - seed: Random seed for particle sampling
         """
         self.config = config or {}
         self.sampling_strategy = self.config.get("sampling_strategy", "monte_carlo")
         self.particle_density = self.config.get("particle_density", None)
         self.velocity_scaling = self.config.get("velocity_scaling", "direct")
         self.boundary_conditions = self.config.get("boundary_conditions", "periodic")
+        self.concentration_name = self.config.get("concentration_name", "C")
+        self.velocity_name = self.config.get("velocity_name", "U")
+        self.decomposed = self.config.get("decomposed", None)
+        self.max_workers = self.config.get("max_workers", None)
+        self.region = self.config.get("region", None)
+        self.seed = self.config.get("seed", None)
 
     def convert(self, input_data: dict[str, Any]) -> dict[str, Any]:
         """Convert OpenFOAM concentration field to particle positions.
 
         Args:
             input_data: Dictionary containing:
-                - concentration_field: Path to OpenFOAM field data
+                - concentration_field: OpenFOAM case directory, or a field
+                  file in one of its time directories
                 - grid: Spatial grid information
                 - particle_properties: Nanoparticle size, type, etc.
                 - time_point: Time snapshot to extract
                 - output_dir: Directory for MD input files
+                - region: Optional region of interest; only its cells are
+                  sampled (default: the converter's region)
 
         Returns:
             Dictionary containing:
-                - particle_positions: List of (x, y, z) coordinates
-                - particle_velocities: List of velocity vectors
+                - particle_positions: (N, 3) array of coordinates
+                - particle_velocities: (N, 3) array of velocity vectors
                 - particle_count: Number of particles
+                - particle_cells: Cell of each particle, indexing the field arrays
+                - field: Cell indices, centres, volumes and concentration of
+                  the sampled region
                 - system_box: MD simulation box dimensions
                 - metadata: Additional information for MD setup
 
@@ -73,34 +101,116 @@ class OpenFoamToGromacsConverter(MacroToMesoBridge):
 
         # Step 1: Load concentration field from OpenFOAM
         concentration_data = self._load_concentration_field(field_file, input_data["time_point"])
+        concentration_data = self._select_region(
+            concentration_data, input_data.get("region", self.region)
+        )
+
+        return self._convert_snapshot(concentration_data, input_data, output_dir)
+
+    def convert_batch(
+        self, input_data: dict[str, Any], max_workers: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Convert several time points of one case in a single pass.
+
+        The mesh geometry is read once, and the geometric part of the region
+        (box, cell zone) and the MD box with its coordinate transform are
+        computed once. Snapshots are then read and converted in parallel,
+        each into its own ``t_<time>`` subdirectory of the output directory.
+        Time points resolving to the same stored time step are converted
+        once and share its result.
+
+        Args:
+            input_data: As for convert, with ``time_points`` (list of times)
+                instead of ``time_point``
+            max_workers: Snapshots converted concurrently
+
+        Returns:
+            One convert() result per time point, in order (the same object
+            for time points sharing a time step)
+
+        Raises:
+            FileNotFoundError: If OpenFOAM results don't exist
+            ValueError: If concentration field is invalid
+        """
+        field_file = Path(input_data["concentration_field"])
+        output_dir = Path(input_data["output_dir"])
+        if not field_file.exists():
+            raise FileNotFoundError(f"Concentration field not found: {field_file}")
+
+        time_points = list(input_data["time_points"])
+        case = open_case(_case_dir(field_file), time_points, self.decomposed, self.max_workers)
+        region = input_data.get("region", self.region) or {}
+
+        # Geometry of the region, shared by all snapshots
+        mesh_data = _mesh_data(case)
+        geometric = {key: value for key, value in region.items() if key != "threshold"}
+        cells = np.flatnonzero(self._region_mask(mesh_data, geometric))
+        if len(cells) == 0:
+            raise ValueError(f"Region of interest contains no cells: {region}")
+        roi = {**mesh_data, **_take(mesh_data, cells)}
+        roi["system_box"] = self._define_simulation_box(roi, input_data["grid"])
+
+        # Several points may resolve to one time step, whose directory is converted once
+        resolved = [case.nearest_time(t) for t in time_points]
+        times = {time: time_points[resolved.index(time)] for time in dict.fromkeys(resolved)}
+
+        def _convert(index: int, time: str) -> dict[str, Any]:
+            time_point = times[time]
+            fields = case.read_fields(time, [self.concentration_name, self.velocity_name], 1)
+            data = self._field_data(case, time, fields, roi)
+            data["seed"] = None if self.seed is None else self.seed + index
+            data = self._select_region(data, region)
+            snapshot_input = {**input_data, "time_point": time_point}
+            return self._convert_snapshot(data, snapshot_input, output_dir / f"t_{time}")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = dict(zip(times, pool.map(_convert, range(len(times)), times), strict=True))
+        return [results[time] for time in resolved]
+
+    def _convert_snapshot(
+        self, concentration_data: dict[str, Any], input_data: dict[str, Any], output_dir: Path
+    ) -> dict[str, Any]:
+        """Sample particles from a loaded region and write the MD input."""
+        output_dir.mkdir(parents=True, exist_ok=True)
 
         # Step 2: Sample particle positions based on concentration
-        positions = self._sample_particle_positions(
-            concentration_data, input_data["grid"], input_data.get("particle_count")
+        particle_count = input_data.get("particle_count")
+        if particle_count is None and self.particle_density is None:
+            # As many particles as the region's mass amounts to
+            particle_mass = _particle_mass(input_data["particle_properties"])
+            particle_count = int(
+                round(concentration_data["statistics"]["total_amount"] / particle_mass)
+            )
+        positions, particle_cells = self._sample_particle_positions(
+            concentration_data, input_data["grid"], particle_count
         )
 
         # Step 3: Assign velocities from flow field
-        velocities = self._assign_velocities(positions, concentration_data)
+        velocities = self._assign_velocities(particle_cells, concentration_data)
 
         # Step 4: Define MD simulation box
-        box_dimensions = self._define_simulation_box(positions, input_data["grid"])
+        box_dimensions = self._define_simulation_box(concentration_data, input_data["grid"])
 
         # Step 5: Generate GROMACS-compatible coordinates
         md_input = self._generate_gromacs_input(
-            positions, velocities, input_data["particle_properties"], output_dir
+            positions, velocities, input_data["particle_properties"], output_dir, box_dimensions
         )
 
         return {
             "particle_positions": positions,
             "particle_velocities": velocities,
             "particle_count": len(positions),
+            "particle_cells": particle_cells,
+            "field": {key: concentration_data[key] for key in _CELL_ARRAYS},
             "system_box": box_dimensions,
             "coordinate_file": md_input["gro_file"],
             "topology_file": md_input["top_file"],
             "metadata": {
                 "source_time": input_data["time_point"],
+                "field_time": concentration_data["time"],
                 "sampling_method": self.sampling_strategy,
                 "original_concentration": concentration_data["statistics"],
+                "region": concentration_data["region"],
             },
         }
 
@@ -146,101 +256,336 @@ class OpenFoamToGromacsConverter(MacroToMesoBridge):
     def _load_concentration_field(self, field_file: Path, time_point: float) -> dict[str, Any]:
         """Load concentration field from OpenFOAM output.
 
+        A decomposed case is read directly from its processor directories,
+        concurrently, and stitched into global cell order, so the case does
+        not need to be reconstructed.
+
         Args:
-            field_file: Path to OpenFOAM field file
-            time_point: Time to extract
+            field_file: OpenFOAM case directory, or field file within it
+            time_point: Time to extract (the nearest written time is used)
 
         Returns:
             Dictionary with concentration data and metadata
+
+        Raises:
+            ValueError: If the concentration field is not written at that time
+        """
+        case = open_case(_case_dir(field_file), [time_point], self.decomposed, self.max_workers)
+        time = case.nearest_time(time_point)
+        fields = case.read_fields(
+            time, [self.concentration_name, self.velocity_name], self.max_workers
+        )
+        return self._field_data(case, time, fields, _mesh_data(case))
+
+    def _field_data(
+        self,
+        case: FoamCase,
+        time: str,
+        fields: dict[str, np.ndarray],
+        mesh_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Combine a snapshot's fields with (a subset of) the mesh cells.
+
+        Raises:
+            ValueError: If the concentration field is not written at that time
+        """
+        if self.concentration_name not in fields:
+            raise ValueError(
+                f"Field {self.concentration_name} not found at time {time} in {case.directory}"
+            )
+
+        cells = mesh_data["cell_indices"]
+        subset = len(cells) < mesh_data["n_mesh_cells"]
+        concentration = fields[self.concentration_name]
+        velocity = fields.get(self.velocity_name)
+        if subset:
+            concentration = concentration[cells]
+            velocity = velocity[cells] if velocity is not None else None
+        return {
+            **mesh_data,
+            "time": time,
+            "concentration": concentration,
+            "velocity": velocity,
+            "n_subdomains": len(case.processors),
+            "statistics": _field_statistics(concentration, mesh_data["cell_volumes"]),
+        }
+
+    def _region_mask(
+        self, concentration_data: dict[str, Any], region: dict[str, Any]
+    ) -> np.ndarray:
+        """Vectorized mask of the cells satisfying all criteria of a region.
+
+        Raises:
+            ValueError: If the cell zone does not exist
+        """
+        mask = np.ones(len(concentration_data["cell_indices"]), dtype=bool)
+        if "box" in region:
+            low, high = np.asarray(region["box"], dtype=float)
+            centres = concentration_data["cell_centres"]
+            mask &= np.all((centres >= low) & (centres <= high), axis=1)
+        if "cell_zone" in region:
+            zones = concentration_data["cell_zones"]
+            if region["cell_zone"] not in zones:
+                raise ValueError(
+                    f"Unknown cell zone: {region['cell_zone']}. Available: {sorted(zones)}"
+                )
+            mask &= np.isin(concentration_data["cell_indices"], zones[region["cell_zone"]])
+        if "threshold" in region:
+            mask &= concentration_data["concentration"] >= region["threshold"]
+        return mask
+
+    def _select_region(
+        self, concentration_data: dict[str, Any], region: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Restrict the loaded field to a region of interest.
+
+        MD only needs a small region (e.g. near a vessel wall), so the cells
+        are filtered with vectorized masks before sampling; later steps
+        then scale with the region rather than the whole mesh. Criteria
+        are combined (all must hold).
+
+        Args:
+            concentration_data: Loaded concentration field
+            region: None (whole mesh) or a dict with any of:
+                - box: ((xmin, ymin, zmin), (xmax, ymax, zmax)) on cell centres (m)
+                - cell_zone: Name of a cellZone of the mesh
+                - threshold: Minimum concentration
+
+        Returns:
+            Concentration data of the region's cells; ``cell_indices`` maps
+            them to the full mesh and ``statistics`` describes the region
+
+        Raises:
+            ValueError: If the cell zone does not exist or no cell is selected
         """
-        # TODO: Implement OpenFOAM field loading
-        # Can use pyFoam, fluidfoam, or direct file parsing
-        raise NotImplementedError("OpenFOAM field loading not yet implemented")
+        region = region or {}
+        cells = np.flatnonzero(self._region_mask(concentration_data, region))
+        if len(cells) == 0:
+            raise ValueError(f"Region of interest contains no cells: {region}")
+
+        selected = {**concentration_data}
+        if len(cells) < len(concentration_data["cell_indices"]):
+            selected.update(_take(concentration_data, cells))
+        n_mesh_cells = concentration_data["n_mesh_cells"]
+        return {
+            **selected,
+            "statistics": _field_statistics(selected["concentration"], selected["cell_volumes"]),
+            "region": {**region, "n_cells": len(cells), "fraction": len(cells) / n_mesh_cells},
+        }
 
     def _sample_particle_positions(
         self, concentration_data: dict[str, Any], grid: dict[str, Any], particle_count: int | None
-    ) -> list[tuple[float, float, float]]:
+    ) -> tuple[np.ndarray, np.ndarray]:
         """Sample particle positions from concentration field.
 
         Args:
             concentration_data: Loaded concentration field
             grid: Grid information
-            particle_count: Target number of particles (None = auto)
+            particle_count: Target number of particles (None = particle_density
+                times the sampled volume)
 
         Returns:
-            List of (x, y, z) particle positions
+            Tuple ((N, 3) array of particle positions, (N,) cell of each
+            particle as an index into the field arrays)
+
+        Raises:
+            ValueError: If neither particle_count nor particle_density is set,
+                or the concentration is zero everywhere
 
         Methods:
         - Monte Carlo: Sample proportional to concentration
         - Uniform: Evenly distribute then weight by concentration
         """
-        # TODO: Implement particle sampling
-        raise NotImplementedError("Particle sampling not yet implemented")
+        volumes = concentration_data["cell_volumes"]
+        weights = np.clip(concentration_data["concentration"], 0.0, None) * volumes
+        if weights.sum() <= 0:
+            raise ValueError("Concentration is zero in the sampled region")
+        weights = weights / weights.sum()
+
+        if particle_count is None:
+            if self.particle_density is None:
+                raise ValueError("particle_count or particle_density is required")
+            particle_count = int(round(self.particle_density * volumes.sum()))
+
+        rng = np.random.default_rng(concentration_data.get("seed", self.seed))
+        if self.sampling_strategy == "uniform":
+            # Largest-remainder allocation of particles to cells
+            expected = weights * particle_count
+            counts = np.floor(expected).astype(np.int64)
+            remainder = particle_count - counts.sum()
+            counts[np.argsort(counts - expected)[:remainder]] += 1
+            cells = np.repeat(np.arange(len(weights)), counts)
+        else:
+            cells = rng.choice(len(weights), size=particle_count, p=weights)
+
+        # Uniform position within a cube of the cell's volume around its centre
+        edges = np.cbrt(volumes[cells])[:, None]
+        jitter = rng.random((len(cells), 3)) - 0.5
+        return concentration_data["cell_centres"][cells] + jitter * edges, cells
 
     def _assign_velocities(
-        self, positions: list[tuple[float, float, float]], concentration_data: dict[str, Any]
-    ) -> list[tuple[float, float, float]]:
+        self, particle_cells: np.ndarray, concentration_data: dict[str, Any]
+    ) -> np.ndarray:
         """Assign velocities to particles from flow field.
 
+        Each particle takes the velocity of the cell it was sampled in.
+
         Args:
-            positions: Particle positions
+            particle_cells: (N,) cell of each particle, indexing the field arrays
             concentration_data: Contains velocity field
 
         Returns:
-            List of (vx, vy, vz) velocity vectors
+            (N, 3) array of (vx, vy, vz) velocity vectors
         """
-        # TODO: Implement velocity assignment
-        raise NotImplementedError("Velocity assignment not yet implemented")
+        velocity = concentration_data["velocity"]
+        if velocity is None:
+            return np.zeros((len(particle_cells), 3))
+        return velocity[particle_cells]
 
     def _define_simulation_box(
-        self, positions: list[tuple[float, float, float]], grid: dict[str, Any]
+        self, concentration_data: dict[str, Any], grid: dict[str, Any]
     ) -> dict[str, Any]:
         """Define MD simulation box dimensions.
 
+        The box and its CFD-to-MD coordinate transform are computed once per
+        region: a box already present in ``concentration_data["system_box"]``
+        (shared across the snapshots of a batch) is returned as is.
+
         Args:
-            positions: Particle positions
-            grid: Original CFD grid
+            concentration_data: Loaded concentration field of the region
+            grid: Original CFD grid; an optional ``box`` entry
+                ((xmin, ymin, zmin), (xmax, ymax, zmax)) in m sets the box,
+                otherwise it encloses the region's cells
 
         Returns:
-            Box parameters for GROMACS
+            Box parameters for GROMACS: origin and size in m, size_nm,
+            periodic, and the CoordinateTransform into the box
         """
-        # TODO: Implement box definition
-        raise NotImplementedError("Simulation box definition not yet implemented")
+        if "system_box" in concentration_data:
+            return concentration_data["system_box"]
+
+        if "box" in grid:
+            low, high = np.asarray(grid["box"], dtype=float)
+        else:
+            centres = concentration_data["cell_centres"]
+            half_edges = np.cbrt(concentration_data["cell_volumes"])[:, None] / 2
+            low = (centres - half_edges).min(axis=0)
+            high = (centres + half_edges).max(axis=0)
+
+        periodic = self.boundary_conditions == "periodic"
+        transform = CoordinateTransform.si_to_gromacs(low, high - low, periodic=periodic)
+        return {
+            "origin": low,
+            "size": high - low,
+            "size_nm": (high - low) * transform.scale,
+            "periodic": periodic,
+            "transform": transform,
+        }
 
     def _generate_gromacs_input(
         self,
-        positions: list[tuple[float, float, float]],
-        velocities: list[tuple[float, float, float]],
+        positions: np.ndarray,
+        velocities: np.ndarray,
         particle_properties: dict[str, Any],
         output_dir: Path,
+        box: dict[str, Any],
     ) -> dict[str, Path]:
         """Generate GROMACS input files.
 
+        Each particle is one bead of residue ``name`` (default 'NP') whose
+        molecule type is included from the ``itp`` particle property.
+
         Args:
-            positions: Particle positions
-            velocities: Particle velocities
+            positions: Particle positions (m)
+            velocities: Particle velocities (m/s)
             particle_properties: Nanoparticle properties
             output_dir: Output directory
+            box: Simulation box (see _define_simulation_box)
 
         Returns:
             Dictionary with paths to .gro and .top files
         """
-        # TODO: Implement GROMACS input generation
-        raise NotImplementedError("GROMACS input generation not yet implemented")
+        name = particle_properties.get("name", "NP")
+        n = len(positions)
+        topology = Topology(
+            names=np.full(n, name, dtype=object),
+            resnames=np.full(n, name, dtype=object),
+            resids=np.arange(1, n + 1),
+            elements=np.full(n, "C", dtype=object),
+        )
+        transform = box["transform"]
+        gro_file = write_gro(
+            output_dir / "particles.gro",
+            topology,
+            transform.apply(positions),
+            box["size_nm"],
+            title="Nanoparticles sampled from CFD",
+            velocities=transform.apply_velocities(velocities),
+            unit="nm",
+        )
+
+        includes = []
+        if "force_field" in particle_properties:
+            includes.append(f'#include "{particle_properties["force_field"]}.ff/forcefield.itp"')
+        if "itp" in particle_properties:
+            includes.append(f'#include "{Path(particle_properties["itp"]).resolve()}"')
+        top_file = output_dir / "topol.top"
+        top_file.write_text(
+            "; Generated by NanoSim\n"
+            + "".join(f"{line}\n" for line in includes)
+            + "\n[ system ]\nNanoparticles sampled from CFD\n"
+            + f"\n[ molecules ]\n{name:<20s}{n}\n"
+        )
+        return {"gro_file": gro_file, "top_file": top_file}
 
     def _check_mass_conservation(
         self, input_data: dict[str, Any], output_data: dict[str, Any]
     ) -> bool:
-        """Check mass conservation."""
-        # TODO: Implement mass conservation check
-        return True  # Placeholder
+        """Check mass conservation.
+
+        The particles' total mass (count x particle mass) must match the
+        integral of the concentration over the sampled cells within
+        ``mass_tolerance`` (config, default 5%).
+        """
+        field = output_data["field"]
+        field_mass = float(np.dot(field["concentration"], field["cell_volumes"]))
+        particle_mass = output_data["particle_count"] * _particle_mass(
+            input_data["particle_properties"]
+        )
+        if field_mass <= 0:
+            return particle_mass == 0
+        return (
+            abs(particle_mass - field_mass) <= self.config.get("mass_tolerance", 0.05) * field_mass
+        )
 
     def _check_distribution_match(
         self, input_data: dict[str, Any], output_data: dict[str, Any]
     ) -> bool:
-        """Check distribution matches concentration."""
-        # TODO: Implement distribution check
-        return True  # Placeholder
+        """Check distribution matches concentration.
+
+        Particles are histogrammed over cells with a bincount and compared
+        with the field's mass fractions using a one-sample KS statistic:
+        the largest difference of the cumulative distributions, with cells
+        ordered by concentration and along each axis. The check fails if it
+        exceeds ``ks_critical`` / sqrt(N) (config, default 1.95, a 0.1%
+        significance level for Monte Carlo sampling). Cost is linear in
+        particles plus a sort of the cells.
+        """
+        field = output_data["field"]
+        cells = np.asarray(output_data["particle_cells"])
+        if len(cells) == 0:
+            return True
+
+        weights = np.clip(field["concentration"], 0.0, None) * field["cell_volumes"]
+        expected = weights / weights.sum()
+        observed = np.bincount(cells, minlength=len(expected)) / len(cells)
+
+        keys = [field["concentration"], *np.asarray(field["cell_centres"]).T]
+        statistic = max(
+            np.abs(np.cumsum(observed[order] - expected[order])).max()
+            for order in (np.argsort(key, kind="stable") for key in keys)
+        )
+        return statistic <= self.config.get("ks_critical", 1.95) / np.sqrt(len(cells))
 
     def _check_velocity_reasonable(self, output_data: dict[str, Any]) -> bool:
         """Check velocities are reasonable."""
@@ -256,3 +601,59 @@ class OpenFoamToGromacsConverter(MacroToMesoBridge):
         """Check for particle overlaps."""
         # TODO: Implement overlap check
         return True  # Placeholder
+
+
+def _case_dir(field_file: Path) -> Path:
+    """Case directory of a case path or of a field file within it."""
+    if not field_file.is_file():
+        return field_file
+    # <case>/<time>/<field> or <case>/processorN/<time>/<field>
+    case_dir = field_file.parent.parent
+    return case_dir.parent if case_dir.name.startswith("processor") else case_dir
+
+
+def _mesh_data(case: FoamCase) -> dict[str, Any]:
+    """Cell geometry of a case in the bridge's field-data layout."""
+    return {
+        "cell_indices": np.arange(case.mesh.n_cells),
+        "cell_centres": case.mesh.cell_centres,
+        "cell_volumes": case.mesh.cell_volumes,
+        "cell_zones": case.mesh.cell_zones,
+        "n_mesh_cells": case.mesh.n_cells,
+    }
+
+
+def _take(data: dict[str, Any], cells: np.ndarray) -> dict[str, np.ndarray]:
+    """Per-cell arrays of the data restricted to cells."""
+    return {
+        key: data[key][cells] for key in (*_CELL_ARRAYS, "velocity") if data.get(key) is not None
+    }
+
+
+def _particle_mass(particle_properties: dict[str, Any]) -> float:
+    """Mass of one particle (kg): ``mass``, or from ``diameter`` (m) and ``density``.
+
+    Without either, the concentration is taken as a number density and
+    each particle counts as one.
+    """
+    if "mass" in particle_properties:
+        return float(particle_properties["mass"])
+    if "diameter" in particle_properties and "density" in particle_properties:
+        return float(
+            particle_properties["density"] * np.pi * particle_properties["diameter"] ** 3 / 6.0
+        )
+    return 1.0
+
+
+def _field_statistics(concentration: np.ndarray, volumes: np.ndarray) -> dict[str, float]:
+    """Summary of a concentration field over cells of the given volumes."""
+    volume = volumes.sum()
+    amount = np.dot(concentration, volumes)
+    return {
+        "n_cells": len(volumes),
+        "min": float(concentration.min()),
+        "max": float(concentration.max()),
+        "mean": float(amount / volume),
+        "total_amount": float(amount),
+        "volume": float(volume),
+    }
@@ -5,10 +5,25 @@ to docking inputs (micro scale), for MD-first workflows like membrane
 interactions or cryptic pocket discovery.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from ..analysis.clustering import cluster_frames
+from ..analysis.pockets import (
+    PocketDetectionParams,
+    detect_pockets,
+    detect_pockets_batch,
+    track_pockets,
+)
+from ..analysis.trajectory import Topology, iter_frames, read_frames, read_topology, write_pdb
 from ..core.bridge import MesoToMicroBridge
+from ..engines.pdbqt import convert_batch
+from ..engines.receptor_prep import get_receptor_template
+from ..engines.vina_maps import DEFAULT_MAP_SPACING, snap_box
+from ..utils.spatial import neighbor_pairs
 
 
 class GromacsToVinaConverter(MesoToMicroBridge):
@@ -34,14 +49,55 @@ class GromacsToVinaConverter(MesoToMicroBridge):
             config: Configuration dictionary containing:
                 - frame_selection: How to select frames ('last', 'cluster', 'all')
                 - binding_site_method: Method for site identification
+                  ('grid' built-in detector, or 'fpocket')
                 - pocket_cutoff: Distance for pocket detection (default: 5.0 Å)
                 - min_pocket_volume: Minimum pocket volume (default: 100 Å³)
+                - site_centroid_cutoff: Max centroid distance to match pockets
+                  across frames (default: 4.0 Å)
+                - site_residue_overlap: Min lining-residue overlap (Jaccard) to
+                  match pockets across frames (default: 0.5)
+                - min_site_occupancy: Drop sites present in fewer frames (default: 0.0)
+                - grid_padding: Padding around a site's pockets (default: 4.0 Å)
+                - min_box_size: Minimum Vina box edge (default: 20.0 Å)
+                - map_spacing: Vina grid map spacing boxes are snapped to
+                  (default: 0.375 Å)
+                - cluster_selection: Atoms used for frame clustering (default:
+                  CA atoms of the binding-site residues, see below)
+                - binding_site_residues: Residue numbers of the binding site
+                  (default: residues within binding_site_cutoff of the ligand
+                  in the first frame, or all CA atoms without a ligand)
+                - ligand_selection: Ligand atoms defining the binding site
+                  (default: 'resname LIG')
+                - binding_site_cutoff: Ligand distance of binding-site
+                  residues (default: 8.0 Å)
+                - cluster_rmsd_cutoff: RMSD cutoff for frame clustering (default: 2.0 Å)
+                - max_representatives: Maximum representative frames (default: 20)
+                - chunk_size: Frames read per batch when streaming (default: 500)
+                - grid_spacing: Pocket detection grid spacing (default: 1.0 Å)
+                - max_workers: Parallel workers for per-frame analysis (default: auto)
         """
         self.config = config or {}
         self.frame_selection = self.config.get("frame_selection", "cluster")
-        self.binding_site_method = self.config.get("binding_site_method", "fpocket")
+        self.binding_site_method = self.config.get("binding_site_method", "grid")
         self.pocket_cutoff = self.config.get("pocket_cutoff", 5.0)
         self.min_pocket_volume = self.config.get("min_pocket_volume", 100.0)
+        self.cluster_selection = self.config.get("cluster_selection")
+        self.binding_site_residues = self.config.get("binding_site_residues")
+        self.ligand_selection = self.config.get("ligand_selection", "resname LIG")
+        self.binding_site_cutoff = self.config.get("binding_site_cutoff", 8.0)
+        self.cluster_rmsd_cutoff = self.config.get("cluster_rmsd_cutoff", 2.0)
+        self.max_representatives = self.config.get("max_representatives", 20)
+        self.chunk_size = self.config.get("chunk_size", 500)
+        self.grid_spacing = self.config.get("grid_spacing", 1.0)
+        self.site_centroid_cutoff = self.config.get("site_centroid_cutoff", 4.0)
+        self.site_residue_overlap = self.config.get("site_residue_overlap", 0.5)
+        self.min_site_occupancy = self.config.get("min_site_occupancy", 0.0)
+        self.grid_padding = self.config.get("grid_padding", 4.0)
+        self.min_box_size = self.config.get("min_box_size", 20.0)
+        self.map_spacing = self.config.get("map_spacing", DEFAULT_MAP_SPACING)
+        self.max_workers = self.config.get("max_workers", None)
+        self._receptor_structures: dict[Path, tuple[np.ndarray, np.ndarray]] = {}
+        self._receptor_topologies: dict[Path, Topology] = {}
 
     def convert(self, input_data: dict[str, Any]) -> dict[str, Any]:
         """Convert GROMACS trajectory to Vina docking inputs.
@@ -55,8 +111,9 @@ class GromacsToVinaConverter(MesoToMicroBridge):
 
         Returns:
             Dictionary containing:
-                - receptor_pdbqt: List of receptor structures in PDBQT format
-                - binding_sites: List of detected binding sites
+                - receptor_pdbqt: Receptor structure (PDBQT) for each binding site
+                - binding_sites: Persistent binding sites (pockets merged across
+                  frames) with occupancy fractions
                 - grid_parameters: Grid box parameters for each site
                 - frame_metadata: Information about selected frames
 
@@ -80,13 +137,23 @@ class GromacsToVinaConverter(MesoToMicroBridge):
         frames = self._select_frames(traj_file, topo_file)
 
         # Step 2: Extract receptor structure from each frame
-        receptors = self._extract_receptors(frames, input_data["receptor_selection"], output_dir)
+        receptors = self._extract_receptors(
+            traj_file, topo_file, frames, input_data["receptor_selection"], output_dir
+        )
 
         # Step 3: Identify binding sites (pockets)
-        binding_sites = self._identify_binding_sites(receptors, output_dir)
+        pockets = self._identify_binding_sites(receptors, output_dir)
+
+        # Step 3b: Merge pockets recurring across frames into persistent sites
+        binding_sites = self._track_binding_sites(frames, receptors, pockets)
 
-        # Step 4: Convert receptor PDB to PDBQT format
-        receptor_pdbqt = self._convert_to_pdbqt(receptors, output_dir)
+        # Step 4: Convert receptor PDB to PDBQT format (one receptor per site)
+        site_receptors = [site["receptor"] for site in binding_sites]
+        unique_receptors = list(dict.fromkeys(site_receptors))
+        converted = dict(
+            zip(unique_receptors, self._convert_to_pdbqt(unique_receptors, output_dir), strict=True)
+        )
+        receptor_pdbqt = [converted[receptor] for receptor in site_receptors]
 
         # Step 5: Generate grid box parameters for Vina
         grid_parameters = self._generate_grid_parameters(binding_sites)
@@ -154,26 +221,107 @@ class GromacsToVinaConverter(MesoToMicroBridge):
         - 'last': Just use final frame
         - 'cluster': RMSD clustering, select representatives
         - 'all': Use all frames (expensive!)
+
+        Raises:
+            ValueError: If the frame selection method is unknown
+
+        The trajectory is streamed in chunks of ``chunk_size`` frames; for
+        'cluster' only the clustering atoms are kept (leader clustering on
+        superposed RMSD), so the full trajectory is never held in memory.
+        """
+        if self.frame_selection == "cluster":
+            atoms = self._cluster_atoms(traj_file, topo_file)
+            chunks = iter_frames(traj_file, topo_file, self.chunk_size, atom_indices=atoms)
+            return cluster_frames(chunks, self.cluster_rmsd_cutoff, self.max_representatives)
+
+        if self.frame_selection not in ("last", "all"):
+            raise ValueError(f"Unknown frame selection method: {self.frame_selection}")
+
+        # Only frame indices and times are needed here, so keep a single atom
+        frames = []
+        for chunk in iter_frames(traj_file, topo_file, self.chunk_size, atom_indices=[0]):
+            frames.extend(
+                {"index": int(i), "time": float(t)}
+                for i, t in zip(chunk.frame_indices, chunk.times, strict=True)
+            )
+
+        return frames[-1:] if self.frame_selection == "last" else frames
+
+    def _cluster_atoms(self, traj_file: Path, topo_file: Path) -> np.ndarray:
+        """Atoms whose RMSD distinguishes frames for clustering.
+
+        Frames are clustered on the binding site rather than the whole
+        protein, so that pocket rearrangements are not drowned out by
+        motions elsewhere. Binding-site residues are taken from the
+        configuration or from the ligand contacts in the first frame; an
+        apo trajectory falls back to all CA atoms.
+
+        Returns:
+            Sorted atom indices
         """
-        # TODO: Implement frame selection
-        # Can use MDAnalysis for trajectory handling
-        raise NotImplementedError("Frame selection not yet implemented")
+        topology = read_topology(topo_file)
+        if self.cluster_selection:
+            return topology.select(self.cluster_selection)
+
+        ca_atoms = topology.select("name CA")
+        residues = self.binding_site_residues
+        if residues is None:
+            ligand = topology.select(self.ligand_selection)
+            if len(ligand) == 0:
+                return ca_atoms
+            protein = topology.select("protein")
+            first_frame = next(iter_frames(traj_file, topo_file, chunk_size=1)).coordinates[0]
+            near, _, _ = neighbor_pairs(
+                first_frame[protein], first_frame[ligand], self.binding_site_cutoff
+            )
+            residues = topology.resids[protein[near]]
+
+        site = ca_atoms[np.isin(topology.resids[ca_atoms], residues)]
+        return site if len(site) else ca_atoms
 
     def _extract_receptors(
-        self, frames: list[dict[str, Any]], selection: str, output_dir: Path
+        self,
+        traj_file: Path,
+        topo_file: Path,
+        frames: list[dict[str, Any]],
+        selection: str,
+        output_dir: Path,
     ) -> list[Path]:
         """Extract receptor structure from selected frames.
 
         Args:
+            traj_file: Trajectory file
+            topo_file: Topology file
             frames: Selected trajectory frames
             selection: Atom selection string (e.g., 'protein')
             output_dir: Output directory
 
         Returns:
             List of receptor PDB files
+
+        The selected frames are fetched in a single streaming pass. Receptor
+        coordinates are kept in memory so that pocket detection does not need
+        to parse the written PDB files again.
         """
-        # TODO: Implement receptor extraction
-        raise NotImplementedError("Receptor extraction not yet implemented")
+        topology = read_topology(topo_file)
+        atoms = topology.select(selection)
+        receptor_topology = topology.subset(atoms)
+        coordinates = read_frames(
+            traj_file, [f["index"] for f in frames], topo_file, self.chunk_size
+        )
+
+        receptors = []
+        for frame in frames:
+            pdb_file = output_dir / f"receptor_frame{frame['index']}.pdb"
+            write_pdb(pdb_file, topology, coordinates[frame["index"]], atoms)
+            self._receptor_structures[pdb_file] = (
+                coordinates[frame["index"]][atoms],
+                topology.resids[atoms],
+            )
+            self._receptor_topologies[pdb_file] = receptor_topology
+            receptors.append(pdb_file)
+
+        return receptors
 
     def _identify_binding_sites(
         self, receptors: list[Path], output_dir: Path
@@ -185,16 +333,61 @@ class GromacsToVinaConverter(MesoToMicroBridge):
             output_dir: Output directory
 
         Returns:
-            List of binding site dictionaries with coordinates and properties
+            List of binding site dictionaries with coordinates and properties,
+            each tagged with the receptor it was detected in
+
+        Raises:
+            ValueError: If the binding site method is unknown
 
         Tools:
+        - Grid (built-in buriedness detector, default)
         - Fpocket (fast, geometric method)
         - SiteMap (commercial, accurate)
         - PocketFinder
         """
-        # TODO: Implement binding site detection
-        # Default: use fpocket
-        raise NotImplementedError("Binding site identification not yet implemented")
+        if self.binding_site_method == "fpocket":
+            # TODO: Implement fpocket integration
+            raise NotImplementedError(
+                "fpocket integration not yet implemented; use binding_site_method='grid'"
+            )
+        if self.binding_site_method != "grid":
+            raise ValueError(f"Unknown binding site method: {self.binding_site_method}")
+
+        structures = [self._load_receptor_structure(receptor) for receptor in receptors]
+        params = PocketDetectionParams(
+            grid_spacing=self.grid_spacing,
+            pocket_cutoff=self.pocket_cutoff,
+            min_pocket_volume=self.min_pocket_volume,
+        )
+
+        # Receptors extracted from one trajectory share a topology
+        same_topology = all(
+            np.array_equal(resids, structures[0][1]) for _, resids in structures[1:]
+        )
+        if structures and same_topology:
+            pocket_lists = detect_pockets_batch(
+                [coords for coords, _ in structures],
+                structures[0][1],
+                params,
+                self.max_workers,
+            )
+        else:
+            pocket_lists = [detect_pockets(coords, resids, params) for coords, resids in structures]
+
+        binding_sites = []
+        for receptor, pockets in zip(receptors, pocket_lists, strict=True):
+            for rank, pocket in enumerate(pockets):
+                binding_sites.append({**pocket, "receptor": receptor, "rank": rank})
+
+        return binding_sites
+
+    def _load_receptor_structure(self, receptor: Path) -> tuple[np.ndarray, np.ndarray]:
+        """Return (coordinates, resids) of a receptor, reading it only if needed."""
+        if receptor not in self._receptor_structures:
+            topology = read_topology(receptor)
+            coordinates = next(iter_frames(receptor, chunk_size=1)).coordinates[0]
+            self._receptor_structures[receptor] = (coordinates, topology.resids)
+        return self._receptor_structures[receptor]
 
     def _convert_to_pdbqt(self, receptors: list[Path], output_dir: Path) -> list[Path]:
         """Convert PDB to PDBQT format for AutoDock.
@@ -206,11 +399,79 @@ class GromacsToVinaConverter(MesoToMicroBridge):
         Returns:
             List of PDBQT files
 
-        Uses AutoDock Tools:
-            prepare_receptor4.py -r receptor.pdb -o receptor.pdbqt
+        Conversion runs in process: receptors extracted from the trajectory
+        share one typing template and are written straight from their cached
+        coordinates; other PDB files are converted on a thread pool.
         """
-        # TODO: Implement PDB to PDBQT conversion
-        raise NotImplementedError("PDB to PDBQT conversion not yet implemented")
+        outputs = [output_dir / f"{receptor.stem}.pdbqt" for receptor in receptors]
+        extracted = [
+            (receptor, output)
+            for receptor, output in zip(receptors, outputs, strict=True)
+            if receptor in self._receptor_topologies
+        ]
+        others = [
+            (receptor, output)
+            for receptor, output in zip(receptors, outputs, strict=True)
+            if receptor not in self._receptor_topologies
+        ]
+
+        def _write(job: tuple[Path, Path]) -> Path:
+            receptor, output = job
+            coordinates = self._receptor_structures[receptor][0]
+            template = get_receptor_template(self._receptor_topologies[receptor], coordinates)
+            return template.write(coordinates, output)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(_write, extracted))
+        convert_batch(others, self.max_workers)
+
+        return outputs
+
+    def _track_binding_sites(
+        self,
+        frames: list[dict[str, Any]],
+        receptors: list[Path],
+        pockets: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Merge pockets detected in several frames into persistent sites.
+
+        Args:
+            frames: Selected trajectory frames
+            receptors: Receptor PDB file of each frame
+            pockets: Pockets tagged with the receptor they were detected in
+
+        Returns:
+            Persistent sites (see ``track_pockets``), each with the receptor and
+            frame index of its representative conformation
+
+        Frames standing for a cluster of conformations are weighted by the
+        cluster size, so occupancy reflects the full trajectory.
+        """
+        frame_pockets: list[list[dict[str, Any]]] = [[] for _ in receptors]
+        position = {receptor: i for i, receptor in enumerate(receptors)}
+        for pocket in pockets:
+            frame_pockets[position[pocket["receptor"]]].append(pocket)
+
+        sites = track_pockets(
+            frame_pockets,
+            centroid_cutoff=self.site_centroid_cutoff,
+            min_residue_overlap=self.site_residue_overlap,
+            frame_weights=[f.get("cluster_size", 1) for f in frames],
+        )
+
+        tracked = []
+        for site in sites:
+            if site["occupancy"] < self.min_site_occupancy:
+                continue
+            representative = site["representative"]
+            tracked.append(
+                {
+                    **site,
+                    "receptor": receptors[representative],
+                    "frame": frames[representative]["index"],
+                }
+            )
+        return tracked
 
     def _generate_grid_parameters(
         self, binding_sites: list[dict[str, Any]]
@@ -226,9 +487,33 @@ class GromacsToVinaConverter(MesoToMicroBridge):
         Parameters:
         - center_x, center_y, center_z: Center of binding site
         - size_x, size_y, size_z: Box dimensions (typically 20-25 Å)
+
+        The box covers the pockets of all frames merged into a site, plus
+        ``grid_padding`` on each side, and is at least ``min_box_size`` wide.
+        Boxes are snapped to the Vina map grid so that repeated conversions
+        of the same site hit the same GridMapCache entry.
         """
-        # TODO: Implement grid generation
-        raise NotImplementedError("Grid parameter generation not yet implemented")
+        grids = []
+        for site in binding_sites:
+            lo = np.asarray(site["min_corner"], dtype=np.float64)
+            hi = np.asarray(site["max_corner"], dtype=np.float64)
+            center, size = snap_box(
+                (lo + hi) / 2.0,
+                np.maximum(hi - lo + 2.0 * self.grid_padding, self.min_box_size),
+                self.map_spacing,
+            )
+            grids.append(
+                {
+                    "site_id": site.get("site_id"),
+                    "center_x": float(center[0]),
+                    "center_y": float(center[1]),
+                    "center_z": float(center[2]),
+                    "size_x": float(size[0]),
+                    "size_y": float(size[1]),
+                    "size_z": float(size[2]),
+                }
+            )
+        return grids
 
     def _check_pdbqt_format(self, pdbqt_file: Path) -> bool:
         """Validate PDBQT file format."""
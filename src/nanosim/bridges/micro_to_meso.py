@@ -5,10 +5,31 @@ to MD simulation inputs (meso scale), following the standard drug discovery
 workflow: Docking → MD Validation.
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from ..analysis.trajectory import read_topology
 from ..core.bridge import MicroToMesoBridge
+from ..engines.autodock import DockingResultParser
+from ..engines.md_prep import (
+    ComponentTopology,
+    SystemJob,
+    assemble_complex,
+    build_ligand_topology,
+    build_receptor_topology,
+    complex_topology,
+    itp_atom_count,
+    prepare_system,
+    protonate_pose,
+)
+from ..engines.pdbqt import pose_to_pdb
+
+# Best-scoring poses considered for clustering
+MAX_CLUSTERED_POSES = 20
 
 
 class VinaToGromacsConverter(MicroToMesoBridge):
@@ -35,6 +56,17 @@ class VinaToGromacsConverter(MicroToMesoBridge):
                 - force_field: GROMACS force field (default: 'amber99sb-ildn')
                 - water_model: Water model (default: 'tip3p')
                 - box_padding: Padding around system (default: 1.0 nm)
+                - ligand_resname: Residue name of the ligand (default: 'LIG')
+                - ligand_charge: Net ligand charge for parameterization (default: 0)
+                - n_replicas: Independent MD replicas per pose (default: 1)
+                - seed: Seed of the first replica (default: 0)
+                - solvate: Add water and neutralizing ions (default: True)
+                - solvator: 'builtin' water-box tiling or 'gmx' solvate/genion
+                  (default: 'builtin')
+                - salt_concentration: Salt added after neutralization in mol/L
+                  (default: 0.0)
+                - max_workers: Parallel workers for conversion and system
+                  preparation (default: executor default)
         """
         self.config = config or {}
         self.top_n_poses = self.config.get("top_n_poses", 5)
@@ -42,6 +74,21 @@ class VinaToGromacsConverter(MicroToMesoBridge):
         self.force_field = self.config.get("force_field", "amber99sb-ildn")
         self.water_model = self.config.get("water_model", "tip3p")
         self.box_padding = self.config.get("box_padding", 1.0)
+        self.ligand_resname = self.config.get("ligand_resname", "LIG")
+        self.ligand_charge = self.config.get("ligand_charge", 0)
+        self.n_replicas = self.config.get("n_replicas", 1)
+        self.seed = self.config.get("seed", 0)
+        self.solvate = self.config.get("solvate", True)
+        self.solvator = self.config.get("solvator", "builtin")
+        self.salt_concentration = self.config.get("salt_concentration", 0.0)
+        self.max_workers = self.config.get("max_workers", None)
+
+        # Receptors processed by pdb2gmx, reused across convert() calls
+        self._receptors: dict[tuple[Path, str, str], ComponentTopology] = {}
+        self._receptor: ComponentTopology | None = None
+        self._ligand_topology: Path | None = None
+        self._pose_files: dict[str, Path] = {}
+        self._pose_metadata: dict[str, dict[str, Any]] = {}
 
     def convert(self, input_data: dict[str, Any]) -> dict[str, Any]:
         """Convert Vina docking results to GROMACS inputs.
@@ -52,6 +99,9 @@ class VinaToGromacsConverter(MicroToMesoBridge):
                 - receptor_structure: Path to receptor PDB
                 - ligand_name: Name of ligand for identification
                 - output_dir: Directory for MD preparation files
+                - receptor_topology: Optional receptor .top matching
+                  receptor_structure (skips pdb2gmx)
+                - ligand_topology: Optional ligand .itp (skips ACPYPE)
 
         Returns:
             Dictionary containing:
@@ -75,6 +125,14 @@ class VinaToGromacsConverter(MicroToMesoBridge):
             raise FileNotFoundError(f"Receptor structure not found: {receptor_file}")
 
         output_dir.mkdir(parents=True, exist_ok=True)
+        if input_data.get("receptor_topology"):
+            key = (receptor_file.resolve(), self.force_field, self.water_model)
+            self._receptors[key] = ComponentTopology(
+                receptor_file, Path(input_data["receptor_topology"])
+            )
+        self._ligand_topology = (
+            Path(input_data["ligand_topology"]) if input_data.get("ligand_topology") else None
+        )
 
         # Step 1: Parse docking results and extract poses
         poses = self._extract_poses(docking_file)
@@ -152,10 +210,14 @@ class VinaToGromacsConverter(MicroToMesoBridge):
 
         Note:
             Vina typically outputs 9 modes by default
+
+        Raises:
+            ValueError: If the file contains no scored poses
         """
-        # TODO: Implement PDBQT parsing
-        # Use vina_split or parse manually
-        raise NotImplementedError("PDBQT parsing not yet implemented")
+        poses = DockingResultParser.parse_pdbqt(docking_file)
+        if not poses:
+            raise ValueError(f"No docked poses found in {docking_file}")
+        return poses
 
     def _select_diverse_poses(self, poses: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Select diverse poses using RMSD clustering.
@@ -173,9 +235,20 @@ class VinaToGromacsConverter(MicroToMesoBridge):
         4. Select representative from each cluster
         5. Return up to top_n_poses
         """
-        # TODO: Implement RMSD clustering
-        # Can use MDAnalysis or scipy.cluster
-        raise NotImplementedError("RMSD clustering not yet implemented")
+        ranked = sorted(poses, key=lambda pose: pose["affinity"])[:MAX_CLUSTERED_POSES]
+
+        # Poses share the receptor frame, so RMSD is computed in place
+        selected: list[dict[str, Any]] = []
+        leaders = np.empty((0, len(ranked[0]["coordinates"]), 3))
+        for pose in ranked:
+            coords = np.asarray(pose["coordinates"], dtype=np.float64)
+            rmsd = np.sqrt(((leaders - coords) ** 2).sum(axis=-1).mean(axis=-1))
+            if (rmsd > self.rmsd_cutoff).all():
+                selected.append(pose)
+                leaders = np.concatenate([leaders, coords[None]])
+                if len(selected) == self.top_n_poses:
+                    break
+        return selected
 
     def _convert_pdbqt_to_pdb(self, poses: list[dict[str, Any]], output_dir: Path) -> list[Path]:
         """Convert PDBQT format to PDB.
@@ -187,11 +260,26 @@ class VinaToGromacsConverter(MicroToMesoBridge):
         Returns:
             List of PDB file paths
 
-        Uses Open Babel for conversion:
-            obabel ligand.pdbqt -O ligand.pdb -h
+        Poses are converted in process (AD4 types mapped back to elements)
+        and then protonated with Open Babel, on a thread pool: docked poses
+        only carry polar hydrogens, and both the ligand parameters and the
+        MD system need all of them.
         """
-        # TODO: Implement conversion using Open Babel
-        raise NotImplementedError("PDBQT to PDB conversion not yet implemented")
+        names = [f"pose_{pose['mode']}" for pose in poses]
+        for name, pose in zip(names, poses, strict=True):
+            self._pose_files[name] = output_dir / f"{name}.pdb"
+            self._pose_metadata[name] = {
+                "pose": name,
+                "mode": pose["mode"],
+                "affinity": pose["affinity"],
+            }
+
+        def _write(name: str, pose: dict[str, Any]) -> Path:
+            pdb = pose_to_pdb(pose, self._pose_files[name], resname=self.ligand_resname)
+            return protonate_pose(pdb)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(_write, names, poses))
 
     def _create_complexes(
         self, receptor_file: Path, ligand_files: list[Path], output_dir: Path
@@ -204,13 +292,23 @@ class VinaToGromacsConverter(MicroToMesoBridge):
             output_dir: Output directory
 
         Returns:
-            List of complex PDB files
+            List of complex structure files (.gro), one directory per pose
 
-        Simple concatenation:
-            cat receptor.pdb ligand.pdb > complex.pdb
+        The receptor is processed by pdb2gmx once (and reused across calls);
+        each pose is then placed into the processed receptor in parallel.
         """
-        # TODO: Implement complex creation
-        raise NotImplementedError("Complex creation not yet implemented")
+        self._receptor = self._prepare_receptor(receptor_file, output_dir / "receptor")
+        outputs = []
+        for ligand in ligand_files:
+            (output_dir / ligand.stem).mkdir(exist_ok=True)
+            outputs.append(output_dir / ligand.stem / "complex.gro")
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(
+                executor.map(
+                    assemble_complex, repeat(self._receptor.structure), ligand_files, outputs
+                )
+            )
 
     def _generate_topologies(self, complex_files: list[Path], output_dir: Path) -> list[Path]:
         """Generate GROMACS topology files.
@@ -222,12 +320,36 @@ class VinaToGromacsConverter(MicroToMesoBridge):
         Returns:
             List of topology files (.top)
 
-        Uses:
-        - gmx pdb2gmx for protein
-        - ACPYPE or LigParGen for ligand parameters
+        The receptor topology comes from the single pdb2gmx pass and the
+        ligand is parameterized once (ACPYPE on the first pose, unless a
+        ligand topology was given); per pose only the combined .top is written.
+
+        Raises:
+            ValueError: If the ligand topology and the protonated poses have
+                different numbers of atoms
         """
-        # TODO: Implement topology generation
-        raise NotImplementedError("Topology generation not yet implemented")
+        first_pose = self._pose_files[complex_files[0].parent.name]
+        ligand_itp = self._ligand_topology
+        if ligand_itp is None:
+            ligand_itp = build_ligand_topology(
+                first_pose, output_dir / "ligand", self.ligand_charge, self.ligand_resname
+            ).topology
+
+        n_pose_atoms = read_topology(first_pose).n_atoms
+        n_itp_atoms = itp_atom_count(ligand_itp)
+        if n_itp_atoms != n_pose_atoms:
+            raise ValueError(
+                f"Ligand topology {ligand_itp} has {n_itp_atoms} atoms but the protonated "
+                f"pose has {n_pose_atoms}; the topology must include all hydrogens"
+            )
+
+        text = complex_topology(self._receptor.topology, ligand_itp)
+        topologies = []
+        for complex_file in complex_files:
+            topology = complex_file.parent / "topol.top"
+            topology.write_text(text)
+            topologies.append(topology)
+        return topologies
 
     def _prepare_md_systems(
         self, complex_files: list[Path], topology_files: list[Path], output_dir: Path
@@ -240,16 +362,43 @@ class VinaToGromacsConverter(MicroToMesoBridge):
             output_dir: Output directory
 
         Returns:
-            List of MD system dictionaries
+            List of MD system dictionaries, one per pose and replica
 
-        Steps:
-        1. Define simulation box (gmx editconf)
-        2. Add solvent (gmx solvate)
-        3. Add ions for neutralization (gmx genion)
-        4. Energy minimization preparation
+        Every pose/replica combination is boxed, solvated and neutralized
+        in its own worker process; the built-in solvator tiles a cached
+        water box instead of calling gmx solvate/genion.
         """
-        # TODO: Implement MD system preparation
-        raise NotImplementedError("MD system preparation not yet implemented")
+        jobs = [
+            SystemJob(
+                complex_file=complex_file,
+                topology_file=topology_file,
+                directory=complex_file.parent / f"rep{replica}",
+                box_padding=self.box_padding,
+                water_model=self.water_model,
+                solvate=self.solvate,
+                solvator=self.solvator,
+                salt_concentration=self.salt_concentration,
+                seed=self.seed + replica,
+                metadata={
+                    **self._pose_metadata.get(complex_file.parent.name, {}),
+                    "replica": replica,
+                },
+            )
+            for complex_file, topology_file in zip(complex_files, topology_files, strict=True)
+            for replica in range(self.n_replicas)
+        ]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(prepare_system, jobs))
+
+    def _prepare_receptor(self, receptor_file: Path, output_dir: Path) -> ComponentTopology:
+        """Process the receptor with pdb2gmx, once per structure and force field."""
+        key = (receptor_file.resolve(), self.force_field, self.water_model)
+        if key not in self._receptors:
+            self._receptors[key] = build_receptor_topology(
+                receptor_file, output_dir, self.force_field, self.water_model
+            )
+        return self._receptors[key]
 
     def _check_clashes(self, coord_file: Path) -> bool:
         """Check for atomic clashes."""
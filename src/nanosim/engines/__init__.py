@@ -5,8 +5,16 @@ from nanosim.engines.autodock import (
     prepare_ligand,
     prepare_receptor,
 )
+from nanosim.engines.docking_archive import DockingArchive, DockingArchiveWriter
 from nanosim.engines.gromacs import GROMACSAnalyzer, GROMACSEngine
+from nanosim.engines.input_templates import render_inputs
+from nanosim.engines.ligand_prep import LigandPreparationPipeline
+from nanosim.engines.ligand_store import PreparedLigandStore
 from nanosim.engines.openfoam import OpenFOAMEngine
+from nanosim.engines.pdbqt import convert_batch, pdbqt_to_pdb
+from nanosim.engines.receptor_prep import ReceptorTemplate
+from nanosim.engines.vina_maps import GridMapCache
+from nanosim.engines.vina_pool import VinaWorkerPool
 
 __all__ = [
     "OpenFOAMEngine",
@@ -16,4 +24,14 @@ __all__ = [
     "DockingResultParser",
     "prepare_receptor",
     "prepare_ligand",
+    "GridMapCache",
+    "VinaWorkerPool",
+    "LigandPreparationPipeline",
+    "PreparedLigandStore",
+    "DockingArchive",
+    "DockingArchiveWriter",
+    "ReceptorTemplate",
+    "convert_batch",
+    "pdbqt_to_pdb",
+    "render_inputs",
 ]
@@ -1,9 +1,21 @@
 """AutoDock Vina simulation engine for micro-scale molecular docking."""
+import heapq
+import subprocess
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 from nanosim.core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from nanosim.engines.docking_archive import DockingArchive, DockingArchiveWriter
+from nanosim.engines.ligand_prep import LigandPreparationPipeline, obabel_executable
+from nanosim.engines.receptor_prep import prepare_receptor_pdb
+from nanosim.engines.vina_maps import DEFAULT_MAP_SPACING, GridMapCache
+from nanosim.engines.vina_pool import VinaWorkerPool
 from nanosim.utils.logger import setup_logger
+from nanosim.utils.retention import RetentionPolicy, RetentionRule, apply_retention
+
+# Applied after a completed screen: prepared ligand shards can be regenerated
+AUTODOCK_RETENTION = RetentionPolicy([RetentionRule("ligands", "delete")])
 
 
 class AutoDockVinaEngine(SimulationEngine):
@@ -22,6 +34,9 @@ class AutoDockVinaEngine(SimulationEngine):
         self.config = config
         self.logger = setup_logger(__name__, config.output_dir / "autodock.log")
         self.work_dir: Path = config.output_dir / "autodock_work"
+        self.config_file: Path = self.work_dir / "config.txt"
+        self.map_prefix: Path | None = None
+        self._completed = False
 
     def validate_config(self) -> None:
         """Validate AutoDock Vina-specific configuration.
@@ -60,17 +75,48 @@ class AutoDockVinaEngine(SimulationEngine):
         - Receptor files (.pdbqt)
         - Ligand files (.pdbqt)
         - Configuration file (config.txt)
+
+        When ``map_cache_dir`` is set, receptor grid maps are taken from (or
+        added to) a GridMapCache and the config references them via ``maps``,
+        so Vina does not recompute them for every ligand.
         """
         self.work_dir.mkdir(parents=True, exist_ok=True)
 
         self.logger.info(f"AutoDock Vina working directory created at {self.work_dir}")
 
-        # TODO: Generate AutoDock Vina configuration file
-        # - Search space definition (center_x, center_y, center_z)
-        # - Box dimensions (size_x, size_y, size_z)
-        # - Number of modes
-        # - Energy range
-        self.logger.warning("AutoDock Vina config file generation not yet implemented")
+        params = self.config.parameters
+        if "center" not in params:
+            self.logger.warning("No search space defined; skipping Vina config generation")
+            return
+
+        center = params["center"]
+        size = params.get("size", [20.0, 20.0, 20.0])
+        lines = []
+
+        # Reuse receptor grid maps across ligands when a map cache is configured
+        if "map_cache_dir" in params and "receptor" in params:
+            cache = GridMapCache(
+                Path(params["map_cache_dir"]),
+                spacing=params.get("grid_spacing", DEFAULT_MAP_SPACING),
+                scoring=params.get("scoring", "vina"),
+            )
+            self.map_prefix = cache.get_or_compute(Path(params["receptor"]), center, size)
+            box = cache.box(self.map_prefix)
+            center, size = box["center"], box["size"]
+            lines.append(f"maps = {self.map_prefix}")
+        elif "receptor" in params:
+            lines.append(f"receptor = {params['receptor']}")
+
+        for axis, c, s in zip("xyz", center, size, strict=True):
+            lines += [f"center_{axis} = {c}", f"size_{axis} = {s}"]
+        lines += [
+            f"exhaustiveness = {params['exhaustiveness']}",
+            f"num_modes = {params.get('num_modes', 9)}",
+            f"energy_range = {params.get('energy_range', 3)}",
+        ]
+
+        self.config_file.write_text("\n".join(lines) + "\n")
+        self.logger.info(f"AutoDock Vina config written to {self.config_file}")
 
     def run(self) -> SimulationResult:
         """Execute AutoDock Vina docking simulation.
@@ -81,7 +127,26 @@ class AutoDockVinaEngine(SimulationEngine):
         try:
             self.logger.info("Starting AutoDock Vina docking")
 
-            # TODO: Implement actual AutoDock Vina execution
+            params = self.config.parameters
+            metadata = {
+                "engine": "AutoDock Vina",
+                "version": "1.2.5",
+                "exhaustiveness": params["exhaustiveness"],
+                "num_modes": params.get("num_modes", 9),
+                "grid_maps": self.map_prefix,
+            }
+
+            if "ligands" in params:
+                output_files, screen_metadata = self._run_screen(params)
+                metadata.update(screen_metadata)
+                self._completed = True
+                return SimulationResult(
+                    success=True,
+                    output_files=output_files,
+                    metadata=metadata,
+                )
+
+            # TODO: Implement single-ligand AutoDock Vina execution
             # Typical workflow:
             # 1. Prepare receptor (add hydrogens, compute charges)
             # 2. Prepare ligand (add hydrogens, compute charges)
@@ -91,20 +156,13 @@ class AutoDockVinaEngine(SimulationEngine):
 
             self.logger.warning("AutoDock Vina execution not yet implemented")
 
-            # Simulate successful execution
+            # Simulate successful execution (library screens write a DockingArchive)
             output_files = [
                 self.work_dir / "docked_ligand.pdbqt",  # Docked poses
                 self.work_dir / "docking_scores.txt",  # Binding affinities
                 self.work_dir / "log.txt",  # Docking log
             ]
 
-            metadata = {
-                "engine": "AutoDock Vina",
-                "version": "1.2.5",
-                "exhaustiveness": self.config.parameters["exhaustiveness"],
-                "num_modes": self.config.parameters.get("num_modes", 9),
-            }
-
             return SimulationResult(
                 success=True,
                 output_files=output_files,
@@ -120,93 +178,337 @@ class AutoDockVinaEngine(SimulationEngine):
                 error_message=str(e),
             )
 
+    def _run_screen(self, params: dict[str, Any]) -> tuple[list[Path], dict[str, Any]]:
+        """Dock a ligand library with a persistent worker pool.
+
+        The receptor (or its cached grid maps) is loaded once per worker, and
+        ligands are streamed to the workers, so per-ligand cost is only the
+        docking search itself. Docked poses are appended to a packed
+        DockingArchive rather than written as one file per ligand.
+
+        Args:
+            params: Engine parameters; ``ligands`` is a directory of PDBQT
+                files, a list of PDBQT paths, or an SDF library that is
+                prepared in parallel while docking runs. An optional ``adaptive`` dict
+                (refine_exhaustiveness, refine_fraction, min_refine,
+                score_cutoff) enables two-tier screening
+
+        Returns:
+            Tuple (output_files, metadata)
+        """
+        n_ligands = 0
+        prep_failures: list[str] = []
+
+        def _ligand_stream() -> Iterator[tuple[str, Path]]:
+            nonlocal n_ligands
+            for ligand_id, ligand_file in self._iter_ligands(params, prep_failures):
+                n_ligands += 1
+                yield ligand_id, ligand_file
+
+        results_dir = self.work_dir / "results"
+        scores_file = self.work_dir / "docking_scores.txt"
+
+        adaptive = params.get("adaptive")
+        best: dict[str, tuple[float, int]] = {}
+        refined: set[str] = set()
+        failures = []
+        with (
+            VinaWorkerPool(
+                params.get("receptor"),
+                params["center"],
+                params.get("size", [20.0, 20.0, 20.0]),
+                backend=params.get("backend", "auto"),
+                n_workers=params.get("n_workers"),
+                exhaustiveness=params["exhaustiveness"],
+                num_modes=params.get("num_modes", 9),
+                map_prefix=self.map_prefix,
+                seed=params.get("seed", 0),
+                scoring=params.get("scoring", "vina"),
+            ) as pool,
+            DockingArchiveWriter(
+                results_dir, compression=params.get("results_compression", "zlib")
+            ) as archive,
+        ):
+            stream = _ligand_stream()
+            if adaptive:
+                results = pool.dock_two_tier(
+                    stream,
+                    screen_exhaustiveness=params["exhaustiveness"],
+                    refine_exhaustiveness=adaptive.get("refine_exhaustiveness", 32),
+                    refine_fraction=adaptive.get("refine_fraction", 0.05),
+                    min_refine=adaptive.get("min_refine", 1),
+                    score_cutoff=adaptive.get("score_cutoff"),
+                )
+            else:
+                results = pool.dock_many(stream)
+
+            for result in results:
+                if not result["success"]:
+                    failures.append(result["ligand_id"])
+                    self.logger.warning(
+                        f"Docking failed for {result['ligand_id']}: {result['error']}"
+                    )
+                    continue
+                # Refined poses supersede the screening poses of the same ligand
+                archive.add(
+                    result["ligand_id"],
+                    result["poses"],
+                    result["best_score"],
+                    exhaustiveness=result["exhaustiveness"],
+                )
+                best[result["ligand_id"]] = (result["best_score"], result["exhaustiveness"])
+                if result.get("tier") == "refine":
+                    refined.add(result["ligand_id"])
+
+        with open(scores_file, "w") as scores:
+            scores.write("ligand_id\tbest_affinity_kcal_mol\texhaustiveness\n")
+            for ligand_id, (score, exhaustiveness) in sorted(best.items(), key=lambda x: x[1][0]):
+                scores.write(f"{ligand_id}\t{score:.3f}\t{exhaustiveness}\n")
+
+        self.logger.info(f"Docked {len(best)}/{n_ligands} ligands ({len(refined)} refined)")
+        metadata = {
+            "n_ligands": n_ligands + len(prep_failures),
+            "preparation_failed": prep_failures,
+            "n_docked": len(best),
+            "n_refined": len(refined),
+            "failed": failures,
+        }
+        return [results_dir, scores_file], metadata
+
+    def _iter_ligands(
+        self, params: dict[str, Any], prep_failures: list[str]
+    ) -> Iterator[tuple[str, Path]]:
+        """Stream (ligand_id, pdbqt_path) pairs for the configured library.
+
+        SDF libraries are prepared shard by shard in a process pool; ligands
+        are yielded as soon as their shard completes, so docking overlaps with
+        preparation.
+        """
+        ligands = params["ligands"]
+        if isinstance(ligands, str | Path) and Path(ligands).suffix.lower() in (".sdf", ".sd"):
+            pipeline = LigandPreparationPipeline(
+                self.work_dir / "ligands",
+                shard_size=params.get("prep_shard_size", 1000),
+                n_workers=params.get("prep_workers"),
+                ph=params.get("ph", 7.4),
+                preparer=params.get("ligand_preparer"),
+                store_dir=params.get("ligand_store"),
+            )
+            for shard in pipeline.run(Path(ligands)):
+                prep_failures.extend(ligand_id for ligand_id, _ in shard.failed)
+                yield from shard.ligands
+        elif isinstance(ligands, str | Path) and Path(ligands).is_dir():
+            yield from ((f.stem, f) for f in sorted(Path(ligands).glob("*.pdbqt")))
+        else:
+            yield from ((Path(f).stem, Path(f)) for f in ligands)
+
     def cleanup(self) -> None:
         """Clean up temporary AutoDock Vina files.
 
-        Removes large temporary files while preserving results.
+        Removes large temporary files while preserving results. Prepared
+        ligands are only removed after a completed screen, and rules of an
+        optional ``retention`` parameter ({pattern: action}) take precedence.
         """
         self.logger.info("Cleaning up AutoDock Vina temporary files")
 
-        # TODO: Implement cleanup
-        # Keep: docked poses, scores, logs
-        # Remove: intermediate files, temporary structures
+        policy = RetentionPolicy.from_mapping(self.config.parameters.get("retention", {}))
+        if self._completed:
+            policy += AUTODOCK_RETENTION
+        report = apply_retention(self.work_dir, policy)
 
-        self.logger.info("AutoDock Vina cleanup completed")
+        self.logger.info(
+            f"AutoDock Vina cleanup completed: {len(report.deleted)} deleted, "
+            f"{len(report.compressed)} compressed"
+        )
 
 
 class DockingResultParser:
     """Parser for AutoDock Vina output files."""
 
     @staticmethod
-    def parse_pdbqt(pdbqt_file: Path) -> list[dict[str, Any]]:
+    def parse_pdbqt(pdbqt_file: Path, ligand_id: str | None = None) -> list[dict[str, Any]]:
         """Parse PDBQT file containing docked poses.
 
         Args:
-            pdbqt_file: Path to PDBQT output file
+            pdbqt_file: Path to PDBQT output file, or to a docking archive
+                when ligand_id is given
+            ligand_id: Ligand to read from a DockingArchive
 
         Returns:
             List of docking poses with coordinates and energies
         """
-        # TODO: Implement PDBQT parsing
-        raise NotImplementedError("PDBQT parsing not yet implemented")
+        if ligand_id is not None:
+            text = DockingArchive(pdbqt_file).read(ligand_id)
+        else:
+            text = Path(pdbqt_file).read_text()
+        return DockingResultParser.parse_pdbqt_string(text)
+
+    @staticmethod
+    def parse_pdbqt_string(text: str) -> list[dict[str, Any]]:
+        """Parse docked poses from PDBQT text.
+
+        Args:
+            text: Vina output in PDBQT format
+
+        Returns:
+            List of poses with mode, affinity (kcal/mol), rmsd_lb, rmsd_ub,
+            atom names, residue names, AutoDock atom types and coordinates (Å)
+        """
+        poses: list[dict[str, Any]] = []
+        pose: dict[str, Any] | None = None
+
+        for line in text.splitlines():
+            if line.startswith("MODEL"):
+                pose = {
+                    "mode": len(poses) + 1,
+                    "atoms": [],
+                    "resnames": [],
+                    "ad_types": [],
+                    "coordinates": [],
+                }
+            elif line.startswith("REMARK VINA RESULT:") and pose is not None:
+                fields = line.split(":", 1)[1].split()
+                pose["affinity"] = float(fields[0])
+                pose["rmsd_lb"] = float(fields[1])
+                pose["rmsd_ub"] = float(fields[2])
+            elif line.startswith(("ATOM", "HETATM")) and pose is not None:
+                pose["atoms"].append(line[12:16].strip())
+                pose["resnames"].append(line[17:20].strip())
+                pose["ad_types"].append(line[77:79].strip())
+                pose["coordinates"].append(
+                    (float(line[30:38]), float(line[38:46]), float(line[46:54]))
+                )
+            elif line.startswith("ENDMDL") and pose is not None:
+                if "affinity" in pose:
+                    poses.append(pose)
+                pose = None
+
+        return poses
 
     @staticmethod
     def extract_binding_affinities(log_file: Path) -> list[tuple[int, float]]:
         """Extract binding affinities from log file.
 
+        Reads the mode table printed by Vina; PDBQT output files are accepted
+        as well and read from their ``REMARK VINA RESULT`` lines.
+
         Args:
             log_file: Path to AutoDock Vina log file
 
         Returns:
             List of (mode_number, affinity_kcal_mol) tuples
         """
-        # TODO: Implement log parsing
         # Expected format:
         # mode |   affinity | dist from best mode
         #      | (kcal/mol) | rmsd l.b.| rmsd u.b.
         # -----+------------+----------+----------
         #    1 |       -8.3 |      0.0 |      0.0
         #    2 |       -7.9 |      2.1 |      3.4
-        raise NotImplementedError("Affinity extraction not yet implemented")
+        text = Path(log_file).read_text()
+        if "REMARK VINA RESULT" in text:
+            return [
+                (pose["mode"], pose["affinity"])
+                for pose in DockingResultParser.parse_pdbqt_string(text)
+            ]
+
+        affinities = []
+        in_table = False
+        for line in text.splitlines():
+            if line.startswith("-----+"):
+                in_table = True
+                continue
+            if not in_table:
+                continue
+            fields = line.replace("|", " ").split()
+            if len(fields) < 2 or not fields[0].isdigit():
+                break
+            affinities.append((int(fields[0]), float(fields[1])))
+        return affinities
 
     @staticmethod
-    def get_best_pose(pdbqt_file: Path) -> dict[str, Any]:
+    def get_best_pose(pdbqt_file: Path, ligand_id: str | None = None) -> dict[str, Any]:
         """Get the best (lowest energy) docking pose.
 
         Args:
-            pdbqt_file: Path to PDBQT output file
+            pdbqt_file: Path to PDBQT output file, or to a docking archive
+                when ligand_id is given
+            ligand_id: Ligand to read from a DockingArchive
 
         Returns:
             Dictionary with best pose information
+
+        Raises:
+            ValueError: If the file contains no scored poses
         """
-        # TODO: Implement best pose extraction
-        raise NotImplementedError("Best pose extraction not yet implemented")
+        poses = DockingResultParser.parse_pdbqt(pdbqt_file, ligand_id)
+        if not poses:
+            raise ValueError(f"No docked poses found in {pdbqt_file}")
+        return min(poses, key=lambda pose: pose["affinity"])
+
+    @staticmethod
+    def select_top_hits(results: Path, k: int) -> list[tuple[str, float]]:
+        """Select the k best-scoring ligands of a screen.
+
+        Args:
+            results: Docking archive directory, or a docking_scores.txt file
+            k: Number of hits
+
+        Returns:
+            List of (ligand_id, best_affinity) tuples, best first
+        """
+        results = Path(results)
+        if results.is_dir():
+            return DockingArchive(results).top_k(k)
+
+        scored = []
+        with open(results) as handle:
+            next(handle)  # header
+            for line in handle:
+                ligand_id, score = line.split("\t")[:2]
+                scored.append((float(score), ligand_id))
+        return [(ligand_id, score) for score, ligand_id in heapq.nsmallest(k, scored)]
 
 
 def prepare_receptor(pdb_file: Path, output_pdbqt: Path) -> None:
     """Prepare receptor PDB file for docking.
 
+    Assigns AutoDock 4 atom types and Gasteiger-style charges and removes
+    non-polar hydrogens. Typing is cached per topology, so preparing many
+    frames of one MD trajectory costs one typing pass plus a coordinate
+    write per frame (see ``receptor_prep.prepare_receptor_frames``).
+
     Args:
         pdb_file: Input PDB file
         output_pdbqt: Output PDBQT file
     """
-    # TODO: Implement using Open Babel or MGLTools
-    # - Add hydrogens
-    # - Compute Gasteiger charges
-    # - Convert to PDBQT format
-    raise NotImplementedError("Receptor preparation not yet implemented")
+    prepare_receptor_pdb(pdb_file, output_pdbqt)
 
 
-def prepare_ligand(mol_file: Path, output_pdbqt: Path) -> None:
+def prepare_ligand(mol_file: Path, output_pdbqt: Path, ph: float = 7.4) -> None:
     """Prepare ligand molecule file for docking.
 
+    Adds hydrogens for the given pH, computes Gasteiger charges, detects
+    rotatable bonds and converts to PDBQT with Open Babel. For whole
+    libraries use LigandPreparationPipeline, which runs this in parallel.
+
     Args:
         mol_file: Input molecule file (PDB, MOL2, SDF, etc.)
         output_pdbqt: Output PDBQT file
+        ph: Protonation pH
+
+    Raises:
+        RuntimeError: If Open Babel is unavailable or fails
     """
-    # TODO: Implement using Open Babel or MGLTools
-    # - Add hydrogens
-    # - Compute Gasteiger charges
-    # - Detect rotatable bonds
-    # - Convert to PDBQT format
-    raise NotImplementedError("Ligand preparation not yet implemented")
+    command = [
+        obabel_executable(),
+        str(mol_file),
+        "-O",
+        str(output_pdbqt),
+        "-p",
+        str(ph),
+        "--partialcharge",
+        "gasteiger",
+    ]
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0 or not Path(output_pdbqt).exists():
+        raise RuntimeError(f"Ligand preparation failed for {mol_file}: {process.stderr.strip()}")
@@ -0,0 +1,253 @@
+"""Packed, append-only archive of per-ligand docking results.
+
+Writing one PDBQT file per docked ligand produces millions of small files
+in a library screen. Instead, docked poses are appended as compressed
+blocks to a few large shard files, and each shard has a JSON-lines offset
+index that also carries the best score, so ranking never touches the pose
+data.
+
+Layout::
+
+    results/
+        archive.json        # format version and block compression
+        shard_0000.pack     # concatenated compressed PDBQT blocks
+        shard_0000.idx      # one JSON line per block: id, offset, length, score, written
+        shard_0001.pack
+        ...
+
+Every writer claims its own shard, so several processes can write into one
+archive without locking. If a ligand is written more than once (e.g. when
+refined at higher exhaustiveness) the most recently written entry wins,
+whichever shard it is in; each index line records its write time in
+nanoseconds for this purpose.
+"""
+
+import gzip
+import heapq
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO
+
+ARCHIVE_FORMAT_VERSION = 1
+COMPRESSIONS = ("none", "zlib", "gzip", "zstd")
+
+
+def _compressor(compression: str) -> tuple[Any, Any]:
+    """Return (compress, decompress) functions for a block compression."""
+    if compression == "none":
+        return bytes, bytes
+    if compression == "zlib":
+        return zlib.compress, zlib.decompress
+    if compression == "gzip":
+        return gzip.compress, gzip.decompress
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "zstd compression requires the zstandard package (pip install zstandard)"
+            ) from e
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"Unknown compression: {compression}. Must be one of {COMPRESSIONS}")
+
+
+class DockingArchiveWriter:
+    """Append docking results to a shard of a packed archive.
+
+    Example:
+        >>> with DockingArchiveWriter(Path("results")) as writer:
+        ...     writer.add("lig1", poses_pdbqt, best_score=-8.2)
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        compression: str = "zlib",
+        max_shard_bytes: int = 1024**3,
+        flush_every: int = 256,
+    ):
+        """Open a new shard for writing.
+
+        Args:
+            root: Archive directory
+            compression: Block compression ('none', 'zlib', 'gzip' or 'zstd');
+                must match the archive's compression if it already exists
+            max_shard_bytes: Size after which the writer moves to a new shard
+            flush_every: Number of blocks buffered before the index is flushed
+
+        Raises:
+            ValueError: If the compression conflicts with an existing archive
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compression = _init_archive(self.root, compression)
+        self._compress = _compressor(self.compression)[0]
+        self.max_shard_bytes = max_shard_bytes
+        self.flush_every = flush_every
+
+        self._pack: BinaryIO | None = None
+        self._index_lines: list[str] = []
+        self.n_written = 0
+        self._open_shard()
+
+    def add(
+        self,
+        ligand_id: str,
+        poses: str,
+        best_score: float | None,
+        **metadata: Any,
+    ) -> None:
+        """Append the docked poses of one ligand.
+
+        Args:
+            ligand_id: Ligand identifier
+            poses: Docked poses in Vina PDBQT format
+            best_score: Best affinity (kcal/mol), stored in the index
+            **metadata: Extra JSON-serializable fields stored in the index
+        """
+        if self._pack.tell() >= self.max_shard_bytes:
+            self._close_shard()
+            self._open_shard()
+
+        block = self._compress(poses.encode())
+        offset = self._pack.tell()
+        self._pack.write(block)
+        entry = {
+            "id": ligand_id,
+            "offset": offset,
+            "length": len(block),
+            "score": best_score,
+            "written": time.time_ns(),
+        }
+        self._index_lines.append(json.dumps({**entry, **metadata}) + "\n")
+        self.n_written += 1
+
+        if len(self._index_lines) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Flush pose data, then the index entries pointing to it."""
+        self._pack.flush()
+        with open(self._index_path, "a") as index:
+            index.writelines(self._index_lines)
+        self._index_lines = []
+
+    def close(self) -> None:
+        """Flush and close the current shard."""
+        if self._pack is not None:
+            self._close_shard()
+
+    def __enter__(self) -> "DockingArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _open_shard(self) -> None:
+        """Claim the next free shard number atomically."""
+        shard = 0
+        while True:
+            path = self.root / f"shard_{shard:04d}.pack"
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                break
+            except FileExistsError:
+                shard += 1
+        self._pack = os.fdopen(fd, "wb")
+        self._index_path = path.with_suffix(".idx")
+        self._index_path.touch()
+
+    def _close_shard(self) -> None:
+        self.flush()
+        self._pack.close()
+        self._pack = None
+
+
+class DockingArchive:
+    """Read access to a packed docking-results archive."""
+
+    def __init__(self, root: Path):
+        """Open an archive.
+
+        Args:
+            root: Archive directory
+
+        Raises:
+            FileNotFoundError: If the directory is not a docking archive
+        """
+        self.root = Path(root)
+        header = self.root / "archive.json"
+        if not header.exists():
+            raise FileNotFoundError(f"Not a docking archive: {self.root}")
+        self.compression = json.loads(header.read_text())["compression"]
+        self._decompress = _compressor(self.compression)[1]
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def entries(self) -> dict[str, dict[str, Any]]:
+        """Index entries by ligand ID (latest write wins), with their shard path."""
+        if self._entries is None:
+            self._entries = {}
+            for index_file in sorted(self.root.glob("shard_*.idx")):
+                pack = index_file.with_suffix(".pack")
+                with open(index_file) as handle:
+                    for line in handle:
+                        entry = json.loads(line)
+                        entry["pack"] = pack
+                        previous = self._entries.get(entry["id"])
+                        if previous is None or entry.get("written", 0) >= previous.get(
+                            "written", 0
+                        ):
+                            self._entries[entry["id"]] = entry
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, ligand_id: str) -> bool:
+        return ligand_id in self.entries
+
+    def scores(self) -> dict[str, float | None]:
+        """Best score of every ligand, read from the index only."""
+        return {ligand_id: entry["score"] for ligand_id, entry in self.entries.items()}
+
+    def top_k(self, k: int) -> list[tuple[str, float]]:
+        """The k best-scoring ligands as (ligand_id, score), best first."""
+        scored = ((e["score"], i) for i, e in self.entries.items() if e["score"] is not None)
+        return [(ligand_id, score) for score, ligand_id in heapq.nsmallest(k, scored)]
+
+    def read(self, ligand_id: str) -> str:
+        """Docked poses (PDBQT text) of one ligand.
+
+        Raises:
+            KeyError: If the ligand is not in the archive
+        """
+        entry = self.entries[ligand_id]
+        with open(entry["pack"], "rb") as handle:
+            handle.seek(entry["offset"])
+            return self._decompress(handle.read(entry["length"])).decode()
+
+
+def _init_archive(root: Path, compression: str) -> str:
+    """Create the archive header, or check it against the requested compression."""
+    _compressor(compression)
+    header = root / "archive.json"
+    if not header.exists():
+        staging = root / f".archive.json.{os.getpid()}"
+        staging.write_text(
+            json.dumps({"format": ARCHIVE_FORMAT_VERSION, "compression": compression})
+        )
+        try:
+            os.link(staging, header)  # Atomic; fails if another writer got there first
+        except FileExistsError:
+            pass
+        finally:
+            staging.unlink()
+
+    existing = json.loads(header.read_text())["compression"]
+    if existing != compression:
+        raise ValueError(f"Archive {root} uses {existing} compression, not {compression}")
+    return existing
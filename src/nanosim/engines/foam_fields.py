@@ -0,0 +1,483 @@
+"""Reading of OpenFOAM cell fields and mesh geometry without OpenFOAM.
+
+Cases can be read reconstructed, or decomposed directly from their
+``processor*`` directories: every subdomain's mesh and fields are read on
+a thread pool and scattered into global arrays through the subdomain's
+``cellProcAddressing`` (local cell -> global cell), which makes
+``reconstructPar`` unnecessary for bridging. ``open_case`` reads the mesh
+once, so many time steps can be read without repeating it. Only cell (internal) fields
+are read, so the face and boundary addressing is not needed.
+
+ASCII files are supported, optionally gzip-compressed (``writeCompression``).
+Cell centres and volumes are computed from ``points``, ``faces``, ``owner``
+and ``neighbour`` with the face-pyramid decomposition OpenFOAM uses.
+"""
+
+import gzip
+import re
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+_COMMENTS = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+_HEADER = re.compile(r"FoamFile\s*\{[^}]*\}")
+_LIST_START = re.compile(r"(\d+)\s*([({])")
+_LIST_TYPE = re.compile(r"List<(\w+)>")
+_NESTED_END = re.compile(r"\)\s*\)")
+_CELL_ZONE = re.compile(r"([^\s(){};]+)\s*\{\s*type\s+cellZone\s*;")
+_COMPONENTS = {"scalar": 1, "vector": 3, "symmTensor": 6, "tensor": 9, "label": 1}
+
+
+@dataclass
+class FoamMesh:
+    """Cell geometry of an OpenFOAM mesh (SI units).
+
+    Attributes:
+        cell_centres: (n_cells, 3) cell centroids
+        cell_volumes: (n_cells,) cell volumes
+        cell_zones: Cell zone name -> cell labels
+    """
+
+    cell_centres: np.ndarray
+    cell_volumes: np.ndarray
+    cell_zones: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.cell_volumes)
+
+
+@dataclass
+class FoamFields:
+    """Cell fields of one time step.
+
+    Attributes:
+        time: Name of the time directory
+        mesh: Cell geometry
+        fields: Field name -> (n_cells,) or (n_cells, n_components) array
+        n_subdomains: Number of processor directories read (0 if reconstructed)
+    """
+
+    time: str
+    mesh: FoamMesh
+    fields: dict[str, np.ndarray] = field(default_factory=dict)
+    n_subdomains: int = 0
+
+
+def read_foam_file(path: Path) -> tuple[dict[str, str], str]:
+    """Read an OpenFOAM file, returning its header entries and body.
+
+    Raises:
+        FileNotFoundError: If neither the file nor its .gz exists
+        ValueError: If the file is written in binary format
+    """
+    path = Path(path)
+    if path.exists():
+        text = path.read_text()
+    elif path.with_name(path.name + ".gz").exists():
+        with gzip.open(path.with_name(path.name + ".gz"), "rt") as handle:
+            text = handle.read()
+    else:
+        raise FileNotFoundError(f"OpenFOAM file not found: {path}")
+
+    text = _COMMENTS.sub(" ", text)
+    header_match = _HEADER.search(text)
+    header: dict[str, str] = {}
+    if header_match:
+        for entry in header_match.group(0)[len("FoamFile") :].strip(" \n{}").split(";"):
+            key, _, value = entry.strip().partition(" ")
+            if key:
+                header[key] = value.strip().strip('"')
+        text = text[header_match.end() :]
+    if header.get("format") == "binary":
+        raise ValueError(f"Binary OpenFOAM files are not supported (use writeFormat ascii): {path}")
+    return header, text
+
+
+def parse_list(text: str, start: int = 0, n_components: int = 1) -> tuple[np.ndarray, int]:
+    """Parse an ASCII OpenFOAM list (``N(...)`` or uniform ``N{value}``).
+
+    Args:
+        text: File body
+        start: Position to search for the list from
+        n_components: Values per element (1 for scalars and labels)
+
+    Returns:
+        Tuple (values, position after the list); values has shape (N,) or
+        (N, n_components)
+    """
+    match = _LIST_START.search(text, start)
+    if match is None:
+        raise ValueError("No OpenFOAM list found")
+    n = int(match.group(1))
+    shape = (n,) if n_components == 1 else (n, n_components)
+
+    if match.group(2) == "{":
+        end = text.index("}", match.end())
+        value = np.fromstring(text[match.end() : end].strip("() "), sep=" ")
+        return np.broadcast_to(value, shape).copy(), end + 1
+
+    if n_components == 1 or n == 0:
+        end = text.index(")", match.end())
+    else:
+        # Elements are parenthesized; the list closes right after the last one
+        end = _NESTED_END.search(text, match.end()).end() - 1
+    body = text[match.end() : end].replace("(", " ").replace(")", " ")
+    return np.fromstring(body, sep=" ").reshape(shape), end + 1
+
+
+def read_field(path: Path, n_cells: int) -> np.ndarray:
+    """Read the internal field of a volume field file.
+
+    Args:
+        path: Field file (e.g. ``<case>/0.5/C``)
+        n_cells: Number of cells (to expand uniform fields)
+
+    Returns:
+        (n_cells,) array for scalar fields, (n_cells, n_components) otherwise
+    """
+    header, text = read_foam_file(path)
+    n_components = 3 if header.get("class", "").startswith("volVector") else 1
+
+    match = re.search(r"internalField\s+(uniform|nonuniform)", text)
+    if match is None:
+        raise ValueError(f"No internalField in {path}")
+    if match.group(1) == "uniform":
+        end = text.index(";", match.end())
+        value = np.fromstring(text[match.end() : end].replace("(", " ").replace(")", " "), sep=" ")
+        shape = (n_cells,) if value.size == 1 else (n_cells, value.size)
+        return np.broadcast_to(value if value.size > 1 else value[0], shape).copy()
+
+    list_type = _LIST_TYPE.match(text, match.end() + 1)
+    if list_type is not None:
+        n_components = _COMPONENTS.get(list_type.group(1), n_components)
+    values, _ = parse_list(text, match.end(), n_components)
+    if len(values) != n_cells:
+        raise ValueError(f"{path} has {len(values)} values for {n_cells} cells")
+    return values
+
+
+def read_labels(path: Path) -> np.ndarray:
+    """Read a labelList file (owner, neighbour, cellProcAddressing, ...)."""
+    _, text = read_foam_file(path)
+    labels, _ = parse_list(text)
+    return labels.astype(np.int64)
+
+
+def read_faces(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Read a faces file as flattened point labels with face offsets.
+
+    Both the ``faceList`` (``4(a b c d)``) and the ``faceCompactList``
+    (offsets and labels) formats are supported.
+
+    Returns:
+        Tuple (offsets of shape (n_faces + 1,), point labels)
+    """
+    header, text = read_foam_file(path)
+    if header.get("class") == "faceCompactList":
+        offsets, position = parse_list(text)
+        labels, _ = parse_list(text, position)
+        return offsets.astype(np.int64), labels.astype(np.int64)
+
+    match = _LIST_START.search(text)
+    n_faces = int(match.group(1))
+    # Mark every face's opening parenthesis with -1 (labels are non-negative),
+    # so each face is a size token, a marker and its point labels
+    tokens = np.fromstring(
+        text[match.end() :].replace("(", " -1 ").replace(")", " "), sep=" ", dtype=np.int64
+    )
+    starts = np.flatnonzero(tokens == -1)[:n_faces]
+    if len(starts) != n_faces:
+        raise ValueError(f"{path} lists {len(starts)} of {n_faces} faces")
+    if n_faces == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    sizes = tokens[starts - 1]
+    tokens = tokens[: starts[-1] + sizes[-1] + 1]
+    keep = np.ones(len(tokens), dtype=bool)
+    keep[starts] = keep[starts - 1] = False
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    return offsets, tokens[keep]
+
+
+def read_cell_zones(path: Path) -> dict[str, np.ndarray]:
+    """Read a cellZones file.
+
+    Returns:
+        Zone name -> cell labels (empty if the file does not exist)
+    """
+    if not _exists(path):
+        return {}
+    _, text = read_foam_file(path)
+    zones = {}
+    for match in _CELL_ZONE.finditer(text):
+        labels, _ = parse_list(text, text.index("cellLabels", match.end()))
+        zones[match.group(1)] = labels.astype(np.int64)
+    return zones
+
+
+def read_mesh(poly_mesh_dir: Path) -> FoamMesh:
+    """Compute cell centres and volumes of a polyMesh.
+
+    Args:
+        poly_mesh_dir: ``constant/polyMesh`` directory
+
+    Returns:
+        FoamMesh
+    """
+    poly_mesh_dir = Path(poly_mesh_dir)
+    _, text = read_foam_file(poly_mesh_dir / "points")
+    points, _ = parse_list(text, n_components=3)
+    offsets, labels = read_faces(poly_mesh_dir / "faces")
+    owner = read_labels(poly_mesh_dir / "owner")
+    neighbour = read_labels(poly_mesh_dir / "neighbour")
+    n_cells = int(max(owner.max(initial=-1), neighbour.max(initial=-1))) + 1
+
+    face_centres, face_areas = _face_geometry(points, offsets, labels)
+
+    # Estimate each cell centre as the mean of its face centres, then refine
+    # with the volume-weighted centroids of the face pyramids
+    n_internal = len(neighbour)
+    cells = np.concatenate([owner, neighbour])
+    sides = np.concatenate([face_centres, face_centres[:n_internal]])
+    counts = np.bincount(cells, minlength=n_cells)
+    estimate = (
+        np.stack([np.bincount(cells, sides[:, k], minlength=n_cells) for k in range(3)], axis=1)
+        / np.maximum(counts, 1)[:, None]
+    )
+
+    areas = np.concatenate([face_areas, -face_areas[:n_internal]])
+    pyramid_volumes = np.einsum("ij,ij->i", areas, sides - estimate[cells]) / 3.0
+    pyramid_centres = 0.75 * sides + 0.25 * estimate[cells]
+
+    volumes = np.bincount(cells, pyramid_volumes, minlength=n_cells)
+    centres = (
+        np.stack(
+            [
+                np.bincount(cells, pyramid_volumes * pyramid_centres[:, k], minlength=n_cells)
+                for k in range(3)
+            ],
+            axis=1,
+        )
+        / np.where(volumes > 0, volumes, 1.0)[:, None]
+    )
+    return FoamMesh(
+        cell_centres=centres,
+        cell_volumes=volumes,
+        cell_zones=read_cell_zones(poly_mesh_dir / "cellZones"),
+    )
+
+
+def _face_geometry(
+    points: np.ndarray, offsets: np.ndarray, labels: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Centres and area vectors of polygonal faces by triangle fans."""
+    sizes = np.diff(offsets)
+    faces = np.repeat(np.arange(len(sizes)), sizes)
+    n_faces = len(sizes)
+
+    vertices = points[labels]
+    mean = (
+        np.stack([np.bincount(faces, vertices[:, k], minlength=n_faces) for k in range(3)], axis=1)
+        / np.maximum(sizes, 1)[:, None]
+    )
+
+    # Next vertex of each edge, wrapping around within the face
+    position = np.arange(len(labels)) - offsets[faces]
+    following = points[labels[offsets[faces] + (position + 1) % sizes[faces]]]
+
+    triangle_areas = 0.5 * np.cross(vertices - mean[faces], following - mean[faces])
+    triangle_centres = (vertices + following + mean[faces]) / 3.0
+    magnitudes = np.linalg.norm(triangle_areas, axis=1)
+
+    area_vectors = np.stack(
+        [np.bincount(faces, triangle_areas[:, k], minlength=n_faces) for k in range(3)], axis=1
+    )
+    total = np.bincount(faces, magnitudes, minlength=n_faces)
+    centres = np.stack(
+        [
+            np.bincount(faces, magnitudes * triangle_centres[:, k], minlength=n_faces)
+            for k in range(3)
+        ],
+        axis=1,
+    )
+    centres = np.where(total[:, None] > 0, centres / np.where(total > 0, total, 1.0)[:, None], mean)
+    return centres, area_vectors
+
+
+def time_directories(directory: Path) -> list[str]:
+    """Names of the time directories in a case or processor directory, in time order."""
+    names = []
+    for path in Path(directory).iterdir():
+        try:
+            float(path.name)
+        except ValueError:
+            continue
+        if path.is_dir():
+            names.append(path.name)
+    return sorted(names, key=float)
+
+
+def nearest_time(directory: Path, time_point: float) -> str:
+    """Name of the time directory closest to a time.
+
+    Raises:
+        ValueError: If the directory holds no time directories
+    """
+    times = time_directories(directory)
+    if not times:
+        raise ValueError(f"No time directories in {directory}")
+    return min(times, key=lambda name: abs(float(name) - time_point))
+
+
+@dataclass
+class FoamCase:
+    """A case opened for reading: mesh geometry read once, fields on demand.
+
+    Attributes:
+        directory: Case directory
+        mesh: Cell geometry in global cell order
+        processors: Processor directories read (empty if reconstructed)
+        addressing: Global cell labels of each processor's cells
+    """
+
+    directory: Path
+    mesh: FoamMesh
+    processors: list[Path] = field(default_factory=list)
+    addressing: list[np.ndarray] = field(default_factory=list)
+
+    def nearest_time(self, time_point: float) -> str:
+        """Name of the written time directory closest to a time."""
+        return nearest_time(self.processors[0] if self.processors else self.directory, time_point)
+
+    def read_fields(
+        self, time: str, fields: Sequence[str], max_workers: int | None = None
+    ) -> dict[str, np.ndarray]:
+        """Read cell fields of one time directory in global cell order.
+
+        Fields not written at that time are skipped. Processor directories
+        are read concurrently.
+
+        Raises:
+            ValueError: If a field is written by only some processor directories
+        """
+        if not self.processors:
+            return _read_fields(self.directory / time, fields, self.mesh.n_cells)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(
+                pool.map(
+                    lambda p: _read_fields(p[0] / time, fields, len(p[1])),
+                    zip(self.processors, self.addressing, strict=True),
+                )
+            )
+        for name in set().union(*parts):
+            missing = [
+                p.name for p, local in zip(self.processors, parts, strict=True) if name not in local
+            ]
+            if missing:
+                raise ValueError(f"Field {name} at time {time} is missing from {missing}")
+
+        values: dict[str, np.ndarray] = {}
+        for addressing, local in zip(self.addressing, parts, strict=True):
+            for name, array in local.items():
+                if name not in values:
+                    values[name] = np.empty((self.mesh.n_cells, *array.shape[1:]))
+                values[name][addressing] = array
+        return values
+
+
+def open_case(
+    case_dir: Path,
+    time_points: Sequence[float] = (),
+    decomposed: bool | None = None,
+    max_workers: int | None = None,
+) -> FoamCase:
+    """Open a case, reading its mesh (concurrently per processor directory).
+
+    Args:
+        case_dir: OpenFOAM case directory
+        time_points: Times that will be read, to decide whether the case
+            must be read decomposed
+        decomposed: Read processor directories (default: if present and
+            a requested time step has not been reconstructed)
+        max_workers: Threads reading processor directories concurrently
+
+    Returns:
+        FoamCase
+    """
+    case_dir = Path(case_dir)
+    processors = sorted(
+        case_dir.glob("processor[0-9]*"), key=lambda p: int(p.name[len("processor") :])
+    )
+    if decomposed is None:
+        reconstructed = set(time_directories(case_dir))
+        decomposed = bool(processors) and any(
+            nearest_time(processors[0], t) not in reconstructed for t in time_points or [0.0]
+        )
+    if not decomposed:
+        return FoamCase(case_dir, read_mesh(case_dir / "constant" / "polyMesh"))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        subdomains = list(pool.map(_read_subdomain_mesh, processors))
+
+    addressing = [labels for labels, _ in subdomains]
+    n_cells = sum(len(labels) for labels in addressing)
+    centres = np.empty((n_cells, 3))
+    volumes = np.empty(n_cells)
+    zones: dict[str, list[np.ndarray]] = {}
+    for labels, mesh in subdomains:
+        centres[labels] = mesh.cell_centres
+        volumes[labels] = mesh.cell_volumes
+        for name, local in mesh.cell_zones.items():
+            zones.setdefault(name, []).append(labels[local])
+
+    mesh = FoamMesh(
+        centres, volumes, {name: np.sort(np.concatenate(parts)) for name, parts in zones.items()}
+    )
+    return FoamCase(case_dir, mesh, processors, addressing)
+
+
+def read_case(
+    case_dir: Path,
+    time_point: float,
+    fields: Sequence[str],
+    max_workers: int | None = None,
+    decomposed: bool | None = None,
+) -> FoamFields:
+    """Read cell fields of a case at the time step closest to time_point.
+
+    Args:
+        case_dir: OpenFOAM case directory
+        time_point: Time to read (the nearest written time is used)
+        fields: Field names; fields not written at that time are skipped
+        max_workers: Threads reading processor directories concurrently
+        decomposed: Read processor directories (default: if present and
+            the time step has not been reconstructed)
+
+    Returns:
+        FoamFields with mesh geometry and fields in global cell order
+    """
+    case = open_case(case_dir, [time_point], decomposed, max_workers)
+    time = case.nearest_time(time_point)
+    values = case.read_fields(time, fields, max_workers)
+    return FoamFields(time, case.mesh, values, n_subdomains=len(case.processors))
+
+
+def _read_subdomain_mesh(processor_dir: Path) -> tuple[np.ndarray, FoamMesh]:
+    """Read one processor directory's cell addressing and mesh."""
+    poly_mesh = processor_dir / "constant" / "polyMesh"
+    return read_labels(poly_mesh / "cellProcAddressing"), read_mesh(poly_mesh)
+
+
+def _read_fields(time_dir: Path, fields: Sequence[str], n_cells: int) -> dict[str, np.ndarray]:
+    return {
+        name: read_field(time_dir / name, n_cells) for name in fields if _exists(time_dir / name)
+    }
+
+
+def _exists(path: Path) -> bool:
+    return path.exists() or path.with_name(path.name + ".gz").exists()
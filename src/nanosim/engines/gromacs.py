@@ -1,9 +1,43 @@
 """GROMACS simulation engine for meso-scale molecular dynamics simulations."""
+import subprocess
 from pathlib import Path
 from typing import Any
 
+from nanosim.analysis.coarse_grain import backmap_structure, map_structure
+from nanosim.analysis.hbonds import HBondResult, HydrogenBondAnalyzer
+from nanosim.analysis.trajectory import iter_frames, read_topology
 from nanosim.core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from nanosim.engines.input_templates import (
+    GROMACS_TEMPLATES,
+    InputSet,
+    render_inputs,
+    run_sweep,
+)
+from nanosim.engines.md_prep import gmx_executable, run_gmx
 from nanosim.utils.logger import setup_logger
+from nanosim.utils.retention import RetentionPolicy, RetentionRule, apply_retention
+
+# Minutes between mdrun checkpoints
+CHECKPOINT_INTERVAL = 15.0
+
+# Exit codes of a process stopped by SIGINT, SIGKILL or SIGTERM (128 + signal)
+_SIGNAL_EXIT_CODES = frozenset({130, 137, 143})
+
+# Backups (#md.log.1#) and LINCS warning snapshots are always removed
+GROMACS_RETENTION = RetentionPolicy(
+    [
+        RetentionRule("**/#*#", "delete"),
+        RetentionRule("step*.pdb", "delete"),
+    ]
+)
+
+# Applied once mdrun has finished; until then the run may still be resumed
+GROMACS_FINISHED_RETENTION = RetentionPolicy(
+    [
+        RetentionRule("*.cpt", "delete"),
+        RetentionRule("*.trr", "compress"),
+    ]
+)
 
 
 class GROMACSEngine(SimulationEngine):
@@ -22,6 +56,9 @@ class GROMACSEngine(SimulationEngine):
         self.config = config
         self.logger = setup_logger(__name__, config.output_dir / "gromacs.log")
         self.work_dir: Path = config.output_dir / "gromacs_work"
+        self.input_sets: list[InputSet] = []
+        self.structure_file: Path | None = None
+        self._finished = False
 
     def validate_config(self) -> None:
         """Validate GROMACS-specific configuration.
@@ -53,36 +90,67 @@ class GROMACSEngine(SimulationEngine):
         - topology files (.top)
         - coordinate files (.gro)
         - parameter files (.mdp)
+
+        The .mdp is rendered from the parameters; a ``sweep`` parameter
+        renders one input set per point, sharing identical sets.
+
+        For the coarse-grained membrane stage a ``coarse_grain`` parameter
+        (atomistic structure) is mapped to Martini-style beads in ``cg.gro``;
+        for atomistic validation a ``backmap`` parameter ({"structure": CG
+        structure, "reference": atomistic structure}) is rebuilt into
+        ``backmapped.gro``. The written file is the default mdrun input.
         """
         self.work_dir.mkdir(parents=True, exist_ok=True)
 
         self.logger.info(f"GROMACS working directory created at {self.work_dir}")
 
-        # TODO: Generate GROMACS input files
-        # - System topology (.top)
-        # - Initial coordinates (.gro)
-        # - MD parameters (.mdp)
-        self.logger.warning("GROMACS input file generation not yet implemented")
+        self.input_sets = render_inputs(GROMACS_TEMPLATES, self.config.parameters, self.work_dir)
+        n_distinct = len({s.digest for s in self.input_sets})
+        self.logger.info(f"Rendered {len(self.input_sets)} input set(s), {n_distinct} distinct")
+
+        params = self.config.parameters
+        if "coarse_grain" in params:
+            self.structure_file = map_structure(params["coarse_grain"], self.work_dir / "cg.gro")
+            self.logger.info(f"Coarse-grained structure written to {self.structure_file}")
+        if "backmap" in params:
+            self.structure_file = backmap_structure(
+                params["backmap"]["structure"],
+                params["backmap"]["reference"],
+                self.work_dir / "backmapped.gro",
+            )
+            self.logger.info(f"Backmapped structure written to {self.structure_file}")
+
+        # TODO: Generate system topology (.top) and initial coordinates (.gro)
 
     def run(self) -> SimulationResult:
         """Execute GROMACS simulation.
 
+        With a run input (``<deffnm>.tpr`` in the work directory, or the
+        ``coordinates`` and ``topology`` parameters for grompp) mdrun is
+        executed with periodic checkpoints. If a checkpoint exists the run
+        resumes from it with appended output, so a preempted job loses at
+        most one checkpoint interval. A preempted run is reported as
+        unsuccessful with ``metadata["preempted"]`` set.
+
+        With a ``sweep`` parameter each distinct input set runs as its own
+        simulation in ``runs/<digest>`` (see ``input_templates.run_sweep``).
+
         Returns:
             SimulationResult with success status and output files
         """
         try:
             self.logger.info("Starting GROMACS simulation")
 
-            # TODO: Implement actual GROMACS execution workflow
-            # Typical GROMACS workflow:
-            # 1. gmx pdb2gmx - generate topology
-            # 2. gmx editconf - define box
-            # 3. gmx solvate - add solvent
-            # 4. gmx grompp - preprocess
-            # 5. gmx mdrun - run MD simulation
-            # 6. gmx analysis tools - post-processing
+            params = self.config.parameters
+            if "sweep" in params:
+                return run_sweep(type(self), self.config, self.input_sets, self.work_dir)
+            deffnm = params.get("deffnm", "md")
+            if (self.work_dir / f"{deffnm}.tpr").exists() or "topology" in params:
+                return self._run_mdrun(deffnm)
 
-            self.logger.warning("GROMACS simulation execution not yet implemented")
+            # TODO: Generate system topology and coordinates from a structure
+            # (pdb2gmx, editconf, solvate) when no run input is given
+            self.logger.warning("No GROMACS run input given; simulation not executed")
 
             # Simulate successful execution
             output_files = [
@@ -115,18 +183,123 @@ class GROMACSEngine(SimulationEngine):
                 error_message=str(e),
             )
 
+    def _run_mdrun(self, deffnm: str) -> SimulationResult:
+        """Run (or resume) mdrun and classify how it ended."""
+        params = self.config.parameters
+        tpr = self.work_dir / f"{deffnm}.tpr"
+        if not tpr.exists():
+            coordinates = params.get("coordinates", self.structure_file)
+            if coordinates is None:
+                raise ValueError(
+                    "GROMACS run input requires 'coordinates', 'coarse_grain' or 'backmap' "
+                    "together with 'topology'"
+                )
+            inputs = self.input_sets[0].directory if self.input_sets else self.work_dir
+            run_gmx(
+                ["grompp", "-f", str(inputs / "md.mdp")]
+                + ["-c", str(Path(coordinates).resolve())]
+                + ["-p", str(Path(params["topology"]).resolve()), "-o", tpr.name]
+                + ["-maxwarn", str(params.get("maxwarn", 0))],
+                cwd=self.work_dir,
+            )
+
+        checkpoint = self.work_dir / f"{deffnm}.cpt"
+        interval = params.get("checkpoint_interval", CHECKPOINT_INTERVAL)
+        args = ["mdrun", "-deffnm", deffnm, "-cpt", str(interval)]
+        if checkpoint.exists():
+            self.logger.info(f"Resuming from checkpoint {checkpoint}")
+            args += ["-cpi", checkpoint.name, "-append"]
+        args += [str(arg) for arg in params.get("mdrun_args", [])]
+
+        process = subprocess.run(
+            [gmx_executable(), *args], cwd=self.work_dir, capture_output=True, text=True
+        )
+        log_file = self.work_dir / f"{deffnm}.log"
+        state = mdrun_state(log_file, process.returncode)
+        self._finished = state == "finished"
+
+        metadata = {
+            "engine": "GROMACS",
+            "temperature": params["temperature"],
+            "simulation_time": params["simulation_time"],
+            "state": state,
+            "preempted": state == "preempted",
+            "segments": _count_segments(log_file),
+            "checkpoint": str(checkpoint) if checkpoint.exists() else None,
+        }
+        output_files = [
+            self.work_dir / f"{deffnm}{suffix}" for suffix in (".xtc", ".edr", ".log", ".gro")
+        ]
+
+        if state == "finished":
+            self.logger.info("mdrun finished")
+            return SimulationResult(success=True, output_files=output_files, metadata=metadata)
+
+        message = (
+            "mdrun was preempted; rerun to resume from the checkpoint"
+            if state == "preempted"
+            else f"mdrun failed: {process.stderr.strip()[-2000:]}"
+        )
+        self.logger.warning(message)
+        return SimulationResult(
+            success=False,
+            output_files=[f for f in output_files if f.exists()],
+            metadata=metadata,
+            error_message=message,
+        )
+
     def cleanup(self) -> None:
         """Clean up temporary GROMACS files.
 
-        Removes large temporary files while preserving results.
+        Removes large temporary files while preserving results. Checkpoints
+        are kept until the run has finished, so a preempted run can resume.
+        Rules of an optional ``retention`` parameter ({pattern: action})
+        take precedence over the defaults.
         """
         self.logger.info("Cleaning up GROMACS temporary files")
 
-        # TODO: Implement cleanup
-        # Keep: trajectories, energy files, final configurations, logs
-        # Remove: checkpoint files (.cpt), temporary files (#*), backup files
+        policy = RetentionPolicy.from_mapping(self.config.parameters.get("retention", {}))
+        policy += GROMACS_RETENTION
+        if self._finished:
+            policy += GROMACS_FINISHED_RETENTION
+        report = apply_retention(self.work_dir, policy)
+
+        self.logger.info(
+            f"GROMACS cleanup completed: {len(report.deleted)} deleted, "
+            f"{len(report.compressed)} compressed"
+        )
+
 
-        self.logger.info("GROMACS cleanup completed")
+def mdrun_state(log_file: Path, returncode: int) -> str:
+    """Classify how the last mdrun segment ended.
+
+    Only the part of the log after the last start is inspected, since
+    resumed runs append to the same log.
+
+    Args:
+        log_file: mdrun log file
+        returncode: Exit code of the mdrun process
+
+    Returns:
+        'finished', 'preempted' (stopped by a signal; resumable from the
+        checkpoint) or 'failed'
+    """
+    text = log_file.read_text(errors="replace") if log_file.exists() else ""
+    segment = text[text.rfind("Started mdrun") :] if "Started mdrun" in text else text
+
+    signalled = "Received the" in segment and "signal" in segment
+    if returncode < 0 or returncode in _SIGNAL_EXIT_CODES or signalled:
+        return "preempted"
+    if returncode == 0 and "Finished mdrun" in segment:
+        return "finished"
+    return "failed"
+
+
+def _count_segments(log_file: Path) -> int:
+    """Number of mdrun starts recorded in an (appended) log."""
+    if not log_file.exists():
+        return 0
+    return log_file.read_text(errors="replace").count("Started mdrun")
 
 
 class GROMACSAnalyzer:
@@ -178,3 +351,38 @@ class GROMACSAnalyzer:
         """
         # TODO: Implement using gmx rms
         raise NotImplementedError("RMSD calculation not yet implemented")
+
+    def calculate_hbond_occupancy(
+        self,
+        trajectory: Path,
+        topology: Path,
+        ligand_selection: str = "resname LIG",
+        receptor_selection: str = "protein",
+        chunk_size: int = 500,
+    ) -> HBondResult:
+        """Calculate ligand-receptor hydrogen-bond occupancy over a trajectory.
+
+        Args:
+            trajectory: Path to trajectory file
+            topology: Path to structure/topology file (.gro, .pdb)
+            ligand_selection: Atom selection for the ligand
+            receptor_selection: Atom selection for the receptor
+            chunk_size: Frames processed per batch
+
+        Returns:
+            HBondResult with per-frame counts and per-pair occupancy
+        """
+        topo = read_topology(topology)
+        analyzer = HydrogenBondAnalyzer(
+            topo.elements, topo.select(ligand_selection), topo.select(receptor_selection)
+        )
+        result = analyzer.run(
+            iter_frames(
+                trajectory, topology, chunk_size=chunk_size, atom_indices=analyzer.atom_indices
+            )
+        )
+
+        self.logger.info(
+            f"H-bond analysis: {result.n_frames} frames, occupancy {result.occupancy:.2f}"
+        )
+        return result
@@ -0,0 +1,481 @@
+"""Template-based generation of engine input files with parameter sweeps.
+
+Input files (.mdp, controlDict, blockMeshDict, ...) are rendered from
+``string.Template`` texts using defaults, derived values and the
+simulation parameters. A ``sweep`` entry in the parameters expands into
+the Cartesian product of its value lists:
+
+    parameters = {
+        "temperature": 310,
+        "simulation_time": 100e-9,
+        "sweep": {"temperature": [300, 310, 320], "seed": list(range(10))},
+    }
+
+Every sweep point is rendered, but input sets are stored by the hash of
+their content, so points that render identical files (e.g. a swept
+parameter no template uses) share a single directory. A 1,000-point sweep
+therefore writes only as many input sets as there are distinct renders.
+
+The engines run each distinct input set once, as its own simulation in
+``runs/<digest>`` (see ``run_sweep``); points sharing a set share its
+results.
+
+Layout of a sweep::
+
+    output_dir/
+        sweep.json          # sweep point -> parameters and input set
+        inputs/
+            3f2a9c0d1e5b7a64/
+                md.mdp
+            ...
+        runs/
+            3f2a9c0d1e5b7a64/   # output directory of that set's simulation
+            ...
+
+Without a sweep the files are written directly into the output directory.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Template
+from typing import Any
+
+from nanosim.core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from nanosim.utils.retention import wait_for_cleanup
+
+BOLTZMANN = 1.380649e-23  # J/K
+
+
+@dataclass
+class InputTemplate:
+    """An input file rendered from simulation parameters.
+
+    Attributes:
+        path: File path relative to the case directory
+        text: ``string.Template`` text with ``${name}`` placeholders
+        defaults: Values used for parameters that are not set
+        derive: Function computing extra values from the merged parameters
+    """
+
+    path: str
+    text: str
+    defaults: dict[str, Any] = field(default_factory=dict)
+    derive: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+
+    def render(self, parameters: Mapping[str, Any]) -> str:
+        """Render the file for one set of parameters.
+
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        values = {**self.defaults, **parameters}
+        if self.derive is not None:
+            values.update(self.derive(values))
+        try:
+            return Template(self.text).substitute(values)
+        except KeyError as e:
+            raise ValueError(f"No value for parameter {e} in template {self.path}") from e
+
+
+@dataclass
+class InputSet:
+    """Rendered input files of one sweep point.
+
+    Attributes:
+        index: Sweep point number
+        parameters: Parameters of the point (swept values applied)
+        directory: Directory holding the input files
+        digest: Content hash of the input set
+    """
+
+    index: int
+    parameters: dict[str, Any]
+    directory: Path
+    digest: str
+
+
+def expand_sweep(parameters: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """Expand the ``sweep`` entry into one parameter dictionary per point.
+
+    Args:
+        parameters: Simulation parameters, optionally with a ``sweep`` mapping
+            of parameter name to list of values
+
+    Returns:
+        Parameter dictionaries in sweep order (last parameter varies fastest)
+    """
+    base = {key: value for key, value in parameters.items() if key != "sweep"}
+    sweep = parameters.get("sweep") or {}
+    names = list(sweep)
+    return [
+        {**base, **dict(zip(names, values, strict=True))}
+        for values in itertools.product(*(sweep[name] for name in names))
+    ]
+
+
+def render_inputs(
+    templates: Sequence[InputTemplate],
+    parameters: Mapping[str, Any],
+    output_dir: Path,
+) -> list[InputSet]:
+    """Render input files for every sweep point, writing distinct sets once.
+
+    Args:
+        templates: Templates to render
+        parameters: Simulation parameters (with optional ``sweep``)
+        output_dir: Case or work directory
+
+    Returns:
+        One InputSet per sweep point
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    points = expand_sweep(parameters)
+
+    if "sweep" not in parameters:
+        files = {t.path: t.render(points[0]) for t in templates}
+        _write_files(output_dir, files)
+        return [InputSet(0, points[0], output_dir, _digest(files))]
+
+    input_sets = []
+    rendered: dict[str, Path] = {}
+    for index, point in enumerate(points):
+        files = {t.path: t.render(point) for t in templates}
+        digest = _digest(files)
+        if digest not in rendered:
+            rendered[digest] = _store(output_dir / "inputs", digest, files)
+        input_sets.append(InputSet(index, point, rendered[digest], digest))
+
+    swept = list(parameters["sweep"])
+    manifest = [
+        {
+            "index": s.index,
+            "parameters": {name: s.parameters[name] for name in swept},
+            "inputs": str(s.directory.relative_to(output_dir)),
+        }
+        for s in input_sets
+    ]
+    (output_dir / "sweep.json").write_text(json.dumps(manifest, indent=1, default=str))
+    return input_sets
+
+
+def run_sweep(
+    engine_class: type[SimulationEngine],
+    config: SimulationConfig,
+    input_sets: Sequence[InputSet],
+    output_dir: Path,
+) -> SimulationResult:
+    """Run one simulation per distinct input set of a sweep.
+
+    Each set runs with the parameters of its first sweep point in
+    ``output_dir/runs/<digest>``. Finished sets record their result there
+    and are not run again, so a sweep that was interrupted (e.g. preempted
+    and rescheduled) only resumes the unfinished ones.
+
+    Args:
+        engine_class: Engine running each set
+        config: Configuration of the sweep
+        input_sets: Input sets rendered for the sweep (see render_inputs)
+        output_dir: Directory the input sets were rendered into
+
+    Returns:
+        Combined result; ``metadata["runs"]`` lists each set's digest, sweep
+        points, output directory, success and metadata
+    """
+    by_digest: dict[str, list[InputSet]] = {}
+    for input_set in input_sets:
+        by_digest.setdefault(input_set.digest, []).append(input_set)
+
+    runs = []
+    output_files: list[Path] = []
+    for digest, sets in by_digest.items():
+        run_dir = Path(output_dir) / "runs" / digest
+        record = run_dir / "result.json"
+        if record.exists():
+            result = SimulationResult(**json.loads(record.read_text()))
+            result.output_files = [Path(f) for f in result.output_files]
+        else:
+            child = SimulationConfig(
+                f"{config.name}_{digest}", config.input_dir, run_dir, dict(sets[0].parameters)
+            )
+            result = engine_class(child).execute()
+            if result.success:
+                record.write_text(json.dumps(vars(result), indent=1, default=str))
+
+        output_files += result.output_files
+        runs.append(
+            {
+                "digest": digest,
+                "points": [s.index for s in sets],
+                "directory": run_dir,
+                "success": result.success,
+                "metadata": result.metadata,
+                "error_message": result.error_message,
+            }
+        )
+
+    # The sweep's own cleanup scans the run directories, which must not
+    # change under it while the runs' cleanup still removes files
+    wait_for_cleanup()
+    failed = [run for run in runs if not run["success"]]
+    return SimulationResult(
+        success=not failed,
+        output_files=output_files,
+        metadata={
+            "runs": runs,
+            # Rescheduling resumes the interrupted sets
+            "preempted": any(run["metadata"].get("preempted", False) for run in failed),
+        },
+        error_message=(
+            "; ".join(f"{run['digest']}: {run['error_message']}" for run in failed)
+            if failed
+            else None
+        ),
+    )
+
+
+def _digest(files: Mapping[str, str]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.encode() + b"\0" + files[path].encode() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _write_files(directory: Path, files: Mapping[str, str]) -> None:
+    for path, text in files.items():
+        target = directory / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text)
+
+
+def _store(root: Path, digest: str, files: Mapping[str, str]) -> Path:
+    """Write an input set under its digest (atomically; reused if present)."""
+    directory = root / digest
+    if directory.exists():
+        return directory
+
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{digest}.", dir=root))
+    _write_files(staging, files)
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Written concurrently by another process; keep theirs
+        shutil.rmtree(staging)
+    return directory
+
+
+# --- GROMACS ----------------------------------------------------------------
+
+
+def _gromacs_derived(values: dict[str, Any]) -> dict[str, Any]:
+    dt = float(values["dt"])
+    return {
+        "nsteps": int(round(values["simulation_time"] * 1e12 / dt)),
+        "nstxout": max(int(round(values["output_interval"] / dt)), 1),
+        "nstenergy": max(int(round(values["energy_interval"] / dt)), 1),
+        "gen_vel": "yes" if values["generate_velocities"] else "no",
+    }
+
+
+MDP_TEMPLATE = InputTemplate(
+    path="md.mdp",
+    text="""; Generated by NanoSim
+integrator               = ${integrator}
+dt                       = ${dt}
+nsteps                   = ${nsteps}
+nstxout-compressed       = ${nstxout}
+nstenergy                = ${nstenergy}
+nstlog                   = ${nstenergy}
+cutoff-scheme            = Verlet
+coulombtype              = PME
+rcoulomb                 = ${cutoff}
+rvdw                     = ${cutoff}
+constraints              = h-bonds
+tcoupl                   = V-rescale
+tc-grps                  = System
+tau-t                    = ${tau_t}
+ref-t                    = ${temperature}
+pcoupl                   = ${pcoupl}
+pcoupltype               = isotropic
+tau-p                    = ${tau_p}
+ref-p                    = ${pressure}
+compressibility          = 4.5e-5
+gen-vel                  = ${gen_vel}
+gen-temp                 = ${temperature}
+gen-seed                 = ${seed}
+""",
+    defaults={
+        "integrator": "md",
+        "dt": 0.002,  # ps
+        "output_interval": 10.0,  # ps
+        "energy_interval": 1.0,  # ps
+        "cutoff": 1.2,  # nm
+        "tau_t": 0.1,
+        "pcoupl": "C-rescale",
+        "tau_p": 2.0,
+        "pressure": 1.0,  # bar
+        "generate_velocities": True,
+        "seed": -1,
+    },
+    derive=_gromacs_derived,
+)
+
+GROMACS_TEMPLATES = [MDP_TEMPLATE]
+
+
+# --- OpenFOAM ---------------------------------------------------------------
+
+_FOAM_HEADER = """FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       dictionary;
+    object      ${object};
+}
+"""
+
+
+def _foam_template(path: str, body: str, **defaults: Any) -> InputTemplate:
+    header = _FOAM_HEADER.replace("${object}", path.rsplit("/", 1)[-1])
+    return InputTemplate(path=path, text=header + body, defaults=defaults)
+
+
+def _particle_diffusivity(values: dict[str, Any]) -> dict[str, Any]:
+    """Stokes-Einstein diffusivity of the nanoparticle in the carrier fluid."""
+    viscosity = values["kinematic_viscosity"] * values["density"]
+    diffusivity = (
+        BOLTZMANN
+        * values["fluid_temperature"]
+        / (3.0 * math.pi * viscosity * values["particle_diameter"])
+    )
+    return {"diffusivity": f"{diffusivity:.6e}"}
+
+
+CONTROL_DICT_TEMPLATE = _foam_template(
+    "system/controlDict",
+    """
+application     ${solver};
+startFrom       startTime;
+startTime       0;
+stopAt          endTime;
+endTime         ${simulation_time};
+deltaT          ${time_step};
+writeControl    adjustableRunTime;
+writeInterval   ${write_interval};
+purgeWrite      0;
+writeFormat     ascii;
+writePrecision  6;
+timeFormat      general;
+runTimeModifiable true;
+adjustTimeStep  yes;
+maxCo           ${max_courant};
+""",
+    solver="pimpleFoam",
+    time_step=1e-4,
+    write_interval=0.1,
+    max_courant=0.9,
+)
+
+BLOCK_MESH_DICT_TEMPLATE = _foam_template(
+    "system/blockMeshDict",
+    """
+convertToMeters 1;
+
+vertices
+(
+    (0 0 0) (${length} 0 0) (${length} ${height} 0) (0 ${height} 0)
+    (0 0 ${width}) (${length} 0 ${width}) (${length} ${height} ${width}) (0 ${height} ${width})
+);
+
+blocks
+(
+    hex (0 1 2 3 4 5 6 7) (${cells_x} ${cells_y} ${cells_z}) simpleGrading (1 1 1)
+);
+
+boundary
+(
+    inlet  { type patch; faces ((0 4 7 3)); }
+    outlet { type patch; faces ((1 2 6 5)); }
+    walls  { type wall;  faces ((0 1 5 4) (3 7 6 2) (0 3 2 1) (4 5 6 7)); }
+);
+""",
+    length=1e-2,  # m
+    height=1e-3,
+    width=1e-3,
+    cells_x=100,
+    cells_y=10,
+    cells_z=10,
+)
+
+TRANSPORT_PROPERTIES_TEMPLATE = InputTemplate(
+    path="constant/transportProperties",
+    text=_FOAM_HEADER.replace("${object}", "transportProperties")
+    + """
+transportModel  Newtonian;
+nu              ${kinematic_viscosity};
+rho             ${density};
+D               ${diffusivity};
+particleDiameter ${particle_diameter};
+""",
+    defaults={
+        "kinematic_viscosity": 3.3e-6,  # m^2/s, blood
+        "density": 1060.0,  # kg/m^3
+        "fluid_temperature": 310.0,  # K
+    },
+    derive=_particle_diffusivity,
+)
+
+
+def _simple_split(values: dict[str, Any]) -> dict[str, Any]:
+    """Split the subdomains over the axes, keeping subdomains close to cubic in cells."""
+    cells = [int(values[f"cells_{axis}"]) for axis in "xyz"]
+    split = [1, 1, 1]
+    n, factor = int(values["n_subdomains"]), 2
+    factors = []
+    while n > 1:
+        while n % factor == 0:
+            factors.append(factor)
+            n //= factor
+        factor += 1
+    for factor in sorted(factors, reverse=True):
+        axis = max(range(3), key=lambda i: cells[i] / split[i])
+        split[axis] *= factor
+    return {"split_x": split[0], "split_y": split[1], "split_z": split[2]}
+
+
+DECOMPOSE_PAR_DICT_TEMPLATE = InputTemplate(
+    path="system/decomposeParDict",
+    text=_FOAM_HEADER.replace("${object}", "decomposeParDict")
+    + """
+numberOfSubdomains ${n_subdomains};
+method          ${decomposition_method};
+
+simpleCoeffs
+{
+    n           (${split_x} ${split_y} ${split_z});
+    delta       0.001;
+}
+""",
+    defaults={
+        "n_subdomains": 1,
+        "decomposition_method": "scotch",
+        **{f"cells_{axis}": BLOCK_MESH_DICT_TEMPLATE.defaults[f"cells_{axis}"] for axis in "xyz"},
+    },
+    derive=_simple_split,
+)
+
+OPENFOAM_TEMPLATES = [
+    CONTROL_DICT_TEMPLATE,
+    BLOCK_MESH_DICT_TEMPLATE,
+    TRANSPORT_PROPERTIES_TEMPLATE,
+    DECOMPOSE_PAR_DICT_TEMPLATE,
+]
@@ -0,0 +1,322 @@
+"""Streaming, parallel ligand preparation for docking.
+
+Compound libraries are read from SDF one record at a time, grouped into
+shards and prepared (protonation, Gasteiger charges, PDBQT conversion) in a
+process pool. Each shard is written to its own directory and yielded as soon
+as it completes, so docking can start on the first shard while the rest of
+the library is still being converted. With a PreparedLigandStore, ligands
+already prepared with the same settings in any earlier screen are copied
+from the store instead of being prepared again.
+
+Layout of the output directory::
+
+    ligands/
+        shard_00000/
+            <ligand_id>.pdbqt
+            manifest.json   # written last; marks the shard as complete
+        shard_00001/
+        ...
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from nanosim.engines.ligand_store import (
+    MoleculeIdentifier,
+    PreparedLigandStore,
+    canonical_smiles,
+    settings_key,
+)
+from nanosim.utils.logger import setup_logger
+
+# (molblock, output_pdbqt, ph) -> None
+LigandPreparer = Callable[[str, Path, float], None]
+
+_UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class LigandShard:
+    """A completed shard of prepared ligands.
+
+    Attributes:
+        index: Shard number
+        directory: Directory holding the shard's PDBQT files
+        ligands: (ligand_id, pdbqt_path) pairs of successfully prepared ligands
+        failed: (ligand_id, error) pairs of ligands that could not be prepared
+        n_cached: Number of ligands taken from the prepared-ligand store
+    """
+
+    index: int
+    directory: Path
+    ligands: list[tuple[str, Path]] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)
+    n_cached: int = 0
+
+
+def obabel_executable() -> str:
+    """Locate the Open Babel command-line tool.
+
+    Raises:
+        RuntimeError: If ``obabel`` is not on PATH
+    """
+    executable = shutil.which("obabel")
+    if executable is None:
+        raise RuntimeError("Open Babel is not available (install 'openbabel' providing obabel)")
+    return executable
+
+
+def prepare_molblock(molblock: str, output_pdbqt: Path, ph: float = 7.4) -> None:
+    """Prepare one SDF record as a docking-ready PDBQT file with Open Babel.
+
+    Args:
+        molblock: SDF record text (without the ``$$$$`` terminator)
+        output_pdbqt: Output PDBQT file
+        ph: pH used to assign protonation states
+
+    Raises:
+        RuntimeError: If Open Babel is unavailable or fails
+    """
+    command = [
+        obabel_executable(),
+        "-isdf",
+        "-opdbqt",
+        "-p",
+        str(ph),
+        "--partialcharge",
+        "gasteiger",
+    ]
+    process = subprocess.run(command, input=molblock + "$$$$\n", capture_output=True, text=True)
+    if process.returncode != 0 or "ATOM" not in process.stdout:
+        raise RuntimeError(process.stderr.strip() or "Open Babel produced no atoms")
+    Path(output_pdbqt).write_text(process.stdout)
+
+
+def iter_sdf_records(sdf_file: Path) -> Iterator[tuple[str, str]]:
+    """Stream (ligand_id, molblock) pairs from an SDF file.
+
+    Records are read line by line, so memory use is independent of library
+    size. IDs are taken from the record title line, made filesystem-safe and
+    de-duplicated; untitled records are numbered.
+
+    Args:
+        sdf_file: Input SDF file
+
+    Yields:
+        (ligand_id, molblock) pairs
+    """
+    seen: set[str] = set()
+    lines: list[str] = []
+    index = 0
+
+    with open(sdf_file) as handle:
+        for line in handle:
+            if not line.startswith("$$$$"):
+                lines.append(line)
+                continue
+
+            if any(text.strip() for text in lines):
+                title = _UNSAFE_ID_CHARS.sub("_", lines[0].strip()).strip("_")
+                ligand_id = title or f"mol{index:07d}"
+                if ligand_id in seen:
+                    ligand_id = f"{ligand_id}_{index}"
+                seen.add(ligand_id)
+                yield ligand_id, "".join(lines)
+                index += 1
+            lines = []
+
+
+def _prepare_shard(
+    index: int,
+    records: list[tuple[str, str]],
+    shard_dir: Path,
+    preparer: LigandPreparer,
+    ph: float,
+    store_dir: Path | None = None,
+    settings: str = "",
+    identifier: MoleculeIdentifier = canonical_smiles,
+) -> LigandShard:
+    """Prepare all ligands of one shard (runs in a worker process).
+
+    Ligands without a canonical identifier are prepared but not stored.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shard = LigandShard(index, shard_dir)
+    store = PreparedLigandStore(store_dir) if store_dir is not None else None
+    molecules = identifier([m for _, m in records]) if store is not None else [None] * len(records)
+    new_entries = []
+
+    for (ligand_id, molblock), molecule in zip(records, molecules, strict=True):
+        output = shard_dir / f"{ligand_id}.pdbqt"
+        try:
+            if molecule is not None:
+                stored = store.get(molecule, settings)
+                if stored is not None:
+                    output.write_text(stored)
+                    shard.ligands.append((ligand_id, output))
+                    shard.n_cached += 1
+                    continue
+            preparer(molblock, output, ph)
+            shard.ligands.append((ligand_id, output))
+            if molecule is not None:
+                new_entries.append((molecule, settings, output.read_text()))
+        except Exception as e:
+            shard.failed.append((ligand_id, str(e)))
+
+    if store is not None:
+        store.put_many(new_entries)
+        store.close()
+
+    manifest = {
+        "ligands": [ligand_id for ligand_id, _ in shard.ligands],
+        "failed": shard.failed,
+        "n_cached": shard.n_cached,
+    }
+    (shard_dir / "manifest.json").write_text(json.dumps(manifest))
+    return shard
+
+
+def _load_shard(index: int, shard_dir: Path) -> LigandShard | None:
+    """Load a previously completed shard, or None if it is incomplete."""
+    manifest_file = shard_dir / "manifest.json"
+    if not manifest_file.exists():
+        return None
+    manifest = json.loads(manifest_file.read_text())
+    return LigandShard(
+        index,
+        shard_dir,
+        ligands=[(i, shard_dir / f"{i}.pdbqt") for i in manifest["ligands"]],
+        failed=[tuple(f) for f in manifest["failed"]],
+        n_cached=manifest.get("n_cached", 0),
+    )
+
+
+class LigandPreparationPipeline:
+    """Parallel SDF → PDBQT preparation with sharded, streamed output.
+
+    Example:
+        >>> pipeline = LigandPreparationPipeline(Path("work/ligands"), n_workers=8)
+        >>> for shard in pipeline.run(Path("library.sdf")):
+        ...     dock(shard.ligands)  # starts before the library is fully prepared
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        shard_size: int = 1000,
+        n_workers: int | None = None,
+        ph: float = 7.4,
+        preparer: LigandPreparer | None = None,
+        max_pending: int | None = None,
+        store_dir: Path | None = None,
+        identifier: MoleculeIdentifier | None = None,
+    ):
+        """Initialize pipeline.
+
+        Args:
+            output_dir: Directory receiving the shard directories
+            shard_size: Ligands per shard
+            n_workers: Number of worker processes (None = CPU count)
+            ph: Protonation pH
+            preparer: Function preparing one record (defaults to ``prepare_molblock``)
+            max_pending: Maximum shards in flight (default: 2 per worker)
+            store_dir: PreparedLigandStore directory shared across screens
+            identifier: Function returning the store key (canonical isomeric
+                SMILES) of a batch of records (defaults to ``canonical_smiles``)
+
+        Raises:
+            ValueError: If shard_size is not positive
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be a positive integer")
+
+        self.output_dir = Path(output_dir)
+        self.shard_size = shard_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.ph = ph
+        self.preparer = preparer or prepare_molblock
+        self.max_pending = max_pending
+        self.store_dir = Path(store_dir) if store_dir is not None else None
+        self.identifier = identifier or canonical_smiles
+        self.settings = settings_key(
+            ph=ph, preparer=f"{self.preparer.__module__}.{self.preparer.__qualname__}"
+        )
+        self.logger = setup_logger(__name__)
+
+    def run(self, sdf_file: Path) -> Iterator[LigandShard]:
+        """Prepare a library, yielding shards in completion order.
+
+        Shards completed by an earlier run (those with a manifest) are yielded
+        without being prepared again.
+
+        Args:
+            sdf_file: Input SDF library
+
+        Yields:
+            Completed LigandShard objects
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        n_prepared = n_failed = n_cached = 0
+
+        for shard in self._run_shards(sdf_file):
+            n_prepared += len(shard.ligands)
+            n_failed += len(shard.failed)
+            n_cached += shard.n_cached
+            yield shard
+
+        self.logger.info(
+            f"Prepared {n_prepared} ligands ({n_cached} from store, {n_failed} failed) "
+            f"from {sdf_file}"
+        )
+
+    def _run_shards(self, sdf_file: Path) -> Iterator[LigandShard]:
+        """Submit shards to the worker pool with bounded look-ahead."""
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            max_pending = self.max_pending or 2 * self.n_workers
+            pending: set[Future] = set()
+
+            for index, records in enumerate(self._iter_shards(sdf_file)):
+                shard_dir = self.output_dir / f"shard_{index:05d}"
+                completed = _load_shard(index, shard_dir)
+                if completed is not None:
+                    yield completed
+                    continue
+
+                pending.add(
+                    executor.submit(
+                        _prepare_shard,
+                        index,
+                        records,
+                        shard_dir,
+                        self.preparer,
+                        self.ph,
+                        self.store_dir,
+                        self.settings,
+                        self.identifier,
+                    )
+                )
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (future.result() for future in done)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+
+    def _iter_shards(self, sdf_file: Path) -> Iterator[list[tuple[str, str]]]:
+        """Group SDF records into shards."""
+        shard: list[tuple[str, str]] = []
+        for record in iter_sdf_records(sdf_file):
+            shard.append(record)
+            if len(shard) == self.shard_size:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
@@ -0,0 +1,225 @@
+"""Persistent store of prepared (PDBQT) ligands shared across screens.
+
+Ligands are keyed by their canonical isomeric SMILES plus a hash of the
+preparation settings, so a vendor library is prepared once and reused for
+every target. PDBQT records are zlib-compressed and appended to a small
+number of large pack files; a SQLite index maps each key to its pack,
+offset and length. This keeps the file count on shared filesystems low no
+matter how many ligands are stored.
+
+The index uses SQLite's rollback journal rather than WAL: WAL relies on
+shared memory between processes on one host and is unsafe on NFS or
+Lustre, whereas the rollback journal only needs POSIX file locks, so hosts
+sharing the store wait on each other through the busy timeout.
+
+Canonical SMILES come from RDKit when it is installed and from Open Babel
+(``obabel -ocan``, one process per batch) otherwise. Both perceive
+tetrahedral and double-bond stereo from 3D coordinates and from 2D wedge
+bonds, so stereoisomers get distinct keys; the SMILES is independent of
+atom order, titles, explicit hydrogens and conformer coordinates.
+"""
+
+import hashlib
+import json
+import sqlite3
+import subprocess
+import zlib
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+# Bump when the molecule key or stored format changes
+STORE_FORMAT_VERSION = 2
+
+# Canonical isomeric identifiers of a batch of SDF records (None if unparsable)
+MoleculeIdentifier = Callable[[list[str]], list[str | None]]
+
+
+def canonical_smiles(molblocks: list[str]) -> list[str | None]:
+    """Canonical isomeric SMILES of SDF records.
+
+    Args:
+        molblocks: SDF record texts (without the ``$$$$`` terminator)
+
+    Returns:
+        One SMILES per record, None for records that cannot be parsed
+
+    Raises:
+        RuntimeError: If neither RDKit nor Open Babel is available
+    """
+    try:
+        from rdkit import Chem, RDLogger
+    except ImportError:
+        return _obabel_canonical_smiles(molblocks)
+
+    RDLogger.DisableLog("rdApp.*")
+    smiles: list[str | None] = []
+    for molblock in molblocks:
+        mol = Chem.MolFromMolBlock(molblock, removeHs=False)
+        if mol is None:
+            smiles.append(None)
+            continue
+        if mol.GetNumConformers() and mol.GetConformer().Is3D():
+            Chem.AssignStereochemistryFrom3D(mol)
+        smiles.append(Chem.MolToSmiles(Chem.RemoveHs(mol), isomericSmiles=True))
+    return smiles
+
+
+def _obabel_canonical_smiles(molblocks: list[str]) -> list[str | None]:
+    """Canonical isomeric SMILES from a single Open Babel run.
+
+    Record titles are replaced by their index, so records Open Babel skips
+    are detected rather than shifting the output.
+    """
+    from nanosim.engines.ligand_prep import obabel_executable
+
+    records = "".join(
+        f"{index}\n" + molblock.partition("\n")[2] + "$$$$\n"
+        for index, molblock in enumerate(molblocks)
+    )
+    process = subprocess.run(
+        [obabel_executable(), "-isdf", "-ocan"], input=records, capture_output=True, text=True
+    )
+    smiles: list[str | None] = [None] * len(molblocks)
+    for line in process.stdout.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[1].isdigit() and int(fields[1]) < len(molblocks):
+            smiles[int(fields[1])] = fields[0]
+    return smiles
+
+
+def settings_key(**settings: Any) -> str:
+    """Hash of the preparation settings a stored PDBQT depends on."""
+    payload = json.dumps({"format": STORE_FORMAT_VERSION, **settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class PreparedLigandStore:
+    """Packed, indexed store of prepared ligand PDBQT records.
+
+    Writers are serialized through SQLite's write lock, which also guards
+    appends to the pack files, so several processes (on one or several
+    hosts) may share one store; readers wait only while a writer commits.
+
+    Example:
+        >>> store = PreparedLigandStore(Path("/shared/ligand_store"))
+        >>> key = settings_key(ph=7.4, charges="gasteiger")
+        >>> [smiles] = canonical_smiles([molblock])
+        >>> store.put(smiles, key, pdbqt_text)
+        >>> store.get(smiles, key)
+    """
+
+    def __init__(self, root: Path, pack_size: int = 256 * 1024**2, busy_timeout: float = 600.0):
+        """Open (or create) a store.
+
+        Args:
+            root: Store directory
+            pack_size: Size in bytes after which a new pack file is started
+            busy_timeout: Seconds to wait for another process's lock on the index
+
+        Raises:
+            ValueError: If the store was written with another format version
+        """
+        self.root = Path(root)
+        self.pack_dir = self.root / "packs"
+        self.pack_dir.mkdir(parents=True, exist_ok=True)
+        self.pack_size = pack_size
+
+        self._db = sqlite3.connect(self.root / "index.sqlite", timeout=busy_timeout)
+        # Also converts stores created in WAL mode, which persists in the file
+        self._db.execute("PRAGMA journal_mode=DELETE")
+        # Checks and creates the schema atomically when several processes open a new store
+        self._db.execute("BEGIN IMMEDIATE")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        has_table = self._db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'ligands'"
+        ).fetchone()
+        if has_table and version != STORE_FORMAT_VERSION:
+            self._db.rollback()
+            self._db.close()
+            raise ValueError(
+                f"Ligand store {self.root} has format {version}, "
+                f"expected {STORE_FORMAT_VERSION}; use a new store directory"
+            )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ligands ("
+            "molecule TEXT, settings TEXT, pack INTEGER, offset INTEGER, length INTEGER, "
+            "PRIMARY KEY (molecule, settings))"
+        )
+        self._db.execute(f"PRAGMA user_version = {STORE_FORMAT_VERSION}")
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM ligands").fetchone()[0]
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return self._locate(*key) is not None
+
+    def get(self, molecule: str, settings: str) -> str | None:
+        """Return the stored PDBQT text, or None if absent."""
+        location = self._locate(molecule, settings)
+        if location is None:
+            return None
+        pack, offset, length = location
+        with open(self._pack_path(pack), "rb") as handle:
+            handle.seek(offset)
+            return zlib.decompress(handle.read(length)).decode()
+
+    def put(self, molecule: str, settings: str, pdbqt: str) -> None:
+        """Store one prepared ligand (no-op if already present)."""
+        self.put_many([(molecule, settings, pdbqt)])
+
+    def put_many(self, entries: Iterable[tuple[str, str, str]]) -> int:
+        """Store prepared ligands in a single transaction.
+
+        Args:
+            entries: (canonical SMILES, settings, pdbqt_text) triples
+
+        Returns:
+            Number of newly stored ligands
+        """
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")  # Serializes writers across processes
+            rows = []
+            seen = set()
+            for molecule, settings, pdbqt in entries:
+                if (molecule, settings) in seen or self._locate(molecule, settings) is not None:
+                    continue
+                seen.add((molecule, settings))
+                rows.append((molecule, settings, zlib.compress(pdbqt.encode(), 6)))
+
+            pack = self._current_pack()
+            written = 0
+            while written < len(rows):
+                with open(self._pack_path(pack), "ab") as handle:
+                    while written < len(rows) and handle.tell() < self.pack_size:
+                        molecule, settings, data = rows[written]
+                        offset = handle.tell()
+                        handle.write(data)
+                        self._db.execute(
+                            "INSERT INTO ligands VALUES (?, ?, ?, ?, ?)",
+                            (molecule, settings, pack, offset, len(data)),
+                        )
+                        written += 1
+                pack += 1
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the index connection."""
+        self._db.close()
+
+    def _locate(self, molecule: str, settings: str) -> tuple[int, int, int] | None:
+        return self._db.execute(
+            "SELECT pack, offset, length FROM ligands WHERE molecule = ? AND settings = ?",
+            (molecule, settings),
+        ).fetchone()
+
+    def _current_pack(self) -> int:
+        pack = self._db.execute("SELECT MAX(pack) FROM ligands").fetchone()[0] or 0
+        path = self._pack_path(pack)
+        if path.exists() and path.stat().st_size >= self.pack_size:
+            pack += 1
+        return pack
+
+    def _pack_path(self, pack: int) -> Path:
+        return self.pack_dir / f"pack_{pack:06d}.bin"
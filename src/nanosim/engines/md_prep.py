@@ -0,0 +1,422 @@
+"""Preparation of protein-ligand MD systems for GROMACS.
+
+Everything that depends only on the receptor (pdb2gmx: hydrogens,
+protonation, force-field topology) or only on the ligand (GAFF parameters
+from ACPYPE) is built once per screen. Each docked pose then only needs
+lightweight steps: placing the ligand into the prepared receptor, writing
+the system topology, defining the box, solvating and neutralizing (with
+the built-in solvator of ``solvation`` unless GROMACS tools are requested).
+These run concurrently in a process pool, one task per pose and replica.
+
+Layout of the output directory::
+
+    md_systems/
+        receptor/           # pdb2gmx output, shared by all systems
+        ligand/             # ligand parameters, shared by all systems
+        pose_1/
+            complex.gro
+            topol.top
+            rep0/           # box, solvent and ions of one replica
+                system.gro
+                topol.top
+        ...
+"""
+
+import shutil
+import subprocess
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from nanosim.analysis.trajectory import Topology, iter_frames, read_topology, write_gro
+from nanosim.engines.ligand_prep import obabel_executable
+from nanosim.engines.solvation import WATER_BOXES, load_water_box, solvate, topology_charge
+
+_IONS_MDP = """; Minimal parameters for genion preprocessing
+integrator  = steep
+nsteps      = 0
+cutoff-scheme = Verlet
+coulombtype = cutoff
+rcoulomb    = 1.0
+rvdw        = 1.0
+pbc         = xyz
+"""
+
+
+@dataclass
+class ComponentTopology:
+    """Prepared structure and GROMACS topology of one system component.
+
+    Attributes:
+        structure: Coordinates matching the topology (.gro or .pdb)
+        topology: Topology file (.top for the receptor, .itp for the ligand)
+    """
+
+    structure: Path
+    topology: Path
+
+
+@dataclass
+class SystemJob:
+    """One MD system (pose and replica) to prepare in a worker process.
+
+    Attributes:
+        complex_file: Receptor-ligand complex (.gro)
+        topology_file: Complex topology (.top)
+        directory: Output directory of the system
+        box_padding: Minimum distance between solute and box edge in nm
+        water_model: Water model used for solvation
+        solvate: Whether to add solvent and neutralizing ions
+        solvator: 'builtin' (tiled water box, see ``solvation``) or 'gmx'
+            (gmx solvate and genion)
+        salt_concentration: Salt added on top of neutralization in mol/L
+        seed: Random seed of the replica (ion placement, velocities)
+        metadata: Pose information carried into the result
+    """
+
+    complex_file: Path
+    topology_file: Path
+    directory: Path
+    box_padding: float = 1.0
+    water_model: str = "tip3p"
+    solvate: bool = True
+    solvator: str = "builtin"
+    salt_concentration: float = 0.0
+    seed: int = 0
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+def gmx_executable() -> str:
+    """Locate the GROMACS command-line tool.
+
+    Raises:
+        RuntimeError: If neither ``gmx`` nor ``gmx_mpi`` is on PATH
+    """
+    for name in ("gmx", "gmx_mpi"):
+        executable = shutil.which(name)
+        if executable is not None:
+            return executable
+    raise RuntimeError("GROMACS is not available (gmx not found on PATH)")
+
+
+def run_gmx(args: Sequence[str], cwd: Path, stdin: str | None = None) -> None:
+    """Run a GROMACS tool in a directory.
+
+    Raises:
+        RuntimeError: If GROMACS is unavailable or the tool fails
+    """
+    process = subprocess.run(
+        [gmx_executable(), *args], cwd=cwd, input=stdin, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"gmx {args[0]} failed: {process.stderr.strip()[-2000:]}")
+
+
+def build_receptor_topology(
+    receptor_pdb: Path,
+    output_dir: Path,
+    force_field: str = "amber99sb-ildn",
+    water_model: str = "tip3p",
+) -> ComponentTopology:
+    """Run pdb2gmx once for a receptor.
+
+    Args:
+        receptor_pdb: Receptor structure
+        output_dir: Directory for the processed receptor
+        force_field: GROMACS force field
+        water_model: Water model
+
+    Returns:
+        Processed receptor structure (with hydrogens) and topology
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    run_gmx(
+        [
+            "pdb2gmx",
+            "-f",
+            str(Path(receptor_pdb).resolve()),
+            "-o",
+            "receptor.gro",
+            "-p",
+            "receptor.top",
+            "-i",
+            "receptor_posre.itp",
+            "-ff",
+            force_field,
+            "-water",
+            water_model,
+            "-ignh",
+        ],
+        cwd=output_dir,
+    )
+    return ComponentTopology(output_dir / "receptor.gro", output_dir / "receptor.top")
+
+
+def protonate_pose(pose_pdb: Path) -> Path:
+    """Add the non-polar hydrogens a docked pose lacks, in place.
+
+    PDBQT poses only carry polar hydrogens. Open Babel adds the missing
+    ones from valence at the pose coordinates; heavy atoms keep their
+    order and the added hydrogens follow them in the same order for every
+    pose of a ligand, so one ligand topology fits all poses.
+
+    Args:
+        pose_pdb: Pose PDB file (heavy atoms and polar hydrogens)
+
+    Returns:
+        Path to the protonated pose (same file)
+
+    Raises:
+        RuntimeError: If Open Babel is unavailable or fails
+    """
+    pose_pdb = Path(pose_pdb)
+    protonated = pose_pdb.with_suffix(".h.pdb")
+    process = subprocess.run(
+        [obabel_executable(), "-ipdb", str(pose_pdb), "-opdb", "-O", str(protonated), "-h"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0 or not protonated.exists():
+        raise RuntimeError(f"Adding hydrogens to {pose_pdb.name} failed: {process.stderr.strip()}")
+    protonated.replace(pose_pdb)
+    return pose_pdb
+
+
+def itp_atom_count(itp_file: Path) -> int:
+    """Number of atoms in the [ atoms ] section of the first molecule type."""
+    count = 0
+    section = None
+    for line in Path(itp_file).read_text().splitlines():
+        stripped = line.split(";")[0].strip()
+        if stripped.startswith("["):
+            name = stripped.strip("[] ").lower()
+            if name == "moleculetype" and section is not None:
+                break
+            section = name
+        elif section == "atoms" and stripped:
+            count += 1
+    return count
+
+
+def build_ligand_topology(
+    ligand_pdb: Path, output_dir: Path, net_charge: int = 0, basename: str = "LIG"
+) -> ComponentTopology:
+    """Parameterize a ligand once with ACPYPE (GAFF, AM1-BCC charges).
+
+    The ligand topology must list atoms in the order of the pose files, so
+    it is built from one pose and reused for all of them.
+
+    Args:
+        ligand_pdb: One pose of the ligand
+        output_dir: Directory for the ACPYPE output
+        net_charge: Net charge of the ligand
+        basename: Molecule name in the topology
+
+    Returns:
+        Ligand structure and .itp topology
+
+    Raises:
+        RuntimeError: If ACPYPE is unavailable or fails
+    """
+    executable = shutil.which("acpype")
+    if executable is None:
+        raise RuntimeError("ACPYPE is not available; provide a ligand topology instead")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    command = [executable, "-i", str(Path(ligand_pdb).resolve()), "-b", basename]
+    command += ["-n", str(net_charge), "-o", "gmx"]
+    process = subprocess.run(command, cwd=output_dir, capture_output=True, text=True)
+    folder = output_dir / f"{basename}.acpype"
+    itp = folder / f"{basename}_GMX.itp"
+    if process.returncode != 0 or not itp.exists():
+        raise RuntimeError(f"Ligand parameterization failed: {process.stderr.strip()}")
+    return ComponentTopology(folder / f"{basename}_GMX.gro", itp)
+
+
+def molecule_name(itp_file: Path) -> str:
+    """Name of the first [ moleculetype ] in an .itp file.
+
+    Raises:
+        ValueError: If the file defines no molecule type
+    """
+    in_section = False
+    for line in Path(itp_file).read_text().splitlines():
+        stripped = line.split(";")[0].strip()
+        if stripped.startswith("["):
+            in_section = stripped.strip("[] ").lower() == "moleculetype"
+        elif in_section and stripped:
+            return stripped.split()[0]
+    raise ValueError(f"No [ moleculetype ] in {itp_file}")
+
+
+def complex_topology(receptor_top: Path, ligand_itp: Path) -> str:
+    """Receptor topology with the ligand included and added to [ molecules ].
+
+    Local includes of the receptor topology (chain .itp files, position
+    restraints) are made absolute so the result can live in any directory.
+
+    Args:
+        receptor_top: Receptor topology written by pdb2gmx
+        ligand_itp: Ligand topology
+
+    Returns:
+        Text of the complex topology
+
+    Raises:
+        ValueError: If the receptor topology does not include a force field
+    """
+    receptor_top = Path(receptor_top)
+    lines = []
+    included = False
+    for line in receptor_top.read_text().splitlines():
+        if line.strip().startswith("#include"):
+            target = line.split(None, 1)[1].strip().strip('"<>')
+            local = receptor_top.parent / target
+            if local.exists():
+                line = f'#include "{local.resolve()}"'
+            lines.append(line)
+            if not included and target.endswith("forcefield.itp"):
+                # Ligand atom types must follow the force field, before any molecule
+                lines.append(f'#include "{Path(ligand_itp).resolve()}"')
+                included = True
+        else:
+            lines.append(line)
+
+    if not included:
+        raise ValueError(f"No force field include found in {receptor_top}")
+    lines.append(f"{molecule_name(ligand_itp):<20s}1")
+    return "\n".join(lines) + "\n"
+
+
+def read_structure(structure_file: Path) -> tuple[Topology, np.ndarray]:
+    """Topology and first-frame coordinates (Å) of a structure file."""
+    topology = read_topology(structure_file)
+    coordinates = next(iter_frames(structure_file, chunk_size=1)).coordinates[0]
+    return topology, coordinates
+
+
+def assemble_complex(receptor_structure: Path, ligand_pdb: Path, output_gro: Path) -> Path:
+    """Combine a prepared receptor and a ligand pose into one structure.
+
+    Args:
+        receptor_structure: Receptor processed by pdb2gmx
+        ligand_pdb: Docked ligand pose
+        output_gro: Output complex file
+
+    Returns:
+        Path to the complex (.gro, box fitted to the solute)
+    """
+    receptor, receptor_coords = read_structure(receptor_structure)
+    ligand, ligand_coords = read_structure(ligand_pdb)
+
+    topology = Topology(
+        names=np.concatenate([receptor.names, ligand.names]),
+        resnames=np.concatenate([receptor.resnames, ligand.resnames]),
+        resids=np.concatenate([receptor.resids, ligand.resids + receptor.resids.max()]),
+        elements=np.concatenate([receptor.elements, ligand.elements]),
+    )
+    coordinates = np.concatenate([receptor_coords, ligand_coords])
+    extent = coordinates.max(axis=0) - coordinates.min(axis=0)
+    return write_gro(output_gro, topology, coordinates, extent, title="Receptor-ligand complex")
+
+
+def cubic_box(coordinates: np.ndarray, padding: float) -> tuple[np.ndarray, np.ndarray]:
+    """Center coordinates in a cubic box (as ``gmx editconf -bt cubic -d``).
+
+    Args:
+        coordinates: Solute coordinates in Å
+        padding: Minimum distance between solute and box edge in Å
+
+    Returns:
+        (centered coordinates, box edge lengths) in Å
+    """
+    low, high = coordinates.min(axis=0), coordinates.max(axis=0)
+    edge = float((high - low).max() + 2.0 * padding)
+    box = np.full(3, edge)
+    return coordinates - (low + high) / 2.0 + box / 2.0, box
+
+
+def prepare_system(job: SystemJob) -> dict[str, Any]:
+    """Box, solvate and neutralize one complex (runs in a worker process).
+
+    Args:
+        job: System to prepare
+
+    Returns:
+        MD system dictionary with coordinates, topology, box (nm) and metadata
+    """
+    job.directory.mkdir(parents=True, exist_ok=True)
+    topology, coordinates = read_structure(job.complex_file)
+    coordinates, box = cubic_box(coordinates, job.box_padding * 10.0)
+
+    structure = write_gro(job.directory / "boxed.gro", topology, coordinates, box)
+    topology_file = job.directory / "topol.top"
+    shutil.copyfile(job.topology_file, topology_file)
+
+    metadata = {**job.metadata, "seed": job.seed, "n_solute_atoms": topology.n_atoms}
+    if job.solvate and job.solvator == "gmx":
+        structure = _solvate_and_neutralize(structure, topology_file, job)
+    elif job.solvate:
+        system = solvate(
+            topology,
+            coordinates,
+            box,
+            load_water_box(job.water_model),
+            net_charge=topology_charge(topology_file),
+            concentration=job.salt_concentration,
+            seed=job.seed,
+        )
+        structure = write_gro(
+            job.directory / "system.gro", system.topology, system.coordinates, system.box
+        )
+        added = [("SOL", system.n_water), ("NA", system.n_cations), ("CL", system.n_anions)]
+        with open(topology_file, "a") as handle:
+            handle.writelines(f"{name:<20s}{count}\n" for name, count in added if count)
+        metadata.update(
+            n_water=system.n_water, n_cations=system.n_cations, n_anions=system.n_anions
+        )
+
+    return {
+        "name": job.directory.name,
+        "directory": job.directory,
+        "coordinates": structure,
+        "topology": topology_file,
+        "box": (box / 10.0).tolist(),
+        "metadata": metadata,
+    }
+
+
+def _solvate_and_neutralize(structure: Path, topology_file: Path, job: SystemJob) -> Path:
+    """Fill the box with water (gmx solvate) and neutralize it (gmx genion)."""
+    water_box = WATER_BOXES.get(job.water_model, "spc216.gro")
+    run_gmx(
+        [
+            "solvate",
+            "-cp",
+            structure.name,
+            "-cs",
+            water_box,
+            "-p",
+            "topol.top",
+            "-o",
+            "solvated.gro",
+        ],
+        cwd=job.directory,
+    )
+    (job.directory / "ions.mdp").write_text(_IONS_MDP)
+    run_gmx(
+        ["grompp", "-f", "ions.mdp", "-c", "solvated.gro", "-p", "topol.top", "-o", "ions.tpr"]
+        + ["-maxwarn", "1"],
+        cwd=job.directory,
+    )
+    run_gmx(
+        ["genion", "-s", "ions.tpr", "-o", "system.gro", "-p", "topol.top", "-neutral"]
+        + ["-conc", str(job.salt_concentration)]
+        + ["-pname", "NA", "-nname", "CL", "-seed", str(job.seed)],
+        cwd=job.directory,
+        stdin="SOL\n",
+    )
+    return job.directory / "system.gro"
@@ -1,9 +1,37 @@
 """OpenFOAM simulation engine for macro-scale CFD simulations."""
+import os
+import shlex
+import shutil
 import subprocess
+from collections.abc import Sequence
 from pathlib import Path
 
 from nanosim.core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from nanosim.engines.input_templates import (
+    OPENFOAM_TEMPLATES,
+    InputSet,
+    render_inputs,
+    run_sweep,
+)
 from nanosim.utils.logger import setup_logger
+from nanosim.utils.retention import RetentionPolicy, RetentionRule, all_but_latest, apply_retention
+
+# Fields the macro-to-meso bridge reads (concentration and velocity)
+DEFAULT_FIELDS = ("C", "U")
+
+# Reader stubs are deleted and logs compressed; every time step is kept, as
+# the macro-to-meso bridge reads the time series. Decomposed copies are only
+# deleted once all their time steps were reconstructed, and intermediate time
+# steps only on request (see cleanup).
+OPENFOAM_RETENTION = RetentionPolicy(
+    [
+        RetentionRule("*.foam", "delete"),
+        RetentionRule("log.*", "compress"),
+    ]
+)
+
+# Key of the ``retention`` parameter selecting all time steps but the latest
+INTERMEDIATE_TIMES = "intermediate_times"
 
 
 class OpenFOAMEngine(SimulationEngine):
@@ -22,6 +50,11 @@ class OpenFOAMEngine(SimulationEngine):
         self.config = config
         self.logger = setup_logger(__name__, config.output_dir / "openfoam.log")
         self.case_dir: Path = config.output_dir / "openfoam_case"
+        self.input_sets: list[InputSet] = []
+        # Set once the case directory holds the results of a completed run
+        self._reconstructed = False
+        # Set once the case directory holds every time step of the processor directories
+        self._fully_reconstructed = False
 
     def validate_config(self) -> None:
         """Validate OpenFOAM-specific configuration.
@@ -44,6 +77,13 @@ class OpenFOAMEngine(SimulationEngine):
         if not isinstance(simulation_time, int | float) or simulation_time <= 0:
             raise ValueError("simulation_time must be a positive number")
 
+        fields = self.config.parameters.get("reconstruct_fields", DEFAULT_FIELDS)
+        if fields is not None and len(fields) == 0:
+            raise ValueError(
+                "reconstruct_fields must not be empty; use None for all fields "
+                "or reconstruct=False to skip reconstruction"
+            )
+
         self.logger.info("OpenFOAM configuration validated")
 
     def setup(self) -> None:
@@ -53,6 +93,10 @@ class OpenFOAMEngine(SimulationEngine):
         - 0/ (initial conditions)
         - constant/ (mesh and physical properties)
         - system/ (solver settings)
+
+        controlDict, blockMeshDict and transportProperties are rendered from
+        the parameters; a ``sweep`` parameter renders one case skeleton per
+        point, sharing identical ones.
         """
         self.case_dir.mkdir(parents=True, exist_ok=True)
 
@@ -63,27 +107,42 @@ class OpenFOAMEngine(SimulationEngine):
 
         self.logger.info(f"OpenFOAM case directory created at {self.case_dir}")
 
-        # TODO: Generate OpenFOAM case files (blockMeshDict, controlDict, etc.)
-        self.logger.warning("OpenFOAM case file generation not yet implemented")
+        self.input_sets = render_inputs(OPENFOAM_TEMPLATES, self.config.parameters, self.case_dir)
+        n_distinct = len({s.digest for s in self.input_sets})
+        self.logger.info(f"Rendered {len(self.input_sets)} case set(s), {n_distinct} distinct")
 
     def run(self) -> SimulationResult:
         """Execute OpenFOAM simulation.
 
+        If the solver is available the case is meshed and solved. With
+        ``n_subdomains`` > 1 the case is decomposed (``decomposition_method``
+        scotch or simple), the solver runs under ``mpi_launcher`` ('local'
+        starts the ranks as plain processes) and only the time steps in
+        ``reconstruct_times`` ('latest', 'all' or a list of times) and the
+        fields in ``reconstruct_fields`` (None for all fields) are
+        reconstructed. With ``reconstruct`` set to False (or
+        ``reconstruct_times`` set to None) reconstructPar is skipped and the
+        processor directories are kept, to be read directly (see
+        ``bridges.foam_fields``).
+
+        With a ``sweep`` parameter each distinct input set runs as its own
+        simulation in ``runs/<digest>`` (see ``input_templates.run_sweep``).
+
         Returns:
             SimulationResult with success status and output files
         """
         try:
             self.logger.info("Starting OpenFOAM simulation")
 
-            # TODO: Implement actual OpenFOAM execution
-            # This would typically involve:
-            # 1. blockMesh - generate mesh
-            # 2. checkMesh - validate mesh
-            # 3. solver (e.g., pisoFoam, simpleFoam) - run simulation
-            # 4. postProcess - extract results
+            params = self.config.parameters
+            if "sweep" in params:
+                return run_sweep(type(self), self.config, self.input_sets, self.case_dir)
+            solver = params.get("solver", "pimpleFoam")
+            if shutil.which(solver) is not None:
+                return self._run_case(solver)
 
-            # Placeholder for actual implementation
-            self.logger.warning("OpenFOAM simulation execution not yet implemented")
+            # TODO: postProcess - extract results
+            self.logger.warning(f"OpenFOAM solver {solver} not found; simulation not executed")
 
             # Simulate successful execution
             output_files = [
@@ -113,29 +172,192 @@ class OpenFOAMEngine(SimulationEngine):
                 error_message=str(e),
             )
 
+    def _run_case(self, solver: str) -> SimulationResult:
+        """Mesh and solve the case, in parallel if requested."""
+        params = self.config.parameters
+        n_subdomains = int(params.get("n_subdomains", 1))
+
+        if not (self.case_dir / "constant" / "polyMesh").exists():
+            run_openfoam_command("blockMesh", self.case_dir)
+        run_openfoam_command("checkMesh", self.case_dir)
+
+        if n_subdomains > 1:
+            run_openfoam_command("decomposePar -force", self.case_dir)
+            run_openfoam_command(
+                solver,
+                self.case_dir,
+                n_procs=n_subdomains,
+                launcher=params.get("mpi_launcher", "mpirun"),
+            )
+            times = params.get("reconstruct_times", "latest")
+            if params.get("reconstruct", True) and times is not None:
+                fields = params.get("reconstruct_fields", DEFAULT_FIELDS)
+                run_openfoam_command(
+                    ["reconstructPar", *reconstruct_args(times)]
+                    + (["-fields", f"({' '.join(fields)})"] if fields is not None else []),
+                    self.case_dir,
+                )
+                self._reconstructed = True
+                self._fully_reconstructed = times == "all"
+        else:
+            run_openfoam_command(solver, self.case_dir)
+            self._reconstructed = True
+            self._fully_reconstructed = True
+
+        # Unreconstructed results stay in the processor directories
+        results_dir = self.case_dir if self._reconstructed else self.case_dir / "processor0"
+        times = sorted(
+            (p for p in results_dir.iterdir() if p.is_dir() and _is_time(p.name)),
+            key=lambda p: float(p.name),
+        )
+        if self._reconstructed:
+            output_files = [f for t in times[1:] for f in sorted(t.iterdir()) if f.is_file()]
+        else:
+            output_files = sorted(self.case_dir.glob("processor*"))
+        self.logger.info(f"OpenFOAM run completed on {n_subdomains} subdomain(s)")
+        return SimulationResult(
+            success=True,
+            output_files=output_files,
+            metadata={
+                "engine": "OpenFOAM",
+                "solver": solver,
+                "particle_diameter": params["particle_diameter"],
+                "simulation_time": params["simulation_time"],
+                "n_subdomains": n_subdomains,
+                "time_steps": [t.name for t in times],
+            },
+        )
+
     def cleanup(self) -> None:
         """Clean up temporary OpenFOAM files.
 
-        Removes large temporary files while preserving results.
+        Removes large temporary files while preserving results. The case is
+        cleaned with OPENFOAM_RETENTION, preceded by the rules of an optional
+        ``retention`` parameter ({pattern: action}); removal runs in the
+        background. Processor directories are only removed once every time
+        step was reconstructed (a serial run, or ``reconstruct_times='all'``),
+        so decomposed results without a reconstructed copy are kept.
+        All time steps are kept unless ``retention`` maps
+        INTERMEDIATE_TIMES ('intermediate_times') to 'delete' or 'compress',
+        which applies to all but the latest time step (time steps
+        reconstructed on request excepted).
         """
         self.logger.info("Cleaning up OpenFOAM temporary files")
 
-        # TODO: Implement cleanup of processor* directories, .foam files, etc.
-        # Keep: results, logs
-        # Remove: processor directories, intermediate time steps
-
-        self.logger.info("OpenFOAM cleanup completed")
-
-
-def run_openfoam_command(command: str, case_dir: Path) -> subprocess.CompletedProcess:
+        rules = dict(self.config.parameters.get("retention", {}))
+        intermediate = rules.pop(INTERMEDIATE_TIMES, "keep")
+        policy = RetentionPolicy.from_mapping(rules)
+        policy += RetentionPolicy([RetentionRule("0", "keep")])
+        times = self.config.parameters.get("reconstruct_times", "latest")
+        if times not in (None, "latest", "all"):
+            # Time steps reconstructed on request are results, not intermediates
+            policy += RetentionPolicy([RetentionRule(f"{t:g}", "keep") for t in times])
+        if self._fully_reconstructed:
+            policy += RetentionPolicy([RetentionRule("processor*", "delete")])
+        policy += RetentionPolicy([RetentionRule("*", intermediate, select=all_but_latest)])
+        report = apply_retention(self.case_dir, policy + OPENFOAM_RETENTION)
+
+        self.logger.info(
+            f"OpenFOAM cleanup completed: {len(report.deleted)} deleted, "
+            f"{len(report.compressed)} compressed"
+        )
+
+
+def run_openfoam_command(
+    command: str | Sequence[str],
+    case_dir: Path,
+    n_procs: int = 1,
+    launcher: str = "mpirun",
+) -> subprocess.CompletedProcess:
     """Execute an OpenFOAM command in the case directory.
 
+    The output is written to ``log.<application>`` in the case, as the
+    OpenFOAM run functions do.
+
     Args:
         command: OpenFOAM command to execute
         case_dir: Path to OpenFOAM case directory
+        n_procs: Number of MPI ranks; above 1 the application runs with
+            ``-parallel`` on a decomposed case
+        launcher: MPI launcher command, or 'local' to start the ranks as
+            plain local processes (for testing without MPI)
 
     Returns:
         CompletedProcess with command results
+
+    Raises:
+        RuntimeError: If the command fails
     """
-    # TODO: Implement Docker or native OpenFOAM command execution
-    raise NotImplementedError("OpenFOAM command execution not yet implemented")
+    args = shlex.split(command) if isinstance(command, str) else list(command)
+    if n_procs > 1:
+        args.append("-parallel")
+        if launcher == "local":
+            process = _launch_local(args, n_procs, case_dir)
+        else:
+            process = subprocess.run(
+                [*shlex.split(launcher), "-np", str(n_procs), *args],
+                cwd=case_dir,
+                capture_output=True,
+                text=True,
+            )
+    else:
+        process = subprocess.run(args, cwd=case_dir, capture_output=True, text=True)
+
+    (Path(case_dir) / f"log.{Path(args[0]).name}").write_text(process.stdout + process.stderr)
+    if process.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {process.stderr.strip()[-2000:]}")
+    return process
+
+
+def reconstruct_args(times: str | Sequence[float]) -> list[str]:
+    """reconstructPar time selection options.
+
+    Args:
+        times: 'latest', 'all' or a list of times
+
+    Returns:
+        Command line options
+    """
+    if times == "latest":
+        return ["-latestTime"]
+    if times == "all":
+        return []
+    return ["-time", ",".join(f"{t:g}" for t in times)]
+
+
+def _launch_local(args: list[str], n_procs: int, case_dir: Path) -> subprocess.CompletedProcess:
+    """Start one process per rank, with the rank variables Open MPI would set."""
+    processes = []
+    for rank in range(n_procs):
+        env = {
+            **os.environ,
+            "OMPI_COMM_WORLD_RANK": str(rank),
+            "OMPI_COMM_WORLD_SIZE": str(n_procs),
+        }
+        processes.append(
+            subprocess.Popen(
+                args,
+                cwd=case_dir,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        )
+
+    outputs = [process.communicate() for process in processes]
+    returncode = next((p.returncode for p in processes if p.returncode != 0), 0)
+    return subprocess.CompletedProcess(
+        args,
+        returncode,
+        stdout="".join(out for out, _ in outputs),
+        stderr="".join(err for _, err in outputs),
+    )
+
+
+def _is_time(name: str) -> bool:
+    try:
+        float(name)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,159 @@
+"""In-process conversion between PDB and PDBQT.
+
+Replaces one Open Babel process per file with direct text conversion:
+
+- PDB → PDBQT for receptors of standard residues, using the per-topology
+  AD4 typing templates of ``receptor_prep``
+- PDBQT → PDB for already-typed ligands and docked poses, mapping AD4 atom
+  types back to elements
+
+Batches of files are converted on a thread pool.
+"""
+
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from nanosim.engines.receptor_prep import prepare_receptor_pdb
+
+# AutoDock 4 atom types whose element is not simply the upper-cased type
+AD4_TYPE_ELEMENTS = {
+    "A": "C",
+    "NA": "N",
+    "NS": "N",
+    "OA": "O",
+    "OS": "O",
+    "SA": "S",
+    "HD": "H",
+    "HS": "H",
+    "G0": "C",
+    "G1": "C",
+    "G2": "C",
+    "G3": "C",
+    "CG0": "C",
+    "CG1": "C",
+    "CG2": "C",
+    "CG3": "C",
+    "W": "O",
+}
+
+
+def ad_type_element(ad_type: str) -> str:
+    """Element symbol (upper case) of an AutoDock 4 atom type."""
+    return AD4_TYPE_ELEMENTS.get(ad_type, ad_type.upper())
+
+
+def pdbqt_to_pdb_text(pdbqt_text: str, model: int | None = 1) -> str:
+    """Convert PDBQT text to PDB text.
+
+    Torsion-tree records (ROOT, BRANCH, TORSDOF, ...) are dropped, charges
+    and AD4 types are replaced by the element column.
+
+    Args:
+        pdbqt_text: PDBQT content
+        model: Model (pose) number to keep, or None to keep all models
+
+    Returns:
+        PDB content
+    """
+    lines = []
+    current = 1
+    has_models = False
+    for line in pdbqt_text.splitlines():
+        record = line[:6]
+        if record.startswith("MODEL"):
+            has_models = True
+            current = int(line.split()[1]) if len(line.split()) > 1 else current
+            if model is None:
+                lines.append(line)
+        elif record.startswith("ENDMDL"):
+            if model is None:
+                lines.append(line)
+            elif current == model:
+                break
+        elif record in ("ATOM  ", "HETATM") and (model is None or current == model):
+            element = ad_type_element(line[77:79].strip())
+            lines.append(f"{line[:54]:<54s}  1.00  0.00          {element:>2s}")
+
+    if model is not None and has_models and not lines:
+        raise ValueError(f"Model {model} not found in PDBQT")
+    lines.append("END")
+    return "\n".join(lines) + "\n"
+
+
+def pdbqt_to_pdb(pdbqt_file: Path, pdb_file: Path, model: int | None = 1) -> Path:
+    """Convert a PDBQT file (ligand, pose set or receptor) to PDB.
+
+    Args:
+        pdbqt_file: Input PDBQT file
+        pdb_file: Output PDB file
+        model: Model (pose) number to keep, or None to keep all models
+
+    Returns:
+        Path to the written PDB file
+    """
+    pdb_file = Path(pdb_file)
+    pdb_file.write_text(pdbqt_to_pdb_text(Path(pdbqt_file).read_text(), model))
+    return pdb_file
+
+
+def pose_to_pdb(pose: dict[str, Any], pdb_file: Path, resname: str | None = None) -> Path:
+    """Write a parsed docking pose (see DockingResultParser) as PDB.
+
+    Args:
+        pose: Pose dictionary with atoms, resnames, ad_types and coordinates
+        pdb_file: Output PDB file
+        resname: Residue name override (e.g. the force-field ligand name)
+
+    Returns:
+        Path to the written PDB file
+    """
+    lines = [f"REMARK VINA RESULT: {pose['affinity']:8.3f}"] if "affinity" in pose else []
+    resnames = pose.get("resnames") or ["LIG"] * len(pose["atoms"])
+    for serial, (name, res, ad_type, (x, y, z)) in enumerate(
+        zip(pose["atoms"], resnames, pose["ad_types"], pose["coordinates"], strict=True), start=1
+    ):
+        padded = f"{name:<4s}" if len(name) == 4 else f" {name:<3s}"
+        lines.append(
+            f"HETATM{serial:5d} {padded} {(resname or res):>3s} A   1    "
+            f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00          {ad_type_element(ad_type):>2s}"
+        )
+    lines.append("END")
+
+    pdb_file = Path(pdb_file)
+    pdb_file.write_text("\n".join(lines) + "\n")
+    return pdb_file
+
+
+def convert_file(input_file: Path, output_file: Path) -> Path:
+    """Convert one file, choosing the direction from the output suffix.
+
+    Raises:
+        ValueError: If the conversion is not supported
+    """
+    source, target = Path(input_file).suffix.lower(), Path(output_file).suffix.lower()
+    if (source, target) == (".pdb", ".pdbqt"):
+        return prepare_receptor_pdb(input_file, output_file)
+    if (source, target) == (".pdbqt", ".pdb"):
+        return pdbqt_to_pdb(input_file, output_file)
+    raise ValueError(f"Unsupported conversion: {source} -> {target}")
+
+
+def convert_batch(jobs: Sequence[tuple[Path, Path]], max_workers: int | None = None) -> list[Path]:
+    """Convert many files on a thread pool.
+
+    Receptors sharing a topology are typed once (see ``receptor_prep``), so
+    converting many frames of one trajectory is dominated by file I/O.
+
+    Args:
+        jobs: (input_file, output_file) pairs; .pdb → .pdbqt or .pdbqt → .pdb
+        max_workers: Number of threads (None = executor default)
+
+    Returns:
+        Output paths in job order
+    """
+    if len(jobs) <= 1:
+        return [convert_file(source, target) for source, target in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: convert_file(*job), jobs))
@@ -0,0 +1,312 @@
+"""Receptor preparation (PDB → PDBQT) with per-topology templates.
+
+Preparing a receptor means assigning AutoDock 4 atom types, partial
+charges and dropping non-polar hydrogens (whose charge is merged into the
+parent carbon). All of this depends only on the topology, so it is done
+once per topology and stored in a ReceptorTemplate; each MD frame then
+only needs its coordinates formatted into the pre-rendered records.
+
+Charges are approximate Gasteiger values from a per-atom lookup table for
+standard residues. Vina scoring ignores charges; they only matter for
+AutoDock 4 scoring.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from nanosim.analysis.trajectory import Topology, iter_frames, read_topology
+from nanosim.utils.spatial import neighbor_pairs
+
+COVALENT_H_CUTOFF = 1.3  # Å, maximum X-H bond length
+
+_HISTIDINES = frozenset({"HIS", "HID", "HIE", "HIP", "HSD", "HSE", "HSP"})
+_AROMATIC_CARBONS = {
+    "PHE": {"CG", "CD1", "CD2", "CE1", "CE2", "CZ"},
+    "TYR": {"CG", "CD1", "CD2", "CE1", "CE2", "CZ"},
+    "TRP": {"CG", "CD1", "CD2", "CE2", "CE3", "CZ2", "CZ3", "CH2"},
+    **{his: {"CG", "CD2", "CE1"} for his in _HISTIDINES},
+}
+
+# Approximate Gasteiger charges of polar groups; other heavy atoms default to 0
+_BACKBONE_CHARGES = {"N": -0.346, "CA": 0.177, "C": 0.241, "O": -0.271, "OXT": -0.271}
+_SIDECHAIN_CHARGES = {
+    ("SER", "OG"): -0.398,
+    ("THR", "OG1"): -0.393,
+    ("TYR", "OH"): -0.361,
+    ("ASN", "OD1"): -0.274,
+    ("ASN", "ND2"): -0.370,
+    ("GLN", "OE1"): -0.274,
+    ("GLN", "NE2"): -0.370,
+    ("ASP", "CG"): 0.172,
+    ("ASP", "OD1"): -0.648,
+    ("ASP", "OD2"): -0.648,
+    ("GLU", "CD"): 0.172,
+    ("GLU", "OE1"): -0.648,
+    ("GLU", "OE2"): -0.648,
+    ("LYS", "NZ"): -0.079,
+    ("ARG", "NE"): -0.227,
+    ("ARG", "CZ"): 0.665,
+    ("ARG", "NH1"): -0.235,
+    ("ARG", "NH2"): -0.235,
+    ("TRP", "NE1"): -0.361,
+    ("CYS", "SG"): -0.179,
+    ("MET", "SD"): -0.163,
+}
+_HIS_NITROGEN_CHARGE = -0.247
+_POLAR_H_CHARGES = {"N": 0.163, "O": 0.209, "S": 0.101}
+
+# AutoDock 4 types of other elements; elements without one are not written
+_METAL_TYPES = {"MG": "Mg", "MN": "Mn", "ZN": "Zn", "CA": "Ca", "FE": "Fe"}
+_ELEMENT_TYPES = {**_METAL_TYPES, "P": "P", "F": "F", "CL": "Cl", "BR": "Br", "I": "I"}
+
+# Maximum number of templates kept in memory
+_TEMPLATE_CACHE_SIZE = 16
+_templates: "OrderedDict[str, ReceptorTemplate]" = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+@dataclass
+class ReceptorTemplate:
+    """Pre-typed PDBQT records of a receptor topology.
+
+    Attributes:
+        signature: Hash of the topology the template was built from
+        atom_indices: Topology atoms written to the PDBQT (non-polar H removed)
+        ad_types: AutoDock 4 atom type of each written atom
+        charges: Partial charge of each written atom
+        record_format: PDBQT text with ``%8.3f`` placeholders for coordinates
+    """
+
+    signature: str
+    atom_indices: np.ndarray
+    ad_types: np.ndarray
+    charges: np.ndarray
+    record_format: str
+
+    def render(self, coordinates: np.ndarray) -> str:
+        """Render PDBQT text for one set of coordinates.
+
+        Args:
+            coordinates: Coordinates of all topology atoms, shape (n_atoms, 3) in Å
+
+        Returns:
+            PDBQT file content
+        """
+        return self.record_format % tuple(coordinates[self.atom_indices].ravel().tolist())
+
+    def write(self, coordinates: np.ndarray, output_pdbqt: Path) -> Path:
+        """Write a PDBQT file for one set of coordinates.
+
+        Args:
+            coordinates: Coordinates of all topology atoms, shape (n_atoms, 3) in Å
+            output_pdbqt: Output path
+
+        Returns:
+            Path to the written file
+        """
+        output_pdbqt = Path(output_pdbqt)
+        output_pdbqt.write_text(self.render(coordinates))
+        return output_pdbqt
+
+
+def topology_signature(topology: Topology) -> str:
+    """Hash identifying a topology (atom names, residues and elements)."""
+    digest = hashlib.sha256()
+    for array in (topology.names, topology.resnames, topology.resids, topology.elements):
+        digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def build_receptor_template(topology: Topology, coordinates: np.ndarray) -> ReceptorTemplate:
+    """Type atoms and assign charges for a receptor topology.
+
+    Hydrogens are attached to their nearest heavy atom using the reference
+    coordinates; hydrogens on N, O or S become polar 'HD' atoms, the rest
+    are dropped and their charge merged into the carbon they are bonded to.
+    Metal ions are typed Mg, Mn, Zn, Ca or Fe; other monatomic ions and
+    elements without an AutoDock 4 type are not written, as Vina would
+    reject the receptor.
+
+    Args:
+        topology: Receptor topology
+        coordinates: Reference coordinates, shape (n_atoms, 3) in Å
+
+    Returns:
+        ReceptorTemplate for the topology
+    """
+    elements = topology.elements
+    n_atoms = topology.n_atoms
+    hydrogens = np.nonzero(elements == "H")[0]
+    heavy = np.nonzero(elements != "H")[0]
+
+    # Parent heavy atom of every hydrogen (nearest within bonding distance)
+    parent = np.full(n_atoms, -1, dtype=np.int64)
+    if len(hydrogens) and len(heavy):
+        h_idx, x_idx, dist = neighbor_pairs(
+            coordinates[hydrogens], coordinates[heavy], COVALENT_H_CUTOFF
+        )
+        order = np.lexsort((dist, h_idx))
+        first = np.unique(h_idx[order], return_index=True)[1]
+        parent[hydrogens[h_idx[order][first]]] = heavy[x_idx[order][first]]
+
+    has_h = np.zeros(n_atoms, dtype=bool)
+    has_h[parent[parent >= 0]] = True
+    parent_element = np.where(parent >= 0, elements[np.maximum(parent, 0)], "")
+    polar_h = (elements == "H") & np.isin(parent_element, ["N", "O", "S"])
+
+    names, resnames = topology.names.astype(str), topology.resnames.astype(str)
+    residue_names = np.char.add(np.char.add(resnames, ":"), names)
+    aromatic = np.isin(
+        residue_names,
+        [f"{res}:{name}" for res, atoms in _AROMATIC_CARBONS.items() for name in atoms],
+    )
+    his_ring = np.isin(resnames, list(_HISTIDINES)) & np.isin(names, ["ND1", "NE2"])
+
+    ad_types = np.select(
+        [
+            elements == "C",
+            elements == "N",
+            elements == "O",
+            elements == "S",
+            elements == "H",
+        ],
+        [
+            np.where(aromatic, "A", "C"),
+            # Histidine ring nitrogens without a hydrogen are acceptors
+            np.where(his_ring & ~has_h, "NA", "N"),
+            "OA",
+            "SA",
+            np.where(polar_h, "HD", "H"),
+        ],
+        default=_lookup(elements, _ELEMENT_TYPES, "")[0],
+    ).astype(object)
+    # Monatomic ions without an AutoDock type (Na+, K+, Cl-, ...) are not written
+    ions = _single_atom_residues(topology.resids)
+    ad_types[ions & ~np.isin(elements, list(_METAL_TYPES))] = ""
+
+    charges = np.zeros(n_atoms)
+    charges[his_ring] = _HIS_NITROGEN_CHARGE
+    polar_parent = _lookup(parent_element, _POLAR_H_CHARGES, 0.0)[0]
+    charges[polar_h] = polar_parent[polar_h]
+    backbone, is_backbone = _lookup(names, _BACKBONE_CHARGES, 0.0)
+    is_backbone &= elements != "H"
+    charges[is_backbone] = backbone[is_backbone]
+    sidechain, is_sidechain = _lookup(
+        residue_names, {f"{res}:{name}": q for (res, name), q in _SIDECHAIN_CHARGES.items()}, 0.0
+    )
+    charges[is_sidechain] = sidechain[is_sidechain]
+
+    # Merge non-polar hydrogens into their parent atom
+    nonpolar_h = (elements == "H") & ~polar_h & (parent >= 0)
+    np.add.at(charges, parent[nonpolar_h], charges[nonpolar_h])
+    keep = np.nonzero(~nonpolar_h & (ad_types != ""))[0]
+
+    records = []
+    for serial, i in enumerate(keep, start=1):
+        name = topology.names[i]
+        padded = f"{name:<4s}" if len(name) == 4 else f" {name:<3s}"
+        prefix = (
+            f"ATOM  {serial % 100000:5d} {padded} {topology.resnames[i]:>3s} A"
+            f"{topology.resids[i] % 10000:4d}    "
+        )
+        suffix = f"  1.00  0.00    {charges[i]:6.3f} {ad_types[i]:<2s}"
+        records.append(prefix.replace("%", "%%") + "%8.3f%8.3f%8.3f" + suffix.replace("%", "%%"))
+
+    return ReceptorTemplate(
+        signature=topology_signature(topology),
+        atom_indices=keep,
+        ad_types=ad_types[keep].astype(str),
+        charges=charges[keep],
+        record_format="\n".join(records) + "\nTER\n",
+    )
+
+
+def _lookup(keys: np.ndarray, table: dict, default) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized dictionary lookup.
+
+    Returns:
+        Tuple (values, found mask); missing keys get the default
+    """
+    table_keys = np.array(sorted(table), dtype=str)
+    table_values = np.array([table[k] for k in table_keys])
+    keys = np.asarray(keys).astype(str)
+    position = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)
+    found = table_keys[position] == keys
+    return np.where(found, table_values[position], default), found
+
+
+def _single_atom_residues(resids: np.ndarray) -> np.ndarray:
+    """Mask of atoms that are the only atom of their (contiguous) residue."""
+    boundary = np.flatnonzero(np.diff(resids) != 0) + 1
+    sizes = np.diff(np.concatenate([[0], boundary, [len(resids)]]))
+    return np.repeat(sizes == 1, sizes)
+
+
+def get_receptor_template(topology: Topology, coordinates: np.ndarray) -> ReceptorTemplate:
+    """Return the cached template of a topology, building it on first use.
+
+    The cache is thread-safe, so batch conversions on a thread pool build
+    each template exactly once.
+
+    Args:
+        topology: Receptor topology
+        coordinates: Reference coordinates used only when building
+
+    Returns:
+        ReceptorTemplate shared by all frames with this topology
+    """
+    signature = topology_signature(topology)
+    with _templates_lock:
+        if signature in _templates:
+            _templates.move_to_end(signature)
+            return _templates[signature]
+
+        template = build_receptor_template(topology, coordinates)
+        _templates[signature] = template
+        if len(_templates) > _TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)
+        return template
+
+
+def prepare_receptor_frames(
+    topology: Topology,
+    frames: Iterable[tuple[np.ndarray, Path]],
+) -> list[Path]:
+    """Write PDBQT receptors for many frames sharing one topology.
+
+    Args:
+        topology: Receptor topology
+        frames: (coordinates, output_pdbqt) pairs
+
+    Returns:
+        Paths of the written PDBQT files
+    """
+    outputs = []
+    template = None
+    for coordinates, output in frames:
+        if template is None:
+            template = get_receptor_template(topology, coordinates)
+        outputs.append(template.write(coordinates, output))
+    return outputs
+
+
+def prepare_receptor_pdb(pdb_file: Path, output_pdbqt: Path) -> Path:
+    """Prepare a receptor PDB file, reusing the template of its topology.
+
+    Args:
+        pdb_file: Input PDB file
+        output_pdbqt: Output PDBQT file
+
+    Returns:
+        Path to the written PDBQT file
+    """
+    topology = read_topology(pdb_file)
+    coordinates = next(iter_frames(pdb_file, chunk_size=1)).coordinates[0]
+    return get_receptor_template(topology, coordinates).write(coordinates, output_pdbqt)
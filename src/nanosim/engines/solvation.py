@@ -0,0 +1,410 @@
+"""Built-in solvation and ion placement for MD system preparation.
+
+Replaces ``gmx solvate`` and ``gmx genion`` with vectorized numpy steps:
+
+1. A pre-equilibrated water box for the water model (loaded once per
+   process and kept in memory) is tiled over the target box.
+2. Water molecules overlapping the solute, or their own periodic images
+   across the box faces, are removed using a cell list.
+3. Randomly chosen water molecules away from the solute are replaced by
+   ions to neutralize the system (plus an optional salt concentration).
+
+Water boxes are read from the GROMACS data directory (``$GMXDATA/top``)
+when available. For 3-site models a lattice box with random orientations
+is generated otherwise; it is not equilibrated, so energy minimization is
+required before dynamics, as for any prepared system.
+"""
+
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from nanosim.analysis.trajectory import Topology, iter_frames, read_topology
+from nanosim.utils.spatial import CellList
+
+# Pre-equilibrated water box shipped with GROMACS for each water model
+WATER_BOXES = {
+    "tip3p": "spc216.gro",
+    "spc": "spc216.gro",
+    "spce": "spc216.gro",
+    "tip4p": "tip4p.gro",
+    "tip4pew": "tip4p.gro",
+    "tip5p": "tip5p.gro",
+}
+
+AVOGADRO = 6.02214076e23
+WATER_DENSITY = 0.03334  # molecules per Å^3 at 300 K
+
+# Minimum distance (Å) between any water atom and any solute atom
+DEFAULT_SOLUTE_DISTANCE = 2.4
+# Minimum O-O distance (Å) between periodic images across box faces
+_IMAGE_DISTANCE = 2.3
+# Ions are not placed closer than this (Å) to the solute
+_ION_SOLUTE_DISTANCE = 5.0
+
+_THREE_SITE_MODELS = frozenset({"tip3p", "spc", "spce"})
+# Massless virtual sites of 4- and 5-site water models; they have no element
+_VIRTUAL_SITES = frozenset({"MW", "LP1", "LP2"})
+
+# Element symbols (upper case, as in Topology) of common ion atom names
+ION_ELEMENTS = {
+    "NA": "NA", "SOD": "NA", "K": "K", "POT": "K", "LI": "LI", "LIT": "LI",
+    "CS": "CS", "CES": "CS", "MG": "MG", "CA": "CA", "CAL": "CA", "ZN": "ZN",
+    "CL": "CL", "CLA": "CL", "BR": "BR", "I": "I",
+}  # fmt: skip
+
+
+@dataclass
+class WaterBox:
+    """A periodic box of water molecules.
+
+    Attributes:
+        names: Atom names of one molecule (e.g. OW, HW1, HW2)
+        elements: Element symbols of one molecule ('' for virtual sites)
+        coordinates: Coordinates in Å, shape (n_molecules, atoms_per_molecule, 3)
+        box: Box edge lengths in Å
+        resname: Residue name of the solvent
+    """
+
+    names: np.ndarray
+    elements: np.ndarray
+    coordinates: np.ndarray
+    box: np.ndarray
+    resname: str = "SOL"
+
+
+@dataclass
+class SolvatedSystem:
+    """Solute with added solvent and ions.
+
+    Attributes:
+        topology: Topology of all atoms (solute, water, cations, anions)
+        coordinates: Coordinates in Å
+        box: Box edge lengths in Å
+        n_water: Number of water molecules
+        n_cations: Number of cations
+        n_anions: Number of anions
+    """
+
+    topology: Topology
+    coordinates: np.ndarray
+    box: np.ndarray
+    n_water: int
+    n_cations: int
+    n_anions: int
+
+
+def gromacs_data_dir() -> Path | None:
+    """GROMACS topology data directory, if it can be located."""
+    if os.environ.get("GMXDATA"):
+        return Path(os.environ["GMXDATA"]) / "top"
+    for name in ("gmx", "gmx_mpi"):
+        executable = shutil.which(name)
+        if executable is not None:
+            top = Path(executable).resolve().parent.parent / "share" / "gromacs" / "top"
+            if top.is_dir():
+                return top
+    return None
+
+
+@lru_cache(maxsize=8)
+def load_water_box(water_model: str = "tip3p", source: Path | None = None) -> WaterBox:
+    """Load the equilibrated water box of a water model (cached per process).
+
+    Args:
+        water_model: Water model name
+        source: Explicit .gro water box (default: from the GROMACS data directory)
+
+    Returns:
+        WaterBox for the model
+
+    Raises:
+        FileNotFoundError: If no box file is found for a model with virtual sites
+    """
+    if source is None:
+        data_dir = gromacs_data_dir()
+        candidate = data_dir / WATER_BOXES.get(water_model, "spc216.gro") if data_dir else None
+        if candidate is not None and candidate.exists():
+            source = candidate
+
+    if source is None:
+        if water_model not in _THREE_SITE_MODELS:
+            raise FileNotFoundError(
+                f"No water box found for {water_model}; set GMXDATA or pass a .gro box"
+            )
+        return lattice_water_box()
+
+    topology = read_topology(source)
+    coordinates = next(iter_frames(source, chunk_size=1)).coordinates[0]
+    per_molecule = int(np.count_nonzero(topology.resids == topology.resids[0]))
+    with open(source) as handle:
+        box = np.array(handle.readlines()[-1].split()[:3], dtype=np.float64) * 10.0
+
+    names = topology.names[:per_molecule]
+    return WaterBox(
+        names=names,
+        elements=np.where(
+            np.isin(names, list(_VIRTUAL_SITES)), "", topology.elements[:per_molecule]
+        ),
+        coordinates=coordinates.reshape(-1, per_molecule, 3),
+        box=box,
+        resname=str(topology.resnames[0]),
+    )
+
+
+def lattice_water_box(n_per_side: int = 6, seed: int = 0) -> WaterBox:
+    """Cubic lattice of randomly oriented 3-site waters at liquid density.
+
+    Args:
+        n_per_side: Molecules along each box edge
+        seed: Seed of the molecule orientations
+
+    Returns:
+        WaterBox of n_per_side**3 molecules
+    """
+    spacing = WATER_DENSITY ** (-1.0 / 3.0)
+    grid = (np.indices((n_per_side,) * 3).reshape(3, -1).T + 0.5) * spacing
+
+    # Rigid geometry: O-H 0.9572 Å, H-O-H 104.52°
+    half_angle = np.radians(104.52) / 2.0
+    local = 0.9572 * np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [np.sin(half_angle), np.cos(half_angle), 0.0],
+            [-np.sin(half_angle), np.cos(half_angle), 0.0],
+        ]
+    )
+
+    # Random rotation matrices from normalized quaternions
+    rng = np.random.default_rng(seed)
+    q = rng.normal(size=(len(grid), 4))
+    w, x, y, z = (q / np.linalg.norm(q, axis=1, keepdims=True)).T
+    rotations = np.stack(
+        [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ]
+    ).transpose(2, 0, 1)
+
+    coordinates = grid[:, None, :] + np.einsum("mij,aj->mai", rotations, local)
+    return WaterBox(
+        names=np.array(["OW", "HW1", "HW2"]),
+        elements=np.array(["O", "H", "H"]),
+        coordinates=coordinates,
+        box=np.full(3, n_per_side * spacing),
+    )
+
+
+def fill_box(
+    water: WaterBox,
+    box: np.ndarray,
+    solute: np.ndarray,
+    min_distance: float = DEFAULT_SOLUTE_DISTANCE,
+) -> np.ndarray:
+    """Tile a water box over a target box and remove overlapping molecules.
+
+    Args:
+        water: Equilibrated water box
+        box: Target box edge lengths in Å
+        solute: Solute coordinates in Å (inside the box)
+        min_distance: Minimum water-solute atom distance in Å
+
+    Returns:
+        Water coordinates, shape (n_molecules, atoms_per_molecule, 3)
+    """
+    box = np.asarray(box, dtype=np.float64)
+    n_tiles = np.ceil(box / water.box).astype(np.int64)
+    offsets = np.indices(n_tiles).reshape(3, -1).T * water.box
+    molecules = (offsets[:, None, None, :] + water.coordinates[None]).reshape(
+        -1, *water.coordinates.shape[1:]
+    )
+
+    # A molecule belongs to the box if its first atom (oxygen) does
+    oxygens = molecules[:, 0]
+    molecules = molecules[np.all((oxygens >= 0.0) & (oxygens < box), axis=1)]
+
+    if len(solute):
+        atoms = molecules.reshape(-1, 3)
+        clash = CellList(solute, min_distance).query_any(atoms, min_distance)
+        molecules = molecules[~clash.reshape(len(molecules), -1).any(axis=1)]
+
+    return molecules[~_image_clashes(molecules[:, 0], box)]
+
+
+def _image_clashes(oxygens: np.ndarray, box: np.ndarray) -> np.ndarray:
+    """Flag molecules near an upper face that clash with periodic images."""
+    clash = np.zeros(len(oxygens), dtype=bool)
+    upper = np.nonzero((oxygens > box - _IMAGE_DISTANCE).any(axis=1))[0]
+    lower = np.nonzero((oxygens < _IMAGE_DISTANCE).any(axis=1))[0]
+    if not len(upper) or not len(lower):
+        return clash
+
+    # Images of the lower-face molecules shifted across every face, edge and corner
+    shifts = np.indices((2, 2, 2)).reshape(3, -1).T[1:] * box
+    images = (oxygens[lower][None] + shifts[:, None]).reshape(-1, 3)
+    query, _, _ = CellList(images, _IMAGE_DISTANCE).query_pairs(oxygens[upper], _IMAGE_DISTANCE)
+    clash[upper[query]] = True
+    return clash
+
+
+def ion_counts(
+    net_charge: float, n_water: int, concentration: float, volume: float
+) -> tuple[int, int]:
+    """Number of (cations, anions) neutralizing a charge at a salt concentration.
+
+    Args:
+        net_charge: Net charge of the solute in e
+        n_water: Number of available water molecules
+        concentration: Salt concentration in mol/L
+        volume: Box volume in Å^3
+
+    Returns:
+        (n_cations, n_anions) for monovalent ions
+
+    Raises:
+        ValueError: If there are not enough water molecules to replace
+    """
+    charge = int(round(net_charge))
+    pairs = int(round(concentration * AVOGADRO * volume * 1e-27))
+    n_cations = pairs + max(-charge, 0)
+    n_anions = pairs + max(charge, 0)
+    if n_cations + n_anions > n_water:
+        raise ValueError(f"Cannot place {n_cations + n_anions} ions among {n_water} waters")
+    return n_cations, n_anions
+
+
+def solvate(
+    solute_topology: Topology,
+    solute_coordinates: np.ndarray,
+    box: np.ndarray,
+    water: WaterBox,
+    net_charge: float = 0.0,
+    concentration: float = 0.0,
+    seed: int = 0,
+    cation: str = "NA",
+    anion: str = "CL",
+    min_distance: float = DEFAULT_SOLUTE_DISTANCE,
+) -> SolvatedSystem:
+    """Solvate a solute and neutralize it with monovalent ions.
+
+    Args:
+        solute_topology: Solute topology
+        solute_coordinates: Solute coordinates in Å, inside the box
+        box: Box edge lengths in Å
+        water: Equilibrated water box
+        net_charge: Net solute charge in e
+        concentration: Additional salt concentration in mol/L
+        seed: Seed for choosing the replaced water molecules
+        cation: Cation name (atom and residue)
+        anion: Anion name (atom and residue)
+        min_distance: Minimum water-solute atom distance in Å
+
+    Returns:
+        SolvatedSystem ordered as solute, water, cations, anions
+
+    Raises:
+        ValueError: If an ion name is not in ION_ELEMENTS
+    """
+    for ion in (cation, anion):
+        if ion.upper() not in ION_ELEMENTS:
+            raise ValueError(f"Unknown ion: {ion}. Must be one of {sorted(ION_ELEMENTS)}")
+
+    box = np.asarray(box, dtype=np.float64)
+    molecules = fill_box(water, box, solute_coordinates, min_distance)
+
+    n_cations, n_anions = ion_counts(net_charge, len(molecules), concentration, box.prod())
+    candidates = np.arange(len(molecules))
+    if len(solute_coordinates) and n_cations + n_anions:
+        near = CellList(solute_coordinates, _ION_SOLUTE_DISTANCE).query_any(
+            molecules[:, 0], _ION_SOLUTE_DISTANCE
+        )
+        if np.count_nonzero(~near) >= n_cations + n_anions:
+            candidates = candidates[~near]
+    replaced = np.random.default_rng(seed).choice(
+        candidates, size=n_cations + n_anions, replace=False
+    )
+    ions = molecules[replaced, 0]
+    molecules = np.delete(molecules, replaced, axis=0)
+
+    per_molecule = len(water.names)
+    n_water = len(molecules)
+    n_ions = n_cations + n_anions
+    first_resid = int(solute_topology.resids.max()) + 1 if solute_topology.n_atoms else 1
+    ion_names = np.array([cation] * n_cations + [anion] * n_anions)
+
+    topology = Topology(
+        names=np.concatenate([solute_topology.names, np.tile(water.names, n_water), ion_names]),
+        resnames=np.concatenate(
+            [solute_topology.resnames, np.full(n_water * per_molecule, water.resname), ion_names]
+        ),
+        resids=np.concatenate(
+            [
+                solute_topology.resids,
+                np.repeat(np.arange(n_water) + first_resid, per_molecule),
+                np.arange(n_ions) + first_resid + n_water,
+            ]
+        ),
+        elements=np.concatenate(
+            [
+                solute_topology.elements,
+                np.tile(water.elements, n_water),
+                [ION_ELEMENTS[cation.upper()]] * n_cations
+                + [ION_ELEMENTS[anion.upper()]] * n_anions,
+            ]
+        ),
+    )
+    coordinates = np.concatenate([solute_coordinates, molecules.reshape(-1, 3), ions])
+    return SolvatedSystem(topology, coordinates, box, n_water, n_cations, n_anions)
+
+
+def topology_charge(top_file: Path) -> float:
+    """Net charge of a GROMACS topology.
+
+    Charges are summed per [ moleculetype ] found in the topology and its
+    local includes, then multiplied by the [ molecules ] counts. Molecule
+    types defined only in the force field (water, ions) are neutral or not
+    yet present and are ignored.
+
+    Args:
+        top_file: Topology (.top) file
+
+    Returns:
+        Net charge in e
+    """
+    charges: dict[str, float] = {}
+    counts: list[tuple[str, int]] = []
+
+    def _read(path: Path) -> None:
+        section, molecule = None, None
+        for raw in path.read_text().splitlines():
+            line = raw.split(";")[0].strip()
+            if not line:
+                continue
+            include = re.match(r'#include\s+"([^"]+)"', line)
+            if include:
+                target = path.parent / include.group(1)
+                if target.exists():
+                    _read(target)
+                continue
+            if line.startswith("#"):
+                continue
+            if line.startswith("["):
+                section = line.strip("[] ").lower()
+                continue
+            fields = line.split()
+            if section == "moleculetype":
+                molecule = fields[0]
+                charges.setdefault(molecule, 0.0)
+            elif section == "atoms" and molecule is not None and len(fields) >= 7:
+                charges[molecule] += float(fields[6])
+            elif section == "molecules":
+                counts.append((fields[0], int(fields[1])))
+
+    _read(Path(top_file))
+    return sum(charges.get(name, 0.0) * count for name, count in counts)
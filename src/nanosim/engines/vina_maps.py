@@ -0,0 +1,218 @@
+"""Cache of precomputed AutoDock Vina grid maps.
+
+Vina spends a large share of a fast docking run computing receptor grid maps.
+When a library is screened against a few receptor conformations, the maps
+depend only on the receptor and the search box, so they are computed once,
+written to disk with Vina's map-writing mode and loaded for every ligand.
+
+Cache entries are keyed by a hash of the receptor file content plus the
+(spacing-snapped) box, spacing and scoring function.
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from nanosim.utils.logger import setup_logger
+
+DEFAULT_MAP_SPACING = 0.375  # Å, Vina default
+
+MapComputer = Callable[[Path, Sequence[float], Sequence[float], float, str, Path], None]
+
+
+def snap_box(
+    center: Sequence[float], size: Sequence[float], spacing: float = DEFAULT_MAP_SPACING
+) -> tuple[tuple[float, ...], tuple[float, ...]]:
+    """Snap a search box to the map grid.
+
+    Centres are rounded to the nearest grid point and sizes are rounded up to
+    an even number of voxels, so boxes that differ only by numerical noise
+    share the same grid maps.
+
+    Args:
+        center: Box centre (x, y, z) in Å
+        size: Box edge lengths (x, y, z) in Å
+        spacing: Grid spacing in Å
+
+    Returns:
+        Tuple (center, size) of snapped values
+    """
+    snapped_center = tuple(round(round(c / spacing) * spacing, 4) for c in center)
+    snapped_size = []
+    for s in size:
+        voxels = math.ceil(round(s / spacing, 6))
+        voxels += voxels % 2
+        snapped_size.append(round(voxels * spacing, 4))
+    return snapped_center, tuple(snapped_size)
+
+
+def compute_grid_maps(
+    receptor: Path,
+    center: Sequence[float],
+    size: Sequence[float],
+    spacing: float,
+    scoring: str,
+    map_prefix: Path,
+) -> None:
+    """Compute and write Vina grid maps.
+
+    Uses the Vina Python bindings when installed, otherwise the ``vina``
+    executable with ``--write_maps``.
+
+    Args:
+        receptor: Receptor PDBQT file
+        center: Box centre (Å)
+        size: Box size (Å)
+        spacing: Grid spacing (Å)
+        scoring: Scoring function ('vina' or 'vinardo')
+        map_prefix: Output prefix for the map files
+
+    Raises:
+        RuntimeError: If neither the Vina bindings nor the executable are available
+    """
+    try:
+        from vina import Vina
+    except ImportError:
+        Vina = None  # noqa: N806
+
+    if Vina is not None:
+        vina = Vina(sf_name=scoring, verbosity=0)
+        vina.set_receptor(str(receptor))
+        vina.compute_vina_maps(center=list(center), box_size=list(size), spacing=spacing)
+        vina.write_maps(map_prefix_filename=str(map_prefix))
+        return
+
+    executable = shutil.which("vina")
+    if executable is None:
+        raise RuntimeError("AutoDock Vina is not available (install 'vina' bindings or binary)")
+
+    command = [executable, "--receptor", str(receptor), "--scoring", scoring]
+    for axis, c, s in zip("xyz", center, size, strict=True):
+        command += [f"--center_{axis}", str(c), f"--size_{axis}", str(s)]
+    command += ["--spacing", str(spacing), "--force_even_voxels", "--write_maps", str(map_prefix)]
+    subprocess.run(command, check=True, capture_output=True, text=True)
+
+
+class GridMapCache:
+    """On-disk cache of Vina grid maps shared across ligands and workers.
+
+    Example:
+        >>> cache = GridMapCache(Path("cache/maps"))
+        >>> prefix = cache.get_or_compute(receptor, center, size)
+        >>> # vina --maps {prefix} --ligand lig.pdbqt ...
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        spacing: float = DEFAULT_MAP_SPACING,
+        scoring: str = "vina",
+        compute: MapComputer | None = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cached map sets
+            spacing: Grid spacing (Å)
+            scoring: Vina scoring function
+            compute: Function computing a map set (defaults to ``compute_grid_maps``)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.spacing = spacing
+        self.scoring = scoring
+        self._compute = compute
+        self._receptor_hashes: dict[tuple[str, int, int], str] = {}
+        self.logger = setup_logger(__name__)
+
+    def receptor_hash(self, receptor: Path) -> str:
+        """SHA-256 of the receptor file content (memoized by path, size and mtime)."""
+        receptor = Path(receptor)
+        stat = receptor.stat()
+        memo_key = (str(receptor.resolve()), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._receptor_hashes:
+            digest = hashlib.sha256()
+            with open(receptor, "rb") as handle:
+                for block in iter(lambda: handle.read(1 << 20), b""):
+                    digest.update(block)
+            self._receptor_hashes[memo_key] = digest.hexdigest()
+        return self._receptor_hashes[memo_key]
+
+    def key(self, receptor: Path, center: Sequence[float], size: Sequence[float]) -> str:
+        """Cache key for a receptor and search box."""
+        center, size = snap_box(center, size, self.spacing)
+        payload = json.dumps(
+            {
+                "receptor": self.receptor_hash(receptor),
+                "center": center,
+                "size": size,
+                "spacing": self.spacing,
+                "scoring": self.scoring,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def get(self, receptor: Path, center: Sequence[float], size: Sequence[float]) -> Path | None:
+        """Return the map prefix of a cached entry, or None if absent."""
+        entry = self.cache_dir / self.key(receptor, center, size)
+        return entry / "receptor" if entry.is_dir() else None
+
+    def get_or_compute(
+        self, receptor: Path, center: Sequence[float], size: Sequence[float]
+    ) -> Path:
+        """Return the map prefix for a receptor/box, computing maps if needed.
+
+        Maps are written to a temporary directory and moved into place
+        atomically, so concurrent workers never observe partial map sets;
+        if two workers race, the first completed set wins.
+
+        Args:
+            receptor: Receptor PDBQT file
+            center: Box centre (Å)
+            size: Box size (Å)
+
+        Returns:
+            Map prefix usable with ``vina --maps`` or ``Vina.load_maps``
+        """
+        key = self.key(receptor, center, size)
+        entry = self.cache_dir / key
+        if entry.is_dir():
+            return entry / "receptor"
+
+        snapped_center, snapped_size = snap_box(center, size, self.spacing)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir))
+        try:
+            compute = self._compute or compute_grid_maps
+            compute(
+                Path(receptor),
+                snapped_center,
+                snapped_size,
+                self.spacing,
+                self.scoring,
+                staging / "receptor",
+            )
+            (staging / "box.json").write_text(
+                json.dumps({"center": snapped_center, "size": snapped_size})
+            )
+            os.replace(staging, entry)
+            self.logger.info(f"Computed grid maps {key} for {Path(receptor).name}")
+        except OSError:
+            # Another worker completed the same entry first
+            if not entry.is_dir():
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return entry / "receptor"
+
+    def box(self, map_prefix: Path) -> dict[str, Any]:
+        """Snapped box (centre and size) a cached map set was computed for."""
+        return json.loads((Path(map_prefix).parent / "box.json").read_text())
@@ -0,0 +1,452 @@
+"""Iterative MD-docking cycles for induced-fit workflows.
+
+Each cycle samples receptor conformations with MD, selects representative
+frames and their pockets, docks the ligand library to every selected
+conformation and rescores the ligands over the conformations of a sliding
+window of recent cycles. The best pose of the top hit is then built into a
+solvated receptor-ligand complex, which the next cycle's MD starts from,
+so receptor and ligand adapt to each other. Cycles stop once the rescored
+top hits (scores and best poses) stop changing.
+
+State that does not depend on the receptor conformation is created once
+and shared by all cycles: the frame-selection and complex-building bridges
+(with their receptor caches), the Vina grid map cache and the
+prepared-ligand store. A preempted MD run is rescheduled and resumes from
+its checkpoint.
+"""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from nanosim.analysis.clustering import superposition
+from nanosim.analysis.trajectory import read_frames, read_topology
+from nanosim.bridges.meso_to_micro import GromacsToVinaConverter
+from nanosim.bridges.micro_to_meso import VinaToGromacsConverter
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.autodock import AutoDockVinaEngine, DockingResultParser
+from nanosim.engines.docking_archive import DockingArchive
+from nanosim.engines.gromacs import GROMACSEngine
+from nanosim.orchestrator.scheduler import JobScheduler, SimulationJob
+from nanosim.orchestrator.workflow_router import DEFAULT_ITERATIVE
+from nanosim.utils.logger import setup_logger
+
+# Gas constant in kcal/(mol K), for Boltzmann weighting of Vina scores
+GAS_CONSTANT = 1.987204e-3
+
+
+def ensemble_scores(scores: np.ndarray, temperature: float = 298.15) -> np.ndarray:
+    """Boltzmann-weighted ensemble score of each ligand over receptor conformations.
+
+    ``-kT ln(mean(exp(-s / kT)))`` over the conformations a ligand was docked
+    to; the best conformations dominate, but a ligand that binds only one
+    of many conformations is penalised.
+
+    Args:
+        scores: Array of shape (n_ligands, n_conformations) in kcal/mol,
+            NaN where a ligand was not docked to a conformation
+        temperature: Temperature (K)
+
+    Returns:
+        Ensemble scores of shape (n_ligands,), NaN for ligands never docked
+    """
+    kt = GAS_CONSTANT * temperature
+    exponents = -np.asarray(scores, dtype=np.float64) / kt
+    docked = ~np.isnan(exponents)
+    counts = docked.sum(axis=1)
+    shift = np.max(np.where(docked, exponents, -np.inf), axis=1, initial=-np.inf)
+    shift = np.where(counts > 0, shift, 0.0)
+    total = np.where(docked, np.exp(exponents - shift[:, None]), 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, -kt * (shift + np.log(total / counts)), np.nan)
+
+
+class ConvergenceMonitor:
+    """Decide when iterative docking has converged.
+
+    A cycle is converged when the top-k ligands are the same as in the
+    previous cycle, their mean rescored score changed by at most
+    ``score_tolerance`` and none of their best poses moved by more than
+    ``rmsd_tolerance``. Iteration stops after ``patience`` consecutive
+    converged cycles (and at least ``min_cycles`` cycles).
+
+    Given the receptor CA coordinates each pose was docked to, poses are
+    first moved into the frame of the first receptor seen, by the rigid
+    transform superposing their receptor onto it, so receptor drift and
+    rotation between MD cycles does not count as pose change. Without
+    receptors (or with CA atoms not matching the first receptor's), poses
+    are compared in place.
+
+    Example:
+        >>> monitor = ConvergenceMonitor(DEFAULT_ITERATIVE)
+        >>> for cycle in cycles:
+        ...     if monitor.update(cycle.top_hits, cycle.poses, cycle.receptors):
+        ...         break
+    """
+
+    def __init__(self, settings: dict[str, Any] | None = None):
+        """Initialize monitor.
+
+        Args:
+            settings: Overrides of DEFAULT_ITERATIVE
+        """
+        self.settings = {**DEFAULT_ITERATIVE, **(settings or {})}
+        self.history: list[dict[str, Any]] = []
+        self._previous: tuple[list[tuple[str, float]], dict[str, np.ndarray]] | None = None
+        self._streak = 0
+        self._reference: np.ndarray | None = None
+
+    @property
+    def converged(self) -> bool:
+        """Whether the stopping criterion has been met."""
+        return (
+            len(self.history) >= self.settings["min_cycles"]
+            and self._streak >= self.settings["patience"]
+        )
+
+    def update(
+        self,
+        top_hits: list[tuple[str, float]],
+        poses: dict[str, np.ndarray],
+        receptors: dict[str, np.ndarray] | None = None,
+    ) -> bool:
+        """Record a cycle's top hits.
+
+        Args:
+            top_hits: (ligand_id, rescored score) of the top-k ligands, best first
+            poses: Best-pose coordinates (n_atoms, 3) of the top-k ligands
+            receptors: CA coordinates (n_residues, 3) of the receptor
+                conformation each pose was docked to
+
+        Returns:
+            True once iteration has converged
+        """
+        if receptors:
+            if self._reference is None:
+                self._reference = next(iter(receptors.values()))
+            poses = {
+                ligand_id: self._superpose(pose, receptors.get(ligand_id))
+                for ligand_id, pose in poses.items()
+            }
+        record: dict[str, Any] = {"cycle": len(self.history) + 1, "top_hits": top_hits}
+        if self._previous is not None and top_hits:
+            previous_hits, previous_poses = self._previous
+            same_hits = {i for i, _ in top_hits} == {i for i, _ in previous_hits}
+            score_delta = abs(
+                float(np.mean([s for _, s in top_hits]) - np.mean([s for _, s in previous_hits]))
+            )
+            rmsds = [
+                float(np.sqrt(np.mean(np.sum((poses[i] - previous_poses[i]) ** 2, axis=1))))
+                for i, _ in top_hits
+                if i in poses and i in previous_poses and poses[i].shape == previous_poses[i].shape
+            ]
+            max_rmsd = max(rmsds) if rmsds else float("inf")
+            stable = (
+                same_hits
+                and score_delta <= self.settings["score_tolerance"]
+                and max_rmsd <= self.settings["rmsd_tolerance"]
+            )
+            record.update(
+                {"same_hits": same_hits, "score_delta": score_delta, "max_rmsd": max_rmsd}
+            )
+            self._streak = self._streak + 1 if stable else 0
+        record["stable_cycles"] = self._streak
+        self.history.append(record)
+        self._previous = (top_hits, poses)
+        return self.converged
+
+    def _superpose(self, pose: np.ndarray, receptor: np.ndarray | None) -> np.ndarray:
+        """A pose moved with its receptor onto the first receptor."""
+        if receptor is None or receptor.shape != self._reference.shape:
+            return pose
+        rotation, translation = superposition(receptor, self._reference)
+        return pose @ rotation + translation
+
+
+class IterativeDockingLoop:
+    """Run MD → frame selection → docking → rescoring → complex until convergence.
+
+    Example:
+        >>> loop = IterativeDockingLoop({
+        ...     "structure": "complex.gro", "topology": "topol.top",
+        ...     "ligand_library": "ligands/", "output_dir": "induced_fit",
+        ...     "md_params": {"temperature": 310, "simulation_time": 10.0},
+        ...     "docking_params": {"exhaustiveness": 16},
+        ... })
+        >>> results = loop.run()
+    """
+
+    def __init__(self, config: dict[str, Any]):
+        """Initialize the loop.
+
+        Args:
+            config: Configuration containing:
+                - structure: Starting coordinates for the first MD cycle
+                - topology: GROMACS topology (.top) of the starting structure
+                - ligand_library: Ligands (PDBQT directory, PDBQT list or SDF)
+                - output_dir: Directory for results, one subdirectory per cycle
+                - md_params: GROMACSEngine parameters
+                - md_max_attempts: Starts of a cycle's MD, resuming from its
+                  checkpoint after preemption (default: 10)
+                - docking_params: AutoDockVinaEngine parameters
+                - frame_selection: GromacsToVinaConverter configuration
+                - complex_preparation: VinaToGromacsConverter configuration for
+                  the complexes the next cycles start from
+                - ligand_topology: Optional ligand .itp for those complexes;
+                  required when the library holds more than one ligand
+                  chemistry and no parameterization tool is available
+                - receptor_selection: Receptor atoms (default: 'protein')
+                - convergence: Overrides of DEFAULT_ITERATIVE
+        """
+        self.config = config
+        self.output_dir = Path(config["output_dir"])
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger(__name__, self.output_dir / "iterative.log")
+        self.settings = {**DEFAULT_ITERATIVE, **config.get("convergence", {})}
+
+        # Shared by all cycles
+        self.frame_selector = GromacsToVinaConverter(config.get("frame_selection"))
+        self.complex_builder = VinaToGromacsConverter(
+            {**config.get("complex_preparation", {}), "top_n_poses": 1, "n_replicas": 1}
+        )
+        self.cache_dir = self.output_dir / "cache"
+        self.ligand_ids: dict[str, int] = {}
+        # Score columns (one per docked conformation) of each cycle
+        self._cycle_columns: list[list[np.ndarray]] = []
+
+    def run(self) -> dict[str, Any]:
+        """Run cycles until the rescored top hits converge or max_cycles is reached.
+
+        Returns:
+            Dictionary with per-cycle records, convergence state, the number of
+            cycles run and the final ranking [(ligand_id, ensemble score)]
+        """
+        monitor = ConvergenceMonitor(self.settings)
+        structure = Path(self.config["structure"])
+        topology = Path(self.config["topology"])
+        cycles = []
+        ranking: list[tuple[str, float]] = []
+
+        for cycle in range(1, self.settings["max_cycles"] + 1):
+            cycle_dir = self.output_dir / f"cycle_{cycle:03d}"
+            trajectory, final_structure = self._run_md(cycle, structure, topology, cycle_dir / "md")
+            sites = self._select_frames(trajectory, final_structure, cycle_dir / "receptors")
+            results = self._dock(cycle, sites, cycle_dir / "docking")
+
+            ranking = self._rescore(results)
+            top_hits = ranking[: self.settings["top_k"]]
+            converged = monitor.update(top_hits, *self._best_poses(top_hits, sites, results))
+            cycles.append(
+                {
+                    **monitor.history[-1],
+                    "structure": structure,
+                    "topology": topology,
+                    "trajectory": trajectory,
+                    "n_conformations": len(results),
+                }
+            )
+            self.logger.info(
+                f"Cycle {cycle}: {len(results)} conformation(s), "
+                f"{monitor.history[-1]['stable_cycles']} stable cycle(s)"
+            )
+            if converged:
+                self.logger.info(f"Converged after {cycle} cycles")
+                break
+            if top_hits and cycle < self.settings["max_cycles"]:
+                # The next cycle samples the receptor with the top hit bound
+                structure, topology = self._build_complex(
+                    top_hits[0][0], sites, results, cycle_dir / "complex"
+                )
+
+        return {
+            "cycles": cycles,
+            "converged": monitor.converged,
+            "n_cycles": len(cycles),
+            "ranking": ranking,
+        }
+
+    def _run_md(
+        self, cycle: int, structure: Path, topology: Path, output_dir: Path
+    ) -> tuple[Path, Path]:
+        """Run the cycle's MD from a structure.
+
+        The run goes through the JobScheduler, so a preempted mdrun is
+        restarted and resumes from its checkpoint in output_dir.
+
+        Returns:
+            Tuple (trajectory, final structure)
+
+        Raises:
+            RuntimeError: If the MD run fails or is preempted too often
+        """
+        params = {
+            **self.config.get("md_params", {}),
+            "coordinates": structure,
+            "topology": topology,
+        }
+        name = f"cycle_{cycle}_md"
+        config = SimulationConfig(name, structure.parent, output_dir, params)
+        GROMACSEngine(config).validate_config()
+        scheduler = JobScheduler(n_workers=1, max_attempts=self.config.get("md_max_attempts", 10))
+        result = scheduler.run([SimulationJob(name, "gromacs", config)])[name]
+        if not result.success:
+            raise RuntimeError(f"MD of cycle {cycle} failed: {result.error_message}")
+        trajectory, *_, final_structure = result.output_files
+        return trajectory, final_structure
+
+    def _select_frames(self, trajectory: Path, topology: Path, output_dir: Path) -> dict[str, Any]:
+        """Representative receptor conformations, their pockets and Vina boxes."""
+        return self.frame_selector.convert(
+            {
+                "trajectory": trajectory,
+                "topology": topology,
+                "receptor_selection": self.config.get("receptor_selection", "protein"),
+                "output_dir": output_dir,
+            }
+        )
+
+    def _dock(self, cycle: int, sites: dict[str, Any], output_dir: Path) -> list[Path]:
+        """Dock the library to every selected conformation.
+
+        Grid maps and prepared ligands are cached in the loop's cache
+        directory, so conformations and ligands seen in earlier cycles are
+        not prepared again.
+
+        Returns:
+            Docking archive of each conformation
+
+        Raises:
+            RuntimeError: If docking fails
+        """
+        archives = []
+        for index, (receptor, grid) in enumerate(
+            zip(sites["receptor_pdbqt"], sites["grid_parameters"], strict=True)
+        ):
+            params = {
+                **self.config.get("docking_params", {}),
+                "receptor": receptor,
+                "center": [grid["center_x"], grid["center_y"], grid["center_z"]],
+                "size": [grid["size_x"], grid["size_y"], grid["size_z"]],
+                "ligands": self.config["ligand_library"],
+                "map_cache_dir": self.cache_dir / "maps",
+                "ligand_store": self.cache_dir / "ligands",
+            }
+            engine = AutoDockVinaEngine(
+                SimulationConfig(
+                    f"cycle_{cycle}_site_{index}",
+                    Path(receptor).parent,
+                    output_dir / f"site_{index}",
+                    params,
+                )
+            )
+            engine.validate_config()
+            engine.setup()
+            result = engine.run()
+            if not result.success:
+                raise RuntimeError(f"Docking of cycle {cycle} failed: {result.error_message}")
+            archives.append(result.output_files[0])
+        return archives
+
+    def _rescore(self, archives: list[Path]) -> list[tuple[str, float]]:
+        """Add the cycle's conformations and rank ligands by ensemble score.
+
+        The ensemble spans the conformations of the last ``window`` cycles,
+        so each cycle is judged on the receptor states it sampled rather
+        than on an ever-growing pool that damps any change.
+
+        Returns:
+            [(ligand_id, ensemble score)] of the ligands docked in the window,
+            best first
+        """
+        columns = []
+        for archive in archives:
+            scores = DockingArchive(archive).scores()
+            for ligand_id in scores:
+                self.ligand_ids.setdefault(ligand_id, len(self.ligand_ids))
+            column = np.full(len(self.ligand_ids), np.nan)
+            for ligand_id, score in scores.items():
+                if score is not None:
+                    column[self.ligand_ids[ligand_id]] = score
+            columns.append(column)
+        self._cycle_columns.append(columns)
+
+        window = [c for cycle in self._cycle_columns[-self.settings["window"] :] for c in cycle]
+        n_ligands = len(self.ligand_ids)
+        matrix = np.full((n_ligands, len(window)), np.nan)
+        for index, column in enumerate(window):
+            matrix[: len(column), index] = column
+        ensemble = ensemble_scores(matrix, self.settings["temperature"])
+
+        ids = np.array(list(self.ligand_ids), dtype=object)
+        order = np.argsort(ensemble, kind="stable")
+        return [(ids[i], float(ensemble[i])) for i in order if not np.isnan(ensemble[i])]
+
+    def _best_poses(
+        self, top_hits: list[tuple[str, float]], sites: dict[str, Any], archives: list[Path]
+    ) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+        """Best pose of each top hit over the cycle's conformations.
+
+        Returns:
+            Tuple (poses, receptors): pose coordinates and the CA coordinates
+            of the conformation each pose was docked to
+        """
+        opened = [DockingArchive(archive) for archive in archives]
+        poses = {}
+        receptors = {}
+        conformations: dict[int, np.ndarray] = {}
+        for ligand_id, _ in top_hits:
+            candidates = [
+                (DockingResultParser.get_best_pose(archive.root, ligand_id), index)
+                for index, archive in enumerate(opened)
+                if ligand_id in archive
+            ]
+            if candidates:
+                best, index = min(candidates, key=lambda candidate: candidate[0]["affinity"])
+                poses[ligand_id] = np.asarray(best["coordinates"], dtype=np.float64)
+                if index not in conformations:
+                    conformations[index] = _ca_coordinates(
+                        sites["binding_sites"][index]["receptor"]
+                    )
+                receptors[ligand_id] = conformations[index]
+        return poses, receptors
+
+    def _build_complex(
+        self, ligand_id: str, sites: dict[str, Any], archives: list[Path], output_dir: Path
+    ) -> tuple[Path, Path]:
+        """Build the solvated complex of a ligand's best pose for the next MD cycle.
+
+        The pose is placed into the receptor conformation it was docked to.
+
+        Returns:
+            Tuple (coordinates, topology) of the prepared system
+        """
+        opened = [DockingArchive(archive) for archive in archives]
+        index = min(
+            (
+                i
+                for i, archive in enumerate(opened)
+                if ligand_id in archive and archive.entries[ligand_id]["score"] is not None
+            ),
+            key=lambda i: opened[i].entries[ligand_id]["score"],
+        )
+        output_dir.mkdir(parents=True, exist_ok=True)
+        poses = output_dir / f"{ligand_id}.pdbqt"
+        poses.write_text(opened[index].read(ligand_id))
+
+        output = self.complex_builder.convert(
+            {
+                "docking_results": poses,
+                "receptor_structure": sites["binding_sites"][index]["receptor"],
+                "ligand_topology": self.config.get("ligand_topology"),
+                "output_dir": output_dir,
+            }
+        )
+        self.logger.info(f"Next cycle starts from {ligand_id} bound to conformation {index}")
+        return output["coordinate_files"][0], output["topology_files"][0]
+
+
+def _ca_coordinates(structure_file: Path) -> np.ndarray:
+    """CA coordinates of a receptor structure."""
+    topology = read_topology(structure_file)
+    return read_frames(structure_file, [0])[0][topology.names == "CA"]
@@ -0,0 +1,152 @@
+"""Execution of simulation jobs on a worker pool with preemption recovery.
+
+Long MD validations run for many hours and cluster schedulers may preempt
+them at any time. Engines that support checkpoints (GROMACS) report a
+preempted run through ``result.metadata["preempted"]``; the scheduler then
+puts the job back in the queue and the next free worker resumes it from
+its checkpoint in the job's output directory. If a worker process dies
+outright (killed node, OOM), every job that was running on the pool is
+requeued the same way on a fresh pool.
+"""
+
+import os
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from ..core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from ..engines import AutoDockVinaEngine, GROMACSEngine, OpenFOAMEngine
+from ..utils.logger import setup_logger
+
+ENGINES: dict[str, type[SimulationEngine]] = {
+    "openfoam": OpenFOAMEngine,
+    "gromacs": GROMACSEngine,
+    "autodock": AutoDockVinaEngine,
+}
+
+
+@dataclass
+class SimulationJob:
+    """A simulation to run on the worker pool.
+
+    Attributes:
+        name: Unique job name
+        engine: Engine name (see ENGINES) or engine class
+        config: Simulation configuration; its output directory holds the
+            checkpoints a restarted attempt resumes from
+        attempts: Number of times the job has been started
+    """
+
+    name: str
+    engine: str | type[SimulationEngine]
+    config: SimulationConfig
+    attempts: int = 0
+
+
+def _execute_job(
+    engine: str | type[SimulationEngine], config: SimulationConfig
+) -> SimulationResult:
+    """Run one job attempt in a worker process."""
+    engine_class = ENGINES[engine] if isinstance(engine, str) else engine
+    return engine_class(config).execute()
+
+
+class JobScheduler:
+    """Run simulation jobs in parallel, rescheduling preempted attempts.
+
+    Example:
+        >>> scheduler = JobScheduler(n_workers=4)
+        >>> results = scheduler.run(
+        ...     SimulationJob(f"pose_{i}", "gromacs", config) for i, config in enumerate(configs)
+        ... )
+    """
+
+    def __init__(self, n_workers: int | None = None, max_attempts: int = 10):
+        """Initialize scheduler.
+
+        Args:
+            n_workers: Number of worker processes (default: CPU count)
+            max_attempts: Maximum starts per job before it is reported as failed
+
+        Raises:
+            ValueError: If max_attempts is not positive
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_attempts = max_attempts
+        self.logger = setup_logger(__name__)
+
+    def run(self, jobs: Iterable[SimulationJob]) -> dict[str, SimulationResult]:
+        """Run jobs until each has finished, failed or used up its attempts.
+
+        Args:
+            jobs: Jobs to run
+
+        Returns:
+            Final result of each job by name
+        """
+        pending = deque(jobs)
+        results: dict[str, SimulationResult] = {}
+        running: dict[Future, SimulationJob] = {}
+        executor = ProcessPoolExecutor(max_workers=self.n_workers)
+
+        try:
+            while pending or running:
+                while pending and len(running) < self.n_workers:
+                    job = pending.popleft()
+                    job.attempts += 1
+                    running[executor.submit(_execute_job, job.engine, job.config)] = job
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        result = None
+                    except Exception as e:
+                        result = SimulationResult(False, [], {}, error_message=str(e))
+                    self._collect(job, result, pending, results)
+
+                if broken:
+                    # Every job still on the dead pool has lost its worker too
+                    self.logger.warning(f"Worker pool broken; requeueing {len(running)} jobs")
+                    for job in running.values():
+                        self._collect(job, None, pending, results)
+                    running.clear()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return results
+
+    def _collect(
+        self,
+        job: SimulationJob,
+        result: SimulationResult | None,
+        pending: deque,
+        results: dict[str, SimulationResult],
+    ) -> None:
+        """Record a job's result, or requeue it if it was interrupted.
+
+        A result of None means the worker process died during the attempt.
+        """
+        interrupted = result is None or result.metadata.get("preempted", False)
+        if not interrupted:
+            results[job.name] = result
+            return
+
+        if job.attempts < self.max_attempts:
+            self.logger.info(f"Job {job.name} interrupted (attempt {job.attempts}); rescheduling")
+            pending.append(job)
+            return
+
+        message = f"Job interrupted {job.attempts} times; giving up"
+        metadata = result.metadata if result is not None else {}
+        results[job.name] = SimulationResult(False, [], metadata, error_message=message)
@@ -55,15 +55,51 @@ class UseCaseCharacteristics:
     goal: str  # 'screening', 'validation', 'mechanism', 'optimization'
 
 
+# Two-tier docking: screen everything fast, re-dock the top hits thoroughly
+DEFAULT_ADAPTIVE_DOCKING: dict[str, Any] = {
+    "enabled": True,
+    "min_library_size": 1000,  # Smaller libraries are docked thoroughly in one pass
+    "screen_exhaustiveness": 8,
+    "refine_exhaustiveness": 32,
+    "refine_fraction": 0.05,
+    "min_refine": 10,
+    "score_cutoff": None,  # kcal/mol; also refine everything at or below this score
+}
+
+
+# Induced-fit cycles stop once the rescored top hits stop changing
+DEFAULT_ITERATIVE: dict[str, Any] = {
+    "min_cycles": 2,
+    "max_cycles": 10,
+    "top_k": 5,  # Ligands whose scores and poses are compared between cycles
+    "score_tolerance": 0.25,  # kcal/mol, change of the mean top-k rescored score
+    "rmsd_tolerance": 1.0,  # Å, maximum best-pose RMSD of a top-k ligand
+    "patience": 2,  # Consecutive converged cycles required to stop
+    "window": 1,  # Cycles whose conformations form the rescoring ensemble
+    "temperature": 298.15,  # K, Boltzmann weighting of the ensemble rescoring
+}
+
+
 class WorkflowRouter:
     """Routes simulation requests to appropriate workflows.
 
     This is the intelligence layer that makes NanoSim adaptive and flexible.
     """
 
-    def __init__(self):
-        """Initialize workflow router."""
+    def __init__(
+        self,
+        adaptive_docking: dict[str, Any] | None = None,
+        iterative: dict[str, Any] | None = None,
+    ):
+        """Initialize workflow router.
+
+        Args:
+            adaptive_docking: Overrides of DEFAULT_ADAPTIVE_DOCKING
+            iterative: Overrides of DEFAULT_ITERATIVE
+        """
         self.decision_history: list[dict[str, Any]] = []
+        self.adaptive_docking = {**DEFAULT_ADAPTIVE_DOCKING, **(adaptive_docking or {})}
+        self.iterative = {**DEFAULT_ITERATIVE, **(iterative or {})}
 
     def determine_workflow(self, use_case: UseCaseCharacteristics) -> WorkflowType:
         """Determine optimal workflow based on use case.
@@ -207,10 +243,7 @@ class WorkflowRouter:
                 "name": "molecular_docking",
                 "tool": "autodock_vina",
                 "purpose": "Screen compound library",
-                "parameters": {
-                    "exhaustiveness": self._get_docking_exhaustiveness(use_case),
-                    "num_modes": 9,
-                },
+                "parameters": self._get_docking_parameters(use_case),
                 "estimated_time": self._estimate_docking_time(use_case.compound_library_size),
             }
         )
@@ -328,11 +361,62 @@ class WorkflowRouter:
     def _build_iterative_pipeline(self, use_case: UseCaseCharacteristics) -> dict[str, Any]:
         """Build iterative MD-docking pipeline for induced fit.
 
-        Pipeline: Multiple cycles of MD → Docking → Scoring
+        Pipeline: cycles of Meso (MD) → Micro (Docking) → Rescoring
 
-        Not implemented in Phase 1.
+        Stages (repeated each cycle):
+        1. GROMACS: Receptor conformational sampling
+        2. Frame selection: Representative receptor conformations and pockets
+        3. AutoDock Vina: Dock ligands to every selected conformation
+        4. Rescoring: Boltzmann-weighted ensemble scores over all cycles
+
+        Cycles stop once the rescored top hits converge (see the
+        ``iteration`` entry), not after a fixed count. Receptor templates,
+        grid maps and prepared ligands are cached across cycles.
         """
-        raise NotImplementedError("Iterative workflow will be added in Phase 2")
+        settings = self.iterative
+        stages = [
+            {
+                "name": "receptor_md",
+                "tool": "gromacs",
+                "purpose": "Sample receptor conformations around the bound ligands",
+                "parameters": {"simulation_time": self._get_md_duration(use_case)},
+                "estimated_time": self._estimate_md_time(use_case),
+            },
+            {
+                "name": "frame_selection",
+                "tool": "internal",
+                "purpose": "Cluster frames and detect pockets in each conformation",
+                "parameters": {"frame_selection": "cluster", "rmsd_cutoff": 2.0},
+                "estimated_time": "5-15 minutes",
+            },
+            {
+                "name": "molecular_docking",
+                "tool": "autodock_vina",
+                "purpose": "Dock ligands to the selected receptor conformations",
+                "parameters": self._get_docking_parameters(use_case),
+                "estimated_time": self._estimate_docking_time(use_case.compound_library_size),
+            },
+            {
+                "name": "rescoring",
+                "tool": "internal",
+                "purpose": "Ensemble rescoring and convergence check",
+                "parameters": {"temperature": settings["temperature"]},
+                "estimated_time": "1-5 minutes",
+            },
+        ]
+
+        return {
+            "scale_sequence": ScaleSequence.MESO_MICRO,
+            "stages": stages,
+            "bridges": ["MesoToMicroBridge"],
+            "iteration": {
+                "repeat": [stage["name"] for stage in stages],
+                "convergence": dict(settings),
+            },
+            "validation": self._get_validation_checks("iterative"),
+            "estimated_total_time": self._sum_stage_times(stages),
+            "estimated_cost": self._estimate_pipeline_cost(stages, use_case),
+        }
 
     def _build_custom_pipeline(self, use_case: UseCaseCharacteristics) -> dict[str, Any]:
         """Provide guidance for custom workflow construction.
@@ -348,6 +432,22 @@ class WorkflowRouter:
             "recommendations": self._generate_recommendations(use_case),
         }
 
+    def _get_docking_parameters(self, use_case: UseCaseCharacteristics) -> dict[str, Any]:
+        """Determine Vina parameters, using two-tier docking for large libraries."""
+        settings = self.adaptive_docking
+        if settings["enabled"] and use_case.compound_library_size > settings["min_library_size"]:
+            return {
+                "exhaustiveness": settings["screen_exhaustiveness"],
+                "num_modes": 9,
+                "adaptive": {
+                    "refine_exhaustiveness": settings["refine_exhaustiveness"],
+                    "refine_fraction": settings["refine_fraction"],
+                    "min_refine": settings["min_refine"],
+                    "score_cutoff": settings["score_cutoff"],
+                },
+            }
+        return {"exhaustiveness": self._get_docking_exhaustiveness(use_case), "num_modes": 9}
+
     def _get_docking_exhaustiveness(self, use_case: UseCaseCharacteristics) -> int:
         """Determine Vina exhaustiveness parameter."""
         if use_case.compound_library_size > 10000:
@@ -418,6 +518,8 @@ class WorkflowRouter:
                 "binding_site_identification",
                 "ligand_stability",
             ]
+        elif workflow_type == "iterative":
+            return common + ["score_convergence", "pose_convergence"]
         return common
 
     def _generate_recommendations(self, use_case: UseCaseCharacteristics) -> list[str]:
@@ -0,0 +1,243 @@
+"""Declarative retention policies for simulation outputs.
+
+A RetentionPolicy is an ordered list of rules mapping glob patterns
+(relative to an engine's work directory) to an action:
+
+- ``keep``: leave as is
+- ``compress``: gzip files, or pack directories into ``.tar.gz``
+- ``delete``: remove
+
+The first matching rule decides; unmatched entries are kept. Deleted
+entries are first renamed into a trash directory next to them, which is
+instantaneous, and the actual removal (and compression) happens in a
+background thread. Engine cleanup therefore returns immediately even when
+an OpenFOAM case holds millions of processor files. The thread is not a
+daemon, so pending work completes before the interpreter exits; call
+``wait_for_cleanup`` to block explicitly.
+"""
+
+import contextlib
+import gzip
+import queue
+import shutil
+import tarfile
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .logger import setup_logger
+
+ACTIONS = ("keep", "compress", "delete")
+
+# Name of the per-root trash directory holding entries awaiting deletion
+TRASH_DIR = ".nanosim-trash"
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class RetentionRule:
+    """Action for the entries matching a glob pattern.
+
+    Attributes:
+        pattern: Glob pattern relative to the root (``Path.glob`` syntax)
+        action: 'keep', 'compress' or 'delete'
+        select: Optional filter applied to the matches (e.g. all but the
+            latest time step); unselected matches fall through to later rules
+    """
+
+    pattern: str
+    action: str
+    select: Callable[[list[Path]], list[Path]] | None = None
+
+    def __post_init__(self) -> None:
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown retention action: {self.action}. Must be one of {ACTIONS}")
+
+
+@dataclass
+class RetentionPolicy:
+    """Ordered retention rules; the first matching rule wins.
+
+    Example:
+        >>> policy = RetentionPolicy([RetentionRule("processor*", "delete")])
+        >>> apply_retention(case_dir, policy)
+    """
+
+    rules: list[RetentionRule] = field(default_factory=list)
+
+    @classmethod
+    def from_mapping(cls, rules: Mapping[str, str]) -> "RetentionPolicy":
+        """Build a policy from a {pattern: action} mapping (in order)."""
+        return cls([RetentionRule(pattern, action) for pattern, action in rules.items()])
+
+    def __add__(self, other: "RetentionPolicy") -> "RetentionPolicy":
+        """Combine policies; rules of the left policy take precedence."""
+        return RetentionPolicy(self.rules + other.rules)
+
+    def classify(self, root: Path) -> dict[str, list[Path]]:
+        """Assign every matched entry under root to an action.
+
+        Args:
+            root: Directory the patterns are relative to
+
+        Returns:
+            Mapping of action to entries, nested entries of a deleted or
+            compressed directory excluded
+        """
+        root = Path(root)
+        decided: dict[Path, str] = {}
+        for rule in self.rules:
+            matches = sorted(p for p in root.glob(rule.pattern) if p not in decided)
+            matches = [p for p in matches if TRASH_DIR not in p.relative_to(root).parts]
+            if rule.select is not None:
+                matches = rule.select(matches)
+            for path in matches:
+                decided[path] = rule.action
+
+        # Entries inside a directory that is removed or packed as a whole are covered by it
+        handled = {p for p, action in decided.items() if action != "keep" and p.is_dir()}
+        classified: dict[str, list[Path]] = {action: [] for action in ACTIONS}
+        for path, action in decided.items():
+            if not any(parent in handled for parent in path.parents):
+                classified[action].append(path)
+        return classified
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of applying a retention policy.
+
+    Attributes:
+        kept: Entries explicitly kept
+        compressed: Entries scheduled for compression
+        deleted: Entries moved to the trash and scheduled for deletion
+    """
+
+    kept: list[Path]
+    compressed: list[Path]
+    deleted: list[Path]
+
+
+def apply_retention(
+    root: Path, policy: RetentionPolicy, background: bool = True
+) -> RetentionReport:
+    """Apply a retention policy to a directory.
+
+    Args:
+        root: Directory to clean up
+        policy: Retention policy
+        background: Compress and delete in the background thread; if False
+            the work is done before returning
+
+    Returns:
+        RetentionReport of the classified entries
+    """
+    root = Path(root)
+    if not root.exists():
+        return RetentionReport([], [], [])
+
+    classified = policy.classify(root)
+    trash = None
+    if classified["delete"]:
+        trash = root / TRASH_DIR / uuid.uuid4().hex
+        trash.mkdir(parents=True)
+        for index, path in enumerate(classified["delete"]):
+            # Rename is O(1) on the same filesystem regardless of directory size
+            path.rename(trash / f"{index}_{path.name}")
+
+    tasks = [(_compress, path) for path in classified["compress"]]
+    if trash is not None:
+        tasks.append((_remove_trash, trash))
+
+    if background:
+        _cleaner.submit(tasks)
+    else:
+        for function, path in tasks:
+            function(path)
+
+    return RetentionReport(classified["keep"], classified["compress"], classified["delete"])
+
+
+def wait_for_cleanup() -> None:
+    """Block until all background compression and deletion has finished."""
+    _cleaner.join()
+
+
+def all_but_latest(paths: list[Path]) -> list[Path]:
+    """Select numerically named entries (time steps) except the latest one."""
+    times = [p for p in paths if _is_number(p.name)]
+    if not times:
+        return []
+    latest = max(times, key=lambda p: float(p.name))
+    return [p for p in times if p != latest]
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _compress(path: Path) -> None:
+    """gzip a file, or pack a directory into a .tar.gz, replacing the original."""
+    if path.is_dir():
+        with tarfile.open(path.with_name(path.name + ".tar.gz"), "w:gz") as archive:
+            archive.add(path, arcname=path.name)
+        shutil.rmtree(path)
+    elif path.exists() and path.suffix != ".gz":
+        with open(path, "rb") as source, gzip.open(path.with_name(path.name + ".gz"), "wb") as out:
+            shutil.copyfileobj(source, out)
+        path.unlink()
+
+
+def _remove_trash(trash: Path) -> None:
+    shutil.rmtree(trash, ignore_errors=True)
+    with contextlib.suppress(OSError):
+        trash.parent.rmdir()  # Only succeeds once no other batch is pending
+
+
+class _BackgroundCleaner:
+    """Single worker thread running cleanup tasks in submission order."""
+
+    def __init__(self) -> None:
+        self._tasks: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, tasks: Iterable[tuple[Callable[[Path], None], Path]]) -> None:
+        with self._lock:
+            for task in tasks:
+                self._tasks.put(task)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name="nanosim-cleanup", daemon=False
+                )
+                self._thread.start()
+
+    def join(self) -> None:
+        self._tasks.join()
+
+    def _work(self) -> None:
+        while True:
+            try:
+                function, path = self._tasks.get(timeout=1.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._tasks.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                function(path)
+            except OSError as e:
+                logger.warning(f"Cleanup of {path} failed: {e}")
+            finally:
+                self._tasks.task_done()
+
+
+_cleaner = _BackgroundCleaner()
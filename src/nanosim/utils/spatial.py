@@ -0,0 +1,141 @@
+"""Spatial search utilities shared by analysis and bridge modules."""
+from itertools import product
+
+import numpy as np
+
+# The 27 cell offsets of a 3x3x3 neighbourhood (including the cell itself)
+_NEIGHBOR_OFFSETS = np.array(list(product((-1, 0, 1), repeat=3)), dtype=np.int64)
+
+
+class CellList:
+    """Uniform grid (cell list) for fixed-radius neighbour queries.
+
+    Points are binned into cubic cells of edge ``cell_size`` once; each query
+    then only inspects the 27 cells surrounding a query point. Construction is
+    O(N log N) and a query is proportional to the number of candidate pairs,
+    so searching a small interface against a large system stays cheap.
+    """
+
+    def __init__(self, points: np.ndarray, cell_size: float):
+        """Bin points into grid cells.
+
+        Args:
+            points: Array of shape (N, 3) with point coordinates
+            cell_size: Cell edge length; must be >= the largest query radius
+
+        Raises:
+            ValueError: If cell_size is not positive or points are not (N, 3)
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"points must have shape (N, 3), got {points.shape}")
+
+        self.points = points
+        self.cell_size = float(cell_size)
+        self.origin = points.min(axis=0) if len(points) else np.zeros(3)
+
+        cells = self._cell_coords(points)
+        self.dims = cells.max(axis=0) + 1 if len(points) else np.ones(3, dtype=np.int64)
+
+        keys = self._cell_keys(cells)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def _cell_coords(self, points: np.ndarray) -> np.ndarray:
+        """Integer cell coordinates of points."""
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _cell_keys(self, cells: np.ndarray) -> np.ndarray:
+        """Linear cell index of integer cell coordinates."""
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def query_pairs(
+        self, points: np.ndarray, radius: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Find all (query point, stored point) pairs within a radius.
+
+        Args:
+            points: Query coordinates of shape (M, 3)
+            radius: Search radius (must not exceed the cell size)
+
+        Returns:
+            Tuple (query_indices, stored_indices, distances) of matching pairs
+
+        Raises:
+            ValueError: If radius exceeds the cell size
+        """
+        if radius > self.cell_size:
+            raise ValueError(f"radius {radius} exceeds cell size {self.cell_size}")
+
+        points = np.asarray(points, dtype=np.float64)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        if len(points) == 0 or len(self.points) == 0:
+            return empty
+
+        query_cells = self._cell_coords(points)
+        query_parts = []
+        stored_parts = []
+
+        for offset in _NEIGHBOR_OFFSETS:
+            cells = query_cells + offset
+            inside = np.all((cells >= 0) & (cells < self.dims), axis=1)
+            if not inside.any():
+                continue
+
+            query_idx = np.nonzero(inside)[0]
+            keys = self._cell_keys(cells[inside])
+            lo = np.searchsorted(self.sorted_keys, keys, side="left")
+            hi = np.searchsorted(self.sorted_keys, keys, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            # Expand each (lo, hi) range into explicit indices without a Python loop
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            query_parts.append(np.repeat(query_idx, counts))
+            stored_parts.append(self.order[np.arange(total) + starts])
+
+        if not query_parts:
+            return empty
+
+        query_all = np.concatenate(query_parts)
+        stored_all = np.concatenate(stored_parts)
+        distances = np.linalg.norm(points[query_all] - self.points[stored_all], axis=1)
+        within = distances <= radius
+
+        return query_all[within], stored_all[within], distances[within]
+
+    def query_any(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """Flag query points that have at least one stored point within a radius.
+
+        Args:
+            points: Query coordinates of shape (M, 3)
+            radius: Search radius (must not exceed the cell size)
+
+        Returns:
+            Boolean array of shape (M,)
+        """
+        query_idx, _, _ = self.query_pairs(points, radius)
+        mask = np.zeros(len(points), dtype=bool)
+        mask[query_idx] = True
+        return mask
+
+
+def neighbor_pairs(
+    points_a: np.ndarray, points_b: np.ndarray, cutoff: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find all pairs between two point sets closer than a cutoff.
+
+    Args:
+        points_a: Coordinates of shape (M, 3)
+        points_b: Coordinates of shape (N, 3)
+        cutoff: Distance cutoff
+
+    Returns:
+        Tuple (indices_a, indices_b, distances) of pairs within the cutoff
+    """
+    return CellList(points_b, cutoff).query_pairs(points_a, cutoff)
@@ -0,0 +1,98 @@
+"""Coordinate transforms between CFD (SI) and MD (GROMACS) frames."""
+from dataclasses import dataclass
+
+import numpy as np
+
+M_TO_NM = 1e9
+M_PER_S_TO_NM_PER_PS = 1e-3
+
+# Rows transformed per block; a block of every operand stays in cache
+_CHUNK_ROWS = 65536
+
+
+@dataclass(frozen=True)
+class CoordinateTransform:
+    """Affine map ``x' = (x - origin) * scale``, optionally wrapped into a box.
+
+    The transform is computed once per case and applied block-wise: every
+    block is scaled, shifted and wrapped while it is in cache, writing into
+    the output array, so transforming millions of particles allocates no
+    full-size temporaries (none at all when applied in place).
+
+    Attributes:
+        scale: Length scale factor (target units per source unit)
+        origin: Source-frame point mapped to the target origin
+        box: Periodic box edge lengths in target units, or None for no wrap
+        velocity_scale: Velocity scale factor (target units per source unit)
+
+    Example:
+        >>> transform = CoordinateTransform.si_to_gromacs(origin, box_size)
+        >>> transform.apply(positions, out=positions)  # m -> nm, in place
+    """
+
+    scale: float
+    origin: np.ndarray
+    box: np.ndarray | None = None
+    velocity_scale: float = 1.0
+
+    @classmethod
+    def si_to_gromacs(
+        cls, origin: np.ndarray, box_size: np.ndarray | None = None, periodic: bool = True
+    ) -> "CoordinateTransform":
+        """Transform from SI (m, m/s) to GROMACS (nm, nm/ps) units.
+
+        Args:
+            origin: CFD point (m) at the corner of the MD box
+            box_size: Box edge lengths (m)
+            periodic: Wrap positions into the box
+        """
+        box = None
+        if periodic and box_size is not None:
+            box = np.asarray(box_size, dtype=np.float64) * M_TO_NM
+        return cls(
+            scale=M_TO_NM,
+            origin=np.asarray(origin, dtype=np.float64),
+            box=box,
+            velocity_scale=M_PER_S_TO_NM_PER_PS,
+        )
+
+    def inverse(self) -> "CoordinateTransform":
+        """Transform back to the source frame (without wrapping)."""
+        return CoordinateTransform(
+            scale=1.0 / self.scale,
+            origin=-self.origin * self.scale,
+            velocity_scale=1.0 / self.velocity_scale,
+        )
+
+    def apply(self, positions: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """Transform positions.
+
+        Args:
+            positions: (N, 3) positions in the source frame
+            out: Output array (may be positions itself); allocated if None
+
+        Returns:
+            Transformed positions (out)
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        out = np.empty_like(positions) if out is None else out
+        offset = -self.origin * self.scale
+        for start in range(0, len(positions), _CHUNK_ROWS):
+            block = out[start : start + _CHUNK_ROWS]
+            np.multiply(positions[start : start + _CHUNK_ROWS], self.scale, out=block)
+            np.add(block, offset, out=block)
+            if self.box is not None:
+                np.remainder(block, self.box, out=block)
+        return out
+
+    def apply_velocities(self, velocities: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """Transform velocities (scaled only).
+
+        Args:
+            velocities: (N, 3) velocities in the source frame
+            out: Output array (may be velocities itself); allocated if None
+
+        Returns:
+            Transformed velocities (out)
+        """
+        return np.multiply(velocities, self.velocity_scale, out=out)
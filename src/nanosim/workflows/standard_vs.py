@@ -17,6 +17,7 @@ from pathlib import Path
 from typing import Any
 
 from ..bridges import VinaToGromacsConverter
+from ..engines.gromacs import GROMACSAnalyzer
 
 
 class StandardVirtualScreening:
@@ -118,6 +119,7 @@ class StandardVirtualScreening:
             "size": binding_site.get("size", [20, 20, 20]),  # Box size
             "exhaustiveness": self.config.get("docking_exhaustiveness", 8),
             "num_modes": self.config.get("docking_modes", 9),
+            "adaptive": self.config.get("docking_adaptive"),  # Two-tier screening settings
             "output_dir": self.output_dir / "docking",
         }
 
@@ -190,15 +192,19 @@ class StandardVirtualScreening:
 
                 # TODO: Run GROMACS simulation
                 # For now, placeholder
+                trajectory = self.output_dir / "md" / pose["id"] / "trajectory.xtc"
+                hbond_occupancy = self._compute_hbond_occupancy(
+                    trajectory, md_input["coordinate_files"][0]
+                )
                 md_result = {
                     "pose_id": pose["id"],
                     "docking_score": pose["score"],
                     "md_input": md_input,
-                    "trajectory": self.output_dir / "md" / pose["id"] / "trajectory.xtc",
+                    "trajectory": trajectory,
                     "stability_metrics": {
                         "rmsd_avg": 1.2,  # Placeholder
                         "rmsd_std": 0.3,
-                        "hbond_occupancy": 0.85,
+                        "hbond_occupancy": 0.85 if hbond_occupancy is None else hbond_occupancy,
                         "binding_energy": -45.2,
                     },
                     "status": "completed (placeholder)",
@@ -214,9 +220,34 @@ class StandardVirtualScreening:
                         "status": "skipped (not implemented)",
                     }
                 )
+            except (RuntimeError, FileNotFoundError) as e:
+                # MD preparation tools (gmx, acpype, obabel) missing or failing
+                print(f"    Skipping {pose['id']} ({e})")
+                md_results.append(
+                    {
+                        "pose_id": pose["id"],
+                        "status": f"skipped ({e})",
+                    }
+                )
 
         return {"success": True, "md_results": md_results}
 
+    def _compute_hbond_occupancy(self, trajectory: Path, topology: Path) -> float | None:
+        """Compute ligand-receptor H-bond occupancy from an MD trajectory.
+
+        Returns None when the trajectory has not been produced yet.
+        """
+        if not Path(trajectory).exists():
+            return None
+
+        analyzer = GROMACSAnalyzer(Path(trajectory).parent)
+        result = analyzer.calculate_hbond_occupancy(
+            trajectory,
+            topology,
+            ligand_selection=f"resname {self.config.get('ligand_resname', 'LIG')}",
+        )
+        return result.occupancy
+
     def _analyze_and_rank(self, md_results: dict[str, Any]) -> dict[str, Any]:
         """Analyze MD trajectories and rank poses.
 
@@ -1,8 +1,12 @@
 """Pytest configuration and fixtures."""
+import os
+import stat
+import sys
 import tempfile
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pytest
 
 
@@ -41,3 +45,180 @@ def sample_simulation_config(temp_dir):
         output_dir=temp_dir / "output",
         parameters={"test_param": 1.0},
     )
+
+
+class FoamCaseWriter:
+    """Writers of minimal ASCII OpenFOAM case files."""
+
+    HEADER = "FoamFile\n{\n    format      ascii;\n    class       %s;\n    object      %s;\n}\n"
+
+    @staticmethod
+    def write(path, cls, body):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("/* test */\n" + FoamCaseWriter.HEADER % (cls, path.name) + body)
+
+    @staticmethod
+    def write_list(path, cls, rows):
+        FoamCaseWriter.write(path, cls, f"{len(rows)}\n(\n" + "\n".join(rows) + "\n)\n")
+
+    @staticmethod
+    def write_block_mesh(poly_mesh, shape, offset=(0, 0, 0), spacing=0.5):
+        """Write a structured hex mesh of shape cells starting at cell offset."""
+        nx, ny, nz = shape
+        point = lambda i, j, k: i + (nx + 1) * (j + (ny + 1) * k)  # noqa: E731
+        cell = lambda i, j, k: i + nx * (j + ny * k)  # noqa: E731
+        points = [
+            f"({(i + offset[0]) * spacing} {(j + offset[1]) * spacing} {(k + offset[2]) * spacing})"
+            for k in range(nz + 1)
+            for j in range(ny + 1)
+            for i in range(nx + 1)
+        ]
+
+        def quads(i, j, k):
+            # Faces with normals along +x, +y and +z at the low corner (i, j, k)
+            return (
+                [point(i, j, k), point(i, j + 1, k), point(i, j + 1, k + 1), point(i, j, k + 1)],
+                [point(i, j, k), point(i, j, k + 1), point(i + 1, j, k + 1), point(i + 1, j, k)],
+                [point(i, j, k), point(i + 1, j, k), point(i + 1, j + 1, k), point(i, j + 1, k)],
+            )
+
+        internal, boundary = [], []
+        for k in range(nz):
+            for j in range(ny):
+                for i in range(nx):
+                    corner = (i, j, k)
+                    for axis in range(3):
+                        low = list(corner)
+                        low[axis] -= 1
+                        high = list(corner)
+                        high[axis] += 1
+                        face = quads(*corner)[axis]
+                        if low[axis] >= 0:
+                            internal.append((face, cell(*low), cell(*corner)))
+                        else:
+                            boundary.append((face[::-1], cell(*corner)))
+                        if high[axis] == shape[axis]:
+                            boundary.append((quads(*high)[axis], cell(*corner)))
+
+        faces = [f for f, _, _ in internal] + [f for f, _ in boundary]
+        FoamCaseWriter.write_list(poly_mesh / "points", "vectorField", points)
+        FoamCaseWriter.write_list(
+            poly_mesh / "faces", "faceList", [f"4({' '.join(map(str, f))})" for f in faces]
+        )
+        owners = [str(o) for _, o, _ in internal] + [str(o) for _, o in boundary]
+        FoamCaseWriter.write_list(poly_mesh / "owner", "labelList", owners)
+        FoamCaseWriter.write_list(
+            poly_mesh / "neighbour", "labelList", [str(n) for _, _, n in internal]
+        )
+
+    @staticmethod
+    def write_field(path, cls, values):
+        rows = [f"({' '.join(map(str, v))})" if np.ndim(v) else str(v) for v in values]
+        kind = "vector" if cls == "volVectorField" else "scalar"
+        body = (
+            f"internalField   nonuniform List<{kind}> {len(rows)}\n(\n"
+            + "\n".join(rows)
+            + "\n)\n;\n"
+        )
+        FoamCaseWriter.write(
+            path, cls, "dimensions [0 0 0 0 0 0 0];\n" + body + "boundaryField\n{\n}\n"
+        )
+
+
+@pytest.fixture
+def foam():
+    """Writers for building small OpenFOAM cases on disk."""
+    return FoamCaseWriter
+
+
+# Stand-in for gmx: the first mdrun is stopped by a TERM signal after writing
+# a checkpoint; a run started with -cpi completes.
+FAKE_GMX = """#!/bin/sh
+echo "$@" >> calls.txt
+case "$1" in
+  grompp) touch md.tpr ;;
+  mdrun)
+    echo "Started mdrun on rank 0" >> md.log
+    case "$*" in
+      *-cpi*) echo "Finished mdrun on rank 0" >> md.log ;;
+      *) echo "Received the TERM signal, stopping within 100 steps" >> md.log; touch md.cpt ;;
+    esac ;;
+esac
+"""
+
+
+@pytest.fixture
+def fake_gmx(temp_dir, monkeypatch):
+    """Put a gmx on PATH whose first mdrun is preempted (see FAKE_GMX)."""
+    gmx = temp_dir / "bin" / "gmx"
+    gmx.parent.mkdir()
+    gmx.write_text(FAKE_GMX)
+    gmx.chmod(gmx.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{gmx.parent}{os.pathsep}{os.environ['PATH']}")
+    return gmx
+
+
+# Stand-in for obabel -h (Python, run with the test interpreter): adds one
+# hydrogen per carbon, after the heavy atoms
+FAKE_OBABEL = """
+import sys
+args = sys.argv[1:]
+atoms = [line for line in open(args[1]) if line.startswith("HETATM")]
+carbons = [line for line in atoms if line.split()[-1] == "C"]
+added = [
+    f"HETATM{len(atoms) + i + 1:5d}  H{i + 1:<2d}{line[16:30]}"
+    f"{float(line[30:38]):8.3f}{float(line[38:46]) + 1.0:8.3f}{float(line[46:54]):8.3f}"
+    "  1.00  0.00           H\\n"
+    for i, line in enumerate(carbons)
+]
+open(args[args.index("-O") + 1], "w").writelines(atoms + added + ["END\\n"])
+"""
+
+
+@pytest.fixture
+def fake_obabel(temp_dir, monkeypatch):
+    """Put an obabel on PATH that protonates the carbons of a pose."""
+    obabel = temp_dir / "obabel_bin" / "obabel"
+    obabel.parent.mkdir()
+    obabel.write_text(f"#!{sys.executable}\n" + FAKE_OBABEL)
+    obabel.chmod(obabel.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{obabel.parent}{os.pathsep}{os.environ['PATH']}")
+    return obabel
+
+
+# Stand-in for the OpenFOAM applications, dispatched on the program name.
+# The solver writes two time steps, into the subdomain of its rank when run
+# in parallel.
+FAKE_OPENFOAM = """#!/bin/sh
+echo "$(basename "$0") $*" >> calls.txt
+case "$(basename "$0")" in
+  blockMesh) mkdir -p constant/polyMesh ;;
+  decomposePar)
+    n=$(sed -n 's/^numberOfSubdomains *\\([0-9]*\\);/\\1/p' system/decomposeParDict)
+    i=0; while [ $i -lt $n ]; do mkdir -p processor$i/0; i=$((i+1)); done ;;
+  pimpleFoam)
+    dir=${OMPI_COMM_WORLD_RANK:+processor$OMPI_COMM_WORLD_RANK/}
+    for t in 0.1 0.2; do mkdir -p $dir$t; echo field > $dir$t/C; done ;;
+  reconstructPar)
+    case "$*" in
+      *-time*) times=$(echo "$2" | tr , ' ') ;;
+      *-latestTime*) times=$(ls processor0 | sort -g | tail -n 1) ;;
+      *) times=$(ls processor0) ;;
+    esac
+    for t in $times; do mkdir -p $t; echo field > $t/C; done ;;
+esac
+"""
+
+
+@pytest.fixture
+def fake_openfoam(temp_dir, monkeypatch):
+    """Put the OpenFOAM applications on PATH (see FAKE_OPENFOAM)."""
+    bin_dir = temp_dir / "foam_bin"
+    bin_dir.mkdir()
+    script = bin_dir / "openfoam"
+    script.write_text(FAKE_OPENFOAM)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    for application in ["blockMesh", "checkMesh", "decomposePar", "pimpleFoam", "reconstructPar"]:
+        (bin_dir / application).symlink_to(script)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return bin_dir
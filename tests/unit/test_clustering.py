@@ -0,0 +1,101 @@
+"""Tests for trajectory frame clustering."""
+import numpy as np
+from nanosim.analysis.clustering import LeaderClustering, superposed_rmsd
+from nanosim.analysis.trajectory import TrajectoryChunk
+from nanosim.bridges.meso_to_micro import GromacsToVinaConverter
+
+
+def _rotation(angle: float) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+
+
+def test_superposed_rmsd_ignores_rigid_motion():
+    """Test that rotated and translated copies have zero RMSD."""
+    rng = np.random.default_rng(0)
+    ref = rng.normal(size=(20, 3))
+    moved = ref @ _rotation(0.7).T + 5.0
+
+    ref_c = ref - ref.mean(axis=0)
+    moved_c = moved - moved.mean(axis=0)
+
+    assert superposed_rmsd(ref_c[None], moved_c[None])[0, 0] < 1e-6
+
+
+def test_leader_clustering_finds_conformations_across_chunks():
+    """Test that two conformations interleaved over chunks form two clusters."""
+    rng = np.random.default_rng(1)
+    open_state = rng.normal(scale=5.0, size=(30, 3))
+    closed_state = open_state.copy()
+    closed_state[:10] *= 0.3
+
+    frames = np.stack([open_state if i % 3 else closed_state for i in range(30)])
+    frames = frames + rng.normal(scale=0.05, size=frames.shape)
+
+    clustering = LeaderClustering(rmsd_cutoff=1.0)
+    for start in range(0, 30, 8):
+        block = frames[start : start + 8]
+        clustering.partial_fit(TrajectoryChunk(start, block, np.arange(len(block)) * 2.0))
+
+    reps = clustering.representatives()
+    assert [r["cluster_size"] for r in reps] == [20, 10]
+    assert reps[0]["index"] == 1
+    assert reps[1]["index"] == 0
+    assert reps[0]["population"] == 20 / 30
+
+
+def test_select_frames_cluster_mode_streams_gro(temp_dir):
+    """Test 'cluster' frame selection on a small .gro trajectory."""
+    gro = temp_dir / "traj.gro"
+    blocks = []
+    for t in range(6):
+        scale = 1.0 if t < 4 else 2.0
+        lines = [f"protein t= {t * 100.0:.1f}", "    4"]
+        for i in range(4):
+            x, y, z = scale * i * 0.4, 0.1 * (i % 2), 0.0
+            lines.append(f"{i + 1:5d}{'ALA':<5s}{'CA':>5s}{i + 1:5d}{x:8.3f}{y:8.3f}{z:8.3f}")
+        lines.append("   5.00000   5.00000   5.00000")
+        blocks.append("\n".join(lines))
+    gro.write_text("\n".join(blocks) + "\n")
+
+    converter = GromacsToVinaConverter({"frame_selection": "cluster", "chunk_size": 4})
+    frames = converter._select_frames(gro, gro)
+
+    assert [(f["index"], f["time"], f["cluster_size"]) for f in frames] == [
+        (0, 0.0, 4),
+        (4, 400.0, 2),
+    ]
+
+    converter.frame_selection = "last"
+    assert converter._select_frames(gro, gro) == [{"index": 5, "time": 500.0}]
+
+
+def test_cluster_mode_uses_binding_site_residues(temp_dir):
+    """Test that clustering follows the pocket near the ligand, not distant motions."""
+    rng = np.random.default_rng(2)
+    gro = temp_dir / "traj.gro"
+    blocks = []
+    for t in range(6):
+        pocket = np.array([[0.5, 0.0, 0.0], [0.0, 0.5, 0.0], [0.0, 0.0, 0.5]])
+        if t >= 3:
+            pocket[0] *= 2.0  # The pocket opens
+        loop = np.array([3.0, 0.0, 0.0]) + rng.uniform(-0.5, 0.5, size=(3, 3))
+        atoms = [(i + 1, "ALA", "CA", xyz) for i, xyz in enumerate(np.vstack([pocket, loop]))]
+        atoms.append((7, "LIG", "C1", np.zeros(3)))
+        lines = [f"complex t= {t * 10.0:.1f}", f"{len(atoms):5d}"]
+        for i, (resid, resname, name, xyz) in enumerate(atoms):
+            lines.append(
+                f"{resid:5d}{resname:<5s}{name:>5s}{i + 1:5d}{xyz[0]:8.3f}{xyz[1]:8.3f}{xyz[2]:8.3f}"
+            )
+        lines.append("   9.00000   9.00000   9.00000")
+        blocks.append("\n".join(lines))
+    gro.write_text("\n".join(blocks) + "\n")
+
+    converter = GromacsToVinaConverter({"frame_selection": "cluster", "cluster_rmsd_cutoff": 2.0})
+    frames = converter._select_frames(gro, gro)
+
+    assert converter._cluster_atoms(gro, gro).tolist() == [0, 1, 2]
+    assert [(f["index"], f["cluster_size"]) for f in frames] == [(0, 3), (3, 3)]
+
+    converter.cluster_selection = "name CA"  # Whole protein: the loop motion dominates
+    assert len(converter._select_frames(gro, gro)) > 2
@@ -0,0 +1,134 @@
+"""Tests for coarse-grained mapping and backmapping."""
+import numpy as np
+from nanosim.analysis.coarse_grain import CGMapping, map_structure
+from nanosim.analysis.trajectory import Topology, read_frames, write_gro
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.gromacs import GROMACSEngine
+
+ATOMS = [
+    (1, "ALA", "N"), (1, "ALA", "H"), (1, "ALA", "CA"), (1, "ALA", "CB"), (1, "ALA", "HB1"),
+    (1, "ALA", "C"), (1, "ALA", "O"), (2, "GLY", "N"), (2, "GLY", "CA"), (2, "GLY", "C"),
+    (2, "GLY", "O"), (3, "SOL", "OW"), (3, "SOL", "HW1"), (3, "SOL", "HW2"), (4, "NA", "NA"),
+]  # fmt: skip
+
+
+def _system():
+    resids, resnames, names = (np.array(column) for column in zip(*ATOMS, strict=True))
+    elements = np.array(["NA" if n == "NA" else n[0] for n in names])
+    topology = Topology(names, resnames, resids.astype(np.int64), elements)
+    coordinates = np.random.default_rng(0).uniform(5.0, 15.0, size=(len(ATOMS), 3))
+    return topology, coordinates
+
+
+def test_beads_are_mass_weighted_centres():
+    """Test bead assignment, naming and vectorized centres over frames."""
+    topology, coordinates = _system()
+    mapping = CGMapping.from_topology(topology)
+
+    assert list(mapping.topology.names) == ["BB", "SC1", "BB", "W", "NA"]
+    assert list(mapping.bead_index) == [0, 0, 0, 1, 1, 0, 0, 2, 2, 2, 2, 3, 3, 3, 4]
+
+    beads = mapping.map_coordinates(coordinates)
+    side_chain = [3, 4]
+    masses = np.array([12.011, 1.008])
+    expected = (coordinates[side_chain] * masses[:, None]).sum(axis=0) / masses.sum()
+    assert np.allclose(beads[1], expected)
+    assert np.allclose(beads[4], coordinates[14])
+
+    frames = np.stack([coordinates, coordinates + 1.0])
+    assert np.allclose(mapping.map_coordinates(frames)[1], beads + 1.0)
+
+
+def test_backmap_restores_reference_geometry(temp_dir):
+    """Test backmapping translated beads and the GROMACS stage inputs."""
+    topology, coordinates = _system()
+    mapping = CGMapping.from_topology(topology)
+    beads = mapping.map_coordinates(coordinates)
+
+    assert np.allclose(mapping.backmap(beads, coordinates), coordinates)
+    shifted = beads.copy()
+    shifted[3] += [1.0, 0.0, 0.0]
+    atoms = mapping.backmap(shifted, coordinates)
+    assert np.allclose(atoms[11:14], coordinates[11:14] + [1.0, 0.0, 0.0])
+    assert np.allclose(atoms[:11], coordinates[:11])
+
+    reference = write_gro(temp_dir / "aa.gro", topology, coordinates, np.full(3, 20.0))
+    config = SimulationConfig(
+        "cg",
+        temp_dir,
+        temp_dir / "cg",
+        {"temperature": 310, "simulation_time": 1.0, "coarse_grain": reference},
+    )
+    cg_engine = GROMACSEngine(config)
+    cg_engine.setup()
+
+    config = SimulationConfig(
+        "aa",
+        temp_dir,
+        temp_dir / "aa",
+        {
+            "temperature": 310,
+            "simulation_time": 1.0,
+            "backmap": {"structure": cg_engine.structure_file, "reference": reference},
+        },
+    )
+    aa_engine = GROMACSEngine(config)
+    aa_engine.setup()
+
+    lines = aa_engine.structure_file.read_text().splitlines()
+    assert cg_engine.structure_file.read_text().splitlines()[1].strip() == "5"
+    assert lines[2:-1] == reference.read_text().splitlines()[2:-1]
+
+
+def test_molecules_wrapped_across_the_box_are_unwrapped(temp_dir):
+    """Test that beads of atom-wise wrapped molecules match the whole molecules."""
+    topology, coordinates = _system()
+    mapping = CGMapping.from_topology(topology)
+    box = np.full(3, 20.0)
+    whole = coordinates + [9.0, 0.0, 0.0]  # Residues straddle x = 20 Å
+    wrapped = whole % box
+
+    def same_image(a, b, atol):
+        return np.allclose((a - b + box / 2) % box - box / 2, 0.0, atol=atol)
+
+    expected = mapping.map_coordinates(whole)
+    assert not same_image(mapping.map_coordinates(wrapped), expected, 1e-6)
+    assert same_image(mapping.map_coordinates(wrapped, box), expected, 1e-6)
+    frames = np.stack([wrapped, (whole + 1.0) % box])
+    assert same_image(mapping.map_coordinates(frames, box)[1], expected + 1.0, 1e-6)
+
+    structure = write_gro(temp_dir / "wrapped.gro", topology, wrapped, box)
+    beads = read_frames(map_structure(structure, temp_dir / "cg.gro"), [0])[0]
+    assert same_image(beads, expected, 0.02)
+
+
+def test_protonation_state_aliases_are_mapped():
+    """Test that HIE/CYX-style residue names get their parent's beads."""
+    names = ["N", "CA", "C", "O", "CB", "CG", "ND1", "CE1", "NE2", "CD2", "N", "CA", "C", "O"]
+    names += ["CB", "SG"]
+    resnames = ["HIE"] * 10 + ["CYX"] * 6
+    resids = [1] * 10 + [2] * 6
+    topology = Topology(
+        np.array(names), np.array(resnames), np.array(resids), np.array([n[0] for n in names])
+    )
+
+    mapping = CGMapping.from_topology(topology)
+
+    assert list(mapping.topology.names) == ["BB", "SC1", "SC2", "SC3", "BB", "SC1"]
+
+
+def test_topology_without_coordinates_is_a_clear_error(temp_dir):
+    """Test that grompp is not attempted without a coordinate source."""
+    config = SimulationConfig(
+        "md",
+        temp_dir,
+        temp_dir / "md",
+        {"temperature": 310, "simulation_time": 1.0, "topology": temp_dir / "topol.top"},
+    )
+    engine = GROMACSEngine(config)
+    engine.setup()
+
+    result = engine.run()
+
+    assert not result.success
+    assert "requires 'coordinates'" in result.error_message
@@ -0,0 +1,60 @@
+"""Tests for the packed docking-results archive."""
+import pytest
+from nanosim.engines.autodock import DockingResultParser
+from nanosim.engines.docking_archive import DockingArchive, DockingArchiveWriter
+
+
+def _poses(score):
+    return (
+        f"MODEL 1\nREMARK VINA RESULT: {score:8.3f}      0.000      0.000\n"
+        "HETATM    1  C1  LIG A   1       1.000   2.000   3.000  0.00  0.00     0.000 C\n"
+        "ENDMDL\n"
+    )
+
+
+def test_archive_shards_and_reads_back(temp_dir):
+    """Test shard rollover, concurrent writers and last-entry-wins semantics."""
+    root = temp_dir / "results"
+    with (
+        DockingArchiveWriter(root, max_shard_bytes=200, flush_every=3) as first,
+        DockingArchiveWriter(root) as second,
+    ):
+        for i in range(10):
+            first.add(f"lig{i}", _poses(-5.0 - i * 0.1), -5.0 - i * 0.1)
+        second.add("other", _poses(-4.0), -4.0)
+        first.add("lig0", _poses(-9.0), -9.0, exhaustiveness=32)
+
+    archive = DockingArchive(root)
+
+    assert len(archive) == 11
+    assert len(list(root.glob("shard_*.pack"))) > 2
+    assert archive.top_k(2) == [("lig0", -9.0), ("lig9", -5.9)]
+    assert archive.entries["lig0"]["exhaustiveness"] == 32
+    assert DockingResultParser.parse_pdbqt(root, "lig3")[0]["affinity"] == -5.3
+    assert DockingResultParser.get_best_pose(root, "lig0")["affinity"] == -9.0
+
+
+def test_archive_rejects_mixed_compression(temp_dir):
+    """Test that writers must agree on the archive's block compression."""
+    root = temp_dir / "results"
+    with DockingArchiveWriter(root, compression="gzip") as writer:
+        writer.add("lig", _poses(-6.0), -6.0)
+
+    with pytest.raises(ValueError, match="gzip"):
+        DockingArchiveWriter(root, compression="zlib")
+    assert DockingArchive(root).read("lig") == _poses(-6.0)
+
+
+def test_archive_latest_write_wins_across_shards(temp_dir):
+    """Test that a rewrite in a lower-numbered shard supersedes an older entry."""
+    root = temp_dir / "results"
+    with DockingArchiveWriter(root) as early, DockingArchiveWriter(root) as late:
+        late.add("lig0", _poses(-5.0), -5.0)
+        late.flush()
+        early.add("lig0", _poses(-8.0), -8.0, exhaustiveness=32)
+
+    archive = DockingArchive(root)
+
+    assert early._index_path.name < late._index_path.name
+    assert archive.scores() == {"lig0": -8.0}
+    assert archive.entries["lig0"]["exhaustiveness"] == 32
@@ -0,0 +1,248 @@
+"""Tests for reading reconstructed and decomposed OpenFOAM cases."""
+import os
+import shutil
+import stat
+
+import numpy as np
+import pytest
+from nanosim.bridges.macro_to_meso import OpenFoamToGromacsConverter
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.foam_fields import read_case, read_faces, read_mesh
+from nanosim.engines.openfoam import OpenFOAMEngine
+from nanosim.utils.retention import wait_for_cleanup
+
+# Stand-in for the OpenFOAM applications: decomposePar and the solver ranks
+# copy the subdomain meshes and results of a prepared decomposed case
+FAKE_OPENFOAM = """#!/bin/sh
+case "$(basename "$0")" in
+  blockMesh) mkdir -p constant/polyMesh ;;
+  decomposePar)
+    for p in "$FOAM_TEMPLATE"/processor*; do
+      mkdir -p "$(basename "$p")/0" && cp -r "$p/constant" "$(basename "$p")/"
+    done ;;
+  pimpleFoam)
+    cp -r "$FOAM_TEMPLATE/processor$OMPI_COMM_WORLD_RANK/0.1" "processor$OMPI_COMM_WORLD_RANK/" ;;
+esac
+"""
+
+
+def test_mesh_geometry_of_block_mesh(temp_dir, foam):
+    """Test cell centres and volumes computed from the polyMesh."""
+    foam.write_block_mesh(temp_dir / "constant" / "polyMesh", (3, 2, 1))
+
+    mesh = read_mesh(temp_dir / "constant" / "polyMesh")
+
+    assert mesh.n_cells == 6
+    assert np.allclose(mesh.cell_volumes, 0.125)
+    assert np.allclose(mesh.cell_centres[4], [0.75, 0.75, 0.25])
+
+
+def _write_decomposed(foam, case, concentration, velocity, times):
+    """Write a 4x2x1 mesh decomposed into two 2x2x1 halves along x."""
+    for rank in range(2):
+        processor = case / f"processor{rank}"
+        foam.write_block_mesh(
+            processor / "constant" / "polyMesh", (2, 2, 1), offset=(2 * rank, 0, 0)
+        )
+        addressing = [2 * rank + i + 4 * j for j in range(2) for i in range(2)]
+        foam.write_list(
+            processor / "constant" / "polyMesh" / "cellProcAddressing",
+            "labelList",
+            [str(a) for a in addressing],
+        )
+        for time in times:
+            foam.write_field(processor / time / "C", "volScalarField", concentration[addressing])
+            foam.write_field(processor / time / "U", "volVectorField", velocity[addressing])
+
+
+def test_mixed_face_sizes(temp_dir, foam):
+    """Test reading a faceList with triangles and quads."""
+    path = temp_dir / "faces"
+    foam.write_list(path, "faceList", ["3(0 1 2)", "4(2 3 4 5)", "5(5 6 7 8 9)", "3(9 8 0)"])
+
+    offsets, labels = read_faces(path)
+
+    assert list(offsets) == [0, 3, 7, 12, 15]
+    assert list(labels) == [0, 1, 2, 2, 3, 4, 5, 5, 6, 7, 8, 9, 9, 8, 0]
+
+
+def test_decomposed_case_matches_reconstructed(temp_dir, foam):
+    """Test stitching processor fields through cellProcAddressing."""
+    concentration = np.arange(8, dtype=float) * 1.5
+    velocity = np.column_stack([np.arange(8), np.zeros(8), np.ones(8)])
+
+    foam.write_block_mesh(temp_dir / "reconstructed" / "constant" / "polyMesh", (4, 2, 1))
+    foam.write_field(temp_dir / "reconstructed" / "0.5" / "C", "volScalarField", concentration)
+    foam.write_field(temp_dir / "reconstructed" / "0.5" / "U", "volVectorField", velocity)
+    _write_decomposed(foam, temp_dir / "decomposed", concentration, velocity, ["0.25", "0.5"])
+
+    reconstructed = read_case(temp_dir / "reconstructed", 0.5, ["C", "U"])
+    decomposed = read_case(temp_dir / "decomposed", 0.45, ["C", "U", "T"], max_workers=2)
+
+    assert decomposed.time == "0.5" and decomposed.n_subdomains == 2
+    assert set(decomposed.fields) == {"C", "U"}
+    assert np.allclose(decomposed.fields["C"], reconstructed.fields["C"])
+    assert np.allclose(decomposed.fields["U"], reconstructed.fields["U"])
+    assert np.allclose(decomposed.mesh.cell_centres, reconstructed.mesh.cell_centres)
+
+    bridge = OpenFoamToGromacsConverter({"max_workers": 2})
+    data = bridge._load_concentration_field(
+        temp_dir / "decomposed" / "processor1" / "0.5" / "C", 0.5
+    )
+    assert data["n_subdomains"] == 2
+    assert np.isclose(data["statistics"]["total_amount"], concentration.sum() * 0.125)
+
+
+def test_decomposed_field_missing_from_a_processor_is_an_error(temp_dir, foam):
+    """Test that a partially written time step is not stitched with garbage."""
+    case = temp_dir / "decomposed"
+    _write_decomposed(foam, case, np.arange(8.0), np.zeros((8, 3)), ["0.5"])
+    (case / "processor1" / "0.5" / "C").unlink()
+
+    with pytest.raises(ValueError, match=r"missing from \['processor1'\]"):
+        read_case(case, 0.5, ["C", "U"])
+
+
+def test_reads_unreconstructed_case_after_engine_run(temp_dir, monkeypatch, foam):
+    """Test reading the processor directories an OpenFOAM run left in place."""
+    concentration = np.arange(8, dtype=float) * 1.5
+    velocity = np.column_stack([np.arange(8), np.zeros(8), np.ones(8)])
+    _write_decomposed(foam, temp_dir / "template", concentration, velocity, ["0.1"])
+    bin_dir = temp_dir / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "openfoam"
+    script.write_text(FAKE_OPENFOAM)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    for application in ["blockMesh", "checkMesh", "decomposePar", "pimpleFoam"]:
+        (bin_dir / application).symlink_to(script)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FOAM_TEMPLATE", str(temp_dir / "template"))
+
+    config = SimulationConfig(
+        "case",
+        temp_dir,
+        temp_dir / "out",
+        {
+            "particle_diameter": 1e-7,
+            "simulation_time": 0.1,
+            "n_subdomains": 2,
+            "mpi_launcher": "local",
+            "reconstruct": False,
+        },
+    )
+    engine = OpenFOAMEngine(config)
+    result = engine.execute()
+    wait_for_cleanup()
+    shutil.rmtree(temp_dir / "template")
+
+    fields = read_case(engine.case_dir, 0.1, ["C", "U"])
+
+    assert result.success and fields.n_subdomains == 2 and fields.time == "0.1"
+    assert np.allclose(fields.fields["C"], concentration)
+    assert np.allclose(fields.fields["U"], velocity)
+
+
+def test_region_of_interest_restricts_sampling(temp_dir, foam):
+    """Test box, cell zone and threshold selection before sampling."""
+    case = temp_dir / "case"
+    foam.write_block_mesh(case / "constant" / "polyMesh", (4, 2, 1))
+    (case / "constant" / "polyMesh" / "cellZones").write_text(
+        foam.HEADER % ("regIOobject", "cellZones")
+        + "1\n(\ntumour\n{\n    type cellZone;\ncellLabels List<label> 4(2 3 6 7);\n}\n)\n"
+    )
+    concentration = np.array([5.0, 5.0, 1.0, 4.0, 5.0, 5.0, 0.0, 4.0])
+    velocity = np.column_stack([np.arange(8), np.zeros(8), np.zeros(8)])
+    foam.write_field(case / "1" / "C", "volScalarField", concentration)
+    foam.write_field(case / "1" / "U", "volVectorField", velocity)
+
+    bridge = OpenFoamToGromacsConverter({"seed": 1})
+    data = bridge._select_region(
+        bridge._load_concentration_field(case, 1.0),
+        {"box": [[0.5, 0.0, 0.0], [2.0, 1.0, 0.5]], "cell_zone": "tumour", "threshold": 0.5},
+    )
+    positions, cells = bridge._sample_particle_positions(data, {}, 200)
+    velocities = bridge._assign_velocities(cells, data)
+
+    assert list(data["cell_indices"]) == [2, 3, 7]
+    assert data["region"]["n_cells"] == 3
+    assert np.isclose(data["statistics"]["total_amount"], 9.0 * 0.125)
+    assert np.all((positions[:, 0] >= 1.0) & (positions[:, 0] <= 2.0))
+    assert set(velocities[:, 0]) <= {2.0, 3.0, 7.0}
+    assert np.array_equal(velocities[:, 0], data["cell_indices"][cells])
+    assert np.all(velocities[positions[:, 1] > 0.5, 0] == 7.0)
+
+
+def test_validation_checks_mass_and_distribution(temp_dir, foam):
+    """Test mass conservation and the binned KS comparison against the field."""
+    case = temp_dir / "case"
+    foam.write_block_mesh(case / "constant" / "polyMesh", (4, 4, 2))
+    concentration = np.linspace(1.0, 4.0, 32) * 1e3
+    foam.write_field(case / "1" / "C", "volScalarField", concentration)
+
+    bridge = OpenFoamToGromacsConverter({"seed": 3})
+    data = bridge._select_region(bridge._load_concentration_field(case, 1.0), None)
+    positions, cells = bridge._sample_particle_positions(data, {}, 2000)
+    field = {key: data[key] for key in ("concentration", "cell_volumes", "cell_centres")}
+    output = {"particle_count": len(positions), "particle_cells": cells, "field": field}
+    mass = data["statistics"]["total_amount"] / 2000
+
+    assert bridge._check_mass_conservation({"particle_properties": {"mass": mass}}, output)
+    assert not bridge._check_mass_conservation(
+        {"particle_properties": {"mass": 1.1 * mass}}, output
+    )
+    assert bridge._check_distribution_match({}, output)
+    biased = {**output, "particle_cells": np.sort(cells)[::-1] % 16}
+    assert not bridge._check_distribution_match({}, biased)
+
+
+def test_batch_conversion_of_time_points(temp_dir, foam):
+    """Test that batch conversion matches per-snapshot conversion."""
+    case = temp_dir / "case"
+    foam.write_block_mesh(case / "constant" / "polyMesh", (4, 2, 1))
+    velocity = np.tile([1e-3, 0.0, 0.0], (8, 1))
+    for step, time in enumerate(["0.1", "0.2", "0.3"]):
+        foam.write_field(case / time / "C", "volScalarField", np.arange(1.0, 9.0) * (step + 1))
+        foam.write_field(case / time / "U", "volVectorField", velocity)
+
+    bridge = OpenFoamToGromacsConverter({"seed": 7, "region": {"box": [[0, 0, 0], [1, 1, 1]]}})
+    input_data = {
+        "concentration_field": case,
+        "grid": {},
+        "particle_properties": {"mass": 0.05},
+        "output_dir": temp_dir / "md",
+    }
+    results = bridge.convert_batch({**input_data, "time_points": [0.1, 0.2, 0.3]}, max_workers=3)
+    single = bridge.convert({**input_data, "time_point": 0.1, "output_dir": temp_dir / "single"})
+
+    assert [r["metadata"]["field_time"] for r in results] == ["0.1", "0.2", "0.3"]
+    assert [r["particle_count"] for r in results] == [35, 70, 105]
+    assert results[0]["metadata"]["region"]["n_cells"] == 4
+    assert np.allclose(results[0]["particle_positions"], single["particle_positions"])
+    assert all(bridge.validate(input_data, r) for r in results)
+    gro = (temp_dir / "md" / "t_0.3" / "particles.gro").read_text().splitlines()
+    assert int(gro[1]) == 105 and gro[2].endswith("  0.0000  0.0000")
+
+
+def test_batch_conversion_shares_time_steps(temp_dir, foam):
+    """Test that time points resolving to one time step are converted once."""
+    case = temp_dir / "case"
+    foam.write_block_mesh(case / "constant" / "polyMesh", (4, 2, 1))
+    for time in ["0.1", "0.2"]:
+        foam.write_field(case / time / "C", "volScalarField", np.arange(1.0, 9.0))
+        foam.write_field(case / time / "U", "volVectorField", np.zeros((8, 3)))
+
+    bridge = OpenFoamToGromacsConverter({"seed": 7})
+    results = bridge.convert_batch(
+        {
+            "concentration_field": case,
+            "grid": {},
+            "particle_properties": {"mass": 0.05},
+            "output_dir": temp_dir / "md",
+            "time_points": [0.1, 0.2, 0.11],
+        },
+        max_workers=3,
+    )
+
+    assert [r["metadata"]["field_time"] for r in results] == ["0.1", "0.2", "0.1"]
+    assert results[2] is results[0]
+    assert sorted(p.name for p in (temp_dir / "md").iterdir()) == ["t_0.1", "t_0.2"]
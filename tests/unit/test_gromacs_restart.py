@@ -0,0 +1,74 @@
+"""Tests for checkpoint-aware GROMACS execution and job rescheduling."""
+import os
+
+from nanosim.core.simulation import SimulationConfig, SimulationEngine, SimulationResult
+from nanosim.engines.gromacs import GROMACSEngine, mdrun_state
+from nanosim.orchestrator.scheduler import JobScheduler, SimulationJob
+
+
+class FlakyEngine(SimulationEngine):
+    """Engine preempted on its first attempt, finishing on the second."""
+
+    def validate_config(self):
+        pass
+
+    def setup(self):
+        pass
+
+    def run(self):
+        marker = self.config.output_dir / "attempted"
+        preempted = not marker.exists()
+        marker.touch()
+        return SimulationResult(not preempted, [], {"preempted": preempted, "pid": os.getpid()})
+
+    def cleanup(self):
+        pass
+
+
+def test_mdrun_resumes_from_checkpoint(temp_dir, fake_gmx):
+    """Test that a preempted mdrun is resumed with -cpi and -append."""
+    (temp_dir / "system.gro").touch()
+    (temp_dir / "topol.top").touch()
+
+    config = SimulationConfig(
+        "md",
+        temp_dir,
+        temp_dir / "out",
+        {
+            "temperature": 310,
+            "simulation_time": 1e-9,
+            "coordinates": temp_dir / "system.gro",
+            "topology": temp_dir / "topol.top",
+        },
+    )
+    first = GROMACSEngine(config).execute()
+    second = GROMACSEngine(config).execute()
+
+    work_dir = temp_dir / "out" / "gromacs_work"
+    calls = (work_dir / "calls.txt").read_text().splitlines()
+    assert not first.success and first.metadata["preempted"]
+    assert second.success and second.metadata["segments"] == 2
+    assert [c.split()[0] for c in calls] == ["grompp", "mdrun", "mdrun"]
+    assert "-cpi md.cpt -append" in calls[2]
+    assert not (work_dir / "md.cpt").exists()
+    assert mdrun_state(work_dir / "md.log", -15) == "preempted"
+
+
+def test_scheduler_reschedules_preempted_jobs(temp_dir):
+    """Test that preempted attempts are requeued until they finish."""
+    jobs = [
+        SimulationJob(
+            f"job{i}", FlakyEngine, SimulationConfig(f"job{i}", temp_dir, temp_dir / f"job{i}", {})
+        )
+        for i in range(3)
+    ]
+
+    results = JobScheduler(n_workers=2, max_attempts=3).run(jobs)
+
+    assert all(result.success for result in results.values())
+    assert [job.attempts for job in jobs] == [2, 2, 2]
+
+    stubborn = SimulationJob("stubborn", FlakyEngine, jobs[0].config)
+    (temp_dir / "job0" / "attempted").unlink()
+    result = JobScheduler(n_workers=1, max_attempts=1).run([stubborn])["stubborn"]
+    assert not result.success and "giving up" in result.error_message
@@ -0,0 +1,107 @@
+"""Tests for hydrogen-bond analysis."""
+import numpy as np
+
+from nanosim.analysis.hbonds import HydrogenBondAnalyzer
+from nanosim.analysis.trajectory import TrajectoryChunk, iter_frames, read_topology
+from nanosim.utils.spatial import neighbor_pairs
+
+
+def _donor_acceptor_frames(n_frames: int) -> np.ndarray:
+    """Ligand N-H donating to a receptor O; the bond breaks in odd frames."""
+    frames = np.zeros((n_frames, 3, 3))
+    frames[:, 0] = [0.0, 0.0, 0.0]  # ligand N
+    frames[:, 1] = [1.0, 0.0, 0.0]  # ligand H
+    frames[:, 2] = [2.9, 0.0, 0.0]  # receptor O, linear geometry
+    frames[1::2, 2] = [0.0, 2.9, 0.0]  # 90 degree D-H...A angle
+    return frames
+
+
+def test_neighbor_pairs_matches_brute_force():
+    """Test that cell-list pairs match an all-pairs search."""
+    rng = np.random.default_rng(0)
+    a = rng.uniform(0, 20, size=(200, 3))
+    b = rng.uniform(0, 20, size=(300, 3))
+
+    ia, ib, _ = neighbor_pairs(a, b, 3.0)
+
+    dist = np.linalg.norm(a[:, None] - b[None], axis=-1)
+    expected = set(zip(*np.nonzero(dist <= 3.0), strict=True))
+    assert set(zip(ia.tolist(), ib.tolist(), strict=True)) == expected
+
+
+def test_hbond_occupancy_counts_geometry():
+    """Test distance and angle criteria over frames."""
+    elements = np.array(["N", "H", "O"])
+    analyzer = HydrogenBondAnalyzer(elements, ligand_indices=[0, 1], receptor_indices=[2])
+
+    frames = _donor_acceptor_frames(10)
+    result = analyzer.run(
+        [TrajectoryChunk(0, frames[:6], np.arange(6.0))]
+        + [TrajectoryChunk(6, frames[6:], np.arange(6.0, 10.0))]
+    )
+
+    assert result.n_frames == 10
+    assert result.per_frame_counts.tolist() == [1, 0] * 5
+    assert result.occupancy == 0.5
+    assert result.pair_occupancy == {(0, 1, 2): 0.5}
+
+
+def test_hbond_analysis_from_gro_trajectory(temp_dir):
+    """Test streaming a multi-frame .gro file through the analyzer."""
+    gro = temp_dir / "traj.gro"
+    blocks = []
+    for t, frame in enumerate(_donor_acceptor_frames(4)):
+        lines = [f"complex t= {t * 10.0:.1f}", "    3"]
+        atoms = [("LIG", "N1"), ("LIG", "H1"), ("SER", "OG")]
+        for i, ((resname, name), xyz) in enumerate(zip(atoms, frame / 10.0, strict=True)):
+            resid = 1 if resname == "LIG" else 2
+            lines.append(
+                f"{resid:5d}{resname:<5s}{name:>5s}{i + 1:5d}{xyz[0]:8.3f}{xyz[1]:8.3f}{xyz[2]:8.3f}"
+            )
+        lines.append("   5.00000   5.00000   5.00000")
+        blocks.append("\n".join(lines))
+    gro.write_text("\n".join(blocks) + "\n")
+
+    topology = read_topology(gro)
+    chunks = list(iter_frames(gro, chunk_size=3))
+    analyzer = HydrogenBondAnalyzer(
+        topology.elements, topology.select("resname LIG"), topology.select("protein")
+    )
+    result = analyzer.run(chunks)
+
+    assert [len(c.coordinates) for c in chunks] == [3, 1]
+    assert chunks[1].times.tolist() == [30.0]
+    assert result.per_frame_counts.tolist() == [1, 0, 1, 0]
+
+
+def test_hbond_analysis_reads_only_needed_atoms():
+    """Test that atom_indices drops solvent and that subset chunks give the same result."""
+    elements = np.array(["N", "H", "C", "O", "O", "H", "H"])
+    ligand, receptor = [0, 1], [2, 3]  # Atoms 4-6 are water
+    frames = np.zeros((4, 7, 3))
+    frames[:, [0, 1, 3]] = _donor_acceptor_frames(4)
+    frames[:, 2] = [4.0, 0.0, 0.0]
+    frames[:, 4:] = [20.0, 20.0, 20.0]
+
+    analyzer = HydrogenBondAnalyzer(elements, ligand, receptor)
+    full = analyzer.run([TrajectoryChunk(0, frames, np.arange(4.0))])
+    subset = HydrogenBondAnalyzer(elements, ligand, receptor).run(
+        [TrajectoryChunk(0, frames[:, analyzer.atom_indices], np.arange(4.0))]
+    )
+
+    assert analyzer.atom_indices.tolist() == [0, 1, 3]
+    assert subset.per_frame_counts.tolist() == full.per_frame_counts.tolist() == [1, 0, 1, 0]
+    assert subset.pair_occupancy == full.pair_occupancy == {(0, 1, 3): 0.5}
+
+
+def test_hbond_contact_forming_late_in_chunk():
+    """Test that an acceptor outside the interface at the chunk start is still found."""
+    elements = np.array(["N", "H", "O"])
+    frames = np.zeros((8, 3, 3))
+    frames[:, 1] = [1.0, 0.0, 0.0]
+    frames[:, 2, 0] = np.linspace(14.0, 2.9, 8)  # Approaches the ligand N-H
+
+    analyzer = HydrogenBondAnalyzer(elements, ligand_indices=[0, 1], receptor_indices=[2])
+    result = analyzer.run([TrajectoryChunk(0, frames, np.arange(8.0))])
+
+    assert result.per_frame_counts.tolist() == [0] * 7 + [1]
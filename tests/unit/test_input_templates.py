@@ -0,0 +1,82 @@
+"""Tests for templated input generation and parameter sweeps."""
+import json
+
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.gromacs import GROMACSEngine
+from nanosim.engines.input_templates import MDP_TEMPLATE, expand_sweep, render_inputs
+from nanosim.engines.openfoam import OpenFOAMEngine
+
+
+def test_sweep_shares_identical_input_sets(temp_dir):
+    """Test Cartesian expansion and hash deduplication of rendered sets."""
+    parameters = {
+        "temperature": 310,
+        "simulation_time": 1e-9,
+        "sweep": {"temperature": [300, 310], "analysis_cutoff": [0.3, 0.35, 0.4]},
+    }
+
+    points = expand_sweep(parameters)
+    input_sets = render_inputs([MDP_TEMPLATE], parameters, temp_dir)
+
+    assert len(points) == len(input_sets) == 6
+    assert len({s.directory for s in input_sets}) == 2
+    assert len(list((temp_dir / "inputs").iterdir())) == 2
+    mdp = (input_sets[3].directory / "md.mdp").read_text()
+    assert "ref-t                    = 310" in mdp and "nsteps                   = 500000" in mdp
+    manifest = json.loads((temp_dir / "sweep.json").read_text())
+    assert manifest[4]["parameters"] == {"temperature": 310, "analysis_cutoff": 0.35}
+
+
+def test_engines_render_inputs_during_setup(temp_dir):
+    """Test that both engines write their rendered input files."""
+    gromacs = GROMACSEngine(
+        SimulationConfig(
+            "md", temp_dir, temp_dir / "md", {"temperature": 310, "simulation_time": 100e-9}
+        )
+    )
+    openfoam = OpenFOAMEngine(
+        SimulationConfig(
+            "cfd", temp_dir, temp_dir / "cfd", {"particle_diameter": 1e-7, "simulation_time": 10}
+        )
+    )
+    gromacs.setup()
+    openfoam.setup()
+
+    assert "nsteps                   = 50000000" in (gromacs.work_dir / "md.mdp").read_text()
+    control = (openfoam.case_dir / "system" / "controlDict").read_text()
+    assert "endTime         10;" in control
+    assert (openfoam.case_dir / "system" / "blockMeshDict").exists()
+    assert "D               " in (openfoam.case_dir / "constant/transportProperties").read_text()
+
+
+def test_gromacs_sweep_runs_each_input_set(temp_dir, fake_gmx):
+    """Test that a 2-point sweep runs and resumes one simulation per input set."""
+    (temp_dir / "system.gro").touch()
+    (temp_dir / "topol.top").touch()
+    config = SimulationConfig(
+        "md",
+        temp_dir,
+        temp_dir / "out",
+        {
+            "temperature": 310,
+            "simulation_time": 1e-9,
+            "coordinates": temp_dir / "system.gro",
+            "topology": temp_dir / "topol.top",
+            "sweep": {"temperature": [300, 320]},
+        },
+    )
+
+    first = GROMACSEngine(config).execute()  # Every first mdrun is preempted
+    second = GROMACSEngine(config).execute()
+    third = GROMACSEngine(config).execute()
+
+    runs = second.metadata["runs"]
+    assert not first.success and first.metadata["preempted"]
+    assert second.success and [run["points"] for run in runs] == [[0], [1]]
+    for run, temperature in zip(runs, (300, 320), strict=True):
+        work_dir = run["directory"] / "gromacs_work"
+        calls = (work_dir / "calls.txt").read_text().splitlines()
+        assert [c.split()[0] for c in calls] == ["grompp", "mdrun", "mdrun"]
+        assert f"ref-t                    = {temperature}" in (work_dir / "md.mdp").read_text()
+    assert third.success and len(third.output_files) == 8  # Finished sets are not rerun
+    assert len((runs[0]["directory"] / "gromacs_work" / "calls.txt").read_text().splitlines()) == 3
@@ -0,0 +1,211 @@
+"""Tests for the iterative MD-docking workflow."""
+import numpy as np
+from nanosim.analysis.trajectory import Topology, write_pdb
+from nanosim.engines.docking_archive import DockingArchiveWriter
+from nanosim.orchestrator.iterative import IterativeDockingLoop, ensemble_scores
+from nanosim.orchestrator.workflow_router import (
+    UseCaseCharacteristics,
+    WorkflowRouter,
+    WorkflowType,
+)
+
+# CA atoms of the scripted receptor
+RECEPTOR = np.array([[0.0, 0.0, 0.0], [3.8, 0.0, 0.0], [3.8, 3.8, 0.0], [3.8, 3.8, 3.8]])
+
+
+def _poses(score, xyz):
+    x, y, z = xyz
+    return (
+        f"MODEL 1\nREMARK VINA RESULT: {score:8.3f}      0.000      0.000\n"
+        f"HETATM    1  C1  LIG A   1    {x:8.3f}{y:8.3f}{z:8.3f}  0.00  0.00     0.000 C\n"
+        "ENDMDL\n"
+    )
+
+
+class ScriptedLoop(IterativeDockingLoop):
+    """Loop whose MD and docking return scripted scores and pose positions.
+
+    A motion (cycle -> rotation, translation) moves receptor and poses rigidly.
+    """
+
+    def __init__(self, config, script, motion=None):
+        super().__init__(config)
+        self.script = script
+        self.motion = motion or (lambda cycle: (np.eye(3), np.zeros(3)))
+        self.structures = []
+        self.complexes = []
+
+    def _run_md(self, cycle, structure, topology, output_dir):
+        self.cycle = cycle
+        self.structures.append((structure, topology))
+        return output_dir / "md.xtc", output_dir / "md.gro"
+
+    def _move(self, coordinates):
+        rotation, translation = self.motion(self.cycle)
+        return coordinates @ rotation + translation
+
+    def _select_frames(self, trajectory, topology, output_dir):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        n = len(RECEPTOR)
+        receptor = write_pdb(
+            output_dir / "receptor.pdb",
+            Topology(np.full(n, "CA"), np.full(n, "ALA"), np.arange(1, n + 1), np.full(n, "C")),
+            self._move(RECEPTOR),
+        )
+        return {
+            "receptor_pdbqt": [output_dir / "receptor.pdbqt"],
+            "grid_parameters": [{}],
+            "binding_sites": [{"receptor": receptor}],
+        }
+
+    def _dock(self, cycle, sites, output_dir):
+        scores, x = self.script(cycle)
+        pose = self._move(np.array([x, 2.0, 3.0]))
+        with DockingArchiveWriter(output_dir / "site_0" / "results") as writer:
+            for ligand_id, score in scores.items():
+                writer.add(ligand_id, _poses(score, pose), score)
+        return [output_dir / "site_0" / "results"]
+
+    def _build_complex(self, ligand_id, sites, archives, output_dir):
+        self.complexes.append(ligand_id)
+        return output_dir / "complex.gro", output_dir / "complex.top"
+
+
+def test_router_builds_iterative_pipeline():
+    """Test the iterative pipeline layout and its convergence settings."""
+    use_case = UseCaseCharacteristics(
+        has_known_receptor_structure=True,
+        has_known_binding_site=False,
+        receptor_type="soluble",
+        compound_library_size=50,
+        has_target_compounds=True,
+        is_membrane_system=False,
+        is_nanoparticle_delivery=False,
+        needs_induced_fit=True,
+        is_cryptic_pocket=False,
+        compute_budget="moderate",
+        time_constraint="days",
+        goal="optimization",
+    )
+    router = WorkflowRouter(iterative={"max_cycles": 4})
+
+    workflow = router.determine_workflow(use_case)
+    pipeline = router.build_pipeline(workflow, use_case)
+
+    assert workflow == WorkflowType.ITERATIVE
+    assert pipeline["iteration"]["repeat"] == [stage["name"] for stage in pipeline["stages"]]
+    assert pipeline["iteration"]["convergence"]["max_cycles"] == 4
+    assert "score_convergence" in pipeline["validation"]
+
+
+def test_ensemble_scores_weight_best_conformations():
+    """Test Boltzmann-weighted rescoring with missing conformations."""
+    scores = np.array([[-8.0, -8.0], [-9.0, np.nan], [np.nan, np.nan], [-9.0, -5.0]])
+
+    ensemble = ensemble_scores(scores)
+
+    assert np.allclose(ensemble[:2], [-8.0, -9.0])
+    assert np.isnan(ensemble[2])
+    assert -9.0 < ensemble[3] < -8.0
+
+
+def test_loop_stops_when_top_hits_converge(temp_dir):
+    """Test stopping on converged scores and poses, and running to max_cycles otherwise."""
+    config = {
+        "structure": temp_dir / "start.gro",
+        "topology": temp_dir / "topol.top",
+        "ligand_library": temp_dir / "ligands",
+        "convergence": {"top_k": 2, "min_cycles": 2, "patience": 2, "max_cycles": 8},
+    }
+
+    def settling(cycle):
+        if cycle == 1:
+            return {"a": -8.0, "b": -6.0, "c": -5.0}, 1.0
+        return {"a": -7.0, "b": -9.0, "c": -5.0}, 1.0
+
+    loop = ScriptedLoop({**config, "output_dir": temp_dir / "settling"}, settling)
+    results = loop.run()
+
+    assert results["converged"]
+    assert results["n_cycles"] == 4  # Top hits change in cycle 2, then two stable cycles
+    assert [ligand_id for ligand_id, _ in results["ranking"]] == ["b", "a", "c"]
+    assert results["cycles"][-1]["max_rmsd"] == 0.0
+    assert loop.structures[0] == (config["structure"], config["topology"])
+    # Each next cycle starts from the complex of the previous cycle's top hit
+    assert loop.complexes == ["a", "b", "b"]
+    assert loop.structures[1][0] == temp_dir / "settling" / "cycle_001" / "complex" / "complex.gro"
+
+    def drifting(cycle):
+        return settling(2)[0], 2.0 * cycle
+
+    loop = ScriptedLoop({**config, "output_dir": temp_dir / "drifting"}, drifting)
+    results = loop.run()
+
+    assert not results["converged"] and results["n_cycles"] == 8
+    assert results["cycles"][-1]["max_rmsd"] == 2.0
+
+
+def test_rigidly_moved_receptor_and_pose_are_converged(temp_dir):
+    """Test that poses are compared after superposing their receptors."""
+    config = {
+        "structure": temp_dir / "start.gro",
+        "topology": temp_dir / "topol.top",
+        "ligand_library": temp_dir / "ligands",
+        "output_dir": temp_dir / "out",
+        "convergence": {"top_k": 1, "min_cycles": 2, "patience": 2, "max_cycles": 8},
+    }
+
+    def tumbling(cycle):
+        angle = 0.4 * cycle
+        rotation = np.array(
+            [[np.cos(angle), -np.sin(angle), 0.0], [np.sin(angle), np.cos(angle), 0.0], [0, 0, 1]]
+        )
+        return rotation, np.array([5.0 * cycle, -2.0, 1.0])
+
+    results = ScriptedLoop(config, lambda cycle: ({"a": -8.0}, 1.0), tumbling).run()
+
+    assert results["converged"] and results["n_cycles"] == 3
+    assert results["cycles"][-1]["max_rmsd"] < 0.01
+
+
+def test_loop_converges_on_each_cycles_conformations(temp_dir):
+    """Test that alternating scores are not averaged into a converged ensemble."""
+    config = {
+        "structure": temp_dir / "start.gro",
+        "topology": temp_dir / "topol.top",
+        "ligand_library": temp_dir / "ligands",
+        "output_dir": temp_dir / "out",
+        "convergence": {"top_k": 1, "min_cycles": 2, "patience": 2, "max_cycles": 12},
+    }
+
+    def alternating(cycle):
+        return {"a": -8.0 if cycle % 2 else -10.0}, 1.0
+
+    results = ScriptedLoop(config, alternating).run()
+
+    assert not results["converged"] and results["n_cycles"] == 12
+    assert results["cycles"][-1]["score_delta"] == 2.0
+
+
+def test_md_resumes_after_preemption(temp_dir, fake_gmx):
+    """Test that a preempted cycle MD is rescheduled and resumed from its checkpoint."""
+    (temp_dir / "start.gro").touch()
+    (temp_dir / "topol.top").touch()
+    loop = IterativeDockingLoop(
+        {
+            "structure": temp_dir / "start.gro",
+            "topology": temp_dir / "topol.top",
+            "ligand_library": temp_dir / "ligands",
+            "output_dir": temp_dir / "out",
+            "md_params": {"temperature": 310, "simulation_time": 1e-9},
+        }
+    )
+
+    trajectory, final_structure = loop._run_md(
+        1, temp_dir / "start.gro", temp_dir / "topol.top", temp_dir / "out" / "md"
+    )
+
+    calls = (temp_dir / "out" / "md" / "gromacs_work" / "calls.txt").read_text().splitlines()
+    assert [c.split()[0] for c in calls] == ["grompp", "mdrun", "mdrun"]
+    assert "-cpi" in calls[2]
+    assert trajectory.name == "md.xtc" and final_structure.name == "md.gro"
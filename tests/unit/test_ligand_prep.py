@@ -0,0 +1,86 @@
+"""Tests for streaming, sharded ligand preparation."""
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.autodock import AutoDockVinaEngine
+from nanosim.engines.ligand_prep import LigandPreparationPipeline, iter_sdf_records
+
+
+def _molblock(title, n_atoms=2):
+    atoms = "".join(
+        f"{1.5 * i:10.4f}{0.0:10.4f}{0.0:10.4f} C   0  0  0  0  0  0  0  0  0  0  0  0\n"
+        for i in range(n_atoms)
+    )
+    return f"{title}\n  test\n\n{n_atoms:3d}  0  0  0  0  0  0  0  0  0999 V2000\n{atoms}M  END\n"
+
+
+def _fake_prepare(molblock, output_pdbqt, ph):
+    """Stand-in for Open Babel: convert V2000 atoms to PDBQT records."""
+    lines = molblock.splitlines()
+    n_atoms = int(lines[3][:3])
+    if n_atoms == 0:
+        raise RuntimeError("no atoms")
+    records = [
+        f"HETATM{i + 1:5d}  C   LIG A   1    {float(line[0:10]):8.3f}{float(line[10:20]):8.3f}"
+        f"{float(line[20:30]):8.3f}  0.00  0.00     0.000 C"
+        for i, line in enumerate(lines[4 : 4 + n_atoms])
+    ]
+    output_pdbqt.write_text("ROOT\n" + "\n".join(records) + "\nENDROOT\nTORSDOF 0\n")
+
+
+def _write_library(path, titles):
+    path.write_text(
+        "".join(_molblock(t, n_atoms=0 if t == "broken" else 2) + "$$$$\n" for t in titles)
+    )
+    return path
+
+
+def test_iter_sdf_records_sanitizes_and_deduplicates_ids(temp_dir):
+    """Test record streaming and ID assignment."""
+    sdf = _write_library(temp_dir / "lib.sdf", ["aspirin", "aspirin", "", "CHEMBL 25/x"])
+
+    ids = [ligand_id for ligand_id, _ in iter_sdf_records(sdf)]
+
+    assert ids == ["aspirin", "aspirin_1", "mol0000002", "CHEMBL_25_x"]
+
+
+def test_pipeline_writes_shards_and_resumes(temp_dir):
+    """Test sharded parallel preparation, failure reporting and resume."""
+    titles = [f"lig{i}" for i in range(7)] + ["broken"]
+    sdf = _write_library(temp_dir / "lib.sdf", titles)
+    pipeline = LigandPreparationPipeline(
+        temp_dir / "prepared", shard_size=3, n_workers=2, preparer=_fake_prepare
+    )
+
+    shards = sorted(pipeline.run(sdf), key=lambda s: s.index)
+    again = sorted(pipeline.run(sdf), key=lambda s: s.index)
+
+    assert [len(s.ligands) for s in shards] == [3, 3, 1]
+    assert shards[2].failed[0][0] == "broken"
+    assert all(path.exists() for s in shards for _, path in s.ligands)
+    assert [s.ligands for s in again] == [s.ligands for s in shards]
+
+
+def test_engine_docks_sdf_library(temp_dir):
+    """Test that the engine prepares an SDF library while docking it."""
+    sdf = _write_library(temp_dir / "lib.sdf", [f"lig{i}" for i in range(5)])
+    config = SimulationConfig(
+        name="screen",
+        input_dir=temp_dir,
+        output_dir=temp_dir / "out",
+        parameters={
+            "exhaustiveness": 4,
+            "ligands": sdf,
+            "center": [0.0, 0.0, 0.0],
+            "backend": "stub",
+            "n_workers": 2,
+            "prep_workers": 2,
+            "prep_shard_size": 2,
+            "ligand_preparer": _fake_prepare,
+        },
+    )
+    engine = AutoDockVinaEngine(config)
+    engine.setup()
+    result = engine.run()
+
+    assert result.success
+    assert result.metadata["n_ligands"] == 5
+    assert result.metadata["n_docked"] == 5
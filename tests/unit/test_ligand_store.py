@@ -0,0 +1,180 @@
+"""Tests for canonical molecule keys and the prepared-ligand store."""
+import shutil
+import sqlite3
+
+import numpy as np
+import pytest
+from nanosim.engines.ligand_prep import LigandPreparationPipeline
+from nanosim.engines.ligand_store import PreparedLigandStore, canonical_smiles, settings_key
+
+try:
+    import rdkit  # noqa: F401
+
+    HAS_CANONICALIZER = True
+except ImportError:
+    HAS_CANONICALIZER = shutil.which("obabel") is not None
+
+needs_canonicalizer = pytest.mark.skipif(
+    not HAS_CANONICALIZER, reason="requires RDKit or Open Babel"
+)
+
+# Bromochlorofluoromethane (CHBrClF): one tetrahedral stereocentre
+ATOMS = [
+    ("C", (0.0, 0.0, 0.0)),
+    ("F", (1.0, 1.0, 1.0)),
+    ("CL", (1.0, -1.0, -1.0)),
+    ("BR", (-1.0, 1.0, -1.0)),
+    ("H", (-1.0, -1.0, 1.0)),
+]
+BONDS = [(0, 1, 1), (0, 2, 1), (0, 3, 1), (0, 4, 1)]
+
+
+def _molblock(title, atoms, bonds):
+    """V2000 record; bonds are (a, b, order) or (a, b, order, stereo)."""
+    atom_lines = "".join(
+        f"{x:10.4f}{y:10.4f}{z:10.4f} {element.capitalize():<3s} 0  0  0  0  0  0  0  0  0  0  0  0\n"
+        for element, (x, y, z) in atoms
+    )
+    bond_lines = "".join(
+        f"{bond[0] + 1:3d}{bond[1] + 1:3d}{bond[2]:3d}{(bond[3] if len(bond) > 3 else 0):3d}\n"
+        for bond in bonds
+    )
+    return (
+        f"{title}\n  test\n\n{len(atoms):3d}{len(bonds):3d}  0  0  0  0  0  0  0  0999 V2000\n"
+        f"{atom_lines}{bond_lines}M  END\n"
+    )
+
+
+def _carbon_rings(bonds):
+    """All-carbon molecule with atoms on a circle (2D, no stereo)."""
+    angles = np.linspace(0.0, 2 * np.pi, 10, endpoint=False)
+    atoms = [("C", (1.5 * np.cos(a), 1.5 * np.sin(a), 0.0)) for a in angles]
+    return _molblock("rings", atoms, [(a, b, 1) for a, b in bonds])
+
+
+def _butene(methyl_y):
+    """2-Butene in 3D; the second methyl above (cis) or below (trans) the axis."""
+    atoms = [
+        ("C", (-1.5, 1.0, 0.1)),
+        ("C", (-0.67, 0.0, 0.0)),
+        ("C", (0.67, 0.0, 0.0)),
+        ("C", (1.5, methyl_y, 0.1)),
+    ]
+    return _molblock("butene", atoms, [(0, 1, 1), (1, 2, 2), (2, 3, 1)])
+
+
+def _fake_prepare(molblock, output_pdbqt, ph):
+    output_pdbqt.write_text(f"REMARK prepared at pH {ph}\nROOT\nENDROOT\nTORSDOF 0\n")
+
+
+def _fake_identifier(molblocks):
+    # Atom block text as identity; stands in for a cheminformatics toolkit
+    return [" ".join(m.splitlines()[3:]) for m in molblocks]
+
+
+@needs_canonicalizer
+def test_canonical_smiles_is_invariant():
+    """Test invariance to atom order, title and explicit hydrogens."""
+    order = [4, 2, 0, 3, 1]
+    position = {old: new for new, old in enumerate(order)}
+    permuted = _molblock(
+        "b", [ATOMS[i] for i in order], [(position[a], position[b], o) for a, b, o in BONDS]
+    )
+    no_hydrogen = _molblock("c", ATOMS[:4], BONDS[:3])
+
+    reference, *others = canonical_smiles([_molblock("a", ATOMS, BONDS), permuted, no_hydrogen])
+
+    assert others == [reference, reference]
+
+
+@needs_canonicalizer
+def test_canonical_smiles_separates_isomers():
+    """Test ring systems, E/Z and 3D/wedge tetrahedral stereo get distinct keys."""
+    decalin = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 0), (5, 6), (6, 7), (7, 8), (8, 9)]
+    bicyclopentyl = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (5, 6), (6, 7), (7, 8), (8, 9)]
+    flat = [(e, (x, y, 0.0)) for e, (x, y, _) in ATOMS]
+    wedge = BONDS[:3] + [(0, 4, 1, 1)]
+    hashed = BONDS[:3] + [(0, 4, 1, 6)]
+
+    keys = canonical_smiles(
+        [
+            _carbon_rings(decalin + [(9, 0)]),
+            _carbon_rings(bicyclopentyl + [(9, 5), (0, 5)]),
+            _butene(1.0),
+            _butene(-1.0),
+            _molblock("r", ATOMS, BONDS),
+            _molblock("s", [(e, (-x, y, z)) for e, (x, y, z) in ATOMS], BONDS),
+            _molblock("wedge", flat, wedge),
+            _molblock("hash", flat, hashed),
+        ]
+    )
+
+    assert None not in keys
+    assert len(set(keys[:6])) == 6
+    assert keys[6] != keys[7] and {keys[6], keys[7]} == {keys[4], keys[5]}
+
+
+def test_store_round_trip_with_pack_rollover(temp_dir):
+    """Test packed storage, deduplication and reopening."""
+    store = PreparedLigandStore(temp_dir / "store", pack_size=64)
+    key = settings_key(ph=7.4)
+    entries = [(f"C{'C' * i}O", key, f"ROOT\nligand {i}\nENDROOT\n" * 5) for i in range(10)]
+
+    assert store.put_many(entries) == 10
+    assert store.put_many(entries[:3]) == 0
+    store.close()
+
+    reopened = PreparedLigandStore(temp_dir / "store", pack_size=64)
+    assert len(reopened) == 10
+    assert reopened.get(entries[7][0], key) == entries[7][2]
+    assert reopened.get(entries[7][0], settings_key(ph=6.0)) is None
+    assert len(list((temp_dir / "store" / "packs").iterdir())) > 1
+
+
+def test_store_index_avoids_wal_on_shared_filesystems(temp_dir):
+    """Test that the index uses the rollback journal, also for stores created with WAL."""
+    (temp_dir / "store").mkdir()
+    legacy = sqlite3.connect(temp_dir / "store" / "index.sqlite")
+    legacy.execute("PRAGMA journal_mode=WAL")
+    legacy.close()
+
+    store = PreparedLigandStore(temp_dir / "store")
+    store.put("CCO", settings_key(ph=7.4), "ROOT\nENDROOT\n")
+
+    assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert not (temp_dir / "store" / "index.sqlite-wal").exists()
+
+
+def test_pipeline_reuses_stored_ligands_across_screens(temp_dir):
+    """Test that a second screen of the same library is served from the store.
+
+    Store lookups of a shard happen before its new ligands are added, so the
+    duplicate within shard 0 is prepared twice but stored once, and the
+    first screen takes nothing from the store however shards are scheduled.
+    """
+    molecules = [ATOMS[:3], ATOMS[:3], ATOMS[:4], [ATOMS[0], ATOMS[1], ATOMS[3]]]
+    sdf = temp_dir / "lib.sdf"
+    sdf.write_text(
+        "".join(
+            _molblock(f"lig{i}", atoms, BONDS[: len(atoms) - 1]) + "$$$$\n"
+            for i, atoms in enumerate(molecules)
+        )
+    )
+
+    def screen(name):
+        pipeline = LigandPreparationPipeline(
+            temp_dir / name,
+            shard_size=2,
+            n_workers=2,
+            preparer=_fake_prepare,
+            store_dir=temp_dir / "store",
+            identifier=_fake_identifier,
+        )
+        return list(pipeline.run(sdf))
+
+    first = screen("target_a")
+    second = screen("target_b")
+
+    assert sum(s.n_cached for s in first) == 0
+    assert sum(s.n_cached for s in second) == 4
+    assert len(PreparedLigandStore(temp_dir / "store")) == 3
@@ -0,0 +1,118 @@
+"""Tests for parallel protein-ligand MD system preparation."""
+import numpy as np
+import pytest
+from nanosim.analysis.trajectory import Topology, read_topology, write_gro
+from nanosim.bridges.micro_to_meso import VinaToGromacsConverter
+from nanosim.engines.md_prep import SystemJob, _solvate_and_neutralize, itp_atom_count
+
+RECEPTOR_TOP = """#include "amber99sb-ildn.ff/forcefield.itp"
+#include "receptor_posre.itp"
+
+[ system ]
+Receptor
+
+[ molecules ]
+Protein_chain_A     1
+"""
+
+LIGAND_ITP = """[ moleculetype ]
+; name  nrexcl
+MOL     3
+
+[ atoms ]
+%s
+"""
+
+
+def _ligand_itp(n_atoms):
+    rows = [f"{i + 1:5d}  c3  1  MOL  C{i + 1}  {i + 1}  0.0  12.01" for i in range(n_atoms)]
+    return LIGAND_ITP % "\n".join(rows)
+
+
+def _pose(mode, affinity, shift):
+    atoms = "".join(
+        f"HETATM{i + 1:5d}  C{i + 1}  UNL     1    {x + shift:8.3f}{0.0:8.3f}{0.0:8.3f}"
+        f"  0.00  0.00    +0.000 A \n"
+        for i, x in enumerate((1.0, 2.4, 3.8))
+    )
+    return (
+        f"MODEL {mode}\nREMARK VINA RESULT: {affinity:9.3f}      0.000      0.000\n"
+        f"ROOT\n{atoms}ENDROOT\nTORSDOF 0\nENDMDL\n"
+    )
+
+
+def _write_inputs(temp_dir, n_ligand_atoms):
+    """Receptor with its topology, a ligand topology and three docked poses."""
+    receptor = Topology(
+        names=np.array(["N", "CA", "C", "O"]),
+        resnames=np.array(["GLY"] * 4),
+        resids=np.array([1] * 4),
+        elements=np.array(["N", "C", "C", "O"]),
+    )
+    coords = np.array([[0.0, 5.0, 0.0], [1.4, 5.0, 0.0], [2.0, 6.3, 0.0], [3.2, 6.4, 0.0]])
+    write_gro(temp_dir / "receptor.gro", receptor, coords, np.full(3, 30.0))
+    (temp_dir / "receptor.top").write_text(RECEPTOR_TOP)
+    (temp_dir / "receptor_posre.itp").write_text("")
+    (temp_dir / "ligand.itp").write_text(_ligand_itp(n_ligand_atoms))
+    # Pose 2 lies within the clustering cutoff of pose 1
+    (temp_dir / "docked.pdbqt").write_text(
+        _pose(1, -9.0, 0.0) + _pose(2, -8.5, 0.5) + _pose(3, -8.0, 6.0)
+    )
+    return {
+        "docking_results": temp_dir / "docked.pdbqt",
+        "receptor_structure": temp_dir / "receptor.gro",
+        "receptor_topology": temp_dir / "receptor.top",
+        "ligand_topology": temp_dir / "ligand.itp",
+        "output_dir": temp_dir / "md",
+    }
+
+
+def test_convert_prepares_poses_and_replicas_in_parallel(temp_dir, fake_obabel):
+    """Test pose clustering, complex assembly, topologies and solvated replicas."""
+    inputs = _write_inputs(temp_dir, n_ligand_atoms=6)
+
+    bridge = VinaToGromacsConverter({"n_replicas": 2, "max_workers": 2, "ligand_resname": "MOL"})
+    output = bridge.convert(inputs)
+
+    metadata = output["pose_metadata"]
+    assert [(m["mode"], m["replica"], m["seed"]) for m in metadata] == [
+        (1, 0, 0),
+        (1, 1, 1),
+        (3, 0, 0),
+        (3, 1, 1),
+    ]
+    system = read_topology(output["coordinate_files"][2])
+    assert list(system.resnames[:11]) == ["GLY"] * 4 + ["MOL"] * 6 + ["SOL"]
+    # The protonated ligand in the system matches the ligand topology atom for atom
+    ligand = system.select("resname MOL")
+    assert len(ligand) == itp_atom_count(temp_dir / "ligand.itp")
+    assert (system.elements[ligand] == "H").sum() == 3
+    assert output["md_systems"][0]["box"][0] >= 2.0
+    topology = output["topology_files"][0].read_text()
+    n_water = output["pose_metadata"][0]["n_water"]
+    assert "ligand.itp" in topology and topology.rstrip().endswith(f"SOL                 {n_water}")
+
+
+def test_convert_rejects_ligand_topology_without_hydrogens(temp_dir, fake_obabel):
+    """Test that a ligand topology lacking the added hydrogens is refused."""
+    inputs = _write_inputs(temp_dir, n_ligand_atoms=3)
+
+    with pytest.raises(ValueError, match="has 3 atoms but the protonated pose has 6"):
+        VinaToGromacsConverter({"ligand_resname": "MOL"}).convert(inputs)
+
+
+def test_gmx_solvator_passes_salt_concentration_to_genion(temp_dir, fake_gmx):
+    """Test that the gmx path adds salt on top of neutralization."""
+    job = SystemJob(
+        temp_dir / "complex.gro",
+        temp_dir / "topol.top",
+        temp_dir,
+        solvator="gmx",
+        salt_concentration=0.15,
+    )
+
+    _solvate_and_neutralize(job.complex_file, job.topology_file, job)
+
+    genion = (temp_dir / "calls.txt").read_text().splitlines()[-1].split()
+    assert genion[0] == "genion" and "-neutral" in genion
+    assert genion[genion.index("-conc") + 1] == "0.15"
@@ -0,0 +1,80 @@
+"""Tests for parallel OpenFOAM execution with selective reconstruction."""
+import pytest
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.openfoam import OpenFOAMEngine
+from nanosim.utils.retention import wait_for_cleanup
+
+
+def _parallel_config(temp_dir, **parameters):
+    return SimulationConfig(
+        "case",
+        temp_dir,
+        temp_dir / "out",
+        {
+            "particle_diameter": 1e-7,
+            "simulation_time": 0.2,
+            "n_subdomains": 4,
+            "decomposition_method": "simple",
+            "mpi_launcher": "local",
+            **parameters,
+        },
+    )
+
+
+def test_parallel_run_reconstructs_requested_times(temp_dir, fake_openfoam):
+    """Test decomposition, local MPI launch and selective reconstruction."""
+    engine = OpenFOAMEngine(_parallel_config(temp_dir, reconstruct_times=[0.1]))
+    result = engine.execute()
+    wait_for_cleanup()
+
+    case = engine.case_dir
+    calls = (case / "calls.txt").read_text().splitlines()
+    assert result.success and result.metadata["time_steps"] == ["0", "0.1"]
+    assert "n           (4 1 1);" in (case / "system" / "decomposeParDict").read_text()
+    assert sum(c == "pimpleFoam -parallel" for c in calls) == 4
+    assert calls[-1] == "reconstructPar -time 0.1 -fields (C U)"
+    assert (case / "0.1" / "C").exists()
+    # 0.2 was not reconstructed, so its decomposed copy is the only one
+    assert (case / "processor3" / "0.2").is_dir()
+    assert (case / "log.pimpleFoam.gz").exists()
+
+
+def test_parallel_run_without_reconstruction_keeps_processor_dirs(temp_dir, fake_openfoam):
+    """Test that reconstruct=False skips reconstructPar and survives cleanup."""
+    engine = OpenFOAMEngine(_parallel_config(temp_dir, reconstruct=False))
+    result = engine.execute()
+    wait_for_cleanup()
+
+    case = engine.case_dir
+    calls = (case / "calls.txt").read_text().splitlines()
+    assert result.success and result.metadata["time_steps"] == ["0", "0.1", "0.2"]
+    assert not any(c.startswith("reconstructPar") for c in calls)
+    assert sorted(p.name for p in case.glob("processor*")) == [f"processor{i}" for i in range(4)]
+    assert (case / "processor3" / "0.2").is_dir()
+
+
+def test_sweep_runs_one_case_per_input_set(temp_dir, fake_openfoam):
+    """Test that each distinct case of a 2-point sweep is meshed and solved."""
+    engine = OpenFOAMEngine(_parallel_config(temp_dir, sweep={"simulation_time": [0.1, 0.2]}))
+    result = engine.execute()
+    wait_for_cleanup()
+
+    runs = result.metadata["runs"]
+    assert result.success and len(runs) == 2
+    for run, end_time in zip(runs, ("0.1", "0.2"), strict=True):
+        case = run["directory"] / "openfoam_case"
+        calls = (case / "calls.txt").read_text().splitlines()
+        assert (
+            calls[0].strip() == "blockMesh" and sum(c == "pimpleFoam -parallel" for c in calls) == 4
+        )
+        assert f"endTime         {end_time};" in (case / "system" / "controlDict").read_text()
+        assert calls[-1].startswith("reconstructPar")
+    assert not (engine.case_dir / "calls.txt").exists()
+
+
+def test_empty_reconstruct_fields_is_rejected(temp_dir):
+    """Test that an empty field list does not fall back to all fields."""
+    engine = OpenFOAMEngine(_parallel_config(temp_dir, reconstruct_fields=[]))
+
+    with pytest.raises(ValueError, match="reconstruct_fields"):
+        engine.validate_config()
@@ -0,0 +1,69 @@
+"""Tests for in-process PDB/PDBQT conversion."""
+import numpy as np
+from nanosim.analysis.trajectory import Topology, write_pdb
+from nanosim.bridges.micro_to_meso import VinaToGromacsConverter
+from nanosim.engines.pdbqt import convert_batch, pdbqt_to_pdb
+
+POSES = """MODEL 1
+REMARK VINA RESULT:    -8.100      0.000      0.000
+ROOT
+HETATM    1  C1  UNL     1       1.000   2.000   3.000  0.00  0.00    +0.100 A
+HETATM    2  O1  UNL     1       2.000   2.000   3.000  0.00  0.00    -0.300 OA
+ENDROOT
+TORSDOF 0
+ENDMDL
+MODEL 2
+REMARK VINA RESULT:    -7.400      1.200      2.500
+ROOT
+HETATM    1  C1  UNL     1       4.000   5.000   6.000  0.00  0.00    +0.100 A
+HETATM    2  O1  UNL     1       5.000   5.000   6.000  0.00  0.00    -0.300 OA
+ENDROOT
+TORSDOF 0
+ENDMDL
+"""
+
+
+def test_pdbqt_to_pdb_selects_model_and_maps_elements(temp_dir):
+    """Test model selection and AD4 type to element mapping."""
+    (temp_dir / "out.pdbqt").write_text(POSES)
+
+    lines = pdbqt_to_pdb(temp_dir / "out.pdbqt", temp_dir / "pose.pdb", model=2)
+    lines = lines.read_text().splitlines()
+
+    assert len(lines) == 3 and lines[-1] == "END"
+    assert float(lines[0][30:38]) == 4.0
+    assert [line[76:78].strip() for line in lines[:2]] == ["C", "O"]
+
+
+def test_batch_converts_receptors_and_bridge_poses(temp_dir, fake_obabel):
+    """Test threaded receptor conversion and the Vina → GROMACS pose export."""
+    topology = Topology(
+        names=np.array(["N", "CA", "C", "O"]),
+        resnames=np.array(["GLY"] * 4),
+        resids=np.array([1] * 4),
+        elements=np.array(["N", "C", "C", "O"]),
+    )
+    jobs = []
+    for i in range(3):
+        pdb = temp_dir / f"frame{i}.pdb"
+        coords = np.arange(12, dtype=float).reshape(4, 3) + i
+        write_pdb(pdb, topology, coords)
+        jobs.append((pdb, temp_dir / f"frame{i}.pdbqt"))
+
+    outputs = convert_batch(jobs, max_workers=3)
+
+    assert [line[77:79].strip() for line in outputs[0].read_text().splitlines()[:4]] == [
+        "N",
+        "C",
+        "C",
+        "OA",
+    ]
+    assert float(outputs[2].read_text().splitlines()[0][30:38]) == 2.0
+
+    (temp_dir / "docked.pdbqt").write_text(POSES)
+    bridge = VinaToGromacsConverter({"ligand_resname": "MOL"})
+    poses = bridge._extract_poses(temp_dir / "docked.pdbqt")
+    pdb_files = bridge._convert_pdbqt_to_pdb(poses, temp_dir)
+
+    assert [p.name for p in pdb_files] == ["pose_1.pdb", "pose_2.pdb"]
+    assert " MOL " in pdb_files[1].read_text().splitlines()[1]
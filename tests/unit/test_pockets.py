@@ -0,0 +1,126 @@
+"""Tests for grid-based pocket detection."""
+import numpy as np
+from nanosim.analysis.pockets import (
+    detect_pockets,
+    detect_pockets_batch,
+    label_components,
+    track_pockets,
+)
+from nanosim.analysis.trajectory import Topology, write_pdb
+from nanosim.bridges.meso_to_micro import GromacsToVinaConverter
+
+
+def _protein_with_cavity(seed: int = 0, cavity_center=(8.0, 0.0, 0.0)) -> np.ndarray:
+    """Dense ball of atoms with a spherical cavity carved out."""
+    rng = np.random.default_rng(seed)
+    atoms = rng.uniform(-20, 20, size=(40000, 3))
+    atoms = atoms[np.linalg.norm(atoms, axis=1) < 20]
+    atoms = atoms[np.linalg.norm(atoms - np.array(cavity_center), axis=1) > 7]
+    return atoms[:6000]
+
+
+def test_label_components_counts_six_connected_regions():
+    """Test connected-component labelling on a small grid."""
+    mask = np.zeros((5, 5, 5), dtype=bool)
+    mask[0, 0, :] = True
+    mask[2, :, 2] = True
+    mask[4, 4, 4] = True
+    mask[3, 3, 3] = True  # diagonal to (4, 4, 4): not 6-connected
+
+    labels, n = label_components(mask)
+
+    assert n == 4
+    assert len(set(labels[0, 0, :].tolist())) == 1
+    assert labels[4, 4, 4] != labels[3, 3, 3]
+    assert (labels[~mask] == -1).all()
+
+
+def test_detect_pockets_finds_buried_cavity():
+    """Test that the carved cavity is found with its lining residues."""
+    atoms = _protein_with_cavity()
+    resids = np.arange(len(atoms)) // 10
+
+    pockets = detect_pockets(atoms, resids)
+
+    assert len(pockets) >= 1
+    assert np.allclose(pockets[0]["center"], (8.0, 0.0, 0.0), atol=1.0)
+    assert pockets[0]["volume"] >= 100.0
+    assert pockets[0]["residues"]
+
+    batched = detect_pockets_batch([atoms, atoms], resids, max_workers=2)
+    assert [p["center"] for p in batched[1]] == [p["center"] for p in pockets]
+
+
+def test_identify_binding_sites_grid_method(temp_dir):
+    """Test the built-in detector in the MD-to-docking bridge."""
+    atoms = _protein_with_cavity()
+    n = len(atoms)
+    topology = Topology(
+        names=np.array(["CA"] * n),
+        resnames=np.array(["ALA"] * n),
+        resids=np.arange(n) // 10,
+        elements=np.array(["C"] * n),
+    )
+    pdb = write_pdb(temp_dir / "receptor.pdb", topology, atoms)
+
+    converter = GromacsToVinaConverter({"min_pocket_volume": 150.0})
+    sites = converter._identify_binding_sites([pdb], temp_dir)
+
+    assert sites
+    assert sites[0]["receptor"] == pdb
+    assert all(site["volume"] >= 150.0 for site in sites)
+
+
+def _pocket(center, residues, volume=200.0):
+    lo = np.asarray(center) - 3.0
+    return {
+        "center": tuple(center),
+        "volume": volume,
+        "residues": residues,
+        "min_corner": tuple(lo),
+        "max_corner": tuple(lo + 6.0),
+    }
+
+
+def test_track_pockets_merges_recurring_sites():
+    """Test that a pocket seen in several frames becomes one persistent site."""
+    frames = [
+        [_pocket((0, 0, 0), [1, 2, 3]), _pocket((20, 0, 0), [40, 41])],
+        [_pocket((1, 0, 0), [1, 2, 3, 4], volume=300.0)],
+        [_pocket((0.5, 0, 0), [2, 3, 4]), _pocket((0, 20, 0), [70, 71])],
+        [],
+    ]
+
+    sites = track_pockets(frames, centroid_cutoff=4.0, min_residue_overlap=0.5)
+
+    assert len(sites) == 3
+    main = sites[0]
+    assert main["frames"] == [0, 1, 2]
+    assert main["occupancy"] == 0.75
+    assert main["representative"] == 1
+    assert main["residues"] == [1, 2, 3, 4]
+    assert main["min_corner"] == (-3.0, -3.0, -3.0)
+    assert main["max_corner"] == (4.0, 3.0, 3.0)
+    assert sorted(s["occupancy"] for s in sites[1:]) == [0.25, 0.25]
+
+
+def test_track_pockets_requires_residue_overlap():
+    """Test that nearby pockets lined by different residues stay separate."""
+    frames = [[_pocket((0, 0, 0), [1, 2, 3])], [_pocket((1, 0, 0), [7, 8, 9])]]
+
+    sites = track_pockets(frames, frame_weights=[3, 1])
+
+    assert len(sites) == 2
+    assert [s["occupancy"] for s in sites] == [0.75, 0.25]
+
+
+def test_grid_parameters_cover_site():
+    """Test Vina boxes enclose all merged pockets with padding."""
+    converter = GromacsToVinaConverter({"grid_padding": 4.0, "min_box_size": 20.0})
+    site = {"site_id": 0, "min_corner": (0.0, 0.0, 0.0), "max_corner": (30.0, 6.0, 6.0)}
+
+    grid = converter._generate_grid_parameters([site])[0]
+
+    assert (grid["center_x"], grid["center_y"], grid["center_z"]) == (15.0, 3.0, 3.0)
+    # Sizes are rounded up to an even number of 0.375 Å voxels
+    assert (grid["size_x"], grid["size_y"], grid["size_z"]) == (38.25, 20.25, 20.25)
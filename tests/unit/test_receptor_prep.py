@@ -0,0 +1,89 @@
+"""Tests for template-based receptor preparation."""
+import numpy as np
+from nanosim.analysis.trajectory import Topology, write_pdb
+from nanosim.engines.autodock import prepare_receptor
+from nanosim.engines.receptor_prep import get_receptor_template, prepare_receptor_frames
+
+# Serine (N-H, CA-HA, OG-HG) followed by a histidine with protonated NE2
+ATOMS = [
+    ("N", "SER", 1, (0.0, 0.0, 0.0)),
+    ("H", "SER", 1, (-0.5, 0.8, 0.0)),
+    ("CA", "SER", 1, (1.46, 0.0, 0.0)),
+    ("HA", "SER", 1, (1.8, -1.0, 0.0)),
+    ("OG", "SER", 1, (2.0, 1.3, 0.5)),
+    ("HG", "SER", 1, (2.9, 1.3, 0.5)),
+    ("ND1", "HIS", 2, (5.0, 0.0, 0.0)),
+    ("CE1", "HIS", 2, (6.3, 0.0, 0.0)),
+    ("NE2", "HIS", 2, (6.8, 1.2, 0.0)),
+    ("HE2", "HIS", 2, (7.8, 1.4, 0.0)),
+]
+
+
+def _receptor():
+    names, resnames, resids, coords = zip(*ATOMS, strict=True)
+    topology = Topology(
+        names=np.array(names),
+        resnames=np.array(resnames),
+        resids=np.array(resids),
+        elements=np.array([n[0] for n in names]),
+    )
+    return topology, np.array(coords)
+
+
+def _types(pdbqt_text):
+    return {line[12:16].strip(): line[77:79].strip() for line in pdbqt_text.splitlines()[:-1]}
+
+
+def test_template_types_atoms_and_merges_nonpolar_hydrogens():
+    """Test AD4 typing, polar hydrogen handling and charge merging."""
+    topology, coords = _receptor()
+    template = get_receptor_template(topology, coords)
+    types = _types(template.render(coords))
+
+    assert "HA" not in types
+    assert types["H"] == "HD" and types["HG"] == "HD" and types["HE2"] == "HD"
+    assert types["OG"] == "OA" and types["CE1"] == "A"
+    assert types["ND1"] == "NA" and types["NE2"] == "N"
+    assert len(template.atom_indices) == len(ATOMS) - 1
+
+
+def test_template_types_metals_and_drops_other_ions():
+    """Test that Zn is typed for Vina and Na/Cl counter-ions are not written."""
+    topology, coords = _receptor()
+    ions = [("ZN", "ZN", 3, "ZN"), ("NA", "NA", 4, "NA"), ("CL", "CL", 5, "CL")]
+    topology = Topology(
+        names=np.append(topology.names, [i[0] for i in ions]),
+        resnames=np.append(topology.resnames, [i[1] for i in ions]),
+        resids=np.append(topology.resids, [i[2] for i in ions]),
+        elements=np.append(topology.elements, [i[3] for i in ions]),
+    )
+    coords = np.vstack([coords, [[10.0, 0.0, 0.0], [15.0, 0.0, 0.0], [20.0, 0.0, 0.0]]])
+
+    types = _types(get_receptor_template(topology, coords).render(coords))
+
+    assert types["ZN"] == "Zn"
+    assert "NA" not in types and "CL" not in types
+    assert types["OG"] == "OA" and types["ND1"] == "NA"
+
+
+def test_frames_reuse_template_and_only_substitute_coordinates(temp_dir):
+    """Test that many frames share one template and keep their coordinates."""
+    topology, coords = _receptor()
+    frames = [(coords + shift, temp_dir / f"frame{shift}.pdbqt") for shift in range(3)]
+
+    outputs = prepare_receptor_frames(topology, frames)
+
+    assert get_receptor_template(topology, coords + 5.0) is get_receptor_template(topology, coords)
+    first, last = (out.read_text().splitlines() for out in (outputs[0], outputs[2]))
+    assert float(last[0][30:38]) == 2.0
+    assert [line[:30] + line[54:] for line in first] == [line[:30] + line[54:] for line in last]
+
+
+def test_prepare_receptor_from_pdb(temp_dir):
+    """Test preparing a receptor PDB file."""
+    topology, coords = _receptor()
+    pdb_file = write_pdb(temp_dir / "receptor.pdb", topology, coords)
+
+    prepare_receptor(pdb_file, temp_dir / "receptor.pdbqt")
+
+    assert _types((temp_dir / "receptor.pdbqt").read_text())["ND1"] == "NA"
@@ -0,0 +1,82 @@
+"""Tests for output retention policies."""
+import gzip
+
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.openfoam import OpenFOAMEngine
+from nanosim.utils.retention import (
+    TRASH_DIR,
+    RetentionPolicy,
+    RetentionRule,
+    all_but_latest,
+    wait_for_cleanup,
+)
+
+
+def test_first_matching_rule_wins(temp_dir):
+    """Test rule precedence, time step selection and nested entry handling."""
+    for name in ["0", "0.1", "0.2", "processor0/0.1", "system"]:
+        (temp_dir / name).mkdir(parents=True)
+    (temp_dir / "log.pimpleFoam").write_text("log")
+
+    policy = RetentionPolicy.from_mapping({"0.1": "keep"}) + RetentionPolicy(
+        [
+            RetentionRule("processor*", "delete"),
+            RetentionRule("*", "delete", select=all_but_latest),
+            RetentionRule("log.*", "compress"),
+        ]
+    )
+    classified = policy.classify(temp_dir)
+
+    assert [p.name for p in classified["keep"]] == ["0.1"]
+    assert [p.name for p in classified["delete"]] == ["processor0", "0"]
+    assert [p.name for p in classified["compress"]] == ["log.pimpleFoam"]
+
+
+def _openfoam_config(temp_dir, **parameters):
+    return SimulationConfig(
+        "case",
+        temp_dir,
+        temp_dir / "out",
+        {"particle_diameter": 1e-7, "simulation_time": 0.2, **parameters},
+    )
+
+
+def test_openfoam_cleanup_runs_in_background(temp_dir, fake_openfoam):
+    """Test that cleanup of a serial run keeps every written time step."""
+    engine = OpenFOAMEngine(_openfoam_config(temp_dir))
+    assert engine.execute().success
+    wait_for_cleanup()
+
+    case = engine.case_dir
+    times = sorted(p.name for p in case.iterdir() if p.name[0].isdigit())
+    assert times == ["0", "0.1", "0.2"] and (case / "0.1" / "C").exists()
+    assert not list(case.glob("log.*[!z]")) and not (case / TRASH_DIR).exists()
+    with gzip.open(case / "log.pimpleFoam.gz", "rt") as log:
+        log.read()
+
+
+def test_openfoam_cleanup_keeps_unreconstructed_time_steps(temp_dir, fake_openfoam):
+    """Test that processor directories are only removed once all times are reconstructed."""
+    parallel = {"n_subdomains": 2, "decomposition_method": "simple", "mpi_launcher": "local"}
+
+    latest = OpenFOAMEngine(_openfoam_config(temp_dir / "latest", **parallel))
+    assert latest.execute().success
+    wait_for_cleanup()
+    assert (latest.case_dir / "0.2" / "C").exists()
+    assert (latest.case_dir / "processor1" / "0.1" / "C").exists()
+
+    full = OpenFOAMEngine(_openfoam_config(temp_dir / "all", reconstruct_times="all", **parallel))
+    assert full.execute().success
+    wait_for_cleanup()
+    assert (full.case_dir / "0.1" / "C").exists() and (full.case_dir / "0.2" / "C").exists()
+    assert not list(full.case_dir.glob("processor*"))
+
+
+def test_openfoam_cleanup_deletes_intermediate_time_steps_on_request(temp_dir, fake_openfoam):
+    """Test that intermediate time steps are only deleted when opted in."""
+    engine = OpenFOAMEngine(_openfoam_config(temp_dir, retention={"intermediate_times": "delete"}))
+    assert engine.execute().success
+    wait_for_cleanup()
+
+    times = sorted(p.name for p in engine.case_dir.iterdir() if p.name[0].isdigit())
+    assert times == ["0", "0.2"]
@@ -0,0 +1,120 @@
+"""Tests for built-in solvation and ion placement."""
+import numpy as np
+import pytest
+from nanosim.analysis.trajectory import Topology, write_gro
+from nanosim.engines.solvation import (
+    WATER_DENSITY,
+    fill_box,
+    lattice_water_box,
+    load_water_box,
+    solvate,
+    topology_charge,
+)
+
+
+def _solute():
+    coords = np.array([[15.0, 15.0, 15.0], [16.5, 15.0, 15.0], [15.0, 16.5, 15.0]])
+    topology = Topology(
+        names=np.array(["C1", "C2", "C3"]),
+        resnames=np.array(["LIG"] * 3),
+        resids=np.array([1] * 3),
+        elements=np.array(["C"] * 3),
+    )
+    return topology, coords
+
+
+def test_fill_box_removes_overlaps_and_keeps_density():
+    """Test tiling, solute overlap removal and periodic image clashes."""
+    _, solute = _solute()
+    box = np.full(3, 30.0)
+
+    molecules = fill_box(lattice_water_box(), box, solute)
+
+    distances = np.linalg.norm(molecules.reshape(-1, 1, 3) - solute[None], axis=-1)
+    assert distances.min() >= 2.4
+    assert np.all((molecules[:, 0] >= 0) & (molecules[:, 0] < box))
+    interior = np.all((molecules[:, 0] >= 3.0) & (molecules[:, 0] < 27.0), axis=1)
+    assert abs(interior.sum() / 24.0**3 - WATER_DENSITY) < 0.1 * WATER_DENSITY
+
+    oxygens = molecules[:, 0]
+    delta = oxygens[:, None] - oxygens[None]
+    delta -= box * np.round(delta / box)
+    image_distances = np.linalg.norm(delta, axis=-1) + np.eye(len(oxygens)) * 10.0
+    assert image_distances.min() >= 2.3
+
+
+def test_solvate_neutralizes_with_ions_away_from_solute(temp_dir):
+    """Test ion counts, placement and ordering of the solvated system."""
+    topology, solute = _solute()
+
+    system = solvate(
+        topology, solute, np.full(3, 30.0), lattice_water_box(), net_charge=-2.0, seed=1
+    )
+
+    assert (system.n_cations, system.n_anions) == (2, 0)
+    assert list(system.topology.resnames[-2:]) == ["NA", "NA"]
+    assert system.topology.n_atoms == 3 + 3 * system.n_water + 2
+    ions = system.coordinates[-2:]
+    assert np.linalg.norm(ions[:, None] - solute[None], axis=-1).min() >= 5.0
+
+    top = temp_dir / "topol.top"
+    (temp_dir / "lig.itp").write_text("[ moleculetype ]\nLIG 3\n[ atoms ]\n")
+    with open(temp_dir / "lig.itp", "a") as handle:
+        for i, charge in enumerate((-0.5, -1.0, -0.5), start=1):
+            handle.write(f"{i} c 1 LIG C{i} {i} {charge}\n")
+    top.write_text('#include "lig.itp"\n[ molecules ]\nLIG 2\n')
+    assert topology_charge(top) == -4.0
+
+
+def test_solvate_sets_ion_elements_from_ion_names():
+    """Test that ions named by force-field residue get element symbols."""
+    topology, solute = _solute()
+
+    system = solvate(
+        topology,
+        solute,
+        np.full(3, 30.0),
+        lattice_water_box(),
+        net_charge=1.0,
+        concentration=0.15,
+        cation="SOD",
+        anion="CLA",
+    )
+
+    cations = slice(-system.n_cations - system.n_anions, -system.n_anions)
+    assert system.n_cations >= 1 and system.n_anions == system.n_cations + 1
+    assert set(system.topology.resnames[cations]) == {"SOD"}
+    assert set(system.topology.elements[cations]) == {"NA"}
+    assert set(system.topology.elements[-system.n_anions :]) == {"CL"}
+    assert system.topology.select("element Na").size == system.n_cations
+    with pytest.raises(ValueError, match="Unknown ion"):
+        solvate(topology, solute, np.full(3, 30.0), lattice_water_box(), cation="XX")
+
+
+def test_four_site_water_keeps_virtual_site_without_element(temp_dir):
+    """Test that the TIP4P virtual site MW is not typed as an element."""
+    three_site = lattice_water_box(n_per_side=4)
+    oxygen, hydrogens = three_site.coordinates[:, :1], three_site.coordinates[:, 1:]
+    virtual = oxygen + 0.15 * (hydrogens.mean(axis=1, keepdims=True) - oxygen)
+    molecules = np.concatenate([three_site.coordinates, virtual], axis=1)
+    n_molecules = len(molecules)
+    names = np.tile(["OW", "HW1", "HW2", "MW"], n_molecules)
+    write_gro(
+        temp_dir / "tip4p.gro",
+        Topology(
+            names=names,
+            resnames=np.full(names.size, "SOL"),
+            resids=np.repeat(np.arange(n_molecules) + 1, 4),
+            elements=np.tile(["O", "H", "H", "M"], n_molecules),
+        ),
+        molecules.reshape(-1, 3),
+        three_site.box,
+    )
+
+    water = load_water_box("tip4p", source=temp_dir / "tip4p.gro")
+    topology, solute = _solute()
+    system = solvate(topology, solute, np.full(3, 30.0), water)
+
+    assert water.elements.tolist() == ["O", "H", "H", ""]
+    waters = system.topology.elements[topology.n_atoms :].reshape(-1, 4)
+    assert (waters == ["O", "H", "H", ""]).all()
@@ -0,0 +1,55 @@
+"""Tests for CFD-to-MD coordinate transforms."""
+import numpy as np
+from nanosim.utils import transforms
+from nanosim.utils.transforms import CoordinateTransform
+
+
+def test_transform_in_place_with_wrapping(monkeypatch):
+    """Test block-wise in-place transform, periodic wrapping and inverse."""
+    monkeypatch.setattr(transforms, "_CHUNK_ROWS", 3)
+    rng = np.random.default_rng(0)
+    origin = np.array([1e-6, 2e-6, 0.0])
+    positions = origin + rng.uniform(0, 5e-7, size=(10, 3))
+    expected = (positions - origin) * 1e9
+
+    transform = CoordinateTransform.si_to_gromacs(origin, np.full(3, 5e-7))
+    out = positions.copy()
+    assert transform.apply(out, out=out) is out
+    assert np.allclose(out, expected)
+    assert np.allclose(transform.inverse().apply(out), positions)
+
+    outside = transform.apply(origin + np.array([[6e-7, -1e-7, 2e-7]]))
+    assert np.allclose(outside, [[100.0, 400.0, 200.0]])
+    assert np.allclose(transform.apply_velocities(np.ones((2, 3))), 1e-3)
+
+
+def test_batch_shares_one_transform(temp_dir, foam):
+    """Test that all snapshots of a batch use the case's cached transform."""
+    from nanosim.bridges.macro_to_meso import OpenFoamToGromacsConverter
+
+    case = temp_dir / "case"
+    foam.write_block_mesh(case / "constant" / "polyMesh", (2, 2, 2), spacing=1e-6)
+    for time in ["1", "2"]:
+        foam.write_field(case / time / "C", "volScalarField", np.arange(1.0, 9.0))
+
+    bridge = OpenFoamToGromacsConverter({"seed": 2})
+    results = bridge.convert_batch(
+        {
+            "concentration_field": case,
+            "grid": {},
+            "particle_properties": {"mass": 1e-18},
+            "output_dir": temp_dir / "md",
+            "time_points": [1.0, 2.0],
+        }
+    )
+
+    boxes = [r["system_box"] for r in results]
+    assert boxes[0]["transform"] is boxes[1]["transform"]
+    assert np.allclose(boxes[0]["size_nm"], 2000.0)
+    gro = (temp_dir / "md" / "t_1" / "particles.gro").read_text().splitlines()
+    written = np.array(
+        [[float(line[20 + 8 * k : 28 + 8 * k]) for k in range(3)] for line in gro[2:-1]]
+    )
+    expected = boxes[0]["transform"].apply(results[0]["particle_positions"])
+    assert np.allclose(written, expected, atol=5e-4)
+    assert np.allclose([float(gro[-1][10 * k : 10 * k + 10]) for k in range(3)], 2000.0)
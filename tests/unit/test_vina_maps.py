@@ -0,0 +1,77 @@
+"""Tests for the Vina grid-map cache."""
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines.autodock import AutoDockVinaEngine
+from nanosim.engines.vina_maps import GridMapCache, snap_box
+
+
+class _CountingComputer:
+    """Fake map computer that records calls and writes one map file."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, receptor, center, size, spacing, scoring, map_prefix):
+        self.calls += 1
+        map_prefix.with_suffix(".C.map").write_text(f"{center} {size}\n")
+
+
+def test_snap_box_rounds_to_even_voxels():
+    """Test box snapping to the map grid."""
+    center, size = snap_box((1.01, -0.2, 0.0), (20.0, 22.5, 0.3))
+
+    assert center == (1.125, -0.375, 0.0)
+    assert size == (20.25, 22.5, 0.75)
+
+
+def test_grid_map_cache_computes_once_per_receptor_and_box(temp_dir):
+    """Test that maps are reused across ligands and keyed by receptor content."""
+    receptor = temp_dir / "receptor.pdbqt"
+    receptor.write_text(
+        "ATOM      1  CA  ALA A   1       0.000   0.000   0.000  1.00  0.00     0.000 C\n"
+    )
+    computer = _CountingComputer()
+    cache = GridMapCache(temp_dir / "maps", compute=computer)
+
+    first = cache.get_or_compute(receptor, (0.0, 0.0, 0.0), (20.0, 20.0, 20.0))
+    again = cache.get_or_compute(receptor, (0.01, 0.0, 0.0), (20.0, 20.0, 20.0))
+
+    assert first == again
+    assert computer.calls == 1
+    assert first.with_suffix(".C.map").exists()
+    assert cache.box(first)["size"] == [20.25, 20.25, 20.25]
+
+    receptor.write_text(
+        "ATOM      1  CA  GLY A   1       0.000   0.000   0.000  1.00  0.00     0.000 C\n"
+    )
+    assert cache.get(receptor, (0.0, 0.0, 0.0), (20.0, 20.0, 20.0)) is None
+    cache.get_or_compute(receptor, (0.0, 0.0, 0.0), (20.0, 20.0, 20.0))
+    assert computer.calls == 2
+
+
+def test_engine_setup_references_cached_maps(temp_dir, monkeypatch):
+    """Test that the Vina config uses cached maps instead of the receptor."""
+    receptor = temp_dir / "receptor.pdbqt"
+    receptor.write_text("REMARK receptor\n")
+    computer = _CountingComputer()
+    monkeypatch.setattr("nanosim.engines.vina_maps.compute_grid_maps", computer)
+
+    config = SimulationConfig(
+        name="dock",
+        input_dir=temp_dir,
+        output_dir=temp_dir / "out",
+        parameters={
+            "exhaustiveness": 8,
+            "receptor": str(receptor),
+            "center": [1.0, 2.0, 3.0],
+            "size": [20, 20, 20],
+            "map_cache_dir": str(temp_dir / "maps"),
+        },
+    )
+    engine = AutoDockVinaEngine(config)
+    engine.setup()
+
+    text = engine.config_file.read_text()
+    assert f"maps = {engine.map_prefix}" in text
+    assert "receptor =" not in text
+    assert "center_x = 1.125" in text
+    assert computer.calls == 1
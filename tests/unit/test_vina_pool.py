@@ -0,0 +1,220 @@
+"""Tests for the persistent Vina worker pool and result parsing."""
+import sys
+from pathlib import Path
+
+from nanosim.core.simulation import SimulationConfig
+from nanosim.engines import vina_pool
+from nanosim.engines.autodock import AutoDockVinaEngine, DockingResultParser
+from nanosim.engines.docking_archive import DockingArchive
+from nanosim.engines.vina_pool import StubVinaBackend, VinaWorkerPool
+
+LIGAND = (
+    "ROOT\n"
+    "HETATM    1  C1  LIG A   1       1.000   2.000   3.000  0.00  0.00     0.000 C\n"
+    "HETATM    2  O1  LIG A   1       2.200   2.000   3.000  0.00  0.00    -0.300 OA\n"
+    "ENDROOT\n"
+    "TORSDOF 0\n"
+)
+
+
+def _ligand(i):
+    return LIGAND.replace("LIG", f"L{i:02d}")
+
+
+def test_worker_pool_docks_stream_with_stub_backend():
+    """Test that every ligand is docked once and results are deterministic."""
+    ligands = [(f"lig{i}", _ligand(i)) for i in range(10)]
+
+    with VinaWorkerPool(
+        None, [0, 0, 0], [20, 20, 20], backend="stub", n_workers=2, num_modes=3, max_pending=3
+    ) as pool:
+        first = {r["ligand_id"]: r for r in pool.dock_many(iter(ligands))}
+        second = {r["ligand_id"]: r for r in pool.dock_many(ligands)}
+        thorough = {r["ligand_id"]: r for r in pool.dock_many(ligands, exhaustiveness=32)}
+
+    assert sorted(first) == sorted(lig_id for lig_id, _ in ligands)
+    assert all(r["success"] for r in first.values())
+    assert all(len(r["scores"]) == 3 for r in first.values())
+    assert all(first[k]["best_score"] == second[k]["best_score"] for k in first)
+    assert all(thorough[k]["best_score"] < first[k]["best_score"] for k in first)
+
+
+def test_result_parser_reads_poses_and_log(temp_dir):
+    """Test parsing of Vina PDBQT output and log tables."""
+    poses = temp_dir / "out.pdbqt"
+    poses.write_text(
+        "MODEL 1\nREMARK VINA RESULT:    -7.1      0.000      0.000\n"
+        + LIGAND
+        + "ENDMDL\nMODEL 2\nREMARK VINA RESULT:    -8.4      1.500      2.700\n"
+        + LIGAND
+        + "ENDMDL\n"
+    )
+    log = temp_dir / "log.txt"
+    log.write_text(
+        "mode |   affinity | dist from best mode\n"
+        "     | (kcal/mol) | rmsd l.b.| rmsd u.b.\n"
+        "-----+------------+----------+----------\n"
+        "   1 |       -8.3 |      0.0 |      0.0\n"
+        "   2 |       -7.9 |      2.1 |      3.4\n"
+        "Writing output ... done.\n"
+    )
+
+    parsed = DockingResultParser.parse_pdbqt(poses)
+    best = DockingResultParser.get_best_pose(poses)
+
+    assert [p["affinity"] for p in parsed] == [-7.1, -8.4]
+    assert parsed[0]["coordinates"][1] == (2.2, 2.0, 3.0)
+    assert best["mode"] == 2 and best["rmsd_ub"] == 2.7
+    assert DockingResultParser.extract_binding_affinities(log) == [(1, -8.3), (2, -7.9)]
+
+
+def test_engine_screens_ligand_directory(temp_dir):
+    """Test that the engine docks a ligand library through the pool."""
+    library = temp_dir / "ligands"
+    library.mkdir()
+    for i in range(4):
+        (library / f"lig{i}.pdbqt").write_text(_ligand(i))
+
+    config = SimulationConfig(
+        name="screen",
+        input_dir=library,
+        output_dir=temp_dir / "out",
+        parameters={
+            "exhaustiveness": 4,
+            "ligands": library,
+            "center": [0.0, 0.0, 0.0],
+            "backend": "stub",
+            "n_workers": 2,
+        },
+    )
+    engine = AutoDockVinaEngine(config)
+    engine.setup()
+    result = engine.run()
+
+    assert result.success
+    assert result.metadata["n_docked"] == 4
+    scores = (engine.work_dir / "docking_scores.txt").read_text().splitlines()
+    assert len(scores) == 5
+    (top_id, top_score), *_ = DockingResultParser.select_top_hits(engine.work_dir / "results", 2)
+    best = DockingResultParser.get_best_pose(engine.work_dir / "results", top_id)
+    assert scores[1].startswith(top_id)
+    assert best["affinity"] == top_score
+
+
+def test_two_tier_screen_refines_top_fraction():
+    """Test that only the best screened ligands are re-docked thoroughly."""
+    ligands = [(f"lig{i}", _ligand(i)) for i in range(20)]
+
+    with VinaWorkerPool(None, [0, 0, 0], [20, 20, 20], backend="stub", n_workers=2) as pool:
+        results = list(
+            pool.dock_two_tier(
+                ligands, screen_exhaustiveness=4, refine_exhaustiveness=32, refine_fraction=0.2
+            )
+        )
+
+    screen = {r["ligand_id"]: r["best_score"] for r in results if r["tier"] == "screen"}
+    refined = {r["ligand_id"]: r for r in results if r["tier"] == "refine"}
+    top = sorted(screen, key=screen.get)[:4]
+
+    assert len(screen) == 20
+    assert sorted(refined) == sorted(top)
+    assert all(r["exhaustiveness"] == 32 for r in refined.values())
+    assert all(r["best_score"] < r["screen_score"] for r in refined.values())
+
+
+FAKE_VINA = """
+class Vina:
+    def __init__(self, sf_name="vina", seed=0, verbosity=1):
+        self.sf_name = sf_name
+
+    def set_receptor(self, receptor):
+        pass
+
+    def compute_vina_maps(self, center, box_size):
+        pass
+
+    def set_ligand_from_string(self, ligand):
+        self.ligand = ligand
+
+    def dock(self, exhaustiveness=8, n_poses=9):
+        pass
+
+    def poses(self, n_poses=9):
+        return (
+            "MODEL 1\\nREMARK VINA RESULT:    -7.0      0.000      0.000\\n"
+            f"REMARK SCORING {self.sf_name}\\n" + self.ligand + "ENDMDL\\n"
+        )
+"""
+
+
+def test_engine_passes_scoring_function_to_vina_workers(temp_dir, monkeypatch):
+    """Test that a non-default scoring setting reaches Vina(sf_name=...) in the workers."""
+    bindings = temp_dir / "bindings"
+    bindings.mkdir()
+    (bindings / "vina.py").write_text(FAKE_VINA)
+    monkeypatch.syspath_prepend(str(bindings))
+    monkeypatch.delitem(sys.modules, "vina", raising=False)
+
+    library = temp_dir / "ligands"
+    library.mkdir()
+    (library / "lig0.pdbqt").write_text(_ligand(0))
+    config = SimulationConfig(
+        name="screen",
+        input_dir=library,
+        output_dir=temp_dir / "out",
+        parameters={
+            "exhaustiveness": 4,
+            "ligands": library,
+            "receptor": temp_dir / "receptor.pdbqt",
+            "center": [0.0, 0.0, 0.0],
+            "backend": "vina",
+            "scoring": "vinardo",
+            "n_workers": 1,
+        },
+    )
+    engine = AutoDockVinaEngine(config)
+    engine.setup()
+    result = engine.run()
+
+    assert result.success
+    poses = DockingArchive(engine.work_dir / "results").read("lig0")
+    assert "REMARK SCORING vinardo" in poses
+
+
+class EmptyBackend(StubVinaBackend):
+    """Backend that finishes without producing any pose."""
+
+    def dock(self, ligand_pdbqt, exhaustiveness=None):
+        return ""
+
+
+def test_worker_reports_ligand_without_poses_as_failed(monkeypatch):
+    """Test that an empty pose list is a failure rather than a success without a score."""
+    monkeypatch.setattr(vina_pool, "_WORKER_BACKEND", EmptyBackend(None, [0, 0, 0], [20, 20, 20]))
+
+    result = vina_pool._dock_in_worker("lig0", _ligand(0), None)
+
+    assert not result["success"]
+    assert "no docked poses" in result["error"]
+
+
+def test_two_tier_screen_spools_text_ligands(monkeypatch):
+    """Test that ligand text is not held in memory between the tiers."""
+    ligands = [(f"lig{i}", _ligand(i)) for i in range(6)]
+    refined_inputs = []
+    dock_many = VinaWorkerPool.dock_many
+
+    def _spy(self, stream, exhaustiveness=None):
+        if exhaustiveness == 32:
+            stream = list(stream)
+            refined_inputs.extend(ligand for _, ligand in stream)
+        return dock_many(self, stream, exhaustiveness)
+
+    monkeypatch.setattr(VinaWorkerPool, "dock_many", _spy)
+    with VinaWorkerPool(None, [0, 0, 0], [20, 20, 20], backend="stub", n_workers=1) as pool:
+        results = list(pool.dock_two_tier(ligands, refine_fraction=0.5))
+
+    assert len(refined_inputs) == 3
+    assert all(isinstance(ligand, Path) for ligand in refined_inputs)
+    assert sum(r["tier"] == "refine" for r in results) == 3
+    assert not any(ligand.exists() for ligand in refined_inputs)